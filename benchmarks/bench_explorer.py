@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Explorer Benchmarks
+
+Headless benchmarks for RGBColorExplorer and RGBColorExplorerMini. Both
+explorers run against the fake Tk backend in fake_tk.py, with root.after
+callbacks driven by a simulated clock, so the numbers measure our own Python
+code and can be collected on build hosts without a display.
+
+Usage:
+    python benchmarks/bench_explorer.py                 # human-readable table
+    python benchmarks/bench_explorer.py --json          # JSON on stdout
+    python benchmarks/bench_explorer.py --output r.json # JSON to a file
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import fake_tk  # noqa: E402  (benchmarks/ is on sys.path when run as a script)
+
+fake_tk.install()
+
+import rgb_color_explorer  # noqa: E402
+import rgb_color_explorer_mini  # noqa: E402
+from color_core import get_dropdown_values  # noqa: E402
+from color_palette import Palette  # noqa: E402
+from color_search import ColorSearch, TypeAhead  # noqa: E402
+
+
+EXPLORERS = {
+    "RGBColorExplorer": rgb_color_explorer.RGBColorExplorer,
+    "RGBColorExplorerMini": rgb_color_explorer_mini.RGBColorExplorerMini,
+}
+
+# One display frame of simulated time
+FRAME = 1 / 60
+
+# Slider events delivered per frame in the drag benchmark
+DRAG_EVENTS_PER_FRAME = 10
+
+# Entries in the synthetic palette used by the palette browser benchmark
+LARGE_PALETTE_SIZE = 100000
+
+# Queries typed one key at a time in the type-ahead benchmark
+TYPED_QUERIES = ("color 4242", "color 99", "#3f", "colr 12")
+
+# Entries in the palette searched by the search keystroke benchmark
+SEARCH_PALETTE_SIZE = 300000
+
+# Queries typed one key at a time in the search keystroke benchmark: prefix,
+# hex, typo (fuzzy), substring and no-match queries
+SEARCH_QUERIES = ("color 4242", "color 99", "#3f", "colr 12", "clr 12", "olo",
+                  "lor 29999", "c0lor 123", "xyz 12")
+
+# Inputs for parse_color_value, valid and invalid
+PARSE_SAMPLES = ("0", "128", "255", "256", "0x00", "0x7f", "0xFF", "0x100",
+                 "7f", "ff", "fff", "", "  42 ", "abc", "-1", "12.5")
+
+
+def percentile(sorted_values, percent):
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1,
+                      round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies):
+    """Turn per-call latencies (seconds) into throughput and percentile figures."""
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "ops_per_second": len(ordered) / total if total > 0 else 0.0,
+        "mean_us": total / len(ordered) * 1e6 if ordered else 0.0,
+        "p50_us": percentile(ordered, 50) * 1e6,
+        "p90_us": percentile(ordered, 90) * 1e6,
+        "p99_us": percentile(ordered, 99) * 1e6,
+        "max_us": ordered[-1] * 1e6 if ordered else 0.0,
+    }
+
+
+def timed_calls(func, iterations):
+    """Call func(i) for each iteration and return the latency of each call."""
+    clock = time.perf_counter
+    latencies = []
+    for i in range(iterations):
+        start = clock()
+        func(i)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def make_app(explorer_class):
+    """Create an explorer on a fresh fake root with a simulated clock."""
+    clock = fake_tk.SimulatedClock()
+    root = fake_tk.Tk(clock)
+    app = explorer_class(root, clock=clock)
+    root.run_pending()
+    return root, app
+
+
+def bench_startup(explorer_class, iterations):
+    """Time constructing the explorer, including its first paint."""
+    return timed_calls(lambda i: make_app(explorer_class), iterations)
+
+
+def bench_update_color(explorer_class, iterations):
+    """Time a color change through the color state and the repaint it schedules."""
+    root, app = make_app(explorer_class)
+
+    def step(i):
+        app.color.set_channel('red', i % 256)
+        root.run_for(FRAME)
+
+    return timed_calls(step, iterations)
+
+
+def bench_slider_drag(explorer_class, iterations):
+    """Time one frame of a slider drag: several on_scale_change events, one repaint."""
+    root, app = make_app(explorer_class)
+
+    def frame(i):
+        for event in range(DRAG_EVENTS_PER_FRAME):
+            app.on_scale_change('green', (i * DRAG_EVENTS_PER_FRAME + event) % 256)
+        root.run_for(FRAME)
+
+    return timed_calls(frame, iterations)
+
+
+def bench_animation(explorer_class, iterations):
+    """Time one frame of the all-channel sweep (animate_color plus repaint)."""
+    root, app = make_app(explorer_class)
+    app.start_all_animation()
+    try:
+        return timed_calls(lambda i: root.run_for(FRAME), iterations)
+    finally:
+        app.stop_all_animation()
+
+
+def bench_parse_color_value(explorer_class, iterations):
+    """Time parse_color_value over a mix of valid and invalid inputs."""
+    root, app = make_app(explorer_class)
+    samples = PARSE_SAMPLES
+    return timed_calls(lambda i: app.parse_color_value(samples[i % len(samples)]), iterations)
+
+
+def bench_apply_current_selection(explorer_class, iterations):
+    """Time keyboard navigation: apply the highlighted dropdown entry and repaint."""
+    root, app = make_app(explorer_class)
+    values = get_dropdown_values(app.COMMON_COLORS)
+
+    def select(i):
+        app.color_combobox.set(values[i % len(values)])
+        app.apply_current_selection()
+        root.run_for(FRAME)
+
+    return timed_calls(select, iterations)
+
+
+def large_palette():
+    """Return a synthetic palette of LARGE_PALETTE_SIZE colors spread over the cube."""
+    return Palette.from_pairs((f"Color {i}", ((i * 97) % 256, (i * 31) % 256, (i * 7) % 256))
+                              for i in range(LARGE_PALETTE_SIZE))
+
+
+def bench_palette_browser(explorer_class, iterations):
+    """Time scrolling the palette browser through a 100k-entry palette."""
+    root, app = make_app(explorer_class)
+    if not hasattr(app, 'open_palette_browser'):
+        return None
+    palette = large_palette()
+    # Only the browser is measured, so skip building the nearest-color index
+    app.palette = palette
+    app.open_palette_browser()
+    browser = app.palette_window.browser
+    browser.set_palette(palette)
+    # Jump around like a scrollbar drag, so labels are mostly cache misses
+    return timed_calls(lambda i: browser.on_scrollbar('moveto', (i * 0.6180339) % 1), iterations)
+
+
+def bench_swatch_board(explorer_class, iterations):
+    """Time one frame of smooth scrolling through a 100k-entry palette on the swatch board."""
+    root, app = make_app(explorer_class)
+    if not hasattr(app, 'open_swatch_board'):
+        return None
+    # Only the board is measured, so skip building the nearest-color index
+    app.palette = large_palette()
+    app.open_swatch_board()
+    board = app.swatch_window.board
+    board.set_palette(app.palette)
+    # About a third of a row per frame, wrapping back to the top at the end
+    step = board.pitch // 3 + 1
+    end = board.content_height() - board.height
+
+    def frame(i):
+        board.scroll_to(i * step % end)
+
+    return timed_calls(frame, iterations)
+
+
+def bench_type_ahead(explorer_class, iterations):
+    """Time one dropdown keystroke (search, select, repaint) against a 100k-entry palette."""
+    root, app = make_app(explorer_class)
+    # Searching is measured, so skip building the nearest-color index
+    app.palette = large_palette()
+    app.search = ColorSearch(app.palette)
+    app.type_ahead = TypeAhead(app.search, clock=root.clock)
+    app.search.build()
+    keys = [char for query in TYPED_QUERIES for char in query + '\n']
+
+    class KeyEvent:
+        def __init__(self, char):
+            self.char = char
+            self.keysym = char
+
+    def press(i):
+        char = keys[i % len(keys)]
+        if char == '\n':
+            # Pause so the next query starts fresh
+            root.run_for(app.type_ahead.timeout + FRAME)
+            return
+        app.on_combobox_keypress(KeyEvent(char))
+        root.run_for(FRAME)
+
+    return timed_calls(press, iterations)
+
+
+def bench_search_keystroke(explorer_class, iterations):
+    """Time ColorSearch.search for each keystroke of typed queries on a 300k-name palette."""
+    if explorer_class is not rgb_color_explorer.RGBColorExplorer:
+        # The search doesn't depend on the explorer, so it is measured once
+        return None
+    palette = Palette.from_pairs((f"Color {i}", (i % 256, (i >> 8) % 256, 0))
+                                 for i in range(SEARCH_PALETTE_SIZE))
+    search = ColorSearch(palette)
+    # One-time index builds are not part of a keystroke
+    search.build()
+    search.build_grams()
+    typed = [query[:end] for query in SEARCH_QUERIES for end in range(1, len(query) + 1)]
+    return timed_calls(lambda i: search.search(typed[i % len(typed)]), iterations)
+
+
+def bench_color_plane(explorer_class, iterations):
+    """Time one frame of a fast blue sweep with the red x green plane open."""
+    root, app = make_app(explorer_class)
+    if not hasattr(app, 'open_color_plane'):
+        return None
+    app.open_color_plane()
+    app.on_speed_change(10)
+    app.animate_blue.set(True)
+    app.on_animation_change()
+    try:
+        # Every frame shows a new blue value, so the plane is regenerated or
+        # taken from its cache on each one
+        return timed_calls(lambda i: root.run_for(FRAME), iterations)
+    finally:
+        app.stop_all_animation()
+
+
+def bench_hue_drag(explorer_class, iterations):
+    """Time one frame of an HSV hue slider drag, like slider_drag_frame does for green."""
+    root, app = make_app(explorer_class)
+    if not hasattr(app, 'open_color_spaces'):
+        return None
+    app.open_color_spaces()
+    # A saturated color, so every hue is a different color
+    app.on_space_pick(200, 40, 40)
+    root.run_for(FRAME)
+    hue = ('HSV', 0)
+
+    def frame(i):
+        for event in range(DRAG_EVENTS_PER_FRAME):
+            app.space_window.on_slide(hue, (i * DRAG_EVENTS_PER_FRAME + event) % 360)
+        root.run_for(FRAME)
+
+    return timed_calls(frame, iterations)
+
+
+# name -> (benchmark function, share of --iterations to run)
+BENCHMARKS = {
+    "startup": (bench_startup, 0.02),
+    "update_color": (bench_update_color, 1),
+    "slider_drag_frame": (bench_slider_drag, 1),
+    "animation_frame": (bench_animation, 1),
+    "parse_color_value": (bench_parse_color_value, 10),
+    "apply_current_selection": (bench_apply_current_selection, 1),
+    "palette_browser_scroll": (bench_palette_browser, 1),
+    "swatch_board_scroll": (bench_swatch_board, 1),
+    "type_ahead_keystroke": (bench_type_ahead, 0.5),
+    "search_keystroke": (bench_search_keystroke, 0.5),
+    "color_plane_frame": (bench_color_plane, 1),
+    "hue_drag_frame": (bench_hue_drag, 1),
+}
+
+
+def run_benchmarks(iterations, selected=None):
+    """Run every (or the selected) benchmark against both explorers."""
+    results = {}
+    for explorer_name, explorer_class in EXPLORERS.items():
+        explorer_results = results[explorer_name] = {}
+        for name, (benchmark, share) in BENCHMARKS.items():
+            if selected and name not in selected:
+                continue
+            count = max(5, int(iterations * share))
+            latencies = benchmark(explorer_class, count)
+            if latencies is not None:
+                # None means the explorer doesn't have the feature being measured
+                explorer_results[name] = summarize(latencies)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def format_table(report):
+    """Return the results as a fixed-width text table."""
+    lines = [f"{'explorer':<22}{'benchmark':<26}{'ops/s':>12}{'p50 us':>10}"
+             f"{'p90 us':>10}{'p99 us':>10}"]
+    for explorer_name, explorer_results in report["results"].items():
+        for name, summary in explorer_results.items():
+            lines.append(f"{explorer_name:<22}{name:<26}{summary['ops_per_second']:>12,.0f}"
+                         f"{summary['p50_us']:>10.1f}{summary['p90_us']:>10.1f}"
+                         f"{summary['p99_us']:>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Run the benchmarks and print or save the results."""
+    parser = argparse.ArgumentParser(description="Headless RGB Color Explorer benchmarks.")
+    parser.add_argument('--iterations', type=int, default=2000,
+                        help="base iteration count per benchmark (default: 2000)")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS),
+                        help="run only these benchmarks")
+    parser.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    parser.add_argument('--output', metavar='PATH', help="also write JSON results to PATH")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.iterations, args.only)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,564 @@
+"""
+Fake Tk Backend
+
+A stand-in for tkinter and tkinter.ttk that lets the explorers run without a
+display. Widgets remember their configuration and do nothing else, variables
+hold plain Python values, and root.after callbacks run on a simulated clock
+that only advances when the benchmark says so.
+
+Call install() before the explorer modules create their first window; their
+lazy tkinter import then picks up these modules instead of the real ones.
+"""
+
+import heapq
+import itertools
+import sys
+import types
+
+
+END = 'end'
+N, S, E, W = 'n', 's', 'e', 'w'
+HORIZONTAL = 'horizontal'
+VERTICAL = 'vertical'
+ALL = 'all'
+
+
+class TclError(Exception):
+    """Raised where real Tk would raise a TclError."""
+
+
+class SimulatedClock:
+    """Virtual time in seconds, advanced explicitly by the event loop."""
+
+    def __init__(self):
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Return the current virtual time (usable as a clock function)."""
+        return self.now
+
+
+class Variable:
+    """tk.Variable holding a plain Python value."""
+
+    _default = None
+
+    def __init__(self, master=None, value=None, name=None):
+        """Create the variable with an initial value."""
+        self._value = self._default if value is None else value
+        self._traces = {}
+        self._trace_ids = itertools.count(1)
+
+    def get(self):
+        """Return the current value."""
+        return self._value
+
+    def set(self, value):
+        """Set the value and run write traces."""
+        self._value = value
+        for callback in list(self._traces.values()):
+            callback('', '', 'write')
+
+    def trace_add(self, mode, callback):
+        """Register a write trace and return its id."""
+        trace_id = f"trace{next(self._trace_ids)}"
+        self._traces[trace_id] = callback
+        return trace_id
+
+    def trace_remove(self, mode, trace_id):
+        """Remove a trace registered with trace_add."""
+        self._traces.pop(trace_id, None)
+
+
+class IntVar(Variable):
+    """tk.IntVar stand-in."""
+
+    _default = 0
+
+    def get(self):
+        """Return the value as an int (like Tk, accepting float strings)."""
+        return int(float(self._value))
+
+
+class DoubleVar(Variable):
+    """tk.DoubleVar stand-in."""
+
+    _default = 0.0
+
+    def get(self):
+        """Return the value as a float."""
+        return float(self._value)
+
+
+class BooleanVar(Variable):
+    """tk.BooleanVar stand-in."""
+
+    _default = False
+
+    def get(self):
+        """Return the value as a bool."""
+        return bool(self._value)
+
+
+class StringVar(Variable):
+    """tk.StringVar stand-in."""
+
+    _default = ''
+
+
+class Misc:
+    """Base widget: stores options and ignores layout and event binding."""
+
+    def __init__(self, master=None, **options):
+        """Create the widget under master with the given options."""
+        self.master = master
+        self._root = master._root if master is not None else self
+        self._options = dict(options)
+        self.configure_count = 0
+
+    def __getattr__(self, name):
+        """Accept any other Tk method (grid, bind, focus_set, ...) as a no-op."""
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _no_op
+
+    def configure(self, cnf=None, **options):
+        """Update widget options."""
+        if cnf:
+            options.update(cnf)
+        self._options.update(options)
+        self.configure_count += 1
+
+    config = configure
+
+    def cget(self, option):
+        """Return a widget option."""
+        return self._options.get(option, '')
+
+    def __getitem__(self, option):
+        """Return a widget option (widget['option'] syntax)."""
+        return self.cget(option)
+
+    def __setitem__(self, option, value):
+        """Set a widget option (widget['option'] = value syntax)."""
+        self.configure(**{option: value})
+
+    def after(self, ms, func=None, *args):
+        """Schedule func on the root's simulated event loop."""
+        return self._root.after(ms, func, *args)
+
+    def after_idle(self, func, *args):
+        """Schedule func to run when the simulated loop is idle."""
+        return self._root.after_idle(func, *args)
+
+    def after_cancel(self, job_id):
+        """Cancel a scheduled callback."""
+        self._root.after_cancel(job_id)
+
+    def winfo_width(self):
+        """Return the configured width (or a plausible default)."""
+        return int(self._options.get('width') or 300)
+
+    def winfo_height(self):
+        """Return the configured height (or a plausible default)."""
+        return int(self._options.get('height') or 200)
+
+    def winfo_x(self):
+        """Return the window's x position."""
+        return 0
+
+    def winfo_y(self):
+        """Return the window's y position."""
+        return 0
+
+    def winfo_screenwidth(self):
+        """Return a typical screen width."""
+        return 1920
+
+    def winfo_screenheight(self):
+        """Return a typical screen height."""
+        return 1080
+
+
+def _no_op(*args, **kwargs):
+    """Ignore a Tk call that has no observable effect in the fake backend."""
+    return None
+
+
+class Tk(Misc):
+    """Root window whose event loop runs on a SimulatedClock."""
+
+    def __init__(self, clock=None):
+        """Create the root with its own (or a shared) simulated clock."""
+        super().__init__(None)
+        self.clock = clock or SimulatedClock()
+        self._queue = []
+        self._cancelled = set()
+        self._job_ids = itertools.count(1)
+        self.clipboard = ''
+        self.callbacks_run = 0
+
+    def after(self, ms, func=None, *args):
+        """Schedule func to run ms milliseconds from the current virtual time."""
+        if func is None:
+            self.clock.now += ms / 1000
+            return None
+        job_id = f"after#{next(self._job_ids)}"
+        due = self.clock.now + ms / 1000
+        heapq.heappush(self._queue, (due, job_id, func, args))
+        return job_id
+
+    def after_idle(self, func, *args):
+        """Schedule func to run before time next advances."""
+        return self.after(0, func, *args)
+
+    def after_cancel(self, job_id):
+        """Cancel a scheduled callback."""
+        if job_id is not None:
+            self._cancelled.add(job_id)
+
+    def run_pending(self):
+        """Run every callback that is due at the current virtual time."""
+        self.run_until(self.clock.now)
+
+    def run_until(self, deadline):
+        """Run callbacks in due order, advancing virtual time up to deadline."""
+        queue = self._queue
+        while queue and queue[0][0] <= deadline:
+            due, job_id, func, args = heapq.heappop(queue)
+            if job_id in self._cancelled:
+                self._cancelled.discard(job_id)
+                continue
+            if due > self.clock.now:
+                self.clock.now = due
+            self.callbacks_run += 1
+            func(*args)
+        if deadline > self.clock.now:
+            self.clock.now = deadline
+
+    def run_for(self, seconds):
+        """Advance virtual time by seconds, running everything that comes due."""
+        self.run_until(self.clock.now + seconds)
+
+    def clipboard_clear(self):
+        """Empty the fake clipboard."""
+        self.clipboard = ''
+
+    def clipboard_append(self, text):
+        """Append text to the fake clipboard."""
+        self.clipboard += text
+
+    def destroy(self):
+        """Drop all pending callbacks."""
+        self._queue.clear()
+
+
+class Entry(Misc):
+    """Entry holding a plain string."""
+
+    def __init__(self, master=None, **options):
+        """Create an empty entry."""
+        super().__init__(master, **options)
+        self.text = ''
+
+    def get(self):
+        """Return the entry text."""
+        return self.text
+
+    def delete(self, first, last=None):
+        """Clear the entry (only full deletes are used by the explorers)."""
+        self.text = ''
+
+    def insert(self, index, text):
+        """Insert text at the start or end."""
+        self.text = text + self.text if index == 0 else self.text + text
+
+
+class Scale(Misc):
+    """Scale reading and writing its variable, like ttk.Scale."""
+
+    def __init__(self, master=None, **options):
+        """Create the scale at its lower bound."""
+        super().__init__(master, **options)
+        self.value = options.get('from_', 0)
+
+    def get(self):
+        """Return the current value."""
+        variable = self._options.get('variable')
+        return variable.get() if variable is not None else self.value
+
+    def set(self, value):
+        """Set the value and invoke the command, like ttk.Scale.set."""
+        variable = self._options.get('variable')
+        if variable is not None:
+            variable.set(value)
+        self.value = value
+        command = self._options.get('command')
+        if command is not None:
+            command(value)
+
+
+class Combobox(Entry):
+    """Combobox holding its current text."""
+
+    def set(self, value):
+        """Set the displayed text."""
+        self.text = value
+
+    def current(self, index=None):
+        """Select a value by index, or return the current index."""
+        values = list(self._options.get('values', ()))
+        if index is None:
+            return values.index(self.text) if self.text in values else -1
+        self.text = values[index]
+
+
+class Listbox(Misc):
+    """Listbox holding a list of strings."""
+
+    def __init__(self, master=None, **options):
+        """Create an empty listbox."""
+        super().__init__(master, **options)
+        self.items = []
+        self.selection = []
+
+    def insert(self, index, *items):
+        """Insert items at index ('end' appends)."""
+        position = len(self.items) if index == END else int(index)
+        self.items[position:position] = items
+
+    def delete(self, first, last=None):
+        """Delete one item or a range of items."""
+        last = len(self.items) - 1 if last == END else (first if last is None else last)
+        del self.items[int(first):int(last) + 1]
+
+    def get(self, first, last=None):
+        """Return one item, or a tuple for a range."""
+        if last is None:
+            return self.items[int(first)]
+        last = len(self.items) - 1 if last == END else int(last)
+        return tuple(self.items[int(first):last + 1])
+
+    def size(self):
+        """Return the number of items."""
+        return len(self.items)
+
+    def curselection(self):
+        """Return the selected indices."""
+        return tuple(self.selection)
+
+    def selection_clear(self, first, last=None):
+        """Clear the selection."""
+        self.selection = []
+
+    def selection_set(self, first, last=None):
+        """Select one index."""
+        self.selection = [int(first)]
+
+
+class Canvas(Misc):
+    """Canvas that keeps its items in a dict."""
+
+    def __init__(self, master=None, **options):
+        """Create an empty canvas."""
+        super().__init__(master, **options)
+        self.items = {}
+        self._item_ids = itertools.count(1)
+
+    def _create(self, kind, coords, options):
+        """Store a new item and return its id."""
+        item_id = next(self._item_ids)
+        self.items[item_id] = {'kind': kind, 'coords': list(coords), 'options': dict(options)}
+        return item_id
+
+    def create_rectangle(self, *coords, **options):
+        """Create a rectangle item."""
+        return self._create('rectangle', coords, options)
+
+    def create_oval(self, *coords, **options):
+        """Create an oval item."""
+        return self._create('oval', coords, options)
+
+    def create_line(self, *coords, **options):
+        """Create a line item."""
+        return self._create('line', coords, options)
+
+    def create_text(self, *coords, **options):
+        """Create a text item."""
+        return self._create('text', coords, options)
+
+    def create_image(self, *coords, **options):
+        """Create an image item."""
+        return self._create('image', coords, options)
+
+    def coords(self, item_id, *coords):
+        """Move an item, or return its coordinates."""
+        if coords:
+            self.items[item_id]['coords'] = list(coords)
+        return self.items[item_id]['coords']
+
+    def itemconfigure(self, item_id, **options):
+        """Update an item's options."""
+        self.items[item_id]['options'].update(options)
+
+    itemconfig = itemconfigure
+
+    def _find(self, tag_or_id):
+        """Return the ids of the items an id or tag refers to."""
+        if tag_or_id == ALL:
+            return list(self.items)
+        if tag_or_id in self.items:
+            return [tag_or_id]
+        return [item_id for item_id, item in self.items.items()
+                if tag_or_id in _tags(item['options'].get('tags'))]
+
+    def delete(self, *item_ids):
+        """Delete items by id or tag ('all' clears the canvas)."""
+        for tag_or_id in item_ids:
+            for item_id in self._find(tag_or_id):
+                self.items.pop(item_id, None)
+
+    def move(self, tag_or_id, dx, dy):
+        """Move items by id or tag."""
+        for item_id in self._find(tag_or_id):
+            coords = self.items[item_id]['coords']
+            self.items[item_id]['coords'] = [value + (dy if position % 2 else dx)
+                                             for position, value in enumerate(coords)]
+
+    def canvasx(self, x):
+        """Return canvas x for a window x (no scrolling in the fake)."""
+        return x
+
+    def canvasy(self, y):
+        """Return canvas y for a window y (no scrolling in the fake)."""
+        return y
+
+
+def _tags(tags):
+    """Return an item's tags option as a tuple."""
+    if tags is None:
+        return ()
+    return (tags,) if isinstance(tags, str) else tuple(tags)
+
+
+class PhotoImage:
+    """PhotoImage that counts put calls instead of storing pixels."""
+
+    def __init__(self, master=None, width=0, height=0, **options):
+        """Create a blank image."""
+        self._width = width
+        self._height = height
+        self.options = options
+        self.put_count = 0
+        self.last_put = None
+
+    def put(self, data, to=None):
+        """Record a bulk pixel write."""
+        self.put_count += 1
+        self.last_put = (data, to)
+
+    def configure(self, **options):
+        """Update image options (e.g. data=)."""
+        self.options.update(options)
+        self.put_count += 1
+
+    config = configure
+
+    def width(self):
+        """Return the image width."""
+        return self._width
+
+    def height(self):
+        """Return the image height."""
+        return self._height
+
+    def blank(self):
+        """Clear the image."""
+
+
+# Plain widgets that only need to remember their options
+class Frame(Misc):
+    """Frame stand-in."""
+
+
+class LabelFrame(Misc):
+    """LabelFrame stand-in."""
+
+
+class Label(Misc):
+    """Label stand-in."""
+
+
+class Button(Misc):
+    """Button stand-in."""
+
+
+class Checkbutton(Misc):
+    """Checkbutton stand-in."""
+
+
+class Radiobutton(Misc):
+    """Radiobutton stand-in."""
+
+
+class Scrollbar(Misc):
+    """Scrollbar stand-in."""
+
+
+class Toplevel(Misc):
+    """Toplevel stand-in."""
+
+
+class Separator(Misc):
+    """Separator stand-in."""
+
+
+class Notebook(Misc):
+    """Notebook stand-in."""
+
+
+class Menu(Misc):
+    """Menu stand-in (add_command and friends are no-ops)."""
+
+
+class Style:
+    """ttk.Style stand-in."""
+
+    def __init__(self, master=None):
+        """Create the style object."""
+
+    def configure(self, *args, **options):
+        """Ignore style configuration."""
+
+    def map(self, *args, **options):
+        """Ignore style maps."""
+
+
+_TK_NAMES = (
+    'END', 'N', 'S', 'E', 'W', 'HORIZONTAL', 'VERTICAL', 'ALL', 'TclError',
+    'Variable', 'IntVar', 'DoubleVar', 'BooleanVar', 'StringVar', 'Misc', 'Tk',
+    'Toplevel', 'Frame', 'LabelFrame', 'Label', 'Button', 'Checkbutton',
+    'Radiobutton', 'Entry', 'Scale', 'Listbox', 'Scrollbar', 'Canvas', 'PhotoImage', 'Menu',
+)
+
+_TTK_NAMES = (
+    'Frame', 'LabelFrame', 'Label', 'Button', 'Checkbutton', 'Radiobutton',
+    'Entry', 'Scale', 'Combobox', 'Scrollbar', 'Separator', 'Notebook', 'Style',
+)
+
+
+def install():
+    """Register the fake modules as tkinter and tkinter.ttk; return (tk, ttk)."""
+    this_module = sys.modules[__name__]
+    tk_module = types.ModuleType('tkinter')
+    ttk_module = types.ModuleType('tkinter.ttk')
+    for name in _TK_NAMES:
+        setattr(tk_module, name, getattr(this_module, name))
+    for name in _TTK_NAMES:
+        setattr(ttk_module, name, getattr(this_module, name))
+    tk_module.ttk = ttk_module
+    tk_module.__path__ = []  # allow "from tkinter import ttk"
+    sys.modules['tkinter'] = tk_module
+    sys.modules['tkinter.ttk'] = ttk_module
+    return tk_module, ttk_module
@@ -0,0 +1,140 @@
+"""
+Color Animation
+
+Time-based channel sweeps for the explorers' auto-sweep feature.
+
+Each animated channel follows a closed-form triangle wave (0 -> 255 -> 0) over
+elapsed monotonic time, so its value at any moment depends only on the clock,
+not on how many timer ticks happened to fire. That makes the sweep speed
+independent of machine load, lets frames be skipped when the event loop falls
+behind, and allows jumping to any point of the sweep in constant time.
+"""
+
+import math
+import time
+
+
+# Steps in one full 0 -> 255 -> 0 cycle
+SWEEP_PERIOD = 510
+
+# Default target frame rate for animation ticks
+DEFAULT_FPS = 60
+
+
+def triangle_wave(position):
+    """Return the channel value (0-255) at a position along the sweep, in steps."""
+    position %= SWEEP_PERIOD
+    if position <= 255:
+        return int(position)
+    return int(SWEEP_PERIOD - position)
+
+
+def speed_to_rate(speed):
+    """Convert the 1-10 speed slider value to sweep steps per second.
+
+    Matches the pace of the original stepping animation, which moved one step
+    every max(20, 200 - speed * 15) milliseconds.
+    """
+    return 1000 / max(20, 200 - speed * 15)
+
+
+class ChannelSweep:
+    """Closed-form triangle-wave sweeps for any set of color channels."""
+
+    def __init__(self, rate=1.0, clock=time.monotonic):
+        """Create an idle sweep moving rate steps per second."""
+        self.clock = clock
+        self.rate = rate
+        self.origin = clock()
+        # channel -> sweep position (in steps) at self.origin
+        self.phases = {}
+
+    @property
+    def channels(self):
+        """Channels currently being swept."""
+        return set(self.phases)
+
+    def start(self, channel, value, direction=1):
+        """Start sweeping a channel from its current value in the given direction."""
+        now = self.clock()
+        value = min(255, max(0, value))
+        # Rising half of the wave covers positions 0-255, falling half 255-510
+        position = value if direction >= 0 else SWEEP_PERIOD - value
+        self.phases[channel] = position - self.rate * (now - self.origin)
+
+    def stop(self, channel):
+        """Stop sweeping a channel and return the direction it was moving (1 or -1)."""
+        direction = self.direction(channel)
+        self.phases.pop(channel, None)
+        return direction
+
+    def position(self, channel, now=None):
+        """Return the channel's position along the sweep, in steps."""
+        if now is None:
+            now = self.clock()
+        return self.phases[channel] + self.rate * (now - self.origin)
+
+    def direction(self, channel, now=None):
+        """Return 1 if the channel is rising, -1 if falling."""
+        if channel not in self.phases:
+            return 1
+        return 1 if self.position(channel, now) % SWEEP_PERIOD < 255 else -1
+
+    def values(self, now=None):
+        """Return {channel: value} for every swept channel at time now."""
+        if now is None:
+            now = self.clock()
+        offset = self.rate * (now - self.origin)
+        return {channel: triangle_wave(phase + offset)
+                for channel, phase in self.phases.items()}
+
+    def set_rate(self, rate):
+        """Change the sweep speed without making the channels jump."""
+        now = self.clock()
+        offset = self.rate * (now - self.origin)
+        self.phases = {channel: phase + offset for channel, phase in self.phases.items()}
+        self.origin = now
+        self.rate = rate
+
+    def seek(self, seconds):
+        """Jump every channel to where it will be seconds from now (negative to rewind)."""
+        self.origin -= seconds
+
+
+class FrameClock:
+    """Schedule animation ticks on absolute frame deadlines, skipping missed frames."""
+
+    def __init__(self, fps=DEFAULT_FPS, clock=time.monotonic):
+        """Create a frame clock targeting fps ticks per second."""
+        self.clock = clock
+        self.interval = 1 / fps
+        self.next_deadline = None
+        self.frames = 0
+        self.skipped = 0
+
+    def set_fps(self, fps):
+        """Change the target frame rate."""
+        self.interval = 1 / fps
+
+    def reset(self):
+        """Start a fresh run of deadlines from the current time."""
+        self.next_deadline = None
+
+    def next_delay(self, now=None):
+        """Count a finished frame and return milliseconds until the next deadline.
+
+        Deadlines advance by whole frame intervals from the first frame, so
+        timer jitter does not accumulate; if the loop fell behind, the missed
+        frames are skipped rather than replayed.
+        """
+        if now is None:
+            now = self.clock()
+        self.frames += 1
+        if self.next_deadline is None:
+            self.next_deadline = now
+        self.next_deadline += self.interval
+        if self.next_deadline <= now:
+            missed = math.floor((now - self.next_deadline) / self.interval) + 1
+            self.skipped += missed
+            self.next_deadline += missed * self.interval
+        return max(1, round((self.next_deadline - now) * 1000))
@@ -0,0 +1,253 @@
+"""
+Color Contrast
+
+WCAG 2.x contrast ratios and APCA lightness contrast, for single pairs of
+colors, one color against a whole palette, and palette-against-palette
+audits.
+
+Relative luminance comes from per-channel tables (the 256-entry sRGB
+linearization table already weighted by each channel's coefficient), so a
+color's luminance is three lookups. A contrast ratio depends only on the two
+luminances, which gives the fast paths here:
+
+- ContrastIndex sorts a palette by luminance once; after that, counting the
+  entries that fail a threshold against any color is two bisections, and the
+  lowest-contrast entries are the ones next to it in luminance order.
+- audit_contrast counts failing pairs between two palettes the same way, so
+  a 10k x 10k audit takes milliseconds instead of 10^8 ratio computations.
+- contrast_blocks still produces every ratio when the full matrix is wanted,
+  in fixed-size blocks so memory stays bounded (see color_difference).
+"""
+
+from bisect import bisect_left, bisect_right
+
+from color_difference import DEFAULT_BLOCK_SIZE, SRGB_TO_LINEAR, delta_e_ok, rgb_to_oklab
+from color_space import OKLCH, rgb_to_space, space_to_rgb
+
+
+# WCAG 2.x minimum ratios
+AA = 4.5
+AAA = 7.0
+AA_LARGE = 3.0     # large text (18pt, or 14pt bold) and UI components
+
+# Rating -> minimum ratio, strictest first
+WCAG_LEVELS = (("AAA", AAA), ("AA", AA), ("AA Large", AA_LARGE))
+FAIL = "Fail"
+
+# Luminance contribution of each 8-bit channel value
+_LUMINANCE_R = tuple(0.2126 * value for value in SRGB_TO_LINEAR)
+_LUMINANCE_G = tuple(0.7152 * value for value in SRGB_TO_LINEAR)
+_LUMINANCE_B = tuple(0.0722 * value for value in SRGB_TO_LINEAR)
+
+# APCA 0.0.98G-4g constants
+_APCA_R = tuple(0.2126729 * (value / 255) ** 2.4 for value in range(256))
+_APCA_G = tuple(0.7151522 * (value / 255) ** 2.4 for value in range(256))
+_APCA_B = tuple(0.0721750 * (value / 255) ** 2.4 for value in range(256))
+_APCA_BLACK_THRESHOLD = 0.022
+_APCA_BLACK_CLAMP = 1.414
+_APCA_DELTA_MIN = 0.0005
+_APCA_SCALE = 1.14
+_APCA_OFFSET = 0.027
+_APCA_LOW_CLIP = 0.1
+
+# Bisection steps when searching lightness for a passing color
+_SEARCH_STEPS = 16
+
+
+def relative_luminance(rgb_values):
+    """Return the WCAG relative luminance (0.0-1.0) of an (r, g, b) color."""
+    r, g, b = rgb_values
+    return _LUMINANCE_R[r] + _LUMINANCE_G[g] + _LUMINANCE_B[b]
+
+
+def packed_luminance(packed):
+    """Return the WCAG relative luminance of a packed 24-bit color."""
+    return _LUMINANCE_R[packed >> 16] + _LUMINANCE_G[(packed >> 8) & 0xFF] + _LUMINANCE_B[packed & 0xFF]
+
+
+def contrast_ratio(rgb1, rgb2):
+    """Return the WCAG contrast ratio (1.0-21.0) between two (r, g, b) colors."""
+    y1 = relative_luminance(rgb1) + 0.05
+    y2 = relative_luminance(rgb2) + 0.05
+    return y1 / y2 if y1 >= y2 else y2 / y1
+
+
+def wcag_rating(ratio):
+    """Return "AAA", "AA", "AA Large" or "Fail" for a contrast ratio."""
+    # WCAG ratios are not rounded: 4.499:1 fails AA
+    for rating, minimum in WCAG_LEVELS:
+        if ratio >= minimum:
+            return rating
+    return FAIL
+
+
+def _apca_luminance(rgb_values):
+    """Return the APCA screen luminance of a color, with the black-level soft clamp."""
+    r, g, b = rgb_values
+    y = _APCA_R[r] + _APCA_G[g] + _APCA_B[b]
+    if y < _APCA_BLACK_THRESHOLD:
+        y += (_APCA_BLACK_THRESHOLD - y) ** _APCA_BLACK_CLAMP
+    return y
+
+
+def apca_contrast(text_rgb, background_rgb):
+    """Return the APCA lightness contrast Lc of text on a background.
+
+    Lc is positive for dark text on a light background and negative for
+    light text on a dark one; about 60 is needed for body text, 75 preferred.
+    """
+    text = _apca_luminance(text_rgb)
+    background = _apca_luminance(background_rgb)
+    if abs(background - text) < _APCA_DELTA_MIN:
+        return 0.0
+    if background > text:
+        contrast = (background ** 0.56 - text ** 0.57) * _APCA_SCALE
+        return 0.0 if contrast < _APCA_LOW_CLIP else (contrast - _APCA_OFFSET) * 100
+    contrast = (background ** 0.65 - text ** 0.62) * _APCA_SCALE
+    return 0.0 if contrast > -_APCA_LOW_CLIP else (contrast + _APCA_OFFSET) * 100
+
+
+def contrast_against(query, colors):
+    """Return the contrast ratio between one (r, g, b) color and each of N colors."""
+    y = relative_luminance(query) + 0.05
+    return [y / other if y >= other else other / y
+            for other in (relative_luminance(rgb_values) + 0.05 for rgb_values in colors)]
+
+
+def contrast_blocks(colors_a, colors_b, block_size=DEFAULT_BLOCK_SIZE):
+    """Yield (row, column, block) tiles of the N×M contrast-ratio matrix.
+
+    Blocks are laid out as in color_difference.distance_blocks; colors_a may
+    be any iterable and is consumed one block of rows at a time.
+    """
+    luminances_b = [relative_luminance(rgb_values) + 0.05 for rgb_values in colors_b]
+
+    row = 0
+    rows = []
+    for rgb_values in colors_a:
+        rows.append(relative_luminance(rgb_values) + 0.05)
+        if len(rows) == block_size:
+            yield from _row_blocks(row, rows, luminances_b, block_size)
+            row += len(rows)
+            rows = []
+    if rows:
+        yield from _row_blocks(row, rows, luminances_b, block_size)
+
+
+def _row_blocks(row, rows, luminances_b, block_size):
+    """Yield the blocks for one band of row luminances."""
+    for column in range(0, len(luminances_b), block_size):
+        columns = luminances_b[column:column + block_size]
+        block = [[a / b if a >= b else b / a for b in columns] for a in rows]
+        yield row, column, block
+
+
+def contrast_matrix(colors_a, colors_b, block_size=DEFAULT_BLOCK_SIZE):
+    """Return the full N×M contrast-ratio matrix as a list of rows."""
+    colors_b = list(colors_b)
+    matrix = []
+    for row, column, block in contrast_blocks(colors_a, colors_b, block_size):
+        if column == 0:
+            matrix.extend([] for _ in block)
+        for offset, values in enumerate(block):
+            matrix[row + offset].extend(values)
+    return matrix
+
+
+class ContrastIndex:
+    """A set of packed colors sorted by luminance, for contrast queries against one color."""
+
+    def __init__(self, colors):
+        """Index a sequence of packed 24-bit colors (e.g. a palette's colors)."""
+        luminances = [packed_luminance(packed) + 0.05 for packed in colors]
+        # Positions of the colors from darkest to lightest
+        self.order = sorted(range(len(luminances)), key=luminances.__getitem__)
+        self.luminances = [luminances[index] for index in self.order]
+
+    def __len__(self):
+        """Return the number of indexed colors."""
+        return len(self.order)
+
+    def count_below(self, rgb_values, minimum):
+        """Return how many indexed colors have a contrast ratio below minimum with a color."""
+        y = relative_luminance(rgb_values) + 0.05
+        # ratio < minimum exactly when the other luminance is within a factor of minimum
+        return bisect_left(self.luminances, y * minimum) - bisect_right(self.luminances, y / minimum)
+
+    def rating_counts(self, rgb_values):
+        """Return {rating: number of indexed colors} for "AAA", "AA", "AA Large" and "Fail"."""
+        counts = {}
+        passed = 0
+        for rating, minimum in WCAG_LEVELS:
+            at_least = len(self.order) - self.count_below(rgb_values, minimum)
+            counts[rating] = at_least - passed
+            passed = at_least
+        counts[FAIL] = len(self.order) - passed
+        return counts
+
+    def lowest(self, rgb_values, count):
+        """Return up to count (position, ratio) pairs with the lowest contrast first."""
+        y = relative_luminance(rgb_values) + 0.05
+        luminances = self.luminances
+        # The lowest ratios are the luminances closest to y: walk outwards from it
+        upper = bisect_left(luminances, y)
+        lower = upper - 1
+        result = []
+        while len(result) < count and (lower >= 0 or upper < len(luminances)):
+            below = y / luminances[lower] if lower >= 0 else None
+            above = luminances[upper] / y if upper < len(luminances) else None
+            if above is None or (below is not None and below <= above):
+                result.append((self.order[lower], below))
+                lower -= 1
+            else:
+                result.append((self.order[upper], above))
+                upper += 1
+        return result
+
+
+def audit_contrast(colors_a, colors_b, minimum=AA):
+    """Count the pairs (one color from each sequence) whose contrast ratio is below minimum.
+
+    Returns (failing pairs, total pairs); colors are (r, g, b) tuples. Only
+    colors_b is held in memory (as sorted luminances).
+    """
+    luminances_b = sorted(relative_luminance(rgb_values) + 0.05 for rgb_values in colors_b)
+    failing = 0
+    rows = 0
+    for rgb_values in colors_a:
+        y = relative_luminance(rgb_values) + 0.05
+        failing += bisect_left(luminances_b, y * minimum) - bisect_right(luminances_b, y / minimum)
+        rows += 1
+    return failing, rows * len(luminances_b)
+
+
+def nearest_passing(rgb_values, background, minimum=AA):
+    """Return the color closest to rgb_values (in OKLab) with at least minimum contrast on background.
+
+    Only OKLCh lightness is changed, keeping hue (and chroma, as far as the
+    gamut allows). Returns (rgb, ratio), or None if no lightness passes.
+    """
+    if contrast_ratio(rgb_values, background) >= minimum:
+        return tuple(rgb_values), contrast_ratio(rgb_values, background)
+    lightness, chroma, hue = rgb_to_space(OKLCH, tuple(rgb_values))
+    original = rgb_to_oklab(tuple(rgb_values))
+    best = None
+    for limit in (0.0, 1.0):
+        # Darker (towards black) and lighter (towards white)
+        candidate = space_to_rgb(OKLCH, (limit, chroma, hue))
+        if contrast_ratio(candidate, background) < minimum:
+            continue
+        failing, passing = lightness, limit
+        for _ in range(_SEARCH_STEPS):
+            middle = (failing + passing) / 2
+            rgb_middle = space_to_rgb(OKLCH, (middle, chroma, hue))
+            if contrast_ratio(rgb_middle, background) >= minimum:
+                passing, candidate = middle, rgb_middle
+            else:
+                failing = middle
+        distance = delta_e_ok(original, rgb_to_oklab(candidate))
+        if best is None or distance < best[0]:
+            best = (distance, candidate)
+    if best is None:
+        return None
+    return best[1], contrast_ratio(best[1], background)
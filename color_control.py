@@ -0,0 +1,306 @@
+"""
+Color Control
+
+A local control endpoint so other processes (test rigs, scripts) can drive an
+explorer: set and read the color, select palette entries and start or stop
+the channel animation. It is only started with --control.
+
+The protocol is JSON lines over a Unix socket or a loopback TCP port. Each
+request is one object with a "cmd" key and gets one reply line:
+
+    {"cmd": "set", "color": "#FF8000"}        or "rgb": [255, 128, 0]
+    {"cmd": "select", "index": 12}            or "name": "Coral"
+    {"cmd": "animate", "channels": ["red", "blue"]}
+    {"cmd": "speed", "value": 7}              animation speed, 1-10
+    {"cmd": "stop"}                           same as animate with no channels
+    {"cmd": "get"}                            the current color and animation
+
+Replies are {"ok": true} (plus the state, for get) or {"ok": false,
+"error": "..."}. A reply means the command was accepted; it is applied on
+the explorer's next frame.
+
+The server runs an asyncio loop on a background thread and never touches Tk.
+Commands go into a CommandMailbox, which keeps only the latest value of each
+command; the explorer drains it once per frame on the Tk thread. However
+fast a client sends, the Tk side does at most one color change per frame,
+and the state it publishes back is what get returns.
+
+Both explorers import this module for its command-line option, so asyncio is
+only imported once a server is started.
+"""
+
+import json
+import os
+import stat
+import sys
+import threading
+
+from color_core import parse_color_string
+from color_state import CHANNELS
+
+
+# Hosts a TCP control endpoint may listen on
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Longest request line accepted, in bytes
+MAX_LINE = 64 * 1024
+
+# Seconds start() waits for the server to be listening
+START_TIMEOUT = 5.0
+
+_OK = b'{"ok": true}\n'
+
+# Commands that are queued for the Tk thread, by name; "stop" is queued as animate
+_QUEUED = ("set", "select", "animate", "speed", "stop")
+
+
+class ControlError(ValueError):
+    """A control request that can't be accepted; its message is sent back to the client."""
+
+
+class CommandMailbox:
+    """Thread-safe latest-value-per-command queue between the server and the Tk thread."""
+
+    def __init__(self):
+        """Create an empty mailbox."""
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.received = 0   # commands put
+        self.replaced = 0   # commands overwritten before they were drained
+
+    def put(self, command, value):
+        """Queue value for command, replacing any value still waiting for it."""
+        with self._lock:
+            # Re-inserting moves the command last, so drain() keeps the order of the
+            # latest requests (a select after a set wins, and vice versa)
+            if command in self._pending:
+                del self._pending[command]
+                self.replaced += 1
+            self._pending[command] = value
+            self.received += 1
+
+    def drain(self):
+        """Return and clear the waiting (command, value) pairs, oldest first."""
+        with self._lock:
+            if not self._pending:
+                return ()
+            pending = self._pending
+            self._pending = {}
+        return pending.items()
+
+
+def _error_line(message):
+    """Return the reply line for a rejected request."""
+    return json.dumps({"ok": False, "error": message}).encode() + b'\n'
+
+
+def parse_address(address):
+    """Return ('unix', path) or ('tcp', (host, port)) for a --control address.
+
+    The address is a socket path (containing a '/' or prefixed with 'unix:'),
+    a port, or host:port with a loopback host.
+    """
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    if "/" in address or os.sep in address:
+        return "unix", address
+    host, _, port = address.rpartition(":")
+    host = host.strip("[]") or "127.0.0.1"
+    if host not in LOOPBACK_HOSTS:
+        raise ValueError(f"Control endpoint must be on a loopback host, not {host!r}")
+    try:
+        port = int(port)
+    except ValueError:
+        raise ValueError(f"Invalid control address: {address!r} "
+                         "(expected PORT, HOST:PORT or a socket path)") from None
+    if not 0 <= port <= 65535:
+        raise ValueError(f"Invalid control port: {port}")
+    return "tcp", (host, port)
+
+
+def parse_request(request):
+    """Return the (command, value) to queue for a decoded request, or raise ControlError."""
+    if not isinstance(request, dict):
+        raise ControlError("request must be a JSON object")
+    command = request.get("cmd")
+    if command == "set":
+        if "color" in request:
+            rgb_values = parse_color_string(str(request["color"]))
+        else:
+            rgb_values = request.get("rgb")
+            if not (isinstance(rgb_values, (list, tuple)) and len(rgb_values) == 3
+                    and all(isinstance(value, int) and not isinstance(value, bool)
+                            and 0 <= value <= 255 for value in rgb_values)):
+                rgb_values = None
+        if rgb_values is None:
+            raise ControlError("set needs a color string or an rgb list of three 0-255 integers")
+        r, g, b = rgb_values
+        return "set", (r << 16) | (g << 8) | b
+    if command == "select":
+        index = request.get("index")
+        if isinstance(index, int) and not isinstance(index, bool) and index >= 0:
+            return "select", index
+        name = request.get("name")
+        if isinstance(name, str):
+            return "select", name
+        raise ControlError("select needs an index (0 or more) or a name")
+    if command == "animate":
+        channels = request.get("channels")
+        if not (isinstance(channels, list)
+                and all(isinstance(channel, str) and channel in CHANNELS for channel in channels)):
+            raise ControlError(f"animate needs a list of channels from {', '.join(CHANNELS)}")
+        return "animate", frozenset(channels)
+    if command == "stop":
+        return "animate", frozenset()
+    if command == "speed":
+        speed = request.get("value")
+        if not (isinstance(speed, int) and not isinstance(speed, bool) and 1 <= speed <= 10):
+            raise ControlError("speed needs a value from 1 to 10")
+        return "speed", speed
+    raise ControlError(f"unknown command: {command!r} (expected get or one of {', '.join(_QUEUED)})")
+
+
+class ControlServer:
+    """JSON-lines control endpoint served by asyncio on a background thread."""
+
+    def __init__(self, address):
+        """Prepare to listen on address (see parse_address)."""
+        self.kind, self.target = parse_address(address)
+        self.commands = CommandMailbox()
+        self.address = None     # where the server listens, once started
+        self._clients = {}      # handler task -> writer, per connected client
+        self._status = {}
+        self._status_line = b'{"ok": true}\n'
+        self._loop = None
+        self._stopping = None
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="color-control", daemon=True)
+
+    def start(self):
+        """Start serving and wait until the server listens; returns the server.
+
+        Raises OSError if the endpoint can't be opened.
+        """
+        self._thread.start()
+        if not self._ready.wait(START_TIMEOUT):
+            raise OSError("Control server did not start")
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        """Close the endpoint and every connection, and wait for the thread to end."""
+        if self._stopping is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stopping.set)
+            except RuntimeError:
+                pass    # already stopped: the loop is closed
+        self._thread.join(START_TIMEOUT)
+
+    @property
+    def clients(self):
+        """Return the number of connected clients."""
+        return len(self._clients)
+
+    def publish(self, status):
+        """Make status (a JSON-serializable dict) what get returns; called from the Tk thread."""
+        if status != self._status:
+            # The reply is encoded once here rather than for every get
+            self._status = status
+            self._status_line = json.dumps(dict(ok=True, **status)).encode() + b'\n'
+
+    def _run(self):
+        """Run the event loop on the server thread."""
+        import asyncio
+
+        try:
+            asyncio.run(self._serve())
+        except Exception as error:
+            self._error = error
+            self._ready.set()
+
+    async def _serve(self):
+        """Listen until stop() is called."""
+        import asyncio
+
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if self.kind == "unix":
+            path = self.target
+            # A socket left behind by an earlier run would make binding fail
+            if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+                os.remove(path)
+            server = await asyncio.start_unix_server(self._handle, path, limit=MAX_LINE)
+            self.address = path
+        else:
+            host, port = self.target
+            server = await asyncio.start_server(self._handle, host, port, limit=MAX_LINE)
+            self.address = server.sockets[0].getsockname()[:2]
+        self._ready.set()
+        try:
+            await self._stopping.wait()
+        finally:
+            server.close()
+            # Closing the connections ends their handlers' reads; they are waited
+            # for rather than left for asyncio.run() to cancel
+            for writer in self._clients.values():
+                writer.close()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            if self.kind == "unix" and os.path.exists(self.target):
+                os.remove(self.target)
+
+    async def _handle(self, reader, writer):
+        """Answer one client's requests until it disconnects."""
+        import asyncio
+
+        self._clients[asyncio.current_task()] = writer
+        put = self.commands.put
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # Line longer than MAX_LINE, or the client went away
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if isinstance(request, dict) and request.get("cmd") == "get":
+                        writer.write(self._status_line)
+                    else:
+                        put(*parse_request(request))
+                        writer.write(_OK)
+                except ControlError as error:
+                    writer.write(_error_line(str(error)))
+                except ValueError:
+                    writer.write(_error_line("invalid JSON"))
+                except TypeError:
+                    # Anything parse_request doesn't anticipate still gets a reply
+                    writer.write(_error_line("invalid request"))
+                # Only waits when the client isn't reading its replies
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(asyncio.current_task(), None)
+            writer.close()
+
+
+def add_arguments(parser):
+    """Add the --control command-line option to an argparse parser."""
+    parser.add_argument('--control', metavar='ADDRESS',
+                        help="accept JSON-lines commands on a Unix socket path or a loopback "
+                             "[HOST:]PORT (port 0 picks a free one)")
+
+
+def start_from_arguments(args):
+    """Start a ControlServer if --control was given and return it, else None."""
+    if not args.control:
+        return None
+    server = ControlServer(args.control).start()
+    print(f"Control server listening on {server.address}", file=sys.stderr)
+    return server
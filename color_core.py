@@ -0,0 +1,164 @@
+"""
+Color Core
+
+The display-independent parts of the RGB Color Explorer: the common color
+palette, channel value parsing, dropdown label handling and hex formatting.
+
+Nothing here imports tkinter, so batch jobs and server-side scripts can use
+the same rules as the GUI without a display.
+"""
+
+
+# Dropdown entry that leaves the current sliders untouched
+CUSTOM_COLOR = "Custom Color"
+
+# Common color names and their RGB values
+COMMON_COLORS = {
+    CUSTOM_COLOR: None,  # Default selection - no auto-change
+    "Azure": (240, 255, 255),
+    "Black": (0, 0, 0),
+    "Blue": (0, 0, 255),
+    "Brown": (165, 42, 42),
+    "Chartreuse": (127, 255, 0),
+    "Coral": (255, 127, 80),
+    "Crimson": (220, 20, 60),
+    "Cyan": (0, 255, 255),
+    "Gold": (255, 215, 0),
+    "Gray": (128, 128, 128),
+    "Green": (0, 128, 0),
+    "Indigo": (75, 0, 130),
+    "Ivory": (255, 255, 240),
+    "Khaki": (240, 230, 140),
+    "Lavender": (230, 230, 250),
+    "Lemon": (255, 250, 205),
+    "Lime": (0, 255, 0),
+    "Magenta": (255, 0, 255),
+    "Maroon": (128, 0, 0),
+    "Mint": (245, 255, 250),
+    "Navy": (0, 0, 128),
+    "Olive": (128, 128, 0),
+    "Orange": (255, 165, 0),
+    "Peach": (255, 218, 185),
+    "Pink": (255, 192, 203),
+    "Plum": (221, 160, 221),
+    "Purple": (128, 0, 128),
+    "Red": (255, 0, 0),
+    "Rose": (255, 102, 204),
+    "Salmon": (250, 128, 114),
+    "Silver": (192, 192, 192),
+    "Spring Green": (0, 255, 127),
+    "Tan": (210, 180, 140),
+    "Teal": (0, 128, 128),
+    "Turquoise": (64, 224, 208),
+    "Violet": (238, 130, 238),
+    "Wheat": (245, 222, 179),
+    "White": (255, 255, 255),
+    "Yellow": (255, 255, 0),
+}
+
+# Lower-case hexadecimal digits, for validating hex input
+HEX_DIGITS = frozenset('0123456789abcdef')
+
+
+def parse_color_value(value_str):
+    """Parse color value from string - supports decimal (0-255) and hex (00-FF, 0x00-0xFF)."""
+    if not value_str:
+        return None
+
+    value_str = value_str.strip().lower()
+
+    try:
+        # Try decimal format first
+        if value_str.isdigit():
+            value = int(value_str)
+            if 0 <= value <= 255:
+                return value
+            return None
+
+        # Try hexadecimal formats
+        if value_str.startswith('0x'):
+            # Format: 0x00 to 0xFF
+            value = int(value_str, 16)
+            if 0 <= value <= 255:
+                return value
+            return None
+        elif len(value_str) <= 2 and all(c in HEX_DIGITS for c in value_str):
+            # Format: 00 to FF (assume hex if all hex digits)
+            value = int(value_str, 16)
+            if 0 <= value <= 255:
+                return value
+            return None
+
+    except ValueError:
+        pass
+
+    return None
+
+
+def rgb_to_hex(rgb_values):
+    """Format an (r, g, b) tuple as an upper-case #RRGGBB string."""
+    r, g, b = rgb_values
+    return f"#{r:02X}{g:02X}{b:02X}"
+
+
+def channel_to_hex(value):
+    """Format a single channel value as a 0xNN label."""
+    return f"0x{value:02X}"
+
+
+def format_dropdown_label(color_name, rgb_values):
+    """Return the dropdown text for a palette entry, e.g. 'Red (#FF0000)'."""
+    if rgb_values is None:
+        # Custom Color entry
+        return color_name
+    return f"{color_name} ({rgb_to_hex(rgb_values)})"
+
+
+def get_dropdown_values(palette=COMMON_COLORS):
+    """Generate dropdown values with color names and hex codes."""
+    return [format_dropdown_label(color_name, rgb_values)
+            for color_name, rgb_values in palette.items()]
+
+
+def extract_color_name(dropdown_text):
+    """Extract the color name from dropdown text that includes hex code."""
+    if '(' in dropdown_text:
+        return dropdown_text.split(' (')[0]
+    return dropdown_text
+
+
+def parse_color_string(text):
+    """Parse a whole color into an (r, g, b) tuple, or return None if invalid.
+
+    Accepts '#RRGGBB', '#RGB', '0xRRGGBB', bare 'RRGGBB', or three channel
+    values separated by commas/whitespace (optionally wrapped in 'rgb(...)'),
+    where each channel follows the parse_color_value rules.
+    """
+    if not text:
+        return None
+
+    text = text.strip().lower()
+    if text.startswith('rgb(') and text.endswith(')'):
+        text = text[4:-1]
+
+    parts = text.replace(',', ' ').split()
+    if len(parts) == 3:
+        channels = [parse_color_value(part) for part in parts]
+        if None in channels:
+            return None
+        return tuple(channels)
+    if len(parts) != 1:
+        return None
+
+    # Single token: packed hex color
+    token = parts[0]
+    if token.startswith('#'):
+        token = token[1:]
+        if len(token) == 3:
+            token = ''.join(c * 2 for c in token)
+    elif token.startswith('0x'):
+        token = token[2:]
+    if len(token) != 6 or not all(c in HEX_DIGITS for c in token):
+        return None
+    value = int(token, 16)
+    return (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
@@ -0,0 +1,276 @@
+"""
+Color Difference
+
+Perceptual color-difference formulas (CIE76, CIE94, CIEDE2000 and OKLab
+distance) for single colors and for batches of colors.
+
+All inputs are 8-bit sRGB (r, g, b) tuples. Conversions to CIELAB and OKLab
+go through a 256-entry linearization table and are cached per color, so batch
+comparisons only pay for each distinct color once. Batch comparisons are
+produced in fixed-size blocks so memory stays bounded however many colors
+are compared.
+"""
+
+import math
+from functools import lru_cache
+
+
+# Names accepted by the metric arguments below
+CIE76 = "cie76"
+CIE94 = "cie94"
+CIEDE2000 = "ciede2000"
+OKLAB = "oklab"
+METRIC_NAMES = (CIE76, CIE94, CIEDE2000, OKLAB)
+
+# Rows/columns per block when comparing two batches
+DEFAULT_BLOCK_SIZE = 256
+
+# Number of converted colors remembered between calls
+CONVERSION_CACHE_SIZE = 1 << 16
+
+# D65 reference white for CIELAB
+_WHITE_X = 0.95047
+_WHITE_Y = 1.0
+_WHITE_Z = 1.08883
+
+_LAB_EPSILON = (6 / 29) ** 3
+_LAB_KAPPA = 1 / (3 * (6 / 29) ** 2)
+_POW25_7 = 25 ** 7
+
+
+def linearize(channel):
+    """Convert one 8-bit sRGB channel to linear light (0.0-1.0)."""
+    c = channel / 255
+    if c <= 0.04045:
+        return c / 12.92
+    return ((c + 0.055) / 1.055) ** 2.4
+
+
+# Precomputed sRGB linearization, indexed by 8-bit channel value
+SRGB_TO_LINEAR = tuple(linearize(i) for i in range(256))
+
+
+def _lab_f(t):
+    """CIELAB companding function."""
+    if t > _LAB_EPSILON:
+        return t ** (1 / 3)
+    return t * _LAB_KAPPA + 4 / 29
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def rgb_to_lab(rgb_values):
+    """Convert an (r, g, b) tuple to CIELAB (L, a, b) under D65."""
+    r = SRGB_TO_LINEAR[rgb_values[0]]
+    g = SRGB_TO_LINEAR[rgb_values[1]]
+    b = SRGB_TO_LINEAR[rgb_values[2]]
+
+    x = 0.4124564 * r + 0.3575761 * g + 0.1804375 * b
+    y = 0.2126729 * r + 0.7151522 * g + 0.0721750 * b
+    z = 0.0193339 * r + 0.1191920 * g + 0.9503041 * b
+
+    fx = _lab_f(x / _WHITE_X)
+    fy = _lab_f(y / _WHITE_Y)
+    fz = _lab_f(z / _WHITE_Z)
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def rgb_to_oklab(rgb_values):
+    """Convert an (r, g, b) tuple to OKLab (L, a, b)."""
+    r = SRGB_TO_LINEAR[rgb_values[0]]
+    g = SRGB_TO_LINEAR[rgb_values[1]]
+    b = SRGB_TO_LINEAR[rgb_values[2]]
+
+    l = 0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b
+    m = 0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b
+    s = 0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b
+
+    l_ = l ** (1 / 3)
+    m_ = m ** (1 / 3)
+    s_ = s ** (1 / 3)
+    return (0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+            1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+            0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_)
+
+
+def delta_e_76(lab1, lab2):
+    """CIE76 difference: Euclidean distance in CIELAB."""
+    dl = lab1[0] - lab2[0]
+    da = lab1[1] - lab2[1]
+    db = lab1[2] - lab2[2]
+    return math.sqrt(dl * dl + da * da + db * db)
+
+
+def delta_e_94(lab1, lab2):
+    """CIE94 difference (graphic arts weights), lab1 being the reference."""
+    l1, a1, b1 = lab1
+    l2, a2, b2 = lab2
+    c1 = math.sqrt(a1 * a1 + b1 * b1)
+    c2 = math.sqrt(a2 * a2 + b2 * b2)
+
+    dl = l1 - l2
+    dc = c1 - c2
+    da = a1 - a2
+    db = b1 - b2
+    dh_sq = max(0.0, da * da + db * db - dc * dc)
+
+    sc = 1 + 0.045 * c1
+    sh = 1 + 0.015 * c1
+    return math.sqrt(dl * dl + (dc / sc) ** 2 + dh_sq / (sh * sh))
+
+
+def delta_e_2000(lab1, lab2):
+    """CIEDE2000 difference between two CIELAB colors."""
+    l1, a1, b1 = lab1
+    l2, a2, b2 = lab2
+
+    # Chroma-dependent rescaling of the a axis
+    c_mean = (math.sqrt(a1 * a1 + b1 * b1) + math.sqrt(a2 * a2 + b2 * b2)) / 2
+    c_mean_7 = c_mean ** 7
+    g = 0.5 * (1 - math.sqrt(c_mean_7 / (c_mean_7 + _POW25_7)))
+    a1p = (1 + g) * a1
+    a2p = (1 + g) * a2
+
+    c1p = math.sqrt(a1p * a1p + b1 * b1)
+    c2p = math.sqrt(a2p * a2p + b2 * b2)
+    h1p = math.degrees(math.atan2(b1, a1p)) % 360 if c1p else 0.0
+    h2p = math.degrees(math.atan2(b2, a2p)) % 360 if c2p else 0.0
+
+    # Lightness, chroma and hue differences
+    dlp = l2 - l1
+    dcp = c2p - c1p
+    chroma_product = c1p * c2p
+    if chroma_product == 0:
+        dhp = 0.0
+        h_mean = h1p + h2p
+    else:
+        dhp = h2p - h1p
+        if dhp > 180:
+            dhp -= 360
+        elif dhp < -180:
+            dhp += 360
+        h_mean = (h1p + h2p) / 2
+        if abs(h1p - h2p) > 180:
+            h_mean += 180 if h_mean < 180 else -180
+    dhp_big = 2 * math.sqrt(chroma_product) * math.sin(math.radians(dhp / 2))
+
+    # Weighting functions
+    l_mean = (l1 + l2) / 2
+    cp_mean = (c1p + c2p) / 2
+    t = (1
+         - 0.17 * math.cos(math.radians(h_mean - 30))
+         + 0.24 * math.cos(math.radians(2 * h_mean))
+         + 0.32 * math.cos(math.radians(3 * h_mean + 6))
+         - 0.20 * math.cos(math.radians(4 * h_mean - 63)))
+    l_offset_sq = (l_mean - 50) ** 2
+    sl = 1 + 0.015 * l_offset_sq / math.sqrt(20 + l_offset_sq)
+    sc = 1 + 0.045 * cp_mean
+    sh = 1 + 0.015 * cp_mean * t
+
+    cp_mean_7 = cp_mean ** 7
+    rc = 2 * math.sqrt(cp_mean_7 / (cp_mean_7 + _POW25_7))
+    d_theta = 30 * math.exp(-((h_mean - 275) / 25) ** 2)
+    rt = -math.sin(math.radians(2 * d_theta)) * rc
+
+    l_term = dlp / sl
+    c_term = dcp / sc
+    h_term = dhp_big / sh
+    return math.sqrt(l_term * l_term + c_term * c_term + h_term * h_term
+                     + rt * c_term * h_term)
+
+
+def delta_e_ok(oklab1, oklab2):
+    """OKLab difference: Euclidean distance in OKLab, scaled by 100 to match ΔE units."""
+    dl = oklab1[0] - oklab2[0]
+    da = oklab1[1] - oklab2[1]
+    db = oklab1[2] - oklab2[2]
+    return 100 * math.sqrt(dl * dl + da * da + db * db)
+
+
+# metric name -> (converter from RGB, difference function on converted values)
+METRICS = {
+    CIE76: (rgb_to_lab, delta_e_76),
+    CIE94: (rgb_to_lab, delta_e_94),
+    CIEDE2000: (rgb_to_lab, delta_e_2000),
+    OKLAB: (rgb_to_oklab, delta_e_ok),
+}
+
+
+def get_metric(metric):
+    """Return the (converter, difference function) pair for a metric name."""
+    try:
+        return METRICS[metric]
+    except KeyError:
+        raise ValueError(f"Unknown color difference metric: {metric!r} "
+                         f"(expected one of {', '.join(METRIC_NAMES)})") from None
+
+
+def color_difference(rgb1, rgb2, metric=CIEDE2000):
+    """Return the perceptual difference between two (r, g, b) colors."""
+    convert, difference = get_metric(metric)
+    return difference(convert(tuple(rgb1)), convert(tuple(rgb2)))
+
+
+def convert_colors(colors, metric=CIEDE2000):
+    """Convert a sequence of (r, g, b) colors into the metric's color space."""
+    convert = get_metric(metric)[0]
+    return [convert(tuple(rgb_values)) for rgb_values in colors]
+
+
+def distances_to(query, colors, metric=CIEDE2000):
+    """Return the difference between one query color and each of N colors."""
+    convert, difference = get_metric(metric)
+    reference = convert(tuple(query))
+    return [difference(reference, convert(tuple(rgb_values))) for rgb_values in colors]
+
+
+def nearest_color(query, colors, metric=CIEDE2000):
+    """Return (position, distance) of the color closest to the query, or None."""
+    best = None
+    for position, distance in enumerate(distances_to(query, colors, metric)):
+        if best is None or distance < best[1]:
+            best = (position, distance)
+    return best
+
+
+def distance_blocks(colors_a, colors_b, metric=CIEDE2000, block_size=DEFAULT_BLOCK_SIZE):
+    """Yield (row, column, block) tiles of the N×M difference matrix.
+
+    Each block is a list of at most block_size rows of at most block_size
+    distances, covering colors_a[row:row + len(block)] against
+    colors_b[column:column + len(block[0])]. colors_a may be any iterable;
+    it is consumed one block of rows at a time.
+    """
+    convert, difference = get_metric(metric)
+    converted_b = [convert(tuple(rgb_values)) for rgb_values in colors_b]
+
+    row = 0
+    rows = []
+    for rgb_values in colors_a:
+        rows.append(convert(tuple(rgb_values)))
+        if len(rows) == block_size:
+            yield from _row_blocks(row, rows, converted_b, difference, block_size)
+            row += len(rows)
+            rows = []
+    if rows:
+        yield from _row_blocks(row, rows, converted_b, difference, block_size)
+
+
+def _row_blocks(row, rows, converted_b, difference, block_size):
+    """Yield the blocks for one band of converted rows."""
+    for column in range(0, len(converted_b), block_size):
+        columns = converted_b[column:column + block_size]
+        block = [[difference(a, b) for b in columns] for a in rows]
+        yield row, column, block
+
+
+def distance_matrix(colors_a, colors_b, metric=CIEDE2000, block_size=DEFAULT_BLOCK_SIZE):
+    """Return the full N×M difference matrix as a list of rows."""
+    colors_b = list(colors_b)
+    matrix = []
+    for row, column, block in distance_blocks(colors_a, colors_b, metric, block_size):
+        if column == 0:
+            matrix.extend([] for _ in block)
+        for offset, values in enumerate(block):
+            matrix[row + offset].extend(values)
+    return matrix
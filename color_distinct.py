@@ -0,0 +1,170 @@
+"""
+Color Distinct
+
+Generates colors that are all clearly different from each other: Poisson-disk
+sampling in OKLab, keeping every pair at least a minimum ΔE apart (OKLab
+distance × 100, as in color_difference).
+
+Candidates are random sRGB colors within the lightness and chroma limits; a
+candidate is kept when no kept color is closer than the minimum. Kept colors
+go in a uniform grid of cells one minimum distance wide, so checking a
+candidate looks at the 27 cells around it instead of every color kept so far,
+and 10k colors take about a tenth of a second. Sampling gives up after
+MAX_REJECTIONS candidates in a row are too close to something, which is when
+the allowed part of the space is full.
+
+Results are reproducible: the same seed and settings give the same colors.
+"""
+
+import math
+import random
+
+from color_difference import rgb_to_oklab
+from color_palette import Palette
+
+
+# Default minimum ΔE between generated colors (about five just-noticeable differences)
+DEFAULT_MIN_DELTA_E = 10.0
+
+# Consecutive rejected candidates after which the space counts as full
+MAX_REJECTIONS = 2000
+
+# Colors that fit in sRGB times the cube of their spacing: about 60 colors fit
+# at ΔE 10, 330 at ΔE 5 and 4,000 at ΔE 2 before the space is full
+_PACKING = 30000
+
+# Recent history entries the Random button keeps its distance from
+RECENT_COLORS = 8
+
+# The 27 grid cells around (and including) a cell, nearest first: a close
+# color, if there is one, is usually in the candidate's own cell
+_NEIGHBORS = tuple(sorted(((dl, da, db) for dl in (-1, 0, 1) for da in (-1, 0, 1)
+                           for db in (-1, 0, 1)),
+                          key=lambda offset: abs(offset[0]) + abs(offset[1]) + abs(offset[2])))
+
+
+class DistinctSampler:
+    """Random colors at least a minimum ΔE from each other, kept in an OKLab grid."""
+
+    def __init__(self, min_delta_e=DEFAULT_MIN_DELTA_E, lightness=(0.0, 1.0),
+                 chroma=(0.0, None), seed=None):
+        """Sample colors with OKLab lightness and chroma within the (low, high) limits.
+
+        A high limit of None means no limit; seed may be an int or a
+        random.Random to draw from.
+        """
+        if min_delta_e <= 0:
+            raise ValueError("min_delta_e must be positive")
+        self.min_distance = min_delta_e / 100
+        self.lightness = lightness
+        self.chroma = chroma
+        self.rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        self.colors = []
+        # (l, a, b) cell -> OKLab colors kept in it
+        self.cells = {}
+
+    def __len__(self):
+        """Return the number of colors kept so far."""
+        return len(self.colors)
+
+    def _cell(self, oklab):
+        """Return the grid cell of an OKLab color."""
+        size = self.min_distance
+        return (math.floor(oklab[0] / size), math.floor(oklab[1] / size),
+                math.floor(oklab[2] / size))
+
+    def allowed(self, oklab):
+        """True if an OKLab color is within the lightness and chroma limits."""
+        low, high = self.lightness
+        if not low <= oklab[0] <= (1.0 if high is None else high):
+            return False
+        low, high = self.chroma
+        chroma = math.hypot(oklab[1], oklab[2])
+        return low <= chroma and (high is None or chroma <= high)
+
+    def is_distinct(self, oklab):
+        """True if no kept color is closer than the minimum distance to an OKLab color."""
+        limit = self.min_distance * self.min_distance
+        get = self.cells.get
+        cl, ca, cb = self._cell(oklab)
+        lightness, a, b = oklab
+        for dl, da, db in _NEIGHBORS:
+            others = get((cl + dl, ca + da, cb + db))
+            if others is None:
+                continue
+            for other_l, other_a, other_b in others:
+                dl_ = other_l - lightness
+                da_ = other_a - a
+                db_ = other_b - b
+                if dl_ * dl_ + da_ * da_ + db_ * db_ < limit:
+                    return False
+        return True
+
+    def add(self, rgb_values):
+        """Keep a color (e.g. one already in use) so later samples stay away from it."""
+        oklab = rgb_to_oklab.__wrapped__(tuple(rgb_values))
+        self.cells.setdefault(self._cell(oklab), []).append(oklab)
+        self.colors.append(tuple(rgb_values))
+
+    def sample(self, rejections=MAX_REJECTIONS):
+        """Keep and return one new distinct (r, g, b) color, or None if the space is full."""
+        randrange = self.rng.randrange
+        # The OKLab conversion without its cache: random candidates rarely repeat
+        to_oklab = rgb_to_oklab.__wrapped__
+        for _ in range(rejections):
+            packed = randrange(0x1000000)
+            rgb_values = (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF)
+            oklab = to_oklab(rgb_values)
+            if self.allowed(oklab) and self.is_distinct(oklab):
+                self.cells.setdefault(self._cell(oklab), []).append(oklab)
+                self.colors.append(rgb_values)
+                return rgb_values
+        return None
+
+    def fill(self, count, rejections=MAX_REJECTIONS):
+        """Sample until count colors are kept or the space is full; returns the new colors."""
+        start = len(self.colors)
+        while len(self.colors) < start + count:
+            if self.sample(rejections) is None:
+                break
+        return self.colors[start:]
+
+
+def spacing_for(count):
+    """Return a minimum ΔE (at most DEFAULT_MIN_DELTA_E) at which count colors comfortably fit in sRGB."""
+    # Ask for half the capacity, so sampling rarely runs into the full-space tail
+    return min(DEFAULT_MIN_DELTA_E, math.floor((_PACKING / 2 / max(1, count)) ** (1 / 3) * 10) / 10)
+
+
+def distinct_colors(count, min_delta_e=DEFAULT_MIN_DELTA_E, lightness=(0.0, 1.0),
+                    chroma=(0.0, None), seed=None):
+    """Return up to count (r, g, b) colors at least min_delta_e apart.
+
+    Fewer colors are returned when the limits leave no room for more (see
+    spacing_for).
+    """
+    return DistinctSampler(min_delta_e, lightness, chroma, seed).fill(count)
+
+
+def distinct_palette(count, min_delta_e=DEFAULT_MIN_DELTA_E, lightness=(0.0, 1.0),
+                     chroma=(0.0, None), seed=None, title="Distinct Colors"):
+    """Return a Palette of up to count distinct colors named "Distinct 1", "Distinct 2", ..."""
+    colors = distinct_colors(count, min_delta_e, lightness, chroma, seed)
+    return Palette.from_pairs(((f"Distinct {index + 1}", rgb_values)
+                               for index, rgb_values in enumerate(colors)), title)
+
+
+def distinct_from(recent, min_delta_e=DEFAULT_MIN_DELTA_E, rng=None):
+    """Return a random (r, g, b) color at least min_delta_e from every recent color.
+
+    Falls back to any random color if none is found (only possible with a
+    very large min_delta_e).
+    """
+    sampler = DistinctSampler(min_delta_e, seed=rng)
+    for rgb_values in recent:
+        sampler.add(rgb_values)
+    rgb_values = sampler.sample()
+    if rgb_values is None:
+        packed = sampler.rng.randrange(0x1000000)
+        rgb_values = (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF)
+    return rgb_values
@@ -0,0 +1,227 @@
+"""
+Color Export
+
+Writers for CSS custom properties, JSON design tokens, GIMP palettes (.gpl),
+Adobe Swatch Exchange (.ase) and the binary .rgbpal format.
+
+Every writer takes an iterable of (name, (r, g, b)) pairs and writes each
+color as it arrives, so exporting a million-entry (e.g. memory-mapped)
+palette never holds more than one color. The only state that grows is the
+set of CSS/JSON names already used, which keeps them unique. The .ase block
+count goes in the header, so it is written as 0 and patched once the colors
+are out; .rgbpal spools its sections to temporary files (see
+color_palette_file.stream_palette_file).
+
+ExportJob runs an export on a background thread and only exposes counters,
+so the Tk side can poll progress from root.after without touching the
+export itself.
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+
+from color_palette_file import stream_palette_file
+
+
+# Default title for exported palettes (CSS comment, token group, GPL name)
+DEFAULT_TITLE = "Palette"
+
+# Adobe Swatch Exchange: magic, version 1.0, block count
+_ASE_HEADER = struct.Struct('>4sHHI')
+_ASE_COLOR_BLOCK = 0x0001
+_ASE_NORMAL = 2
+
+# Characters a CSS custom property name can keep as they are
+_CSS_UNSAFE = re.compile(r'[^\w-]+')
+
+# Characters with a meaning in design token names (groups and references)
+_TOKEN_UNSAFE = re.compile(r'[.{}]')
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export when its ExportJob is cancelled."""
+
+
+def _css_name(name, used):
+    """Return a unique CSS custom property name (without the --) for a color name."""
+    slug = _CSS_UNSAFE.sub('-', name.lower()).strip('-') or "color"
+    return _unique(slug, used, '-')
+
+
+def _token_name(name, used):
+    """Return a unique design token name for a color name."""
+    token = _TOKEN_UNSAFE.sub('-', name).lstrip('$').strip() or "color"
+    return _unique(token, used, ' ')
+
+
+def _unique(name, used, separator):
+    """Return name, or name with a number appended if it was already used."""
+    candidate = name
+    number = 2
+    while candidate in used:
+        candidate = f"{name}{separator}{number}"
+        number += 1
+    used.add(candidate)
+    return candidate
+
+
+def write_css(stream, pairs, title=DEFAULT_TITLE):
+    """Write colors as CSS custom properties on :root; returns the count."""
+    used = set()
+    count = 0
+    stream.write(f"/* {title.replace('*/', '* /')} */\n:root {{\n")
+    for name, (r, g, b) in pairs:
+        stream.write(f"  --{_css_name(name, used)}: #{r:02x}{g:02x}{b:02x};\n")
+        count += 1
+    stream.write("}\n")
+    return count
+
+
+def write_json_tokens(stream, pairs, title=DEFAULT_TITLE):
+    """Write colors as a group of W3C design tokens (DTCG format); returns the count."""
+    used = set()
+    count = 0
+    stream.write(f'{{\n  {json.dumps(title, ensure_ascii=False)}: {{\n    "$type": "color"')
+    for name, (r, g, b) in pairs:
+        token = json.dumps(_token_name(name, used), ensure_ascii=False)
+        stream.write(f',\n    {token}: {{"$value": "#{r:02X}{g:02X}{b:02X}"}}')
+        count += 1
+    stream.write("\n  }\n}\n")
+    return count
+
+
+def write_gpl(stream, pairs, title=DEFAULT_TITLE):
+    """Write colors as a GIMP palette; returns the count."""
+    count = 0
+    stream.write(f"GIMP Palette\nName: {' '.join(title.split())}\nColumns: 0\n#\n")
+    for name, (r, g, b) in pairs:
+        # Names can't span lines in a .gpl file
+        stream.write(f"{r:3d} {g:3d} {b:3d}\t{' '.join(name.split())}\n")
+        count += 1
+    return count
+
+
+def write_ase(stream, pairs, title=DEFAULT_TITLE):
+    """Write colors as an Adobe Swatch Exchange file (binary, seekable stream); returns the count."""
+    start = stream.tell()
+    stream.write(_ASE_HEADER.pack(b"ASEF", 1, 0, 0))
+    count = 0
+    for name, (r, g, b) in pairs:
+        # Names are UTF-16BE with a terminating null, preceded by their length in code units
+        encoded = (name + "\0").encode('utf-16-be')
+        body = (struct.pack('>H', len(encoded) // 2) + encoded + b"RGB "
+                + struct.pack('>fffH', r / 255, g / 255, b / 255, _ASE_NORMAL))
+        stream.write(struct.pack('>HI', _ASE_COLOR_BLOCK, len(body)) + body)
+        count += 1
+    end = stream.tell()
+    stream.seek(start)
+    stream.write(_ASE_HEADER.pack(b"ASEF", 1, 0, count))
+    stream.seek(end)
+    return count
+
+
+# extension -> (writer, binary, description)
+EXPORT_FORMATS = {
+    ".css": (write_css, False, "CSS custom properties"),
+    ".json": (write_json_tokens, False, "JSON design tokens"),
+    ".gpl": (write_gpl, False, "GIMP palette"),
+    ".ase": (write_ase, True, "Adobe Swatch Exchange"),
+    ".rgbpal": (None, True, "Binary palette"),
+}
+
+# (description, pattern) pairs for save dialogs
+EXPORT_FILETYPES = tuple((description, f"*{extension}")
+                         for extension, (_, _, description) in EXPORT_FORMATS.items())
+
+
+def export_format(path):
+    """Return the extension of path if it is an export format, else raise ValueError."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {extension or path!r} "
+                         f"(expected one of {', '.join(EXPORT_FORMATS)})")
+    return extension
+
+
+def export_colors(path, pairs, title=DEFAULT_TITLE):
+    """Write (name, (r, g, b)) pairs to path in the format its extension names; returns the count.
+
+    The file is written next to path and moved into place when complete, so
+    a failed or cancelled export never leaves a partial file behind.
+    """
+    extension = export_format(path)
+    writer, binary, _ = EXPORT_FORMATS[extension]
+    if writer is None:
+        # .rgbpal does its own spooling and replacing
+        return stream_palette_file(path, pairs)
+
+    temporary = f"{path}.tmp"
+    try:
+        if binary:
+            with open(temporary, 'wb') as stream:
+                count = writer(stream, pairs, title)
+        else:
+            with open(temporary, 'w', encoding='utf-8', newline='\n') as stream:
+                count = writer(stream, pairs, title)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return count
+
+
+class ExportJob:
+    """An export_colors() call running on a background thread, with progress counters."""
+
+    def __init__(self, path, pairs, title=DEFAULT_TITLE, total=None):
+        """Prepare to export pairs to path; total is the expected count, if known."""
+        export_format(path)
+        self.path = path
+        self.pairs = pairs
+        self.title = title
+        self.total = total
+        self.written = 0
+        self.error = None
+        self.done = False
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="color-export", daemon=True)
+
+    def start(self):
+        """Start exporting; returns the job."""
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Stop the export at the next color; the destination is left untouched."""
+        self._cancelled = True
+
+    def join(self, timeout=None):
+        """Wait for the export to finish."""
+        self._thread.join(timeout)
+
+    def progress(self):
+        """Return the fraction written (0.0-1.0), or None if the total is unknown."""
+        if not self.total:
+            return None
+        return min(1.0, self.written / self.total)
+
+    def _counted(self, pairs):
+        """Yield pairs, counting them and stopping if the job is cancelled."""
+        for pair in pairs:
+            if self._cancelled:
+                raise ExportCancelled(self.path)
+            yield pair
+            self.written += 1
+
+    def _run(self):
+        """Run the export, recording any error for the polling side."""
+        try:
+            export_colors(self.path, self._counted(self.pairs), self.title)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.done = True
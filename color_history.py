@@ -0,0 +1,126 @@
+"""
+Color History
+
+Bounded undo/redo history of colors.
+
+Colors are stored packed as 24-bit integers in a fixed-size array used as a
+ring buffer, so the history never grows past its capacity however long the
+session runs: the oldest entries are overwritten. Consecutive changes from
+one source (a slider drag, an animation, arrowing through the dropdown) can
+be merged into a single entry so they don't flood the history.
+"""
+
+import time
+from array import array
+
+
+# Colors remembered
+HISTORY_SIZE = 256
+
+# Seconds after which a change from the same source starts a new entry
+MERGE_TIMEOUT = 0.75
+
+
+class ColorHistory:
+    """Undo/redo history of packed 24-bit colors in a fixed-capacity ring buffer."""
+
+    def __init__(self, capacity=HISTORY_SIZE, clock=time.monotonic, merge_timeout=MERGE_TIMEOUT):
+        """Create an empty history holding at most capacity colors."""
+        self.capacity = capacity
+        self.clock = clock
+        self.merge_timeout = merge_timeout
+        self._colors = array('I', [0]) * capacity
+        self._start = 0        # ring slot of the oldest entry
+        self._count = 0        # entries stored (redo entries included)
+        self._current = -1     # entry the explorer shows, counted from the oldest
+        self._merge_key = None
+        self._merge_time = None
+        # Bumped on every change so views can tell when to redraw
+        self.version = 0
+
+    def __len__(self):
+        """Return the number of stored entries."""
+        return self._count
+
+    @property
+    def position(self):
+        """Return the index of the current entry (oldest is 0), or -1 if empty."""
+        return self._current
+
+    @property
+    def can_undo(self):
+        """True if there is an older entry."""
+        return self._current > 0
+
+    @property
+    def can_redo(self):
+        """True if there is a newer entry."""
+        return self._current < self._count - 1
+
+    def _slot(self, index):
+        """Return the ring slot of entry index."""
+        return (self._start + index) % self.capacity
+
+    def __getitem__(self, index):
+        """Return entry index (oldest is 0) as a packed color."""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._colors[self._slot(index)]
+
+    def current(self):
+        """Return the current packed color, or None if the history is empty."""
+        return self[self._current] if self._count else None
+
+    def record(self, packed, merge_key=None):
+        """Record a new color, dropping any redo entries.
+
+        A color recorded with the same merge_key as the previous one, within
+        merge_timeout seconds of it, replaces that entry instead of adding one.
+        """
+        now = self.clock()
+        merge = (merge_key is not None and merge_key == self._merge_key
+                 and now - self._merge_time <= self.merge_timeout
+                 and self._current == self._count - 1 and self._current > 0)
+        self._merge_key = merge_key
+        self._merge_time = now
+        if merge:
+            if self[self._current] != packed:
+                self._colors[self._slot(self._current)] = packed
+                self.version += 1
+            return
+        if self._count and self[self._current] == packed:
+            return
+
+        # Anything after the current entry can no longer be redone
+        self._count = self._current + 1
+        if self._count == self.capacity:
+            # Full: the oldest entry makes room
+            self._start = (self._start + 1) % self.capacity
+            self._count -= 1
+        self._colors[self._slot(self._count)] = packed
+        self._count += 1
+        self._current = self._count - 1
+        self.version += 1
+
+    def jump(self, index):
+        """Make entry index current and return its color."""
+        packed = self[index]
+        self._current = index
+        self._merge_key = None
+        self.version += 1
+        return packed
+
+    def undo(self):
+        """Step back one entry and return its color, or None if there is none."""
+        return self.jump(self._current - 1) if self.can_undo else None
+
+    def redo(self):
+        """Step forward one entry and return its color, or None if there is none."""
+        return self.jump(self._current + 1) if self.can_redo else None
+
+    def recent(self, count):
+        """Return (first index, packed colors) for up to count entries around the current one."""
+        # Keep a few redo entries in view after the current one
+        stop = min(self._count, max(count, self._current + 1 + count // 4))
+        first = max(0, stop - count)
+        return first, [self[index] for index in range(first, stop)]
@@ -0,0 +1,239 @@
+"""
+Color Image
+
+Streaming image readers and a color histogram for matching colors against
+real assets.
+
+PPM and PGM files (binary P6/P5 and plain P3/P2) are read natively in strips
+of rows, so scanning a 100-megapixel image never needs the whole image in
+memory. Other formats (PNG, GIF) are decoded by Tk and read back from the
+PhotoImage one strip at a time (see iter_photo_strips).
+
+Strips are RGB bytes. ColorHistogram packs each pixel into a 24-bit integer
+with bytes slicing (no per-pixel Python work), counts each strip with
+Counter, and adds the totals to a 16M-bin count array, which gives the
+unique-color count and the most common colors.
+"""
+
+import heapq
+import io
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+
+
+# Pixels per strip: about 768 KB of RGB data, so each step stays short
+STRIP_PIXELS = 1 << 18
+
+# Most common colors reported by default
+DEFAULT_TOP = 32
+
+# One bin per 24-bit color
+COLOR_COUNT = 1 << 24
+
+# Extensions read natively; anything else goes through a Tk PhotoImage
+PNM_EXTENSIONS = (".ppm", ".pgm", ".pnm")
+
+_WHITESPACE = b" \t\r\n\x0b\x0c"
+
+
+def _read_header_token(stream):
+    """Read one whitespace-separated header token, skipping '#' comments."""
+    token = b""
+    while True:
+        char = stream.read(1)
+        if not char:
+            break
+        if char == b"#":
+            stream.readline()
+            if token:
+                break
+            continue
+        if char in _WHITESPACE:
+            if token:
+                break
+            continue
+        token += char
+    return token
+
+
+def read_pnm_header(stream):
+    """Read a PPM/PGM header and return (magic, width, height, maxval).
+
+    The stream is left at the first byte of pixel data.
+    """
+    magic = stream.read(2)
+    if magic not in (b"P2", b"P3", b"P5", b"P6"):
+        raise ValueError("Not a PPM or PGM image")
+    try:
+        width, height, maxval = (int(_read_header_token(stream)) for _ in range(3))
+    except ValueError:
+        raise ValueError("Malformed PPM/PGM header") from None
+    if width <= 0 or height <= 0 or not 0 < maxval < 65536:
+        raise ValueError("Malformed PPM/PGM header")
+    return magic.decode('ascii'), width, height, maxval
+
+
+def _scale_table(maxval):
+    """Return a translate table mapping samples 0..maxval to 0..255."""
+    return bytes(min(255, (value * 255 + maxval // 2) // maxval) for value in range(256))
+
+
+def _to_rgb(samples, channels, maxval):
+    """Turn 8-bit gray or RGB samples into RGB bytes scaled to 0..255."""
+    if maxval != 255:
+        samples = samples.translate(_scale_table(maxval))
+    if channels == 3:
+        return bytes(samples)
+    rgb = bytearray(3 * len(samples))
+    rgb[0::3] = samples
+    rgb[1::3] = samples
+    rgb[2::3] = samples
+    return bytes(rgb)
+
+
+def _iter_binary_strips(stream, channels, width, height, maxval, strip_pixels):
+    """Yield RGB strips from binary (P5/P6) pixel data."""
+    sample_size = 1 if maxval < 256 else 2
+    row_size = width * channels * sample_size
+    rows = max(1, strip_pixels // width)
+    for top in range(0, height, rows):
+        count = min(rows, height - top)
+        data = stream.read(count * row_size)
+        if len(data) < count * row_size:
+            raise ValueError("Truncated PPM/PGM image")
+        if sample_size == 2:
+            # 16-bit samples are big-endian; the high byte is the 8-bit value
+            data = data[0::2]
+            yield _to_rgb(data, channels, max(1, maxval >> 8))
+        else:
+            yield _to_rgb(data, channels, maxval)
+
+
+def _iter_plain_strips(stream, channels, width, height, maxval, strip_pixels):
+    """Yield RGB strips from plain (P2/P3) text pixel data."""
+    rows = max(1, strip_pixels // width)
+    strip_samples = rows * width * channels
+    remaining = width * height * channels
+    # Scale exactly as the binary reader does: 16-bit samples keep the high byte
+    shift = 0 if maxval < 256 else 8
+    table = _scale_table(max(1, maxval >> shift))
+    samples = []
+    partial = b""
+    while remaining:
+        chunk = stream.read(1 << 16)
+        if not chunk:
+            tokens = [partial] if partial else []
+            partial = b""
+        else:
+            tokens = (partial + chunk).split()
+            # The last token may continue in the next chunk
+            partial = b"" if chunk[-1:] in _WHITESPACE else tokens.pop() if tokens else b""
+        for token in tokens:
+            samples.append(table[min(maxval, int(token)) >> shift])
+        while len(samples) >= strip_samples or (samples and len(samples) >= remaining):
+            take = min(strip_samples, remaining)
+            strip, samples = samples[:take], samples[take:]
+            remaining -= take
+            yield _to_rgb(bytes(strip), channels, 255)
+        if not chunk and remaining:
+            raise ValueError("Truncated PPM/PGM image")
+
+
+def iter_pnm_strips(path, strip_pixels=STRIP_PIXELS):
+    """Return (width, height, strips) for a PPM/PGM file; strips yields RGB bytes of whole rows."""
+    stream = open(path, 'rb')
+    try:
+        magic, width, height, maxval = read_pnm_header(stream)
+    except Exception:
+        stream.close()
+        raise
+    channels = 3 if magic in ("P3", "P6") else 1
+    reader = _iter_plain_strips if magic in ("P2", "P3") else _iter_binary_strips
+
+    def strips():
+        with stream:
+            yield from reader(stream, channels, width, height, maxval, strip_pixels)
+
+    return width, height, strips()
+
+
+def iter_photo_strips(image, strip_pixels=STRIP_PIXELS):
+    """Yield RGB strips of a Tk PhotoImage, reading each strip back as PPM data."""
+    width, height = image.width(), image.height()
+    rows = max(1, strip_pixels // max(1, width))
+    for top in range(0, height, rows):
+        bottom = min(height, top + rows)
+        data = image.tk.call(image.name, 'data', '-format', 'ppm',
+                             '-from', 0, top, width, bottom)
+        if isinstance(data, str):
+            data = data.encode('latin-1')
+        stream = io.BytesIO(data)
+        magic, strip_width, strip_height, maxval = read_pnm_header(stream)
+        yield from _iter_binary_strips(stream, 3, strip_width, strip_height, maxval,
+                                       strip_width * strip_height)
+
+
+def pack_pixels(rgb):
+    """Return RGB bytes as a sequence of packed 24-bit integers (a memoryview, no per-pixel work)."""
+    count = len(rgb) // 3
+    # Widen each pixel to a native 32-bit integer with the bytes in packed order
+    packed = bytearray(4 * count)
+    if sys.byteorder == 'little':
+        packed[0::4], packed[1::4], packed[2::4] = rgb[2::3], rgb[1::3], rgb[0::3]
+    else:
+        packed[1::4], packed[2::4], packed[3::4] = rgb[0::3], rgb[1::3], rgb[2::3]
+    return memoryview(packed).cast('I')
+
+
+class ColorHistogram:
+    """Count pixels per 24-bit color across any number of strips."""
+
+    def __init__(self):
+        """Start with every color at zero."""
+        self.counts = array('I', bytes(4 * COLOR_COUNT))
+        self.colors = []      # packed colors seen so far, in first-seen order
+        self.pixels = 0
+        self.seconds = 0.0    # time spent counting
+
+    def add(self, rgb):
+        """Count a strip of RGB bytes."""
+        start = time.perf_counter()
+        packed = pack_pixels(rgb)
+        counts = self.counts
+        colors = self.colors
+        for color, number in Counter(packed).items():
+            if not counts[color]:
+                colors.append(color)
+            counts[color] += number
+        self.pixels += len(packed)
+        self.seconds += time.perf_counter() - start
+
+    @property
+    def unique(self):
+        """Return the number of distinct colors counted."""
+        return len(self.colors)
+
+    @property
+    def megapixels_per_second(self):
+        """Return the counting throughput."""
+        return self.pixels / self.seconds / 1e6 if self.seconds > 0 else 0.0
+
+    def top(self, count=DEFAULT_TOP):
+        """Return the count most common colors as (packed color, pixels) pairs."""
+        counts = self.counts
+        return [(color, counts[color])
+                for color in heapq.nlargest(count, self.colors, key=counts.__getitem__)]
+
+
+def analyze_image(path, strip_pixels=STRIP_PIXELS):
+    """Count the colors of a PPM/PGM file and return (width, height, histogram)."""
+    if os.path.splitext(path)[1].lower() not in PNM_EXTENSIONS:
+        raise ValueError(f"Unsupported image type (PPM/PGM only without Tk): {path}")
+    width, height, strips = iter_pnm_strips(path, strip_pixels)
+    histogram = ColorHistogram()
+    for strip in strips:
+        histogram.add(strip)
+    return width, height, histogram
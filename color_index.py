@@ -0,0 +1,331 @@
+"""
+Nearest Color Index
+
+A k-d tree over palette colors that answers "which named color is closest to
+this one?" fast enough to run on every slider move and animation frame, even
+for palettes with hundreds of thousands of entries.
+
+The tree is stored implicitly: the points are reordered so that every node's
+pivot sits in the middle of its index range, which keeps queries to a handful
+of list lookups and lets the ordering be saved and reloaded without rebuilding.
+
+Points are indexed in the color space of the chosen metric (see
+color_difference), so "closest" means perceptually closest by default.
+
+CIE94 and CIEDE2000 are not distances in any space a tree can split, so
+their searches walk the CIELAB tree with a lower bound on the metric
+instead: a color whose lightness and (a, b) offsets from the query are dl
+and dab is at least sqrt((wl dl)^2 + (k dab / (alpha + beta dab))^2) away
+(see _metric_bounds). The bound prunes subtrees and skips most exact
+evaluations, and since it never overestimates, the result is the exact
+nearest color under the metric.
+"""
+
+import math
+
+from color_difference import CIE76, CIE94, CIEDE2000, OKLAB, get_metric
+
+
+# Ranges this small are scanned directly instead of being split further
+LEAF_SIZE = 8
+
+# Number of recent query results remembered (slider drags revisit colors often)
+CACHE_SIZE = 4096
+
+# Plain Euclidean distance between (r, g, b) tuples
+RGB_EUCLIDEAN = "rgb"
+
+# Metrics whose distance is exactly Euclidean distance in the indexed space
+# (OKLab distances are reported scaled by 100, see color_difference.delta_e_ok)
+_EUCLIDEAN_SCALE = {RGB_EUCLIDEAN: 1, CIE76: 1, OKLAB: 100}
+
+# CIEDE2000 lower-bound constants. SL is largest at L' = 0 or 100; the RT
+# rotation term can cancel up to sin(60 degrees) of the chroma/hue terms; and
+# the a' rescaling adds at most 6.374 (g(C) * C, maximal near C = 14) to a
+# pair's mean chroma.
+_SL_MAX = 1 + 0.015 * 2500 / math.sqrt(20 + 2500)
+_RT_FACTOR = math.sqrt(1 - math.sin(math.radians(60)))
+_G_CHROMA_MAX = 6.4
+
+
+class NearestColorIndex:
+    """Answer nearest-named-color queries against a palette in logarithmic time."""
+
+    def __init__(self, palette, metric=CIEDE2000):
+        """Build the index from a {name: (r, g, b)} dict or (name, (r, g, b)) pairs."""
+        self._set_metric(metric)
+        items = palette.items() if hasattr(palette, 'items') else palette
+
+        names = []
+        colors = []
+        for name, rgb_values in items:
+            if rgb_values is None:
+                # Entries such as "Custom Color" have no value to match against
+                continue
+            names.append(name)
+            colors.append(tuple(rgb_values))
+
+        self.names = names
+        self.colors = colors
+        self._cache = {}
+        self._build()
+
+    @classmethod
+    def from_tree(cls, names, colors, metric, order, xs, ys, zs):
+        """Create an index from a previously built tree (see tree_arrays) without rebuilding.
+
+        names and colors are sequences indexed by palette position (colors as
+        (r, g, b) tuples); order and the coordinate sequences are used as-is,
+        so they can be views into a memory-mapped file.
+        """
+        index = cls.__new__(cls)
+        index._set_metric(metric)
+        index.names = names
+        index.colors = colors
+        index._cache = {}
+        index._order = order
+        index._x, index._y, index._z = xs, ys, zs
+        return index
+
+    def _set_metric(self, metric):
+        """Select the color space and distance function for metric."""
+        self.metric = metric
+        if metric == RGB_EUCLIDEAN:
+            self._convert = tuple
+            self._difference = None
+        else:
+            self._convert, self._difference = get_metric(metric)
+        self._scale = _EUCLIDEAN_SCALE.get(metric)
+
+    def tree_arrays(self):
+        """Return (order, xs, ys, zs): the tree layout from_tree() needs to skip the build."""
+        return self._order, self._x, self._y, self._z
+
+    def __len__(self):
+        """Return the number of indexed colors."""
+        return len(self.colors)
+
+    def _build(self):
+        """Reorder the points into implicit k-d tree order."""
+        count = len(self.colors)
+        order = list(range(count))
+        points = [self._convert(rgb_values) for rgb_values in self.colors]
+        axes = ([p[0] for p in points],
+                [p[1] for p in points],
+                [p[2] for p in points])
+
+        # Iterative build: sort each range on its axis and recurse on both halves
+        stack = [(0, count, 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            axis_values = axes[depth % 3]
+            order[lo:hi] = sorted(order[lo:hi], key=axis_values.__getitem__)
+            mid = (lo + hi) >> 1
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+        self._order = order
+        self._x = [axes[0][i] for i in order]
+        self._y = [axes[1][i] for i in order]
+        self._z = [axes[2][i] for i in order]
+
+    def nearest(self, rgb_values):
+        """Return (name, (r, g, b), distance) of the closest palette color."""
+        if not self.colors:
+            return None
+
+        r, g, b = rgb_values
+        key = (r << 16) | (g << 8) | b
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._query((r, g, b), 1)[0]
+
+        # Bounded cache so long animation sessions don't grow memory
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def nearest_k(self, rgb_values, k):
+        """Return the k closest palette colors as (name, (r, g, b), distance) tuples."""
+        if not self.colors or k <= 0:
+            return []
+
+        return self._query(tuple(rgb_values), k)
+
+    def _query(self, rgb_values, k):
+        """Return the k closest colors, re-ranking tree candidates if needed."""
+        point = self._convert(rgb_values)
+        if self._scale is not None:
+            # Tree distance is the metric distance
+            return [self._result(position, self._scale * math.sqrt(dist_sq))
+                    for dist_sq, position in self._search(point, k)]
+
+        # CIE94/CIEDE2000: exact search pruned by a lower bound on the metric
+        return [self._result(position, distance)
+                for distance, position in self._search_metric(point, k)]
+
+    def _result(self, position, distance):
+        """Build a (name, (r, g, b), distance) tuple for a tree position."""
+        color_id = self._order[position]
+        return (self.names[color_id], self.colors[color_id], distance)
+
+    def _search(self, query, k):
+        """Return up to k (squared distance, position) pairs sorted by distance."""
+        xs, ys, zs = self._x, self._y, self._z
+        axes = (xs, ys, zs)
+        qx, qy, qz = query
+        query_axes = (qx, qy, qz)
+
+        # Sorted list of the best k candidates found so far
+        best = []
+        worst = [math.inf]
+
+        def consider(position):
+            dx = xs[position] - qx
+            dy = ys[position] - qy
+            dz = zs[position] - qz
+            dist_sq = dx * dx + dy * dy + dz * dz
+            if dist_sq < worst[0]:
+                best.append((dist_sq, position))
+                best.sort()
+                if len(best) > k:
+                    best.pop()
+                if len(best) == k:
+                    worst[0] = best[-1][0]
+
+        def visit(lo, hi, depth):
+            if hi - lo <= LEAF_SIZE:
+                for position in range(lo, hi):
+                    consider(position)
+                return
+
+            mid = (lo + hi) >> 1
+            axis = depth % 3
+            diff = query_axes[axis] - axes[axis][mid]
+            consider(mid)
+
+            # Descend into the side containing the query first
+            if diff < 0:
+                visit(lo, mid, depth + 1)
+                if diff * diff < worst[0]:
+                    visit(mid + 1, hi, depth + 1)
+            else:
+                visit(mid + 1, hi, depth + 1)
+                if diff * diff < worst[0]:
+                    visit(lo, mid, depth + 1)
+
+        visit(0, len(xs), 0)
+        return best
+
+    def _metric_bounds(self, query):
+        """Return (wl, k, alpha, beta) of the metric lower bound for a CIELAB query.
+
+        Any color at lightness offset dl and (a, b) distance dab from the
+        query is at least sqrt((wl dl)^2 + (k dab / (alpha + beta dab))^2)
+        away; the second term grows with dab.
+        """
+        chroma = math.hypot(query[1], query[2])
+        if self.metric == CIE94:
+            # The query is the reference color, so SC is known and SH <= SC
+            return 1.0, 1.0, 1 + 0.045 * chroma, 0.0
+        # CIEDE2000: SC >= SH, and SC grows with the pair's mean chroma, which
+        # is at most the query's chroma plus dab / 2 (plus the a' rescaling)
+        return 1 / _SL_MAX, _RT_FACTOR, 1 + 0.045 * (chroma + _G_CHROMA_MAX), 0.0225
+
+    def _search_metric(self, query, k):
+        """Return up to k (metric distance, position) pairs sorted by distance, for CIE94/CIEDE2000."""
+        xs, ys, zs = self._x, self._y, self._z
+        axes = (xs, ys, zs)
+        qx, qy, qz = query
+        query_axes = (qx, qy, qz)
+        difference = self._difference
+        wl, k_ab, alpha, beta = self._metric_bounds(query)
+
+        best = []
+        worst = [math.inf]
+
+        def consider(position):
+            dl = (xs[position] - qx) * wl
+            da = ys[position] - qy
+            db = zs[position] - qz
+            dab = math.sqrt(da * da + db * db)
+            chroma_term = k_ab * dab / (alpha + beta * dab)
+            # Only colors the bound can't rule out are measured exactly
+            if dl * dl + chroma_term * chroma_term >= worst[0] * worst[0]:
+                return
+            distance = difference(query, (xs[position], ys[position], zs[position]))
+            if distance < worst[0]:
+                best.append((distance, position))
+                best.sort()
+                if len(best) > k:
+                    best.pop()
+                if len(best) == k:
+                    worst[0] = best[-1][0]
+
+        def beyond(axis, diff):
+            # Smallest possible metric distance on the far side of a split
+            diff = abs(diff)
+            if axis == 0:
+                return diff * wl
+            return k_ab * diff / (alpha + beta * diff)
+
+        def visit(lo, hi, depth):
+            if hi - lo <= LEAF_SIZE:
+                for position in range(lo, hi):
+                    consider(position)
+                return
+
+            mid = (lo + hi) >> 1
+            axis = depth % 3
+            diff = query_axes[axis] - axes[axis][mid]
+            consider(mid)
+
+            # Descend into the side containing the query first
+            if diff < 0:
+                visit(lo, mid, depth + 1)
+                if beyond(axis, diff) < worst[0]:
+                    visit(mid + 1, hi, depth + 1)
+            else:
+                visit(mid + 1, hi, depth + 1)
+                if beyond(axis, diff) < worst[0]:
+                    visit(lo, mid, depth + 1)
+
+        visit(0, len(xs), 0)
+        return best
+
+
+class _Column:
+    """Read-only sequence over a per-index accessor such as Palette.name."""
+
+    def __init__(self, getter, length):
+        """Wrap getter(index) as a sequence of the given length."""
+        self._getter = getter
+        self._length = length
+
+    def __len__(self):
+        """Return the number of items."""
+        return self._length
+
+    def __getitem__(self, index):
+        """Return the item at index."""
+        return self._getter(index)
+
+
+def index_for_palette(palette, metric=CIEDE2000):
+    """Return a nearest-color index for a color_palette.Palette.
+
+    Uses the tree stored with the palette (see color_palette_file) when it
+    was built for the same metric, otherwise builds a new one.
+    """
+    tree = getattr(palette, 'tree', None)
+    if tree is not None and tree.metric == metric:
+        count = len(palette)
+        return NearestColorIndex.from_tree(_Column(palette.name, count),
+                                           _Column(palette.rgb, count),
+                                           metric, tree.order, tree.xs, tree.ys, tree.zs)
+    return NearestColorIndex(palette, metric)
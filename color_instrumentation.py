@@ -0,0 +1,285 @@
+"""
+Color Instrumentation
+
+Optional performance instrumentation for the explorers: call counts and
+latency histograms for the hot handlers, plus event-loop lag (how late each
+root.after / after_idle callback actually ran compared to when it was due).
+
+The data can be shown in a small overlay window and dumped periodically as
+JSON lines or CSV. Nothing here is active unless an Instrumentation object is
+passed to an explorer (see the --instrument command-line options).
+
+StartupProfile times each phase of an explorer's startup up to its first
+paint (--startup-profile). Both explorers import this module before their
+window exists, so it only imports what every run needs.
+"""
+
+import math
+import sys
+import time
+from functools import wraps
+
+
+# Histogram resolution: buckets per doubling of latency
+BUCKETS_PER_OCTAVE = 4
+
+# Name under which event-loop lag is reported
+EVENT_LOOP_LAG = "event_loop_lag"
+
+# Percentiles included in snapshots and dumps
+PERCENTILES = (50, 90, 99)
+
+CSV_FIELDS = ("time", "name", "count", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms")
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with constant-time recording."""
+
+    def __init__(self):
+        """Create an empty histogram."""
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """Add one latency sample, in seconds."""
+        microseconds = max(seconds * 1e6, 1.0)
+        bucket = int(math.log2(microseconds) * BUCKETS_PER_OCTAVE)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        """Return an upper bound for the given percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        threshold = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= threshold:
+                upper = 2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE) / 1e6
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self):
+        """Return count, mean, percentiles and max in milliseconds."""
+        result = {
+            "count": self.count,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+        }
+        for percent in PERCENTILES:
+            result[f"p{percent}_ms"] = self.percentile(percent) * 1000
+        result["max_ms"] = self.max * 1000
+        return result
+
+
+class Instrumentation:
+    """Collect handler latencies and event-loop lag for an explorer window."""
+
+    def __init__(self, clock=time.perf_counter):
+        """Create an empty set of measurements."""
+        self.clock = clock
+        self.histograms = {}
+        self.started = clock()
+
+    def histogram(self, name):
+        """Return the histogram for name, creating it on first use."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        return histogram
+
+    def wrap(self, name, func):
+        """Return func wrapped so each call is counted and timed under name."""
+        histogram = self.histogram(name)
+        clock = self.clock
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+
+        return timed
+
+    def instrument(self, obj, method_names):
+        """Replace the named methods on obj (an instance) with timed versions.
+
+        Must run before the methods are handed to widgets or timers, since
+        those keep a reference to whatever method object they were given.
+        """
+        for name in method_names:
+            setattr(obj, name, self.wrap(name, getattr(obj, name)))
+
+    def watch_event_loop(self, root):
+        """Record how late every root.after / root.after_idle callback runs."""
+        histogram = self.histogram(EVENT_LOOP_LAG)
+        clock = self.clock
+        original_after = root.after
+        original_after_idle = root.after_idle
+
+        def delayed(due, func):
+            def run(*args):
+                histogram.record(max(0.0, clock() - due))
+                return func(*args)
+            return run
+
+        def after(ms, func=None, *args):
+            if func is None:
+                return original_after(ms)
+            return original_after(ms, delayed(clock() + ms / 1000, func), *args)
+
+        def after_idle(func, *args):
+            return original_after_idle(delayed(clock(), func), *args)
+
+        root.after = after
+        root.after_idle = after_idle
+
+    def snapshot(self):
+        """Return {name: summary} for everything measured so far."""
+        return {name: histogram.summary()
+                for name, histogram in sorted(self.histograms.items())}
+
+    def format_report(self):
+        """Return a fixed-width text table of the current measurements."""
+        lines = [f"{'name':<24}{'calls':>8}{'mean':>9}{'p50':>9}{'p99':>9}{'max':>9}  (ms)"]
+        for name, summary in self.snapshot().items():
+            lines.append(f"{name:<24}{summary['count']:>8}"
+                         f"{summary['mean_ms']:>9.2f}{summary['p50_ms']:>9.2f}"
+                         f"{summary['p99_ms']:>9.2f}{summary['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Append the current snapshot to path (CSV if it ends in .csv, else JSON lines)."""
+        timestamp = round(time.time(), 3)
+        snapshot = self.snapshot()
+        # Imported here so startup doesn't pay for them
+        import csv
+        import json
+
+        with open(path, 'a', newline='', encoding='utf-8') as stream:
+            if path.endswith('.csv'):
+                writer = csv.writer(stream)
+                if stream.tell() == 0:
+                    writer.writerow(CSV_FIELDS)
+                for name, summary in snapshot.items():
+                    writer.writerow([timestamp, name] + [
+                        round(summary[field], 4) if field.endswith('_ms') else summary[field]
+                        for field in CSV_FIELDS[2:]])
+            else:
+                stream.write(json.dumps({"time": timestamp, "metrics": snapshot}))
+                stream.write('\n')
+
+    def start_dumps(self, root, path, interval_ms=5000):
+        """Dump to path every interval_ms milliseconds through root's event loop."""
+        def tick():
+            try:
+                self.dump(path)
+            except OSError as e:
+                print(f"Could not write instrumentation dump: {e}", file=sys.stderr)
+                return
+            root.after(interval_ms, tick)
+
+        root.after(interval_ms, tick)
+
+
+class StartupProfile:
+    """Wall-clock time of each startup phase, up to the window's first paint."""
+
+    def __init__(self, start=None, clock=time.perf_counter):
+        """Start timing at start, a clock() reading.
+
+        By default the start is estimated as when the process began (now minus
+        the CPU time used so far; startup is CPU-bound), so the first phase
+        includes interpreter startup and the imports.
+        """
+        self.clock = clock
+        self.start = clock() - time.process_time() if start is None else start
+        self.phases = []        # (name, seconds) in order
+        self._last = self.start
+
+    def mark(self, name):
+        """End the current phase and record it as name."""
+        now = self.clock()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        """Return the time from the start to the last mark, in seconds."""
+        return self._last - self.start
+
+    def format_report(self):
+        """Return the phases as a fixed-width text table."""
+        lines = [f"{'phase':<16}{'ms':>9}{'total':>9}"]
+        elapsed = 0.0
+        for name, seconds in self.phases:
+            elapsed += seconds
+            lines.append(f"{name:<16}{seconds * 1000:>9.1f}{elapsed * 1000:>9.1f}")
+        return "\n".join(lines)
+
+
+def mark_startup(profile, name):
+    """Record a startup phase if a StartupProfile is being kept."""
+    if profile is not None:
+        profile.mark(name)
+
+
+class InstrumentationOverlay:
+    """Small always-on-top window showing live instrumentation numbers."""
+
+    def __init__(self, root, instrumentation, refresh_ms=500):
+        """Open the overlay window next to root."""
+        import tkinter as tk
+
+        self.root = root
+        self.instrumentation = instrumentation
+        self.refresh_ms = refresh_ms
+        self.window = tk.Toplevel(root)
+        self.window.title("Performance")
+        self.window.attributes('-topmost', True)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.label = tk.Label(self.window, font=('Courier', 9), justify='left',
+                              anchor='nw', padx=8, pady=8)
+        self.label.pack(fill='both', expand=True)
+        self.job = None
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the numbers and schedule the next refresh."""
+        self.label.config(text=self.instrumentation.format_report())
+        self.job = self.root.after(self.refresh_ms, self.refresh)
+
+    def close(self):
+        """Stop refreshing and close the window."""
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+        self.window.destroy()
+
+
+def add_arguments(parser):
+    """Add the --instrument command-line options to an argparse parser."""
+    parser.add_argument('--instrument', action='store_true',
+                        help="measure handler latency and event-loop lag and show an overlay "
+                             "(F12 toggles it)")
+    parser.add_argument('--instrument-dump', metavar='PATH',
+                        help="periodically append measurements to PATH "
+                             "(CSV if it ends in .csv, otherwise JSON lines)")
+    parser.add_argument('--instrument-interval', type=int, default=5000, metavar='MS',
+                        help="milliseconds between dumps (default: 5000)")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="print the time each startup phase took, up to the first paint, "
+                             "to stderr")
+
+
+def from_arguments(args):
+    """Return an Instrumentation if any --instrument option was given, else None."""
+    if args.instrument or args.instrument_dump:
+        return Instrumentation()
+    return None
@@ -0,0 +1,239 @@
+"""
+Color Palette
+
+A named-color palette that scales from the 39 common colors to vendor
+palettes with hundreds of thousands of entries.
+
+Colors are stored packed as 24-bit integers in an array, the data is only
+loaded the first time it is needed, and dropdown labels are formatted on
+demand with a bounded cache, so nothing proportional to the palette size
+happens until something actually asks for it.
+"""
+
+import csv
+import json
+import os
+from array import array
+from functools import lru_cache
+
+from color_core import format_dropdown_label, parse_color_string, rgb_to_hex
+
+
+# Formatted labels kept around for scrolling back and forth
+LABEL_CACHE_SIZE = 4096
+
+
+def pack_rgb(rgb_values):
+    """Pack an (r, g, b) tuple into a 24-bit integer."""
+    r, g, b = rgb_values
+    return (r << 16) | (g << 8) | b
+
+
+def unpack_rgb(packed):
+    """Unpack a 24-bit integer into an (r, g, b) tuple."""
+    return (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF)
+
+
+class Palette:
+    """An ordered list of named colors, loaded on first use."""
+
+    def __init__(self, loader, title="Palette"):
+        """Create a palette whose (name, (r, g, b)) pairs come from loader() when first needed."""
+        self.title = title
+        self._loader = loader
+        self._names = None
+        self._colors = None
+        self._positions = None
+        self.label = lru_cache(maxsize=LABEL_CACHE_SIZE)(self._format_label)
+        # Prebuilt nearest-color tree stored with the palette, if any (see color_palette_file)
+        self.tree = None
+
+    @classmethod
+    def from_dict(cls, colors, title="Palette"):
+        """Create a palette from a {name: (r, g, b)} dict, skipping None entries."""
+        return cls(lambda: ((name, rgb_values) for name, rgb_values in colors.items()
+                            if rgb_values is not None), title)
+
+    @classmethod
+    def from_pairs(cls, pairs, title="Palette"):
+        """Create a palette from an iterable of (name, (r, g, b)) pairs."""
+        pairs = list(pairs)
+        return cls(lambda: pairs, title)
+
+    @classmethod
+    def from_file(cls, path):
+        """Create a palette that reads path (JSON, CSV or GIMP .gpl) the first time it is used."""
+        title = os.path.splitext(os.path.basename(path))[0]
+        return cls(lambda: read_palette_file(path), title)
+
+    @classmethod
+    def from_tables(cls, names, colors, title="Palette"):
+        """Create a palette over existing sequences of names and packed 24-bit colors."""
+        palette = cls(None, title)
+        palette._names = names
+        palette._colors = colors
+        return palette
+
+    @property
+    def loaded(self):
+        """True once the palette data has been read."""
+        return self._colors is not None
+
+    def load(self):
+        """Read the palette data now (normally done on first access)."""
+        if self._colors is not None:
+            return
+        names = []
+        colors = array('I')
+        for name, rgb_values in self._loader():
+            names.append(name)
+            colors.append(pack_rgb(rgb_values))
+        self._names = names
+        self._colors = colors
+        self._loader = None
+
+    def __len__(self):
+        """Return the number of colors."""
+        self.load()
+        return len(self._colors)
+
+    def name(self, index):
+        """Return the name of the color at index."""
+        self.load()
+        return self._names[index]
+
+    def rgb(self, index):
+        """Return the (r, g, b) tuple of the color at index."""
+        self.load()
+        return unpack_rgb(self._colors[index])
+
+    def packed(self, index):
+        """Return the color at index as a packed 24-bit integer."""
+        self.load()
+        return self._colors[index]
+
+    def _format_label(self, index):
+        """Format the dropdown label for index (wrapped by the label cache)."""
+        return format_dropdown_label(self.name(index), self.rgb(index))
+
+    def index_of(self, name):
+        """Return the index of the first color called name, or None."""
+        if self._positions is None:
+            self.load()
+            positions = {}
+            for index, color_name in enumerate(self._names):
+                positions.setdefault(color_name, index)
+            self._positions = positions
+        return self._positions.get(name)
+
+    def get(self, name):
+        """Return the (r, g, b) tuple for name, or None if it isn't in the palette."""
+        index = self.index_of(name)
+        return None if index is None else self.rgb(index)
+
+    def items(self):
+        """Iterate over (name, (r, g, b)) pairs in palette order."""
+        self.load()
+        for name, packed in zip(self._names, self._colors):
+            yield name, unpack_rgb(packed)
+
+
+def read_json_palette(path):
+    """Yield (name, rgb) pairs from a JSON palette file.
+
+    Accepts {"name": "#RRGGBB", ...}, a list of objects with a "name" and
+    either a "hex" string or an "rgb" list, or W3C design tokens
+    ({"group": {"name": {"$value": "#RRGGBB"}}}, as color_export writes).
+    """
+    with open(path, encoding='utf-8') as stream:
+        data = json.load(stream)
+
+    if isinstance(data, dict):
+        entries = _design_tokens(data)
+    elif isinstance(data, list):
+        if not all(isinstance(entry, dict) for entry in data):
+            raise ValueError(f"{path}: a JSON palette list must contain only objects")
+        entries = ((entry.get("name", ""), entry.get("hex", entry.get("rgb")))
+                   for entry in data)
+    else:
+        raise ValueError(f"{path}: a JSON palette must be an object or a list of objects")
+
+    for name, value in entries:
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(str(channel) for channel in value)
+        rgb_values = parse_color_string(str(value)) if value is not None else None
+        if rgb_values is not None:
+            yield str(name), rgb_values
+
+
+def _design_tokens(data):
+    """Yield (name, value) pairs from a {name: color} dict, descending into token groups."""
+    for name, value in data.items():
+        if name.startswith('$'):
+            # Token properties such as "$type" and "$description"
+            continue
+        if isinstance(value, dict):
+            if "$value" in value:
+                yield name, value["$value"]
+            else:
+                yield from _design_tokens(value)
+        else:
+            yield name, value
+
+
+def read_gpl_palette(path):
+    """Yield (name, rgb) pairs from a GIMP .gpl palette file.
+
+    Color lines are 'R G B [name]'; the header, Name:/Columns: lines and
+    comments are skipped, and unnamed colors are named by their hex code.
+    """
+    with open(path, encoding='utf-8', errors='replace') as stream:
+        for line in stream:
+            fields = line.split(None, 3)
+            if len(fields) < 3 or not all(field.isdigit() for field in fields[:3]):
+                continue
+            rgb_values = tuple(int(field) for field in fields[:3])
+            if max(rgb_values) > 255:
+                continue
+            name = fields[3].strip() if len(fields) > 3 else ""
+            yield name or rgb_to_hex(rgb_values), rgb_values
+
+
+def read_csv_palette(path):
+    """Yield (name, rgb) pairs from CSV rows of 'name,color' or 'name,r,g,b'.
+
+    Rows whose color doesn't parse (such as a header row) are skipped.
+    """
+    with open(path, newline='', encoding='utf-8') as stream:
+        for row in csv.reader(stream):
+            if len(row) < 2:
+                continue
+            rgb_values = parse_color_string(",".join(row[1:4]))
+            if rgb_values is not None:
+                yield row[0].strip(), rgb_values
+
+
+# File extension -> reader yielding (name, rgb) pairs
+PALETTE_READERS = {
+    ".json": read_json_palette,
+    ".csv": read_csv_palette,
+    ".gpl": read_gpl_palette,
+}
+
+
+def read_palette_file(path):
+    """Yield (name, rgb) pairs from any supported palette file."""
+    extension = os.path.splitext(path)[1].lower()
+    reader = PALETTE_READERS.get(extension)
+    if reader is None:
+        raise ValueError(f"Unsupported palette file type: {extension or path!r}")
+    return reader(path)
+
+
+def open_palette(path):
+    """Open any supported palette file: binary palettes are memory-mapped, text ones read lazily."""
+    from color_palette_file import PALETTE_FILE_EXTENSION, open_palette_file
+
+    if os.path.splitext(path)[1].lower() == PALETTE_FILE_EXTENSION:
+        return open_palette_file(path)
+    return Palette.from_file(path)
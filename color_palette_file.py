@@ -0,0 +1,268 @@
+"""
+Color Palette File
+
+A compact binary palette format (.rgbpal) that opens in constant time.
+
+Files are memory-mapped read-only and their tables are used in place, so
+opening a million-color palette only parses the header, and processes that
+open the same file (such as --batch workers) share its pages through the
+operating system's cache instead of each building their own copy.
+
+Layout (integers little-endian, each section starting on an 8-byte boundary):
+
+    header        HEADER: magic, version, color count, tree metric and the
+                  offsets of the sections below (tree offset 0 = no tree)
+    colors        count x 3 bytes (R, G, B)
+    name offsets  (count + 1) x uint32, where name i is name_data[offsets[i]:offsets[i + 1]]
+    name data     UTF-8 names back to back
+    tree          optional nearest-color k-d tree for one metric: count x uint32
+                  point order, then (on the next boundary) the x, y and z
+                  coordinates as count x float64 each (see NearestColorIndex.tree_arrays)
+"""
+
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import accumulate
+
+from color_difference import CIEDE2000
+from color_index import NearestColorIndex
+from color_palette import Palette, open_palette
+
+
+PALETTE_FILE_EXTENSION = ".rgbpal"
+
+# The CR LF pair catches files mangled by text-mode transfers
+MAGIC = b"RGBPAL\r\n"
+VERSION = 1
+
+# magic, version, count, tree metric, colors / name offsets / name data / tree offsets
+HEADER = struct.Struct('<8sII16sQQQQ')
+
+# Section alignment in bytes
+ALIGNMENT = 8
+
+
+def _align(offset):
+    """Round offset up to the next section boundary."""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _table(buffer, offset, count, typecode):
+    """Return count little-endian typecode values at offset, without copying where possible."""
+    size = array(typecode).itemsize * count
+    view = memoryview(buffer)[offset:offset + size]
+    if sys.byteorder == 'little':
+        return view.cast(typecode)
+    table = array(typecode, bytes(view))
+    table.byteswap()
+    return table
+
+
+class PaletteTree:
+    """A nearest-color k-d tree stored in a palette file."""
+
+    def __init__(self, metric, order, xs, ys, zs):
+        """Hold the tree layout for one metric (see NearestColorIndex.from_tree)."""
+        self.metric = metric
+        self.order = order
+        self.xs = xs
+        self.ys = ys
+        self.zs = zs
+
+
+class _PackedColors:
+    """Sequence of packed 24-bit colors read from 3-byte records."""
+
+    def __init__(self, view, count):
+        """Wrap count RGB records in view."""
+        self._view = view
+        self._count = count
+
+    def __len__(self):
+        """Return the number of colors."""
+        return self._count
+
+    def __getitem__(self, index):
+        """Return color index as a packed integer."""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        start = index * 3
+        return int.from_bytes(self._view[start:start + 3], 'big')
+
+
+class _NameTable:
+    """Sequence of names decoded on access from an offset-indexed UTF-8 blob."""
+
+    def __init__(self, data, offsets, count):
+        """Wrap the name data and its count + 1 offsets."""
+        self._data = data
+        self._offsets = offsets
+        self._count = count
+
+    def __len__(self):
+        """Return the number of names."""
+        return self._count
+
+    def __getitem__(self, index):
+        """Return name index."""
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offsets = self._offsets
+        return str(self._data[offsets[index]:offsets[index + 1]], 'utf-8')
+
+
+def open_palette_file(path):
+    """Memory-map a binary palette and return it as a Palette (with .tree set if stored)."""
+    with open(path, 'rb') as stream:
+        if os.fstat(stream.fileno()).st_size < HEADER.size:
+            raise ValueError(f"Not a binary palette file: {path}")
+        # The mapping stays open for as long as the tables below reference it
+        mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (magic, version, count, metric, colors_offset, offsets_offset,
+     names_offset, tree_offset) = HEADER.unpack_from(mapping)
+    if magic != MAGIC:
+        raise ValueError(f"Not a binary palette file: {path}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported palette file version {version}: {path}")
+
+    offsets = _table(mapping, offsets_offset, count + 1, 'I')
+    # The coordinate tables follow the point order, each count x 8 bytes
+    coordinates = _align(tree_offset + 4 * count)
+    end = coordinates + 3 * 8 * count if tree_offset else names_offset + offsets[count]
+    if end > len(mapping) or colors_offset + 3 * count > offsets_offset:
+        raise ValueError(f"Truncated palette file: {path}")
+
+    view = memoryview(mapping)
+    colors = _PackedColors(view[colors_offset:colors_offset + 3 * count], count)
+    names = _NameTable(view[names_offset:names_offset + offsets[count]], offsets, count)
+    title = os.path.splitext(os.path.basename(path))[0]
+    palette = Palette.from_tables(names, colors, title)
+
+    if tree_offset:
+        palette.tree = PaletteTree(
+            metric.rstrip(b'\0').decode('ascii'),
+            _table(mapping, tree_offset, count, 'I'),
+            _table(mapping, coordinates, count, 'd'),
+            _table(mapping, coordinates + 8 * count, count, 'd'),
+            _table(mapping, coordinates + 16 * count, count, 'd'))
+    return palette
+
+
+def write_palette_file(path, pairs, metric=CIEDE2000):
+    """Write (name, (r, g, b)) pairs as a binary palette and return the color count.
+
+    A nearest-color tree for metric is stored with the colors unless metric
+    is None. The file is written next to path and then renamed over it, so
+    processes that have the old file mapped keep a consistent copy.
+    """
+    encoded = []
+    rgb_list = []
+    colors = bytearray()
+    for name, rgb_values in pairs:
+        rgb_values = tuple(rgb_values)
+        encoded.append(name.encode('utf-8'))
+        rgb_list.append(rgb_values)
+        colors += bytes(rgb_values)
+    count = len(encoded)
+
+    name_data = b"".join(encoded)
+    if len(name_data) > 0xFFFFFFFF:
+        raise ValueError("Palette names exceed 4 GiB")
+    offsets = array('I', [0])
+    offsets.extend(accumulate(len(name) for name in encoded))
+
+    sections = [colors, offsets, name_data]
+    if metric is not None:
+        names = [name.decode('utf-8') for name in encoded]
+        index = NearestColorIndex(zip(names, rgb_list), metric)
+        order, xs, ys, zs = index.tree_arrays()
+        sections += [array('I', order), array('d', xs), array('d', ys), array('d', zs)]
+    if sys.byteorder != 'little':
+        for section in sections:
+            if isinstance(section, array):
+                section.byteswap()
+
+    # Lay the sections out after the header
+    positions = []
+    position = HEADER.size
+    for section in sections:
+        position = _align(position)
+        positions.append(position)
+        position += len(memoryview(section).cast('B'))
+
+    tree_offset = positions[3] if metric is not None else 0
+    header = HEADER.pack(MAGIC, VERSION, count, (metric or "").encode('ascii'),
+                         positions[0], positions[1], positions[2], tree_offset)
+
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, 'wb') as stream:
+            stream.write(header)
+            for offset, section in zip(positions, sections):
+                stream.write(b'\0' * (offset - stream.tell()))
+                stream.write(section)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return count
+
+
+def stream_palette_file(path, pairs):
+    """Write (name, (r, g, b)) pairs as a binary palette without a tree, in constant memory.
+
+    Each section is spooled to a temporary file as the pairs arrive and the
+    sections are then copied into place, so pairs can be a generator over a
+    palette of any size. Returns the color count.
+    """
+    count = 0
+    name_size = 0
+    with tempfile.TemporaryFile() as colors, tempfile.TemporaryFile() as offsets, \
+            tempfile.TemporaryFile() as names:
+        offsets.write(struct.pack('<I', 0))
+        for name, rgb_values in pairs:
+            encoded = name.encode('utf-8')
+            name_size += len(encoded)
+            if name_size > 0xFFFFFFFF:
+                raise ValueError("Palette names exceed 4 GiB")
+            colors.write(bytes(rgb_values))
+            offsets.write(struct.pack('<I', name_size))
+            names.write(encoded)
+            count += 1
+
+        sections = (colors, offsets, names)
+        positions = []
+        position = HEADER.size
+        for section in sections:
+            position = _align(position)
+            positions.append(position)
+            position += section.tell()
+        header = HEADER.pack(MAGIC, VERSION, count, b"", positions[0], positions[1],
+                             positions[2], 0)
+
+        temporary = f"{path}.tmp"
+        try:
+            with open(temporary, 'wb') as stream:
+                stream.write(header)
+                for offset, section in zip(positions, sections):
+                    stream.write(b'\0' * (offset - stream.tell()))
+                    section.seek(0)
+                    shutil.copyfileobj(section, stream)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+    return count
+
+
+def convert_palette(source, destination, metric=CIEDE2000):
+    """Convert a JSON, CSV, GIMP .gpl (or binary) palette to a binary palette file."""
+    return write_palette_file(destination, open_palette(source).items(), metric)
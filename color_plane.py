@@ -0,0 +1,115 @@
+"""
+Color Plane
+
+Pixel data for 256x256 color-picker planes: two RGB channels against each
+other at a fixed value of the third (e.g. red x green at the current blue), or
+saturation x value at a fixed hue.
+
+Planes are generated as binary PPM data that a Tk PhotoImage loads in one
+call. Every pixel row is produced by bytes operations that run at C speed
+(slice assignment and bytes.translate through multiplication tables), so a
+new plane takes about a millisecond, and recently used planes are cached so
+animating the fixed channel back and forth only reuses them.
+"""
+
+import colorsys
+from functools import lru_cache
+
+
+# Width and height of a plane in pixels (one pixel per channel value)
+PLANE_SIZE = 256
+
+# Planes kept per mode (about 200 KB each)
+PLANE_CACHE_SIZE = 64
+
+# Mode -> (x channel, y channel, fixed channel); channels are 0 red, 1 green, 2 blue
+RGB_PLANES = {
+    "Red × Green": (0, 1, 2),
+    "Red × Blue": (0, 2, 1),
+    "Green × Blue": (1, 2, 0),
+}
+
+# Saturation (x) against value (y) at a fixed hue
+HUE_PLANE = "Saturation × Value"
+
+PLANE_MODES = tuple(RGB_PLANES) + (HUE_PLANE,)
+
+_PPM_HEADER = f"P6 {PLANE_SIZE} {PLANE_SIZE} 255\n".encode('ascii')
+_PIXELS = PLANE_SIZE * PLANE_SIZE
+
+# Channel value of every pixel when it varies along x (left to right) or y (bottom to top)
+_X_RAMP = bytes(range(PLANE_SIZE)) * PLANE_SIZE
+_Y_RAMP = b"".join(bytes([value]) * PLANE_SIZE for value in range(PLANE_SIZE - 1, -1, -1))
+
+# _multiply_tables()[v][m] == round(v * m / 255), built on first use
+_MULTIPLY = []
+
+
+def _multiply_tables():
+    """Return the 256 translate tables used to scale a row of bytes by a value."""
+    if not _MULTIPLY:
+        _MULTIPLY.extend(bytes((value * factor + 127) // 255 for factor in range(256))
+                         for value in range(256))
+    return _MULTIPLY
+
+
+def _clamp(value):
+    """Clamp a pixel coordinate to the plane."""
+    return max(0, min(PLANE_SIZE - 1, int(value)))
+
+
+@lru_cache(maxsize=PLANE_CACHE_SIZE * len(PLANE_MODES))
+def plane_ppm(mode, fixed):
+    """Return binary PPM data for mode at fixed (the third channel's value, or a hue in degrees)."""
+    pixels = bytearray(3 * _PIXELS)
+    if mode in RGB_PLANES:
+        x_channel, y_channel, fixed_channel = RGB_PLANES[mode]
+        pixels[x_channel::3] = _X_RAMP
+        pixels[y_channel::3] = _Y_RAMP
+        pixels[fixed_channel::3] = bytes([fixed]) * _PIXELS
+    elif mode == HUE_PLANE:
+        # channel = value * (1 - saturation * (1 - pure hue channel)); each row
+        # is one translate of a per-hue saturation ramp by that row's value
+        multiply = _multiply_tables()
+        hue_rgb = colorsys.hsv_to_rgb(fixed / 360, 1.0, 1.0)
+        for channel, pure in enumerate(hue_rgb):
+            ramp = bytes(round(255 - saturation * (1 - pure)) for saturation in range(PLANE_SIZE))
+            pixels[channel::3] = b"".join(ramp.translate(multiply[value])
+                                          for value in range(PLANE_SIZE - 1, -1, -1))
+    else:
+        raise ValueError(f"Unknown color plane: {mode!r}")
+    return _PPM_HEADER + bytes(pixels)
+
+
+def fixed_value(mode, rgb_values):
+    """Return the plane's fixed coordinate for a color, or None if it is undefined (gray hue)."""
+    if mode in RGB_PLANES:
+        return rgb_values[RGB_PLANES[mode][2]]
+    hue, saturation, value = colorsys.rgb_to_hsv(*(channel / 255 for channel in rgb_values))
+    if saturation == 0 or value == 0:
+        return None
+    return round(hue * 360) % 360
+
+
+def plane_position(mode, rgb_values):
+    """Return the (x, y) pixel where a color sits on the plane."""
+    if mode in RGB_PLANES:
+        x_channel, y_channel, _ = RGB_PLANES[mode]
+        return rgb_values[x_channel], PLANE_SIZE - 1 - rgb_values[y_channel]
+    _, saturation, value = colorsys.rgb_to_hsv(*(channel / 255 for channel in rgb_values))
+    return round(saturation * 255), PLANE_SIZE - 1 - round(value * 255)
+
+
+def plane_color(mode, fixed, x, y):
+    """Return the (r, g, b) color at pixel (x, y) of the plane (clamped to its edges)."""
+    x = _clamp(x)
+    level = PLANE_SIZE - 1 - _clamp(y)
+    if mode in RGB_PLANES:
+        x_channel, y_channel, fixed_channel = RGB_PLANES[mode]
+        rgb_values = [0, 0, 0]
+        rgb_values[x_channel] = x
+        rgb_values[y_channel] = level
+        rgb_values[fixed_channel] = fixed
+        return tuple(rgb_values)
+    return tuple(round(channel * 255)
+                 for channel in colorsys.hsv_to_rgb(fixed / 360, x / 255, level / 255))
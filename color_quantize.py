@@ -0,0 +1,216 @@
+"""
+Color Quantize
+
+Dominant-palette extraction: reduces an image to K representative colors
+with (variance-based) median-cut quantization.
+
+Images are split into tiles of rows that are counted independently (in a
+process pool when workers > 1) at 5 bits per channel, so a tile's counts have
+at most 32,768 entries however large it is. The per-tile counts are merged and
+median cut runs on the merged counts, which takes milliseconds. Workers read
+their tiles straight from binary PPM/PGM files, so only the small counts
+travel between processes.
+"""
+
+import heapq
+import os
+from collections import Counter
+
+from color_image import (PNM_EXTENSIONS, STRIP_PIXELS, _iter_binary_strips, iter_pnm_strips,
+                         pack_pixels, read_pnm_header)
+
+
+# Colors extracted per image by default
+DEFAULT_COLORS = 16
+
+# Pixels per tile handed to a worker
+TILE_PIXELS = 1 << 21
+
+# Low bits dropped from each channel before counting
+QUANTIZE_SHIFT = 3
+
+# Keeps the top 5 bits of each channel
+_QUANTIZE = bytes(value >> QUANTIZE_SHIFT << QUANTIZE_SHIFT for value in range(256))
+
+# Offset from a quantized value to the middle of its bucket
+_BUCKET_MIDDLE = (1 << QUANTIZE_SHIFT) // 2
+
+
+def quantized_counts(rgb):
+    """Count a strip of RGB bytes by color at 5 bits per channel; returns a Counter of packed colors."""
+    return Counter(pack_pixels(rgb.translate(_QUANTIZE)))
+
+
+def _count_strips(strips):
+    """Merge the quantized counts of several RGB strips."""
+    counts = Counter()
+    for strip in strips:
+        counts.update(quantized_counts(strip))
+    return counts
+
+
+def count_pnm_tile(path, offset, magic, width, rows, maxval):
+    """Count one tile of a binary PPM/PGM file: rows rows starting at byte offset."""
+    channels = 3 if magic == "P6" else 1
+    with open(path, 'rb') as stream:
+        stream.seek(offset)
+        return _count_strips(_iter_binary_strips(stream, channels, width, rows, maxval,
+                                                 STRIP_PIXELS))
+
+
+def pnm_tiles(path, tile_pixels=TILE_PIXELS):
+    """Return count_pnm_tile() arguments covering a binary PPM/PGM file, or None for plain ones."""
+    with open(path, 'rb') as stream:
+        magic, width, height, maxval = read_pnm_header(stream)
+        start = stream.tell()
+    if magic not in ("P5", "P6"):
+        return None
+    row_size = width * (3 if magic == "P6" else 1) * (1 if maxval < 256 else 2)
+    rows = max(1, tile_pixels // width)
+    return [(path, start + top * row_size, magic, width, min(rows, height - top), maxval)
+            for top in range(0, height, rows)]
+
+
+def _box_entry(box):
+    """Return a heap entry for box: (-squared error, tiebreak, box, widest-variance channel)."""
+    population = 0
+    sums = [0, 0, 0]
+    squares = [0, 0, 0]
+    for point in box:
+        weight = point[3]
+        population += weight
+        for axis in range(3):
+            sums[axis] += point[axis] * weight
+            squares[axis] += point[axis] * point[axis] * weight
+    errors = [squares[axis] - sums[axis] * sums[axis] / population for axis in range(3)]
+    axis = max(range(3), key=errors.__getitem__)
+    # heapq is a min-heap: the box with the largest error comes out first
+    return (-sum(errors), id(box), box, axis)
+
+
+def _best_split(box, axis):
+    """Return the split index of a box (sorted on axis) that leaves the least squared error."""
+    total_weight = sum(point[3] for point in box)
+    total_sum = sum(point[axis] * point[3] for point in box)
+    best, best_score = 1, -1.0
+    weight = 0
+    running = 0
+    for index in range(len(box) - 1):
+        point = box[index]
+        weight += point[3]
+        running += point[axis] * point[3]
+        if box[index + 1][axis] == point[axis]:
+            # Never separate equal values
+            continue
+        rest = total_sum - running
+        # Minimizing the error means maximizing the weighted spread of the two means
+        score = running * running / weight + rest * rest / (total_weight - weight)
+        if score > best_score:
+            best, best_score = index + 1, score
+    return best
+
+
+def median_cut(counts, colors=DEFAULT_COLORS):
+    """Reduce {packed color: pixels} to at most colors (rgb, pixels) pairs, most common first.
+
+    This is the variance-based form of median cut: the box with the largest
+    squared error is split first, along its highest-variance channel, at the
+    point that leaves the least error (rather than at the median, which would
+    cut clusters of similar colors in half).
+    """
+    points = [((packed >> 16) & 0xFF, (packed >> 8) & 0xFF, packed & 0xFF, count)
+              for packed, count in counts.items() if count]
+    if not points:
+        return []
+
+    heap = [_box_entry(points)]
+    done = []
+    while heap and len(heap) + len(done) < colors:
+        error, _, box, axis = heapq.heappop(heap)
+        if error == 0 or len(box) < 2:
+            # Every pixel in the box has the same color
+            done.append(box)
+            continue
+        box.sort(key=lambda point: point[axis])
+        split = _best_split(box, axis)
+        heapq.heappush(heap, _box_entry(box[:split]))
+        heapq.heappush(heap, _box_entry(box[split:]))
+
+    swatches = []
+    for box in done + [item[2] for item in heap]:
+        population = sum(point[3] for point in box)
+        # Weighted mean of the bucket middles
+        rgb_values = tuple(min(255, round(sum((point[axis] + _BUCKET_MIDDLE) * point[3]
+                                              for point in box) / population))
+                           for axis in range(3))
+        swatches.append((rgb_values, population))
+    swatches.sort(key=lambda swatch: -swatch[1])
+    return swatches
+
+
+def quantize_histogram(histogram):
+    """Fold a color_image.ColorHistogram into 5-bit-per-channel counts."""
+    counts = Counter()
+    mask = (0xFF >> QUANTIZE_SHIFT << QUANTIZE_SHIFT) * 0x010101
+    histogram_counts = histogram.counts
+    for color in histogram.colors:
+        counts[color & mask] += histogram_counts[color]
+    return counts
+
+
+class _ImmediateResult:
+    """Stand-in for an AsyncResult whose value is already known."""
+
+    def __init__(self, value):
+        """Hold value."""
+        self.value = value
+
+    def get(self):
+        """Return the value."""
+        return self.value
+
+
+def extract_palettes(paths, colors=DEFAULT_COLORS, workers=0):
+    """Yield (path, [(rgb, pixels), ...]) for each PPM/PGM image, in order.
+
+    With workers > 1 the tiles of all images are counted in one process pool.
+    """
+    for path in paths:
+        if os.path.splitext(path)[1].lower() not in PNM_EXTENSIONS:
+            raise ValueError(f"Unsupported image type (PPM/PGM only): {path}")
+
+    if workers <= 1:
+        for path in paths:
+            tiles = pnm_tiles(path)
+            if tiles is None:
+                counts = _count_strips(iter_pnm_strips(path)[2])
+            else:
+                counts = Counter()
+                for tile in tiles:
+                    counts.update(count_pnm_tile(*tile))
+            yield path, median_cut(counts, colors)
+        return
+
+    import multiprocessing
+
+    with multiprocessing.Pool(workers) as pool:
+        # Queue every tile up front so workers never wait between images
+        pending = []
+        for path in paths:
+            tiles = pnm_tiles(path)
+            if tiles is None:
+                # Plain (text) files can't be split by offset; they are small, count them here
+                pending.append([_ImmediateResult(_count_strips(iter_pnm_strips(path)[2]))])
+            else:
+                pending.append([pool.apply_async(count_pnm_tile, tile) for tile in tiles])
+        for path, results in zip(paths, pending):
+            counts = Counter()
+            for result in results:
+                counts.update(result.get())
+            yield path, median_cut(counts, colors)
+
+
+def palette_pairs(title, swatches):
+    """Name extracted swatches '<title> 1', '<title> 2', ... as (name, rgb) pairs."""
+    return [(f"{title} {number}", rgb_values)
+            for number, (rgb_values, _) in enumerate(swatches, 1)]
@@ -0,0 +1,168 @@
+"""
+Color Render Pipeline
+
+Helpers that keep the explorers' repaint work proportional to what actually
+changed on screen:
+
+- FrameRenderer coalesces bursts of render requests (slider drags, animation
+  ticks) into at most one repaint per display frame using after_idle.
+- WidgetState remembers the last value pushed to each widget so unchanged
+  widgets are skipped instead of being reconfigured through Tcl.
+- GradientTrack paints a slider's channel gradient into a PhotoImage with a
+  single bulk put of cached row strings.
+
+None of these import tkinter; they only need an object with after,
+after_idle and after_cancel (the Tk root), or an image with put/configure.
+"""
+
+import time
+from functools import lru_cache
+
+
+# Target repaint interval (about 60 frames per second)
+FRAME_INTERVAL_MS = 16
+
+# Sentinel for "never pushed"
+_UNSET = object()
+
+# Default size of a gradient track image in pixels (the width follows the slider)
+TRACK_WIDTH = 256
+TRACK_HEIGHT = 6
+
+# Gradient images kept per track, so dragging back and forth reuses them
+TRACK_CACHE_SIZE = 256
+
+# Two-digit hex for every channel value
+_HEX_BYTES = [f"{value:02x}" for value in range(256)]
+
+
+class FrameRenderer:
+    """Run a render callback at most once per display frame, on request."""
+
+    def __init__(self, root, render, frame_interval_ms=FRAME_INTERVAL_MS,
+                 clock=time.monotonic):
+        """Create a renderer that calls render() through root's event loop."""
+        self.root = root
+        self.render = render
+        self.clock = clock
+        self.frame_interval = frame_interval_ms / 1000
+        self._job = None
+        self._last_render = None
+
+    @property
+    def pending(self):
+        """True if a repaint has been requested but not yet run."""
+        return self._job is not None
+
+    def request(self):
+        """Ask for a repaint; repeated requests before it runs are merged."""
+        if self._job is None:
+            self._job = self.root.after_idle(self._run)
+
+    def flush(self):
+        """Repaint immediately, dropping any scheduled repaint."""
+        self.cancel()
+        self._render()
+
+    def cancel(self):
+        """Drop a scheduled repaint, if any."""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _run(self):
+        """Repaint now, or wait for the rest of the current frame."""
+        self._job = None
+        if self._last_render is not None:
+            wait = self._last_render + self.frame_interval - self.clock()
+            if wait > 0:
+                # Rendered too recently; repaint once at the next frame boundary
+                self._job = self.root.after(max(1, int(wait * 1000)), self._run)
+                return
+        self._render()
+
+    def _render(self):
+        """Call the render callback and remember when it ran."""
+        self._last_render = self.clock()
+        self.render()
+
+
+class WidgetState:
+    """Track the last value pushed to each widget field."""
+
+    def __init__(self):
+        """Start with every field marked as never pushed."""
+        self._values = {}
+
+    def changed(self, field, value):
+        """Record value for field and return True if it differs from the last one."""
+        if self._values.get(field, _UNSET) == value:
+            return False
+        self._values[field] = value
+        return True
+
+    def mark(self, field, value):
+        """Record that field already shows value (e.g. the user typed it)."""
+        self._values[field] = value
+
+    def invalidate(self, field=None):
+        """Forget one field (or all fields) so the next render pushes it again."""
+        if field is None:
+            self._values.clear()
+        else:
+            self._values.pop(field, None)
+
+
+class GradientTrack:
+    """Paint one RGB channel's gradient into an image, with the other two channels fixed.
+
+    Column x shows the color the slider gives at that position. The pixel data
+    for the whole image is built from precomputed hex columns with a single
+    join per row and written with one put() call, and the data for recently
+    shown (other channel) pairs is cached.
+    """
+
+    def __init__(self, image, channel, width=TRACK_WIDTH, height=TRACK_HEIGHT):
+        """Create a track drawing channel (0 red, 1 green, 2 blue) into image."""
+        self.image = image
+        self.channel = channel
+        self.height = height
+        self.pixel_data = lru_cache(maxsize=TRACK_CACHE_SIZE)(self._format_pixel_data)
+        self.width = None
+        self.resize(width)
+
+    def resize(self, width):
+        """Change the track width in pixels; returns True if it changed."""
+        width = max(2, int(width))
+        if width == self.width:
+            return False
+        self.width = width
+        # Column x shows the channel value at that slider position
+        self._columns = [_HEX_BYTES[x * 255 // (width - 1)] for x in range(width)]
+        self.pixel_data.cache_clear()
+        self.image.configure(width=width, height=self.height)
+        return True
+
+    def others(self, r, g, b):
+        """Return the two channel values the gradient depends on."""
+        if self.channel == 0:
+            return g, b
+        if self.channel == 1:
+            return r, b
+        return r, g
+
+    def paint(self, r, g, b):
+        """Draw the gradient for the current color."""
+        self.image.put(self.pixel_data(*self.others(r, g, b)), to=(0, 0))
+
+    def _format_pixel_data(self, first, second):
+        """Build put() data for the image (wrapped by the pixel data cache)."""
+        # Every pixel is "#" + the channels in order; the varying one comes from the columns
+        if self.channel == 0:
+            prefix, suffix = "#", _HEX_BYTES[first] + _HEX_BYTES[second]
+        elif self.channel == 1:
+            prefix, suffix = "#" + _HEX_BYTES[first], _HEX_BYTES[second]
+        else:
+            prefix, suffix = "#" + _HEX_BYTES[first] + _HEX_BYTES[second], ""
+        row = "{" + prefix + (suffix + " " + prefix).join(self._columns) + suffix + "}"
+        return " ".join([row] * self.height)
@@ -0,0 +1,368 @@
+"""
+Color Search
+
+Incremental type-ahead and fuzzy search over palette color names and hex
+codes, fast enough to run on every keystroke against palettes with hundreds
+of thousands of entries.
+
+Results are ranked: name prefix (exact matches first), hex code, word
+prefix, substring, fuzzy; shorter names come first within a tier. The name
+indexes are split into one bucket per name length, built the first time a
+palette is searched:
+
+- the bucket's lower-cased names in sorted order, which answers "starts
+  with" like a flattened trie with one bisect per bucket. Walking the
+  buckets from the shortest names up yields prefix matches already ranked,
+  so a keystroke costs a few dozen bisects however many names match,
+- the bucket's names joined into one string in palette order, scanned at C
+  speed for word and substring matches. Every line has the same length, so
+  a match offset maps straight back to its name, and the scan stops as soon
+  as enough matches are found,
+- the palette's packed colors in sorted order, so a hex prefix such as
+  "#ff8" is a range lookup.
+
+Each tier only produces as many matches as are still needed. When a tier
+ran to completion and a keystroke only extends the query, the next search
+filters its previous matches instead of looking again.
+
+Fuzzy matching (for typos and transpositions) only runs when nothing matched
+as typed. It uses a trigram index, built in one pass the first time it is
+needed: for each 3-character substring, the names containing it, as
+positions in rank order (shortest names first). A name sharing at least t
+of the query's m trigrams must appear in one of the m - t + 1 rarest posting
+lists, so matches are found by merging just those lists in rank order, for
+t from m down, and stop as soon as enough are found.
+"""
+
+import heapq
+import re
+import time
+from array import array
+from bisect import bisect_left
+
+from color_core import HEX_DIGITS
+
+
+# Length of the substrings in the n-gram index
+NGRAM = 3
+
+# Results returned when no limit is given
+DEFAULT_LIMIT = 50
+
+# Share of a query's trigrams a name needs to count as a fuzzy match
+FUZZY_MIN_SHARE = 0.5
+
+# Seconds between keystrokes after which type-ahead starts a new query
+TYPE_AHEAD_TIMEOUT = 1.0
+
+# Tiers whose matches can be narrowed when the query is extended
+_PREFIX = "prefix"
+_WORD = "word"
+_SUBSTRING = "substring"
+
+
+def _ngrams(text):
+    """Return the set of NGRAM-character substrings of text."""
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _word_start(text):
+    """Return a regex matching text at the start of a word."""
+    # The literal comes first so the regex engine can skip ahead to it; the
+    # lookbehind then rejects matches preceded by a letter or digit
+    escaped = re.escape(text)
+    return re.compile(f'{escaped}(?<![0-9a-z]{escaped})')
+
+
+def _fuzzy_needed(grams):
+    """Return how many of a query's trigrams a fuzzy match must share."""
+    return max(2, int(len(grams) * FUZZY_MIN_SHARE + 0.5))
+
+
+class _Bucket:
+    """The names of one length: sorted for prefix lookups, joined for scans."""
+
+    def __init__(self, length, ids, names):
+        """Index the names (all length characters long) at palette indices ids."""
+        self.length = length
+        prefix_order = sorted(range(len(ids)), key=[names[index] for index in ids].__getitem__)
+        self.sorted_names = [names[ids[position]] for position in prefix_order]
+        self.sorted_ids = array('I', (ids[position] for position in prefix_order))
+        # Newline-separated, so line i starts at i * (length + 1)
+        self.haystack = "\n".join(names[index] for index in ids)
+        self.ids = array('I', ids)
+
+    def prefix_matches(self, text):
+        """Return the indices of names starting with text, alphabetically."""
+        names = self.sorted_names
+        start = bisect_left(names, text)
+        stop = bisect_left(names, text + '\uffff', start)
+        return self.sorted_ids[start:stop]
+
+    def scan(self, pattern):
+        """Yield the indices of names matching a compiled regex, in palette order."""
+        ids = self.ids
+        stride = self.length + 1
+        last = -1
+        for match in pattern.finditer(self.haystack):
+            line = match.start() // stride
+            # A name can match more than once; matches come in order
+            if line != last:
+                last = line
+                yield ids[line]
+
+
+class ColorSearch:
+    """Ranked name and hex-code search over a palette."""
+
+    def __init__(self, palette):
+        """Create a search for palette (a color_palette.Palette); indexes are built on first use."""
+        self.palette = palette
+        self._names = None
+        self._grams = None
+        # tier -> (query, matches in rank order, whether they are all of them)
+        self._previous = {}
+        # (query, its trigrams, trigrams needed, every fuzzy candidate) of the last fuzzy search
+        self._previous_fuzzy = None
+
+    @property
+    def built(self):
+        """True once the indexes have been built."""
+        return self._names is not None
+
+    def build(self):
+        """Build the name and hex indexes now (normally done on the first search)."""
+        if self._names is not None:
+            return
+        palette = self.palette
+        count = len(palette)
+        names = [palette.name(index).lower() for index in range(count)]
+        colors = array('I', (palette.packed(index) for index in range(count)))
+
+        by_length = {}
+        for index, name in enumerate(names):
+            by_length.setdefault(len(name), []).append(index)
+        self._buckets = [_Bucket(length, by_length[length], names)
+                         for length in sorted(by_length)]
+        self._lengths = array('I', (len(name) for name in names))
+        # Palette indices in rank order: shortest names first, then palette order
+        self._rank_ids = array('I')
+        for bucket in self._buckets:
+            self._rank_ids.extend(bucket.ids)
+
+        hex_order = sorted(range(count), key=colors.__getitem__)
+        self._hex_ids = array('I', hex_order)
+        self._hex_values = array('I', (colors[index] for index in hex_order))
+        self._names = names
+
+    def build_grams(self):
+        """Build the trigram index for fuzzy matching now (normally done on first need)."""
+        if self._grams is not None:
+            return
+        self.build()
+        names = self._names
+        postings = {}
+        # Filled in rank order, so every posting list is sorted by rank
+        for position, index in enumerate(self._rank_ids):
+            for gram in _ngrams(names[index]):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = posting = []
+                posting.append(position)
+        self._grams = {gram: array('I', posting) for gram, posting in postings.items()}
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Return up to limit palette indices matching query, best first (limit=None for all)."""
+        self.build()
+        text = query.strip().lower()
+        if not text:
+            return []
+
+        tiers = (
+            (_PREFIX, self._prefix_matches),
+            (None, lambda text: self._hex_matches(text, explicit=True)),
+            (_WORD, self._word_matches),
+            (_SUBSTRING, self._substring_matches),
+            (None, lambda text: self._hex_matches(text, explicit=False)),
+        )
+
+        results = []
+        seen = set()
+        for tier, matches in tiers:
+            wanted = None if limit is None else limit - len(results)
+            if wanted == 0:
+                return results
+            chosen = self._take(tier, text, matches, wanted, seen)
+            results.extend(chosen)
+            seen.update(chosen)
+
+        if not results:
+            # Nothing matched as typed: fall back to near misses (typos, transpositions)
+            results = self._fuzzy_matches(text, limit)
+        return results
+
+    def _take(self, tier, text, matches, wanted, seen):
+        """Return up to wanted of a tier's matches that aren't in seen, in rank order."""
+        previous = self._previous.get(tier)
+        if previous is not None and previous[2] and text.startswith(previous[0]):
+            # The query was extended: a tier's matches only ever shrink, and
+            # their rank doesn't depend on the query, so filter the last ones
+            source = self._narrow(tier, text, previous[1])
+        else:
+            source = matches(text)
+            if source is None:
+                # The tier doesn't apply to this query
+                return []
+
+        found = []
+        chosen = []
+        complete = True
+        for index in source:
+            found.append(index)
+            if index in seen:
+                continue
+            chosen.append(index)
+            if wanted is not None and len(chosen) == wanted:
+                complete = False
+                break
+        if tier is not None:
+            self._previous[tier] = (text, found, complete)
+        return chosen
+
+    def _narrow(self, tier, text, matches):
+        """Return the matches of a shorter query that still match text."""
+        names = self._names
+        if tier == _PREFIX:
+            return [index for index in matches if names[index].startswith(text)]
+        if tier == _WORD:
+            search = _word_start(text).search
+            return [index for index in matches if search(names[index])]
+        return [index for index in matches if text in names[index]]
+
+    def _prefix_matches(self, text):
+        """Yield indices of names starting with text, shortest (then alphabetical) first."""
+        for bucket in self._buckets:
+            if bucket.length >= len(text):
+                yield from bucket.prefix_matches(text)
+
+    def _scan(self, pattern, text):
+        """Yield indices of names matching pattern, shortest (then in palette order) first."""
+        for bucket in self._buckets:
+            if bucket.length >= len(text):
+                yield from bucket.scan(pattern)
+
+    def _word_matches(self, text):
+        """Return an iterator over indices of names with a word starting with text."""
+        return self._scan(_word_start(text), text)
+
+    def _substring_matches(self, text):
+        """Return an iterator over indices of names containing text anywhere, or None."""
+        if len(text) < NGRAM:
+            # Too short to be useful mid-word; word starts already matched
+            return None
+        return self._scan(re.compile(re.escape(text)), text)
+
+    def _hex_matches(self, text, explicit):
+        """Return indices of colors whose hex code starts with text.
+
+        With explicit=True only queries written as hex ('#...', '0x...') or
+        full six-digit codes match; otherwise bare hex digits such as 'fa'.
+        """
+        digits = text
+        for prefix in ('#', '0x'):
+            if text.startswith(prefix):
+                digits = text[len(prefix):]
+        if not 0 < len(digits) <= 6 or not HEX_DIGITS.issuperset(digits):
+            return ()
+        if explicit != (digits != text or len(digits) == 6):
+            return ()
+        # A hex prefix covers a contiguous range of packed values
+        shift = 4 * (6 - len(digits))
+        low = int(digits, 16) << shift
+        high = (int(digits, 16) + 1) << shift
+        values = self._hex_values
+        start = bisect_left(values, low)
+        stop = bisect_left(values, high, start)
+        return self._hex_ids[start:stop]
+
+    def _shared(self, grams, position):
+        """Return how many of grams the name at a rank position contains."""
+        name = self._names[self._rank_ids[position]]
+        return sum(gram in name for gram in grams)
+
+    def _fuzzy_matches(self, text, limit):
+        """Return indices sharing most of text's trigrams, best first."""
+        grams = _ngrams(text)
+        if len(grams) < 2:
+            return []
+        self.build_grams()
+        needed = _fuzzy_needed(grams)
+        ranks = self._rank_ids
+
+        previous = self._previous_fuzzy
+        if (previous is not None and text.startswith(previous[0])
+                and needed - len(grams - previous[1]) >= previous[2]):
+            # Extended query: a match shares at least needed - (new trigrams) of
+            # the old trigrams, so it was one of the (complete) old matches
+            counted = ((self._shared(grams, position), position) for position in previous[3])
+            matches = [position for shared, position
+                       in sorted((-shared, position) for shared, position in counted
+                                 if shared >= needed)]
+            self._previous_fuzzy = (text, grams, needed, matches)
+            return [ranks[position] for position in matches[:limit]]
+
+        postings = self._grams
+        empty = ()
+        ordered = sorted(grams, key=lambda gram: len(postings.get(gram, empty)))
+        matches = []
+        for threshold in range(len(grams), needed - 1, -1):
+            # Names sharing at least threshold trigrams, in rank order; those
+            # sharing more were taken in an earlier round
+            lists = [postings.get(gram, empty) for gram in ordered[:len(grams) - threshold + 1]]
+            last = -1
+            for position in heapq.merge(*lists):
+                if position == last:
+                    continue
+                last = position
+                if self._shared(grams, position) == threshold:
+                    matches.append(position)
+                    if limit is not None and len(matches) == limit:
+                        # Stopped early, so these can't be narrowed later
+                        self._previous_fuzzy = None
+                        return [ranks[position] for position in matches]
+        self._previous_fuzzy = (text, grams, needed, matches)
+        return [ranks[position] for position in matches]
+
+
+class TypeAhead:
+    """Collect keystrokes into a query and return the best match as the user types."""
+
+    def __init__(self, search, timeout=TYPE_AHEAD_TIMEOUT, clock=time.monotonic):
+        """Create a type-ahead over a ColorSearch."""
+        self.search = search
+        self.timeout = timeout
+        self.clock = clock
+        self.query = ""
+        self._last_key = None
+
+    def key(self, char):
+        """Add a typed character ('\\b' deletes one) and return the best palette index, or None."""
+        now = self.clock()
+        if self._last_key is None or now - self._last_key > self.timeout:
+            # Paused long enough: start a new query
+            self.query = ""
+        self._last_key = now
+
+        if char == '\b':
+            self.query = self.query[:-1]
+        else:
+            self.query += char
+        if not self.query:
+            return None
+        results = self.search.search(self.query, limit=1)
+        return results[0] if results else None
+
+    def reset(self):
+        """Forget the current query."""
+        self.query = ""
+        self._last_key = None
@@ -0,0 +1,268 @@
+"""
+Color Space
+
+Conversions between 8-bit sRGB and the slider spaces HSV, HSL, OKLCh and
+CMYK, for single colors and for batches.
+
+Sliders work in integer positions (hue in degrees, most channels in
+percent, OKLCh chroma in thousandths), and both directions are cached per
+color. OKLCh goes through the 256-entry sRGB linearization table from
+color_difference on the way in, and a 255-entry threshold table, searched
+with bisect, on the way back to 8-bit values. Dragging one slider looks its
+color up in a table covering every position of that slider with the other
+channels fixed (see channel_table), so a hue drag costs an index like a red
+drag does.
+"""
+
+import colorsys
+import math
+from bisect import bisect_right
+from functools import lru_cache
+
+from color_difference import CONVERSION_CACHE_SIZE, linearize, rgb_to_oklab
+from color_palette import unpack_rgb
+
+
+# Space names, in the order the sliders are shown
+HSV = "HSV"
+HSL = "HSL"
+OKLCH = "OKLCh"
+CMYK = "CMYK"
+SPACE_NAMES = (HSV, HSL, OKLCH, CMYK)
+
+# Slider tables remembered (one per dragged channel and fixed other channels)
+CHANNEL_TABLE_CACHE_SIZE = 64
+
+# Bisection steps when pulling an out-of-gamut OKLCh color in by its chroma
+_GAMUT_STEPS = 12
+
+# OKLab distance below which clipping an out-of-gamut color is close enough
+# (the "just noticeable difference" used by CSS Color 4 gamut mapping)
+_GAMUT_JND = 0.02
+
+# 8-bit value v covers linear light from _LINEAR_THRESHOLDS[v - 1] up to _LINEAR_THRESHOLDS[v]
+_LINEAR_THRESHOLDS = tuple(linearize(value + 0.5) for value in range(255))
+
+
+def encode_linear(linear):
+    """Convert linear light (0.0-1.0) to the nearest 8-bit sRGB value."""
+    return bisect_right(_LINEAR_THRESHOLDS, linear)
+
+
+def _channel(value):
+    """Scale a 0.0-1.0 channel to 0-255."""
+    return max(0, min(255, round(value * 255)))
+
+
+def _hsv_from_rgb(r, g, b):
+    """Return (hue degrees, saturation, value) with saturation and value in 0.0-1.0."""
+    hue, saturation, value = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+    return hue * 360, saturation, value
+
+
+def _hsv_to_rgb(hue, saturation, value):
+    """Return the (r, g, b) of an HSV color."""
+    return tuple(_channel(c) for c in colorsys.hsv_to_rgb(hue / 360 % 1, saturation, value))
+
+
+def _hsl_from_rgb(r, g, b):
+    """Return (hue degrees, saturation, lightness) with saturation and lightness in 0.0-1.0."""
+    hue, lightness, saturation = colorsys.rgb_to_hls(r / 255, g / 255, b / 255)
+    return hue * 360, saturation, lightness
+
+
+def _hsl_to_rgb(hue, saturation, lightness):
+    """Return the (r, g, b) of an HSL color."""
+    return tuple(_channel(c) for c in colorsys.hls_to_rgb(hue / 360 % 1, lightness, saturation))
+
+
+def _oklch_from_rgb(r, g, b):
+    """Return (lightness 0.0-1.0, chroma, hue degrees) in OKLCh."""
+    lightness, a, b_axis = rgb_to_oklab((r, g, b))
+    return lightness, math.hypot(a, b_axis), math.degrees(math.atan2(b_axis, a)) % 360
+
+
+def _oklab_to_linear(lightness, a, b):
+    """Return the linear-light (r, g, b) of an OKLab color (may be outside 0.0-1.0)."""
+    l_ = lightness + 0.3963377774 * a + 0.2158037573 * b
+    m_ = lightness - 0.1055613458 * a - 0.0638541728 * b
+    s_ = lightness - 0.0894841775 * a - 1.2914855480 * b
+    l, m, s = l_ * l_ * l_, m_ * m_ * m_, s_ * s_ * s_
+    return (4.0767416621 * l - 3.3077115913 * m + 0.2309699292 * s,
+            -1.2684380046 * l + 2.6097574011 * m - 0.3413193965 * s,
+            -0.0041960863 * l - 0.7034186147 * m + 1.7076147010 * s)
+
+
+def _in_gamut(linear):
+    """True if linear-light channels are all displayable."""
+    return all(-1e-7 <= c <= 1 + 1e-7 for c in linear)
+
+
+def _oklch_to_rgb(lightness, chroma, hue):
+    """Return the (r, g, b) of an OKLCh color, reducing chroma until it fits in sRGB."""
+    angle = math.radians(hue)
+    cos_h, sin_h = math.cos(angle), math.sin(angle)
+    a, b = chroma * cos_h, chroma * sin_h
+    linear = _oklab_to_linear(lightness, a, b)
+    if not _in_gamut(linear):
+        # Just past the edge (e.g. slider rounding): clipping each channel is
+        # indistinguishable, and keeps colors on the gamut boundary reachable
+        clipped = tuple(encode_linear(c) for c in linear)
+        clipped_lightness, clipped_a, clipped_b = rgb_to_oklab(clipped)
+        if math.sqrt((clipped_lightness - lightness) ** 2 + (clipped_a - a) ** 2
+                     + (clipped_b - b) ** 2) < _GAMUT_JND:
+            return clipped
+        # Keep lightness and hue; find the largest chroma that is displayable
+        low, high = 0.0, chroma
+        linear = _oklab_to_linear(lightness, 0.0, 0.0)
+        for _ in range(_GAMUT_STEPS):
+            middle = (low + high) / 2
+            candidate = _oklab_to_linear(lightness, middle * cos_h, middle * sin_h)
+            if _in_gamut(candidate):
+                low, linear = middle, candidate
+            else:
+                high = middle
+    return tuple(encode_linear(c) for c in linear)
+
+
+def _cmyk_from_rgb(r, g, b):
+    """Return (cyan, magenta, yellow, black), each 0.0-1.0."""
+    brightest = max(r, g, b)
+    if brightest == 0:
+        return 0.0, 0.0, 0.0, 1.0
+    return ((brightest - r) / brightest, (brightest - g) / brightest,
+            (brightest - b) / brightest, 1 - brightest / 255)
+
+
+def _cmyk_to_rgb(cyan, magenta, yellow, black):
+    """Return the (r, g, b) of a CMYK color."""
+    white = 1 - black
+    return _channel((1 - cyan) * white), _channel((1 - magenta) * white), _channel((1 - yellow) * white)
+
+
+# space -> (channels, from RGB, to RGB); each channel is
+# (label, highest slider position, units per position, label format)
+SPACES = {
+    HSV: ((("H", 359, 1, "{:.0f}°"), ("S", 100, 0.01, "{:.0%}"), ("V", 100, 0.01, "{:.0%}")),
+          _hsv_from_rgb, _hsv_to_rgb),
+    HSL: ((("H", 359, 1, "{:.0f}°"), ("S", 100, 0.01, "{:.0%}"), ("L", 100, 0.01, "{:.0%}")),
+          _hsl_from_rgb, _hsl_to_rgb),
+    OKLCH: ((("L", 100, 0.01, "{:.0%}"), ("C", 330, 0.001, "{:.3f}"), ("H", 359, 1, "{:.0f}°")),
+            _oklch_from_rgb, _oklch_to_rgb),
+    CMYK: ((("C", 100, 0.01, "{:.0%}"), ("M", 100, 0.01, "{:.0%}"), ("Y", 100, 0.01, "{:.0%}"),
+            ("K", 100, 0.01, "{:.0%}")),
+           _cmyk_from_rgb, _cmyk_to_rgb),
+}
+
+
+def get_space(space):
+    """Return the (channels, from RGB, to RGB) entry for a space name."""
+    try:
+        return SPACES[space]
+    except KeyError:
+        raise ValueError(f"Unknown color space: {space!r} "
+                         f"(expected one of {', '.join(SPACE_NAMES)})") from None
+
+
+def space_channels(space):
+    """Return the channel specs of a space: (label, highest position, unit, format) each."""
+    return get_space(space)[0]
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def rgb_to_space(space, rgb_values):
+    """Convert an (r, g, b) tuple to the space's components (hue in degrees, others 0.0-1.0)."""
+    return get_space(space)[1](*rgb_values)
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def space_to_rgb(space, components):
+    """Convert a tuple of the space's components back to an (r, g, b) tuple."""
+    return get_space(space)[2](*components)
+
+
+def colors_to_space(space, colors):
+    """Convert a sequence of (r, g, b) colors to the space's components."""
+    convert = get_space(space)[1]
+    # OKLCh reuses the cached OKLab conversion, so repeated colors are cheap
+    return [convert(*rgb_values) for rgb_values in colors]
+
+
+def colors_from_space(space, components):
+    """Convert a sequence of component tuples back to (r, g, b) colors."""
+    convert = get_space(space)[2]
+    return [convert(*values) for values in components]
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def to_positions(space, packed):
+    """Return the slider positions showing a packed color."""
+    channels, convert, _ = get_space(space)
+    components = convert(*unpack_rgb(packed))
+    # Hue wraps around (359.6° is 0°); everything else is clamped to its slider
+    return tuple(round(value / unit) % (highest + 1) if label == "H"
+                 else max(0, min(highest, round(value / unit)))
+                 for (label, highest, unit, _), value in zip(channels, components))
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def from_positions(space, positions):
+    """Return the packed color shown by a tuple of slider positions."""
+    channels, _, convert = get_space(space)
+    r, g, b = convert(*(position * channel[2] for channel, position in zip(channels, positions)))
+    return (r << 16) | (g << 8) | b
+
+
+@lru_cache(maxsize=CHANNEL_TABLE_CACHE_SIZE)
+def _channel_table(space, channel, positions):
+    """Return the (lazily filled) table of one slider for positions of the other channels."""
+    return [None] * (space_channels(space)[channel][1] + 1)
+
+
+def channel_color(space, channel, positions, position):
+    """Return the packed color with one slider at position and the others at positions.
+
+    Colors are kept in a table per slider and setting of the other sliders,
+    filled in as the slider visits each position, so a drag converts each
+    position once and afterwards costs a list index.
+    """
+    # The dragged channel's own position doesn't matter, so it isn't part of the cache key
+    key = positions[:channel] + (0,) + positions[channel + 1:]
+    table = _channel_table(space, channel, key)
+    packed = table[position]
+    if packed is None:
+        packed = table[position] = from_positions(
+            space, positions[:channel] + (position,) + positions[channel + 1:])
+    return packed
+
+
+def channel_table(space, channel, positions):
+    """Return the packed colors of every position of one slider, the others held at positions."""
+    return [channel_color(space, channel, positions, position)
+            for position in range(space_channels(space)[channel][1] + 1)]
+
+
+@lru_cache(maxsize=len(SPACES) * 4)
+def position_labels(space, channel):
+    """Return the label text of every position of one slider."""
+    _, highest, unit, text = space_channels(space)[channel]
+    return tuple(text.format(position * unit) for position in range(highest + 1))
+
+
+def sync_positions(space, packed, previous):
+    """Return slider positions for packed, keeping each previous position that still gives packed.
+
+    Hue is meaningless for grays (and saturation for black, or C/M/Y when K is
+    full), so a slider that doesn't affect the color stays where it was
+    instead of jumping to 0.
+    """
+    positions = to_positions(space, packed)
+    if previous is None or positions == previous:
+        return positions
+    kept = list(positions)
+    for channel, position in enumerate(previous):
+        if position != kept[channel]:
+            candidate = kept[:channel] + [position] + kept[channel + 1:]
+            if from_positions(space, tuple(candidate)) == packed:
+                kept = candidate
+    return tuple(kept)
@@ -0,0 +1,97 @@
+"""
+Color State
+
+The explorer's current color as a single packed 24-bit integer.
+
+Every part of the explorer reads and writes the color through one ColorState
+instead of three Tk variables, so reading it costs no Tcl call, several
+channels change in one step (one notification for a palette pick rather
+than three), and subscribers are only called when the color really changed.
+A change carries the channels it touched and a source tag, which replaces
+"am I being updated programmatically?" guard flags: writing back the value a
+widget just reported is a no-op, so it cannot loop.
+
+Hex labels come from 256-entry tables built once, so formatting a color is a
+few list lookups.
+"""
+
+from color_palette import unpack_rgb
+
+
+CHANNELS = ("red", "green", "blue")
+
+# Bit position of each channel in a packed color
+CHANNEL_SHIFTS = {"red": 16, "green": 8, "blue": 0}
+
+# Upper-case two-digit hex of every channel value, and the 0xNN slider labels
+HEX_BYTES = tuple(f"{value:02X}" for value in range(256))
+CHANNEL_LABELS = tuple(f"0x{value:02X}" for value in range(256))
+
+# Middle gray, the explorer's starting color
+DEFAULT_COLOR = 0x808080
+
+
+def hex_color(packed):
+    """Format a packed color as #RRGGBB."""
+    return "#" + HEX_BYTES[(packed >> 16) & 0xFF] + HEX_BYTES[(packed >> 8) & 0xFF] + HEX_BYTES[packed & 0xFF]
+
+
+def changed_channels(old, new):
+    """Return the names of the channels that differ between two packed colors."""
+    difference = old ^ new
+    return tuple(name for name in CHANNELS if (difference >> CHANNEL_SHIFTS[name]) & 0xFF)
+
+
+class ColorState:
+    """The current color, packed, with change-only notifications."""
+
+    def __init__(self, packed=DEFAULT_COLOR):
+        """Start at packed with no subscribers."""
+        self.packed = packed
+        self._subscribers = []
+
+    @property
+    def rgb(self):
+        """Return the current (r, g, b) channels."""
+        return unpack_rgb(self.packed)
+
+    def channel(self, name):
+        """Return one channel of the current color by name."""
+        return (self.packed >> CHANNEL_SHIFTS[name]) & 0xFF
+
+    def subscribe(self, callback):
+        """Call callback(packed, old, source) after every change; returns callback."""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """Stop calling callback."""
+        self._subscribers.remove(callback)
+
+    def set(self, packed, source=None):
+        """Make packed the current color; returns False (and notifies nobody) if it already was."""
+        old = self.packed
+        if packed == old:
+            return False
+        self.packed = packed
+        for callback in self._subscribers:
+            callback(packed, old, source)
+        return True
+
+    def set_rgb(self, r, g, b, source=None):
+        """Set all three channels in one change."""
+        return self.set((int(r) << 16) | (int(g) << 8) | int(b), source)
+
+    def set_channel(self, name, value, source=None):
+        """Set one channel (clamped to 0-255), leaving the others alone."""
+        shift = CHANNEL_SHIFTS[name]
+        value = max(0, min(255, int(round(float(value)))))
+        return self.set((self.packed & ~(0xFF << shift)) | (value << shift), source)
+
+    def set_channels(self, values, source=None):
+        """Set several channels from a {name: value} dict in one change."""
+        packed = self.packed
+        for name, value in values.items():
+            shift = CHANNEL_SHIFTS[name]
+            packed = (packed & ~(0xFF << shift)) | (int(value) << shift)
+        return self.set(packed, source)
@@ -0,0 +1,202 @@
+"""
+Color Vision
+
+Simulates how colors look with protanopia, deuteranopia and tritanopia, for
+single colors and whole palettes, and finds the palette colors that can be
+told apart normally but not with a deficiency.
+
+Two published models are available: Viénot, Brettel & Mollon (1999) for
+protanopia and deuteranopia with Brettel, Viénot & Mollon (1997) for
+tritanopia, which the 1999 simplification handles poorly; and Machado,
+Oliveira & Fernandes (2009) at full severity. Both are 3x3 matrices on
+linear RGB (Brettel's tritanopia uses one of two, depending on which side of
+a plane the color falls).
+
+Each matrix is turned into per-channel tables (the 256-entry sRGB
+linearization table times each coefficient), the same trick color_contrast
+uses for luminance, so simulating a color is nine lookups and three
+bisections back to 8-bit values, and a whole palette is a tight loop over
+them. Confusable pairs are found by putting the simulated colors in a grid of
+OKLab cells one threshold wide and only comparing colors in neighboring
+cells.
+"""
+
+import math
+from functools import lru_cache
+
+from color_difference import CONVERSION_CACHE_SIZE, SRGB_TO_LINEAR, rgb_to_oklab
+from color_space import encode_linear
+
+
+PROTANOPIA = "protanopia"
+DEUTERANOPIA = "deuteranopia"
+TRITANOPIA = "tritanopia"
+DEFICIENCIES = (PROTANOPIA, DEUTERANOPIA, TRITANOPIA)
+
+# Short labels for swatches and reports
+DEFICIENCY_LABELS = {PROTANOPIA: "Protan", DEUTERANOPIA: "Deutan", TRITANOPIA: "Tritan"}
+
+# Simulation models
+VIENOT = "vienot"      # Viénot 1999 (protan, deutan) and Brettel 1997 (tritan)
+MACHADO = "machado"    # Machado 2009, severity 1.0
+METHODS = (VIENOT, MACHADO)
+
+# OKLab ΔE (× 100) below which two colors are easily mistaken for each other
+CONFUSION_DELTA_E = 3.0
+
+# (method, deficiency) -> (matrix, second matrix, separating plane normal);
+# the second matrix is used for colors on the negative side of the plane
+_MODELS = {
+    (VIENOT, PROTANOPIA): (((0.11238, 0.88762, 0.00000),
+                            (0.11238, 0.88762, 0.00000),
+                            (0.00401, -0.00401, 1.00000)), None, None),
+    (VIENOT, DEUTERANOPIA): (((0.29275, 0.70725, 0.00000),
+                              (0.29275, 0.70725, 0.00000),
+                              (-0.02234, 0.02234, 1.00000)), None, None),
+    (VIENOT, TRITANOPIA): (((1.01277, 0.13548, -0.14826),
+                            (-0.01243, 0.86812, 0.14431),
+                            (0.07589, 0.80500, 0.11911)),
+                           ((0.93678, 0.18979, -0.12657),
+                            (0.06154, 0.81526, 0.12320),
+                            (-0.37562, 1.12767, 0.24796)),
+                           (0.03901, -0.02788, -0.01113)),
+    (MACHADO, PROTANOPIA): (((0.152286, 1.052583, -0.204868),
+                             (0.114503, 0.786281, 0.099216),
+                             (-0.003882, -0.048116, 1.051998)), None, None),
+    (MACHADO, DEUTERANOPIA): (((0.367322, 0.860646, -0.227968),
+                               (0.280085, 0.672501, 0.047413),
+                               (-0.011820, 0.042940, 0.968881)), None, None),
+    (MACHADO, TRITANOPIA): (((1.255528, -0.076749, -0.178779),
+                             (-0.078411, 0.930809, 0.147602),
+                             (0.004733, 0.691367, 0.303900)), None, None),
+}
+
+# Cells around (and including) a grid cell that come after it in sort order,
+# so each neighboring pair of cells is compared once
+_FORWARD_NEIGHBORS = tuple(offset for offset in
+                           ((dl, da, db) for dl in (-1, 0, 1) for da in (-1, 0, 1)
+                            for db in (-1, 0, 1))
+                           if offset > (0, 0, 0))
+
+
+def _matrix_tables(matrix):
+    """Return each matrix coefficient times every linearized channel value, row by row."""
+    return tuple(tuple(tuple(coefficient * value for value in SRGB_TO_LINEAR)
+                       for coefficient in row)
+                 for row in matrix)
+
+
+@lru_cache(maxsize=None)
+def _simulator(method, deficiency):
+    """Return the lookup tables for one model: (tables, second tables, plane tables)."""
+    try:
+        matrix, second, normal = _MODELS[method, deficiency]
+    except KeyError:
+        raise ValueError(f"Unknown color vision deficiency or method: {deficiency!r}, "
+                         f"{method!r} (expected one of {', '.join(DEFICIENCIES)}; "
+                         f"{', '.join(METHODS)})") from None
+    if second is None:
+        return _matrix_tables(matrix), None, None
+    return _matrix_tables(matrix), _matrix_tables(second), _matrix_tables((normal,))[0]
+
+
+def simulate_colors(deficiency, colors, method=VIENOT):
+    """Return how each (r, g, b) color in a sequence looks with a deficiency."""
+    tables, second, plane = _simulator(method, deficiency)
+    encode = encode_linear
+    simulated = []
+    for r, g, b in colors:
+        rows = tables
+        if plane is not None and plane[0][r] + plane[1][g] + plane[2][b] < 0:
+            rows = second
+        (rr, rg, rb), (gr, gg, gb), (br, bg, bb) = rows
+        simulated.append((encode(rr[r] + rg[g] + rb[b]), encode(gr[r] + gg[g] + gb[b]),
+                          encode(br[r] + bg[g] + bb[b])))
+    return simulated
+
+
+def simulate(deficiency, rgb_values, method=VIENOT):
+    """Return how an (r, g, b) color looks with a deficiency."""
+    return simulate_colors(deficiency, (rgb_values,), method)[0]
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def simulate_packed(deficiency, packed, method=VIENOT):
+    """Return how a packed 24-bit color looks with a deficiency, packed."""
+    r, g, b = simulate(deficiency, (packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF), method)
+    return (r << 16) | (g << 8) | b
+
+
+def close_pairs(points, distance):
+    """Yield (i, j, d) for the 3D points (e.g. OKLab colors) closer than distance, with i < j.
+
+    Points are put in a grid of cells distance wide, so only points in the
+    same or neighboring cells are compared.
+    """
+    cells = {}
+    for index, (x, y, z) in enumerate(points):
+        cell = (math.floor(x / distance), math.floor(y / distance), math.floor(z / distance))
+        cells.setdefault(cell, []).append(index)
+
+    limit = distance * distance
+    for (cx, cy, cz), members in cells.items():
+        # Pairs within the cell
+        for position, i in enumerate(members):
+            xi, yi, zi = points[i]
+            for j in members[position + 1:]:
+                xj, yj, zj = points[j]
+                squared = (xi - xj) ** 2 + (yi - yj) ** 2 + (zi - zj) ** 2
+                if squared < limit:
+                    yield (i, j, math.sqrt(squared)) if i < j else (j, i, math.sqrt(squared))
+        # Pairs with the neighboring cells (each neighboring pair of cells once)
+        for dx, dy, dz in _FORWARD_NEIGHBORS:
+            others = cells.get((cx + dx, cy + dy, cz + dz))
+            if others is None:
+                continue
+            for i in members:
+                xi, yi, zi = points[i]
+                for j in others:
+                    xj, yj, zj = points[j]
+                    squared = (xi - xj) ** 2 + (yi - yj) ** 2 + (zi - zj) ** 2
+                    if squared < limit:
+                        yield (i, j, math.sqrt(squared)) if i < j else (j, i, math.sqrt(squared))
+
+
+def confusable_pairs(colors, deficiency, threshold=CONFUSION_DELTA_E, method=VIENOT):
+    """Yield (i, j, normal ΔE, simulated ΔE) for colors that only look alike with a deficiency.
+
+    colors is a sequence of (r, g, b) tuples; ΔE is OKLab distance × 100.
+    Pairs that already look alike with normal vision are left out.
+    """
+    to_oklab = rgb_to_oklab.__wrapped__
+    simulated = [to_oklab(rgb_values) for rgb_values in simulate_colors(deficiency, colors, method)]
+    originals = {}
+    for i, j, distance in close_pairs(simulated, threshold / 100):
+        # Only the colors that end up close need their normal-vision OKLab
+        for index in (i, j):
+            if index not in originals:
+                originals[index] = to_oklab(tuple(colors[index]))
+        normal = math.dist(originals[i], originals[j]) * 100
+        if normal >= threshold:
+            yield i, j, normal, distance * 100
+
+
+def audit_vision(colors, threshold=CONFUSION_DELTA_E, method=VIENOT, examples=10):
+    """Return {deficiency: (confusable pair count, the examples most changed by it)}.
+
+    Each example is (i, j, normal ΔE, simulated ΔE); the examples are the
+    pairs that look most different normally.
+    """
+    colors = list(colors)
+    report = {}
+    for deficiency in DEFICIENCIES:
+        count = 0
+        worst = []
+        for pair in confusable_pairs(colors, deficiency, threshold, method):
+            count += 1
+            worst.append(pair)
+            if len(worst) > examples * 4:
+                # Keep the list short without sorting on every pair
+                worst = sorted(worst, key=lambda pair: -pair[2])[:examples]
+        report[deficiency] = (count, sorted(worst, key=lambda pair: -pair[2])[:examples])
+    return report
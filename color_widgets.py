@@ -0,0 +1,1028 @@
+"""
+Color Widgets
+
+Reusable Tk widgets for the RGB Color Explorer.
+
+This module imports tkinter at the top, so the explorers only import it from
+the methods that open these widgets, keeping startup (and headless use of the
+explorer modules) free of the cost.
+"""
+
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from color_contrast import (AA, AA_LARGE, AAA, ContrastIndex, apca_contrast, nearest_passing,
+                            wcag_rating)
+from color_image import PNM_EXTENSIONS, ColorHistogram, iter_photo_strips, iter_pnm_strips
+from color_palette import Palette, unpack_rgb
+from color_quantize import median_cut, palette_pairs, quantize_histogram
+from color_plane import (HUE_PLANE, PLANE_MODES, PLANE_SIZE, fixed_value, plane_color,
+                         plane_position, plane_ppm)
+from color_space import (SPACE_NAMES, channel_color, position_labels, space_channels,
+                         sync_positions)
+
+
+def _text_color(packed):
+    """Return black or white, whichever reads better on the packed background color."""
+    r, g, b = packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF
+    return '#000000' if r * 299 + g * 587 + b * 114 > 140000 else '#FFFFFF'
+
+
+class PaletteBrowser(ttk.Frame):
+    """Scrollable palette list that only materializes the visible rows.
+
+    The listbox never holds more than `rows` items: scrolling rewrites those
+    rows from the palette, and the scrollbar is driven from the palette length,
+    so a 100k-entry palette costs the same to show as a 39-entry one.
+
+    Rows are addressed by position in the current view, which is either the
+    whole palette or a list of palette indices (e.g. search results).
+    """
+
+    def __init__(self, master, palette, on_select, rows=15, width=40):
+        """Create the browser; on_select(index) is called when a row is chosen."""
+        super().__init__(master)
+        self.palette = palette
+        self.on_select = on_select
+        self.rows = rows
+        self.view = None       # palette indices to list, or None for the whole palette
+        self.top = 0           # view position shown in the first row
+        self.selected = None   # selected view position
+        self._shown = None     # (palette, view, top) the rows were last filled for
+
+        self.listbox = tk.Listbox(self, height=rows, width=width, activestyle='none',
+                                  exportselection=False, font=('Courier', 10))
+        self.listbox.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.listbox.bind('<<ListboxSelect>>', self.on_listbox_select)
+        self.listbox.bind('<MouseWheel>', self.on_mousewheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll_rows(-3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll_rows(3))
+        self.listbox.bind('<Up>', lambda e: self.move_selection(-1))
+        self.listbox.bind('<Down>', lambda e: self.move_selection(1))
+        self.listbox.bind('<Prior>', lambda e: self.move_selection(-self.rows))
+        self.listbox.bind('<Next>', lambda e: self.move_selection(self.rows))
+        self.listbox.bind('<Home>', lambda e: self.select(0))
+        self.listbox.bind('<End>', lambda e: self.select(self.count() - 1))
+
+        self.refresh()
+
+    def set_palette(self, palette):
+        """Show a different palette from the top."""
+        self.palette = palette
+        self.set_view(None)
+
+    def set_view(self, indices):
+        """List only the given palette indices, in order (None lists the whole palette)."""
+        self.view = indices
+        self.top = 0
+        self.selected = None
+        self.refresh()
+
+    def count(self):
+        """Return the number of rows in the current view."""
+        return len(self.palette) if self.view is None else len(self.view)
+
+    def palette_index(self, position):
+        """Return the palette index shown at a view position."""
+        return position if self.view is None else self.view[position]
+
+    def scroll_to(self, top):
+        """Make view position top the first visible row (clamped to the view)."""
+        self.top = max(0, min(top, self.count() - self.rows))
+        self.refresh()
+
+    def scroll_rows(self, count):
+        """Scroll by count rows (negative scrolls up)."""
+        self.scroll_to(self.top + count)
+        return "break"
+
+    def refresh(self):
+        """Fill the visible rows from the palette if the view moved."""
+        palette = self.palette
+        total = self.count()
+        shown = (palette, self.view, self.top)
+        if shown != self._shown:
+            self._shown = shown
+            stop = min(self.top + self.rows, total)
+            indices = [self.palette_index(position) for position in range(self.top, stop)]
+            listbox = self.listbox
+            listbox.delete(0, tk.END)
+            listbox.insert(0, *(palette.label(index) for index in indices))
+            for row, index in enumerate(indices):
+                packed = palette.packed(index)
+                background = f"#{packed:06X}"
+                foreground = _text_color(packed)
+                listbox.itemconfigure(row, background=background, foreground=foreground,
+                                      selectbackground=foreground,
+                                      selectforeground=background)
+
+        # Highlight the selected row if it is on screen
+        self.listbox.selection_clear(0, tk.END)
+        if self.selected is not None and self.top <= self.selected < self.top + self.rows:
+            self.listbox.selection_set(self.selected - self.top)
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def show_position(self, position):
+        """Scroll just enough to make a view position visible."""
+        if position < self.top:
+            self.scroll_to(position)
+        elif position >= self.top + self.rows:
+            self.scroll_to(position - self.rows + 1)
+        else:
+            self.refresh()
+
+    def select(self, position, notify=True):
+        """Select a view position, scroll it into view and optionally report its palette index."""
+        if not self.count():
+            return "break"
+        position = max(0, min(position, self.count() - 1))
+        self.selected = position
+        self.show_position(position)
+        if notify:
+            self.on_select(self.palette_index(position))
+        return "break"
+
+    def move_selection(self, count):
+        """Move the selection by count rows (keyboard navigation)."""
+        if self.selected is None:
+            return self.select(self.top)
+        return self.select(self.selected + count)
+
+    def on_listbox_select(self, event=None):
+        """Handle a click on one of the visible rows."""
+        selection = self.listbox.curselection()
+        if selection:
+            position = self.top + selection[0]
+            if position != self.selected and position < self.count():
+                self.select(position)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Handle scrollbar drags ('moveto') and arrow/trough clicks ('scroll')."""
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.count()))
+        elif action == 'scroll':
+            step = self.rows if unit == 'pages' else 1
+            self.scroll_rows(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        """Scroll three rows per wheel notch (Windows/macOS)."""
+        return self.scroll_rows(-3 if event.delta > 0 else 3)
+
+
+class PaletteBrowserWindow:
+    """Toplevel window with a search box over a PaletteBrowser; hidden rather than destroyed on close."""
+
+    # Search results listed in the browser at most
+    RESULT_LIMIT = 5000
+
+    def __init__(self, root, palette, search, on_select):
+        """Create the window next to root; search is a color_search.ColorSearch over palette."""
+        self.search = search
+        self.window = tk.Toplevel(root)
+        self.window.title(f"Palette Browser - {palette.title}")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        search_frame = ttk.Frame(self.window, padding=(8, 6))
+        search_frame.pack(fill='x')
+        ttk.Label(search_frame, text="Search:").pack(side='left')
+        self.query_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.query_var)
+        self.search_entry.pack(side='left', fill='x', expand=True, padx=(5, 10))
+        self.search_entry.bind('<Down>', lambda e: self.focus_results())
+        self.search_entry.bind('<Return>', lambda e: self.focus_results())
+        self.count_label = ttk.Label(search_frame)
+        self.count_label.pack(side='right')
+
+        self.browser = PaletteBrowser(self.window, palette, on_select)
+        self.browser.pack(fill='both', expand=True, padx=8, pady=(0, 8))
+        self.query_var.trace_add('write', self.on_query_change)
+        self.update_count()
+
+    def set_palette(self, palette, search):
+        """Switch the browser to a new palette and its search."""
+        self.search = search
+        self.window.title(f"Palette Browser - {palette.title}")
+        self.browser.set_palette(palette)
+        self.on_query_change()
+
+    def on_query_change(self, *args):
+        """Filter the list to the ranked matches for the search text."""
+        query = self.query_var.get()
+        if query.strip():
+            self.browser.set_view(self.search.search(query, limit=self.RESULT_LIMIT))
+        else:
+            self.browser.set_view(None)
+        self.update_count()
+
+    def focus_results(self):
+        """Move keyboard focus from the search box to the first result."""
+        self.browser.listbox.focus_set()
+        self.browser.select(0)
+        return "break"
+
+    def update_count(self):
+        """Show how many colors are listed."""
+        total = len(self.browser.palette)
+        shown = self.browser.count()
+        if shown == total:
+            self.count_label.config(text=f"{total:,} colors")
+        else:
+            self.count_label.config(text=f"{shown:,} of {total:,} colors")
+
+    def show(self):
+        """Bring the window back and focus the search box."""
+        self.window.deiconify()
+        self.window.lift()
+        self.search_entry.focus_set()
+
+    def hide(self):
+        """Hide the window, keeping its scroll position for next time."""
+        self.window.withdraw()
+
+
+class SwatchBoard(ttk.Frame):
+    """Scrollable grid of palette swatches on one canvas, with items only for the visible rows.
+
+    The canvas holds a ring of rectangle items one row taller than the
+    viewport. Scrolling moves every item with a single tagged move and refills
+    only the rows that came into view (the ring slot of content row n is
+    n % ring size), so a smooth scroll recolors one row at a time and even a
+    jump through a 100k-entry palette touches no more items than are visible.
+    Zooming changes the swatch size and rebuilds the ring around the swatch
+    that was at the top left.
+    """
+
+    # Swatch sizes in pixels, smallest first
+    ZOOM_SIZES = (8, 12, 16, 24, 32, 48, 64)
+
+    # Gap between neighboring swatches, in pixels
+    GAP = 1
+
+    def __init__(self, master, palette, on_select, width=640, height=420, size=24):
+        """Create the board; on_select(index) is called when a swatch is clicked."""
+        super().__init__(master)
+        self.palette = palette
+        self.on_select = on_select
+        self.size = size
+        self.width = width
+        self.height = height
+        self.offset = 0          # content y shown at the top of the canvas
+        self.columns = 1
+        self.ring = []           # ring slot -> rectangle items of that row
+        self.slot_rows = []      # ring slot -> content row it shows (None for none)
+        self.selected = None     # palette index outlined as selected
+
+        self.canvas = tk.Canvas(self, width=width, height=height, highlightthickness=0,
+                                bg='#202020')
+        self.canvas.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+        self.selection = self.canvas.create_rectangle(0, 0, 0, 0, outline='#FFFFFF', width=2,
+                                                      state='hidden')
+
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.canvas.bind('<MouseWheel>', self.on_mousewheel)
+        self.canvas.bind('<Control-MouseWheel>', self.on_zoom_wheel)
+        self.canvas.bind('<Button-4>', lambda e: self.scroll_pixels(-3 * self.pitch))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll_pixels(3 * self.pitch))
+        self.canvas.bind('<Control-Button-4>', lambda e: self.zoom(1))
+        self.canvas.bind('<Control-Button-5>', lambda e: self.zoom(-1))
+
+        self.build()
+
+    @property
+    def pitch(self):
+        """Return the distance from one swatch to the next, in pixels."""
+        return self.size + self.GAP
+
+    def row_count(self):
+        """Return the number of swatch rows in the palette."""
+        return -(-len(self.palette) // self.columns)
+
+    def content_height(self):
+        """Return the height of the whole board in pixels."""
+        return self.row_count() * self.pitch
+
+    def index_at(self, x, y):
+        """Return the palette index of the swatch at canvas (x, y), or None."""
+        column = int(x) // self.pitch
+        if column >= self.columns:
+            return None
+        index = (int(y) + self.offset) // self.pitch * self.columns + column
+        return index if 0 <= index < len(self.palette) else None
+
+    def build(self):
+        """Create the ring of items for the current size and viewport, then fill it."""
+        canvas = self.canvas
+        canvas.delete('swatch')
+        pitch = self.pitch
+        self.columns = max(1, self.width // pitch)
+        ring_size = self.height // pitch + 2
+        self.ring = [[canvas.create_rectangle(0, 0, 0, 0, outline='', tags='swatch')
+                      for _ in range(self.columns)]
+                     for _ in range(ring_size)]
+        self.slot_rows = [None] * ring_size
+        self.offset = max(0, min(self.offset, self.content_height() - self.height))
+        canvas.tag_raise(self.selection)
+        self.refresh()
+
+    def fill_row(self, slot, row):
+        """Place the items of a ring slot at content row and color them from the palette."""
+        canvas = self.canvas
+        palette = self.palette
+        pitch = self.pitch
+        size = self.size
+        count = len(palette)
+        top = row * pitch - self.offset
+        first = row * self.columns
+        for column, item in enumerate(self.ring[slot]):
+            index = first + column
+            left = column * pitch
+            canvas.coords(item, left, top, left + size, top + size)
+            if index < count:
+                canvas.itemconfigure(item, fill=f"#{palette.packed(index):06X}", state='normal')
+            else:
+                canvas.itemconfigure(item, state='hidden')
+        self.slot_rows[slot] = row
+
+    def refresh(self):
+        """Make sure the rows in the viewport are filled and the scrollbar matches."""
+        pitch = self.pitch
+        ring_size = len(self.ring)
+        first_row = self.offset // pitch
+        last_row = min(self.row_count(), (self.offset + self.height) // pitch + 1)
+        for row in range(first_row, last_row):
+            slot = row % ring_size
+            if self.slot_rows[slot] != row:
+                self.fill_row(slot, row)
+        # Rows that went out of range (e.g. a shorter palette) are hidden
+        for slot, row in enumerate(self.slot_rows):
+            if row is not None and not first_row <= row < last_row:
+                for item in self.ring[slot]:
+                    self.canvas.itemconfigure(item, state='hidden')
+                self.slot_rows[slot] = None
+        self.show_selection()
+
+        total = self.content_height()
+        if total > self.height:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def show_selection(self):
+        """Outline the selected swatch if it is in view."""
+        canvas = self.canvas
+        if self.selected is None or self.selected >= len(self.palette):
+            canvas.itemconfigure(self.selection, state='hidden')
+            return
+        row, column = divmod(self.selected, self.columns)
+        left = column * self.pitch
+        top = row * self.pitch - self.offset
+        canvas.coords(self.selection, left - 1, top - 1, left + self.size + 1, top + self.size + 1)
+        canvas.itemconfigure(self.selection, state='normal')
+
+    def scroll_to(self, offset):
+        """Show the board from content y offset (clamped), moving rather than refilling what stays."""
+        offset = int(max(0, min(offset, self.content_height() - self.height)))
+        if offset != self.offset:
+            # Rows that stay in view only move and refresh fills the ones that
+            # came in; after a jump every row is refilled, so nothing is moved
+            if abs(offset - self.offset) < self.height + self.pitch:
+                self.canvas.move('swatch', 0, self.offset - offset)
+            self.offset = offset
+        self.refresh()
+
+    def scroll_pixels(self, amount):
+        """Scroll by amount pixels (negative scrolls up)."""
+        self.scroll_to(self.offset + amount)
+        return "break"
+
+    def show_index(self, index):
+        """Scroll just enough to bring a palette index into view."""
+        top = index // self.columns * self.pitch
+        if top < self.offset:
+            self.scroll_to(top)
+        elif top + self.pitch > self.offset + self.height:
+            self.scroll_to(top + self.pitch - self.height)
+
+    def set_palette(self, palette):
+        """Show a different palette from the top."""
+        self.palette = palette
+        self.offset = 0
+        self.selected = None
+        self.build()
+
+    def zoom(self, steps):
+        """Make swatches steps sizes bigger (or smaller), keeping the top-left swatch in view."""
+        sizes = self.ZOOM_SIZES
+        current = min(range(len(sizes)), key=lambda i: abs(sizes[i] - self.size))
+        size = sizes[max(0, min(len(sizes) - 1, current + steps))]
+        if size == self.size:
+            return "break"
+        anchor = self.offset // self.pitch * self.columns
+        self.size = size
+        self.offset = 0
+        self.build()
+        self.scroll_to(anchor // self.columns * self.pitch)
+        return "break"
+
+    def on_click(self, event):
+        """Select the swatch under the pointer and report its palette index."""
+        index = self.index_at(event.x, event.y)
+        if index is not None:
+            self.selected = index
+            self.show_selection()
+            self.on_select(index)
+
+    def on_resize(self, event):
+        """Rebuild the ring when the canvas changes size."""
+        if (event.width, event.height) != (self.width, self.height):
+            self.width, self.height = event.width, event.height
+            anchor = self.offset // self.pitch * self.columns
+            self.build()
+            self.scroll_to(anchor // self.columns * self.pitch)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Handle scrollbar drags ('moveto') and arrow/trough clicks ('scroll')."""
+        if action == 'moveto':
+            self.scroll_to(float(amount) * self.content_height())
+        elif action == 'scroll':
+            step = self.height - self.pitch if unit == 'pages' else self.pitch
+            self.scroll_pixels(int(amount) * step)
+
+    def on_mousewheel(self, event):
+        """Scroll three rows per wheel notch (Windows/macOS)."""
+        return self.scroll_pixels((-3 if event.delta > 0 else 3) * self.pitch)
+
+    def on_zoom_wheel(self, event):
+        """Zoom in or out one step per Ctrl+wheel notch."""
+        return self.zoom(1 if event.delta > 0 else -1)
+
+
+class SwatchBoardWindow:
+    """Toplevel with a SwatchBoard and zoom buttons; hidden rather than destroyed on close."""
+
+    def __init__(self, root, palette, on_select):
+        """Create the window next to root; on_select(index) is called for a clicked swatch."""
+        self.window = tk.Toplevel(root)
+        self.window.title(f"Swatches - {palette.title}")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        top_frame = ttk.Frame(self.window, padding=(8, 6))
+        top_frame.pack(fill='x')
+        ttk.Button(top_frame, text="−", width=3,
+                   command=lambda: self.board.zoom(-1)).pack(side='left')
+        ttk.Button(top_frame, text="+", width=3,
+                   command=lambda: self.board.zoom(1)).pack(side='left', padx=(4, 0))
+        self.count_label = ttk.Label(top_frame)
+        self.count_label.pack(side='right')
+
+        self.board = SwatchBoard(self.window, palette, on_select)
+        self.board.pack(fill='both', expand=True, padx=8, pady=(0, 8))
+        self.update_count()
+
+    def set_palette(self, palette):
+        """Show a new palette."""
+        self.window.title(f"Swatches - {palette.title}")
+        self.board.set_palette(palette)
+        self.update_count()
+
+    def update_count(self):
+        """Show how many colors the board holds."""
+        self.count_label.config(text=f"{len(self.board.palette):,} colors")
+
+    def show(self):
+        """Bring the window back."""
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        """Hide the window, keeping its scroll position and zoom for next time."""
+        self.window.withdraw()
+
+
+class ColorPlaneWindow:
+    """Toplevel with a 256x256 color plane that picks colors by clicking or dragging.
+
+    The plane image is only reloaded when the mode or its fixed coordinate
+    changes (see color_plane); otherwise an update just moves the marker.
+    """
+
+    # Radius of the marker ring around the current color
+    MARKER_RADIUS = 5
+
+    def __init__(self, root, on_pick):
+        """Create the window next to root; on_pick(r, g, b) is called as the user picks colors."""
+        self.on_pick = on_pick
+        self.mode = PLANE_MODES[0]
+        self.fixed = None      # fixed coordinate the image was drawn for
+        self.rgb = None        # color the marker shows
+        self._picked = None    # last color produced by the plane itself
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Color Plane")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.shown = True
+
+        top_frame = ttk.Frame(self.window, padding=(8, 6))
+        top_frame.pack(fill='x')
+        ttk.Label(top_frame, text="Plane:").pack(side='left')
+        self.mode_combobox = ttk.Combobox(top_frame, values=PLANE_MODES, state="readonly",
+                                          width=20)
+        self.mode_combobox.set(self.mode)
+        self.mode_combobox.pack(side='left', padx=(5, 0))
+        self.mode_combobox.bind('<<ComboboxSelected>>', self.on_mode_change)
+        self.fixed_label = ttk.Label(top_frame, font=('Courier', 10))
+        self.fixed_label.pack(side='right')
+
+        self.image = tk.PhotoImage(master=self.window, width=PLANE_SIZE, height=PLANE_SIZE)
+        self.canvas = tk.Canvas(self.window, width=PLANE_SIZE, height=PLANE_SIZE,
+                                highlightthickness=0, cursor='crosshair')
+        self.canvas.pack(padx=8, pady=(0, 8))
+        self.canvas.create_image(0, 0, image=self.image, anchor='nw')
+        radius = self.MARKER_RADIUS
+        self.marker_outer = self.canvas.create_oval(-radius, -radius, radius, radius,
+                                                    outline='#000000', width=3)
+        self.marker_inner = self.canvas.create_oval(-radius, -radius, radius, radius,
+                                                    outline='#FFFFFF', width=1)
+        self.canvas.bind('<Button-1>', self.on_drag)
+        self.canvas.bind('<B1-Motion>', self.on_drag)
+
+    def show_color(self, r, g, b):
+        """Show the plane through (r, g, b) and mark where it is."""
+        rgb_values = (r, g, b)
+        if rgb_values != self._picked:
+            # Colors picked on the plane keep its hue/fixed channel, so the
+            # plane doesn't shift under the pointer from rounding
+            fixed = fixed_value(self.mode, rgb_values)
+            if fixed is not None or self.fixed is None:
+                self.show_plane(fixed or 0)
+        if rgb_values != self.rgb:
+            self.rgb = rgb_values
+            x, y = plane_position(self.mode, rgb_values)
+            radius = self.MARKER_RADIUS
+            self.canvas.coords(self.marker_outer, x - radius, y - radius, x + radius, y + radius)
+            self.canvas.coords(self.marker_inner, x - radius, y - radius, x + radius, y + radius)
+
+    def show_plane(self, fixed):
+        """Load the plane image for fixed, unless it is already shown."""
+        if fixed == self.fixed:
+            return
+        self.fixed = fixed
+        self.image.configure(data=plane_ppm(self.mode, fixed), format='PPM')
+        unit = "°" if self.mode == HUE_PLANE else ""
+        self.fixed_label.config(text=f"{fixed}{unit}")
+
+    def on_mode_change(self, event=None):
+        """Switch to the plane chosen in the mode dropdown."""
+        self.mode = self.mode_combobox.get()
+        self.fixed = None
+        self._picked = None
+        if self.rgb is not None:
+            rgb_values, self.rgb = self.rgb, None
+            self.show_color(*rgb_values)
+
+    def on_drag(self, event):
+        """Pick the color under the pointer."""
+        if self.fixed is None:
+            return
+        self._picked = plane_color(self.mode, self.fixed, event.x, event.y)
+        self.on_pick(*self._picked)
+
+    def show(self):
+        """Bring the window back."""
+        self.shown = True
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        """Hide the window (it stops following the color), keeping its mode for next time."""
+        self.shown = False
+        self.window.withdraw()
+
+
+class ColorSpaceWindow:
+    """Toplevel with HSV, HSL, OKLCh and CMYK sliders that follow and set the current color.
+
+    Each space keeps its own slider positions, so a slider that doesn't
+    affect the color (the hue of a gray, say) stays where it is. Dragging a
+    slider looks its color up in a cached per-slider table (see
+    color_space.channel_color), and widgets are only touched when the
+    position they show changed.
+    """
+
+    # Slider length in pixels
+    SLIDER_LENGTH = 256
+
+    def __init__(self, root, on_pick):
+        """Create the window next to root; on_pick(r, g, b) is called as the user drags a slider."""
+        self.on_pick = on_pick
+        self.packed = None                         # color the sliders show
+        self.positions = dict.fromkeys(SPACE_NAMES)  # space -> slider positions
+        self._picked = None      # (space, packed color) last produced by a slider here
+        self.variables = {}      # (space, channel) -> slider variable
+        self.value_labels = {}   # (space, channel) -> label showing the slider's value
+        self._slider_positions = {}  # (space, channel) -> position the slider shows
+        self._label_positions = {}   # (space, channel) -> position its label shows
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Color Spaces")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.shown = True
+
+        for row, space in enumerate(SPACE_NAMES):
+            frame = ttk.LabelFrame(self.window, text=space, padding=(8, 4))
+            frame.grid(row=row, column=0, sticky='ew', padx=8, pady=(8 if row == 0 else 0, 6))
+            for channel, (label, highest, _, _) in enumerate(space_channels(space)):
+                key = (space, channel)
+                ttk.Label(frame, text=label, width=2).grid(row=channel, column=0)
+                self.variables[key] = tk.IntVar(master=self.window, value=0)
+                ttk.Scale(frame, from_=0, to=highest, variable=self.variables[key],
+                          orient='horizontal', length=self.SLIDER_LENGTH,
+                          command=lambda value, key=key: self.on_slide(key, value)
+                          ).grid(row=channel, column=1, padx=5)
+                self.value_labels[key] = ttk.Label(frame, width=6, anchor='e',
+                                                   font=('Courier', 10))
+                self.value_labels[key].grid(row=channel, column=2)
+
+    def show_color(self, r, g, b):
+        """Move every slider set to (r, g, b)."""
+        packed = (r << 16) | (g << 8) | b
+        if packed == self.packed:
+            return
+        self.packed = packed
+        for space in SPACE_NAMES:
+            if self._picked != (space, packed):
+                self.positions[space] = sync_positions(space, packed, self.positions[space])
+            # The space a color was picked in keeps the positions that produced it
+            self.show_positions(space)
+
+    def show_positions(self, space):
+        """Push a space's positions to the sliders and labels that show something else."""
+        for channel, position in enumerate(self.positions[space]):
+            key = (space, channel)
+            if self._slider_positions.get(key) != position:
+                self._slider_positions[key] = position
+                self.variables[key].set(position)
+            if self._label_positions.get(key) != position:
+                self._label_positions[key] = position
+                self.value_labels[key].config(text=position_labels(space, channel)[position])
+
+    def on_slide(self, key, value):
+        """Pick the color at a slider's new position."""
+        space, channel = key
+        positions = self.positions[space]
+        position = int(round(float(value)))
+        if positions is None or positions[channel] == position:
+            return
+        positions = positions[:channel] + (position,) + positions[channel + 1:]
+        self.positions[space] = positions
+        # The slider is already there; its label follows with the next repaint
+        self._slider_positions[key] = position
+        packed = channel_color(space, channel, positions, position)
+        self._picked = (space, packed)
+        if packed == self.packed:
+            # Same color (e.g. the hue of a gray), so there is no repaint to wait for
+            self.show_positions(space)
+            return
+        self.on_pick(*unpack_rgb(packed))
+
+    def show(self):
+        """Bring the window back."""
+        self.shown = True
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        """Hide the window (it stops following the color)."""
+        self.shown = False
+        self.window.withdraw()
+
+
+class ContrastWindow:
+    """Toplevel rating the current color's contrast against every color of the palette.
+
+    The palette is indexed by luminance once (see color_contrast.ContrastIndex),
+    so the pass/fail counts and the lowest-contrast rows cost a few bisections
+    per color change, however large the palette is.
+    """
+
+    # Palette colors listed, lowest contrast first
+    ROWS = 12
+
+    # Threshold choices -> minimum contrast ratio
+    THRESHOLDS = {"AA (4.5:1)": AA, "AAA (7:1)": AAA, "AA Large (3:1)": AA_LARGE}
+
+    # Text color of rows below the threshold
+    FAIL_COLOR = '#B00000'
+
+    def __init__(self, root, palette, on_pick):
+        """Create the window next to root; on_pick(r, g, b) applies a suggested color."""
+        self.palette = palette
+        self.on_pick = on_pick
+        self.index = None        # built when the window first shows a color
+        self.rgb = None          # current color
+        self.rows = []           # (palette position, ratio) of the listed rows
+        self.suggestion = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Contrast")
+        self.window.resizable(False, False)
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.shown = True
+
+        top_frame = ttk.Frame(self.window, padding=(8, 6))
+        top_frame.pack(fill='x')
+        ttk.Label(top_frame, text="Minimum:").pack(side='left')
+        self.threshold_combobox = ttk.Combobox(top_frame, values=list(self.THRESHOLDS),
+                                               state="readonly", width=15)
+        self.threshold_combobox.set(next(iter(self.THRESHOLDS)))
+        self.threshold_combobox.pack(side='left', padx=(5, 10))
+        self.threshold_combobox.bind('<<ComboboxSelected>>', lambda e: self.refresh())
+        # APCA is directional: it depends on which color is the text
+        self.as_text = tk.BooleanVar(master=self.window, value=True)
+        ttk.Checkbutton(top_frame, text="Current color is the text", variable=self.as_text,
+                        command=self.refresh).pack(side='left')
+
+        self.summary_label = ttk.Label(self.window, font=('Courier', 10), padding=(8, 0))
+        self.summary_label.pack(fill='x')
+
+        self.listbox = tk.Listbox(self.window, height=self.ROWS, width=62, font=('Courier', 10),
+                                  activestyle='none', exportselection=False)
+        self.listbox.pack(padx=8, pady=6)
+        self.listbox.bind('<<ListboxSelect>>', lambda e: self.show_suggestion())
+
+        suggestion_frame = ttk.Frame(self.window, padding=(8, 0, 8, 8))
+        suggestion_frame.pack(fill='x')
+        self.suggestion_label = ttk.Label(suggestion_frame, width=48)
+        self.suggestion_label.pack(side='left')
+        self.suggestion_button = ttk.Button(suggestion_frame, text="Use Suggestion",
+                                            command=self.use_suggestion, state='disabled')
+        self.suggestion_button.pack(side='right')
+
+    @property
+    def minimum(self):
+        """Return the selected minimum contrast ratio."""
+        return self.THRESHOLDS[self.threshold_combobox.get()]
+
+    def set_palette(self, palette):
+        """Rate against a different palette."""
+        self.palette = palette
+        self.index = None
+        if self.rgb is not None and self.shown:
+            self.refresh()
+
+    def show_color(self, r, g, b):
+        """Rate (r, g, b) against the palette."""
+        if (r, g, b) != self.rgb:
+            self.rgb = (r, g, b)
+            self.refresh()
+
+    def refresh(self):
+        """Recount the ratings and relist the lowest-contrast palette colors."""
+        if self.rgb is None:
+            return
+        if self.index is None:
+            palette = self.palette
+            self.index = ContrastIndex(palette.packed(index) for index in range(len(palette)))
+        minimum = self.minimum
+        counts = self.index.rating_counts(self.rgb)
+        failing = self.index.count_below(self.rgb, minimum)
+        self.summary_label.config(
+            text=f"{len(self.index) - failing} pass, {failing} fail  |  "
+                 + "  ".join(f"{rating}: {count}" for rating, count in counts.items()))
+
+        self.rows = self.index.lowest(self.rgb, self.ROWS)
+        self.listbox.delete(0, tk.END)
+        for row, (position, ratio) in enumerate(self.rows):
+            rgb_values = self.palette.rgb(position)
+            if self.as_text.get():
+                lightness_contrast = apca_contrast(self.rgb, rgb_values)
+            else:
+                lightness_contrast = apca_contrast(rgb_values, self.rgb)
+            name = self.palette.name(position)
+            self.listbox.insert(tk.END, "{:<22.22} #{:02X}{:02X}{:02X} {:6.2f}:1 {:<8} Lc {:6.1f}".format(
+                name, *rgb_values, ratio, wcag_rating(ratio), lightness_contrast))
+            if ratio < minimum:
+                self.listbox.itemconfigure(row, foreground=self.FAIL_COLOR)
+        if self.rows:
+            self.listbox.selection_set(0)
+        self.show_suggestion()
+
+    def show_suggestion(self):
+        """Suggest the closest color to the current one that passes against the selected row."""
+        self.suggestion = None
+        selection = self.listbox.curselection()
+        row = selection[0] if selection else 0
+        if self.rgb is None or row >= len(self.rows):
+            self.suggestion_label.config(text="")
+        else:
+            position, ratio = self.rows[row]
+            name = self.palette.name(position)
+            if ratio >= self.minimum:
+                self.suggestion_label.config(text=f"Passes on {name}")
+            else:
+                found = nearest_passing(self.rgb, self.palette.rgb(position), self.minimum)
+                if found is None:
+                    self.suggestion_label.config(text=f"No lightness passes on {name}")
+                else:
+                    self.suggestion, ratio = found
+                    self.suggestion_label.config(
+                        text="On {}: use #{:02X}{:02X}{:02X} ({:.2f}:1)".format(
+                            name, *self.suggestion, ratio))
+        self.suggestion_button.configure(state='normal' if self.suggestion else 'disabled')
+
+    def use_suggestion(self):
+        """Apply the suggested color."""
+        if self.suggestion is not None:
+            self.on_pick(*self.suggestion)
+
+    def show(self):
+        """Bring the window back."""
+        self.shown = True
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        """Hide the window (it stops following the color)."""
+        self.shown = False
+        self.window.withdraw()
+
+
+class ImageHistogramWindow:
+    """Toplevel that counts an image's colors and shows the most common ones as swatches.
+
+    The image is scanned one strip per event-loop turn, so the explorer stays
+    responsive while large images are analyzed.
+    """
+
+    # Swatches shown, and how many fit in a row
+    TOP_COLORS = 32
+    COLUMNS = 8
+    
+    # Colors in a palette extracted with "Use as Palette"
+    PALETTE_COLORS = 16
+
+    def __init__(self, root, on_pick, on_palette=None):
+        """Create the window next to root.
+
+        on_pick(r, g, b) is called when a swatch is clicked, and
+        on_palette(palette) with the image's dominant colors on "Use as Palette".
+        """
+        self.on_pick = on_pick
+        self.on_palette = on_palette
+        self.path = None
+        self.histogram = None
+        self.photo = None      # Tk image being read back (non-PNM formats)
+        self._strips = None
+        self._job = None
+        self._size = (0, 0)
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Image Colors")
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+
+        top_frame = ttk.Frame(self.window, padding=(8, 6))
+        top_frame.pack(fill='x')
+        ttk.Button(top_frame, text="Open Image...", command=self.choose_image).pack(side='left')
+        self.file_label = ttk.Label(top_frame, text="No image")
+        self.file_label.pack(side='left', padx=(10, 0))
+        self.palette_button = ttk.Button(top_frame, text="Use as Palette", state='disabled',
+                                         command=self.use_as_palette)
+        if on_palette is not None:
+            self.palette_button.pack(side='right')
+        self.status_label = ttk.Label(self.window, padding=(8, 0), font=('Arial', 10))
+        self.status_label.pack(fill='x')
+
+        swatch_frame = ttk.Frame(self.window, padding=8)
+        swatch_frame.pack(fill='both', expand=True)
+        self.swatches = []
+        for position in range(self.TOP_COLORS):
+            swatch = tk.Label(swatch_frame, width=9, height=2, relief='solid', borderwidth=1,
+                              font=('Courier', 8), text="")
+            swatch.grid(row=position // self.COLUMNS, column=position % self.COLUMNS,
+                        padx=2, pady=2)
+            swatch.bind('<Button-1>', lambda e, p=position: self.on_swatch_click(p))
+            self.swatches.append(swatch)
+        self.top_colors = []
+
+    def choose_image(self):
+        """Ask for an image file and analyze it."""
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(
+            parent=self.window, title="Analyze Image",
+            filetypes=[("Images", "*.ppm *.pgm *.pnm *.png *.gif"), ("All files", "*.*")])
+        if path:
+            self.analyze(path)
+
+    def analyze(self, path):
+        """Start counting the colors of an image file (PPM/PGM natively, others through Tk)."""
+        self.cancel()
+        self.path = path
+        self.palette_button.config(state='disabled')
+        self.file_label.config(text=os.path.basename(path))
+        try:
+            if os.path.splitext(path)[1].lower() in PNM_EXTENSIONS:
+                self.photo = None
+                width, height, self._strips = iter_pnm_strips(path)
+            else:
+                self.photo = tk.PhotoImage(master=self.window, file=path)
+                width, height = self.photo.width(), self.photo.height()
+                self._strips = iter_photo_strips(self.photo)
+        except (OSError, ValueError, tk.TclError) as e:
+            self.status_label.config(text=f"Could not read image: {e}")
+            return
+        if not width or not height:
+            self.status_label.config(text="The image is empty")
+            self.cancel()
+            return
+        self._size = (width, height)
+        self.histogram = ColorHistogram()
+        self.status_label.config(text="Scanning...")
+        self._job = self.window.after_idle(self.scan_step)
+
+    def scan_step(self):
+        """Count the next strip and schedule the one after it."""
+        self._job = None
+        try:
+            strip = next(self._strips)
+        except StopIteration:
+            self.finish()
+            return
+        except (OSError, ValueError, tk.TclError) as e:
+            self.status_label.config(text=f"Could not read image: {e}")
+            self.cancel()
+            return
+        self.histogram.add(strip)
+        width, height = self._size
+        self.status_label.config(
+            text=f"Scanning... {self.histogram.pixels / (width * height):.0%}")
+        self._job = self.window.after(1, self.scan_step)
+
+    def finish(self):
+        """Show the scan results and the most common colors."""
+        histogram = self.histogram
+        width, height = self._size
+        self.status_label.config(
+            text=f"{width}×{height}: {histogram.unique:,} unique colors "
+                 f"({histogram.megapixels_per_second:.1f} MP/s)")
+        self.top_colors = histogram.top(self.TOP_COLORS)
+        for position, swatch in enumerate(self.swatches):
+            if position < len(self.top_colors):
+                packed, pixels = self.top_colors[position]
+                share = pixels / histogram.pixels
+                swatch.config(bg=f"#{packed:06X}", fg=_text_color(packed),
+                              text=f"#{packed:06X}\n{share:.1%}")
+            else:
+                swatch.config(bg='#f0f0f0', fg='#000000', text="")
+        self._strips = None
+        self.photo = None
+        self.palette_button.config(state='normal')
+
+    def use_as_palette(self):
+        """Reduce the scanned image to its dominant colors and hand them over as a palette."""
+        if self.histogram is None or self._strips is not None:
+            return
+        title = os.path.splitext(os.path.basename(self.path))[0]
+        swatches = median_cut(quantize_histogram(self.histogram), self.PALETTE_COLORS)
+        self.on_palette(Palette.from_pairs(palette_pairs(title, swatches), title))
+
+    def cancel(self):
+        """Stop a scan in progress."""
+        if self._job is not None:
+            self.window.after_cancel(self._job)
+            self._job = None
+        if self._strips is not None:
+            self._strips.close()
+            self._strips = None
+        self.photo = None
+
+    def on_swatch_click(self, position):
+        """Apply a swatch's color."""
+        if position < len(self.top_colors):
+            self.on_pick(*unpack_rgb(self.top_colors[position][0]))
+
+    def show(self):
+        """Bring the window back."""
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        """Hide the window, stopping any scan in progress."""
+        self.cancel()
+        self.window.withdraw()
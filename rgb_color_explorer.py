@@ -6,82 +6,137 @@ A GUI application that allows users to explore colors using RGB sliders.
 Features red, green, and blue sliders that control a large color display square.
 """
 
-import tkinter as tk
-from tkinter import ttk
+import argparse
+import random
 import sys
+import time
+
+from color_animation import ChannelSweep, FrameClock, speed_to_rate
+from color_contrast import packed_luminance
+from color_batch import DEFAULT_CHUNK_SIZE, OUTPUT_FORMATS, run_batch
+from color_core import (COMMON_COLORS, CUSTOM_COLOR, extract_color_name,
+                        format_dropdown_label, parse_color_value, rgb_to_hex)
+from color_difference import CIEDE2000, METRIC_NAMES
+from color_distinct import RECENT_COLORS, distinct_from, distinct_palette, spacing_for
+from color_history import ColorHistory
+from color_index import NearestColorIndex, index_for_palette
+import color_control
+import color_instrumentation
+from color_instrumentation import InstrumentationOverlay, StartupProfile, mark_startup
+from color_palette import Palette, open_palette, unpack_rgb
+from color_search import ColorSearch, TypeAhead
+from color_state import CHANNEL_LABELS, DEFAULT_COLOR, ColorState, hex_color
+from color_render import TRACK_HEIGHT, TRACK_WIDTH, FrameRenderer, GradientTrack, WidgetState
+from color_vision import (CONFUSION_DELTA_E, DEFICIENCIES, DEFICIENCY_LABELS, METHODS, VIENOT,
+                          simulate_packed)
+
+# tkinter is imported when the first window is created (see load_tkinter),
+# so importing this module works on machines without a display
+tk = None
+ttk = None
+
+
+def load_tkinter():
+    """Import tkinter on first use and return the (tk, ttk) modules."""
+    global tk, ttk
+    if tk is None:
+        import tkinter
+        from tkinter import ttk as tkinter_ttk
+        tk, ttk = tkinter, tkinter_ttk
+    return tk, ttk
 
 
 class RGBColorExplorer:
     """Main application class for the RGB Color Explorer."""
     
-    # Common color names and their RGB values
-    COMMON_COLORS = {
-        "Custom Color": None,  # Default selection - no auto-change
-        "Azure": (240, 255, 255),
-        "Black": (0, 0, 0),
-        "Blue": (0, 0, 255),
-        "Brown": (165, 42, 42),
-        "Chartreuse": (127, 255, 0),
-        "Coral": (255, 127, 80),
-        "Crimson": (220, 20, 60),
-        "Cyan": (0, 255, 255),
-        "Gold": (255, 215, 0),
-        "Gray": (128, 128, 128),
-        "Green": (0, 128, 0),
-        "Indigo": (75, 0, 130),
-        "Ivory": (255, 255, 240),
-        "Khaki": (240, 230, 140),
-        "Lavender": (230, 230, 250),
-        "Lemon": (255, 250, 205),
-        "Lime": (0, 255, 0),
-        "Magenta": (255, 0, 255),
-        "Maroon": (128, 0, 0),
-        "Mint": (245, 255, 250),
-        "Navy": (0, 0, 128),
-        "Olive": (128, 128, 0),
-        "Orange": (255, 165, 0),
-        "Peach": (255, 218, 185),
-        "Pink": (255, 192, 203),
-        "Plum": (221, 160, 221),
-        "Purple": (128, 0, 128),
-        "Red": (255, 0, 0),
-        "Rose": (255, 102, 204),
-        "Salmon": (250, 128, 114),
-        "Silver": (192, 192, 192),
-        "Spring Green": (0, 255, 127),
-        "Tan": (210, 180, 140),
-        "Teal": (0, 128, 128),
-        "Turquoise": (64, 224, 208),
-        "Violet": (238, 130, 238),
-        "Wheat": (245, 222, 179),
-        "White": (255, 255, 255),
-        "Yellow": (255, 255, 0),
+    # Common color names and their RGB values (shared with color_core)
+    COMMON_COLORS = COMMON_COLORS
+    
+    # Largest CIEDE2000 difference still treated as the named color itself
+    # (1.0 is roughly one just-noticeable difference)
+    MATCH_THRESHOLD = 1.0
+    
+    # Target frame rate for color animation
+    ANIMATION_FPS = 60
+    
+    # Palettes larger than this are only listed in the palette browser;
+    # the dropdown would otherwise have to format and hold every entry
+    COMBOBOX_LIMIT = 500
+    
+    # Entries shown in the history strip, and the width of each in pixels
+    HISTORY_STRIP_SIZE = 24
+    HISTORY_CELL_WIDTH = 20
+    
+    # How often a running export's progress is shown, in milliseconds
+    EXPORT_POLL_MS = 100
+    
+    # How often commands from the control server are applied: once per frame
+    CONTROL_POLL_MS = 1000 // ANIMATION_FPS
+    
+    # Size of each swatch in the color-vision panel
+    VISION_SWATCH_WIDTH = 90
+    VISION_SWATCH_HEIGHT = 48
+    
+    # Handlers timed when instrumentation is enabled
+    INSTRUMENTED_METHODS = ("update_color", "render", "on_scale_change",
+                            "on_entry_change", "animate_color")
+    
+    # Initial window size, optimized for 1366x768 screens
+    WINDOW_SIZE = (750, 650)
+    
+    # Secondary panels, built the first time they are opened rather than at
+    # startup: name -> (title, method that fills the panel's frame). Each gets
+    # a toggle button in the panel bar and a row below it.
+    PANELS = {
+        "animation": ("Color Animation", "create_animation_panel"),
+        "history": ("History", "create_history_panel"),
+        "vision": ("Color Vision", "create_vision_panel"),
     }
     
-    def __init__(self, root):
-        """Initialize the RGB Color Explorer application."""
+    # Grid row of the panel bar in the main frame; panels go in the rows after it
+    PANEL_ROW = 8
+    
+    def __init__(self, root, instrumentation=None, clock=time.monotonic, startup_profile=None):
+        """Initialize the RGB Color Explorer application.
+        
+        startup_profile, a color_instrumentation.StartupProfile, gets a mark
+        at the end of each construction phase.
+        """
+        load_tkinter()
         self.root = root
+        self.startup_profile = startup_profile
+        
+        # Optional call counting, latency histograms and event-loop lag tracking;
+        # handlers are wrapped before any widget or timer holds a reference to them
+        self.instrumentation = instrumentation
+        self.instrumentation_overlay = None
+        if instrumentation is not None:
+            instrumentation.instrument(self, self.INSTRUMENTED_METHODS)
+            instrumentation.watch_event_loop(self.root)
+            self.root.bind('<F12>', self.toggle_instrumentation_overlay)
         self.root.title("RGB Color Explorer")
         
         # Configure window close behavior for proper cleanup
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-        # Set optimal window size to fit on smaller screens (1366x768)
-        self.root.geometry("750x650")  # Optimized for 1366x768 screens
+        # Size and center the window in one geometry call
+        self.center_window()
         self.root.minsize(650, 600)  # Minimum size to maintain usability
         self.root.resizable(True, True)
         
-        # Center the window on screen
-        self.center_window()
-        
         # Optional: Start maximized for the best experience
         # Uncomment the next line if you prefer to start maximized
         # self.root.state('zoomed')  # Linux/Windows maximized
         
         # Configure the main window
         self.root.configure(bg='#f0f0f0')
+        mark_startup(startup_profile, "window")
+        
+        # The current color, packed into one integer; every change repaints once
+        self.color = ColorState(DEFAULT_COLOR)
+        self.color.subscribe(self.on_color_change)
         
-        # RGB values (0-255)
+        # Slider positions (0-255), written from the color state when repainting
         self.red_var = tk.IntVar(value=128)
         self.green_var = tk.IntVar(value=128)
         self.blue_var = tk.IntVar(value=128)
@@ -92,34 +147,108 @@ class RGBColorExplorer:
         self.animate_blue = tk.BooleanVar(value=False)
         self.animation_active = False
         self.animation_direction = {"red": 1, "green": 1, "blue": 1}  # 1 for increasing, -1 for decreasing
-        self.animation_speed = 2  # pixels per update (adjustable)
-        self.animation_timer = None
-        
-        # Set up the GUI
+        self.animation_job = None
+        self.animation_speed = 3  # 1-10, shown on the speed slider once the panel exists
+        
+        # Channel values are computed from elapsed time, ticks run on a frame clock
+        self.sweep = ChannelSweep(clock=clock, rate=self.sweep_rate(self.animation_speed))
+        self.frame_clock = FrameClock(self.ANIMATION_FPS, clock=clock)
+        self.animated_values = {}  # last value written to each animated channel
+        
+        # Active palette (loaded lazily) and its nearest-named-color lookup,
+        # queried on every color change
+        self.palette = Palette.from_dict(self.COMMON_COLORS, "Common Colors")
+        self.nearest_index = NearestColorIndex(self.palette)
+        self.palette_window = None  # created the first time it is opened
+        self.swatch_window = None   # canvas grid of the whole palette, also created on first use
+        self.plane_window = None    # 2D color-plane picker, also created on first use
+        self.space_window = None    # HSV/HSL/OKLCh/CMYK sliders, also created on first use
+        self.contrast_window = None  # WCAG/APCA contrast against the palette, also on first use
+        self.image_window = None    # image color histogram, also created on first use
+        self.export_job = None      # background export started from the Tools menu, if any
+        
+        # Local control endpoint (--control), if one was started
+        self.control_server = None
+        self.control_job = None
+        
+        # Name/hex search over the palette, driven by typing in the dropdown
+        self.clock = clock
+        self.search = ColorSearch(self.palette)
+        self.type_ahead = TypeAhead(self.search, clock=clock)
+        
+        # Repaints are coalesced to one per frame and only touch changed widgets
+        self.widget_state = WidgetState()
+        self.renderer = FrameRenderer(self.root, self.render, clock=clock)
+        self.combobox_dirty = False
+        self.gradient_tracks = {}  # channel name -> GradientTrack under its slider
+        
+        # Undo/redo history of packed colors, starting with the initial gray
+        self.history = ColorHistory(clock=clock)
+        
+        # Random colors; in distinct mode they keep away from the recent history
+        self.rng = random.Random()
+        self.distinct_random = tk.BooleanVar(value=False)
+        
+        # Secondary panels that have been built, and those on screen
+        self.panels = {}
+        self.panel_buttons = {}
+        self.shown_panels = set()
+        self.vision_swatches = {}  # deficiency -> swatch, once the panel is built
+        mark_startup(startup_profile, "state")
+        
+        # Set up the GUI and paint the initial color right away
         self.create_widgets()
-        self.update_color()
+        mark_startup(startup_profile, "widgets")
+        self.record_history()
+        self.renderer.flush()
+        mark_startup(startup_profile, "first paint")
         
     def get_dropdown_values(self):
         """Generate dropdown values with color names and hex codes."""
-        dropdown_values = []
-        for color_name, rgb_values in self.COMMON_COLORS.items():
-            if rgb_values is None:
-                # Custom Color entry
-                dropdown_values.append(color_name)
-            else:
-                r, g, b = rgb_values
-                hex_code = f"#{r:02X}{g:02X}{b:02X}"
-                dropdown_values.append(f"{color_name} ({hex_code})")
-        return dropdown_values
+        if len(self.palette) > self.COMBOBOX_LIMIT:
+            # Large palettes are picked from the palette browser instead
+            return [CUSTOM_COLOR]
+        return [CUSTOM_COLOR] + [self.palette.label(index)
+                                 for index in range(len(self.palette))]
         
     def extract_color_name(self, dropdown_text):
         """Extract the color name from dropdown text that includes hex code."""
-        if '(' in dropdown_text:
-            return dropdown_text.split(' (')[0]
-        return dropdown_text
+        return extract_color_name(dropdown_text)
+        
+    def create_menu(self):
+        """Create the menu bar with the palette and image tools."""
+        menubar = tk.Menu(self.root)
+        tools_menu = tk.Menu(menubar, tearoff=False)
+        tools_menu.add_command(label="Browse Palette", command=self.open_palette_browser)
+        tools_menu.add_command(label="Swatch Board", command=self.open_swatch_board)
+        tools_menu.add_command(label="Load Palette...", command=self.load_palette)
+        tools_menu.add_command(label="Generate Distinct Colors...",
+                               command=self.generate_distinct_palette)
+        tools_menu.add_command(label="Color Plane", command=self.open_color_plane)
+        tools_menu.add_command(label="Color Spaces", command=self.open_color_spaces)
+        tools_menu.add_command(label="Contrast", command=self.open_contrast)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Analyze Image...", command=self.open_image_histogram)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="Export Color...", command=lambda: self.export_colors('color'))
+        tools_menu.add_command(label="Export History...", command=lambda: self.export_colors('history'))
+        tools_menu.add_command(label="Export Palette...", command=lambda: self.export_colors('palette'))
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        edit_menu = tk.Menu(menubar, tearoff=False)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        edit_menu.add_separator()
+        edit_menu.add_checkbutton(label="Distinct Random Colors", variable=self.distinct_random)
+        menubar.insert_cascade(0, label="Edit", menu=edit_menu)
+        self.root.config(menu=menubar)
+        self.root.bind('<Control-z>', self.undo)
+        self.root.bind('<Control-y>', self.redo)
+        self.root.bind('<Control-Z>', self.redo)  # Ctrl+Shift+Z
         
     def create_widgets(self):
         """Create and arrange all GUI widgets."""
+        self.create_menu()
+        
         # Main frame with reduced padding for compact layout
         main_frame = ttk.Frame(self.root, padding="15")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -145,7 +274,7 @@ class RGBColorExplorer:
                                           values=self.get_dropdown_values(),
                                           state="readonly", width=25)
         self.color_combobox.grid(row=0, column=1, padx=(0, 10))
-        self.color_combobox.set("Custom Color")  # Default selection
+        self.color_combobox.set(CUSTOM_COLOR)  # Default selection
         self.color_combobox.bind('<<ComboboxSelected>>', self.on_color_selected)
         
         # Add keyboard navigation for real-time color changes
@@ -154,6 +283,10 @@ class RGBColorExplorer:
         self.color_combobox.bind('<Down>', self.on_combobox_navigate)
         self.color_combobox.bind('<Return>', self.on_color_selected)
         
+        # Closest named color to the current slider values
+        self.nearest_label = ttk.Label(color_selection_frame, font=('Arial', 10))
+        self.nearest_label.grid(row=0, column=2)
+        
         # Color display area (maximum width spanning nearly the full window)
         self.color_frame = tk.Frame(main_frame, width=680, height=120, 
                                    relief='solid', borderwidth=2)
@@ -174,8 +307,9 @@ class RGBColorExplorer:
         ttk.Label(red_frame, text="0").grid(row=0, column=0, padx=(0, 5))
         self.red_scale = ttk.Scale(red_frame, from_=0, to=255, 
                                   variable=self.red_var, orient='horizontal',
-                                  command=self.on_scale_change)
+                                  command=lambda value: self.on_scale_change('red', value))
         self.red_scale.grid(row=0, column=1, sticky='ew', padx=5)
+        self.create_gradient_track('red', red_frame, self.red_scale, 0)
         ttk.Label(red_frame, text="255").grid(row=0, column=2, padx=(5, 0))
         
         self.red_value_label = ttk.Label(red_frame, text="0x80", 
@@ -197,8 +331,9 @@ class RGBColorExplorer:
         ttk.Label(green_frame, text="0").grid(row=0, column=0, padx=(0, 5))
         self.green_scale = ttk.Scale(green_frame, from_=0, to=255, 
                                     variable=self.green_var, orient='horizontal',
-                                    command=self.on_scale_change)
+                                    command=lambda value: self.on_scale_change('green', value))
         self.green_scale.grid(row=0, column=1, sticky='ew', padx=5)
+        self.create_gradient_track('green', green_frame, self.green_scale, 1)
         ttk.Label(green_frame, text="255").grid(row=0, column=2, padx=(5, 0))
         
         self.green_value_label = ttk.Label(green_frame, text="0x80", 
@@ -220,8 +355,9 @@ class RGBColorExplorer:
         ttk.Label(blue_frame, text="0").grid(row=0, column=0, padx=(0, 5))
         self.blue_scale = ttk.Scale(blue_frame, from_=0, to=255, 
                                    variable=self.blue_var, orient='horizontal',
-                                   command=self.on_scale_change)
+                                   command=lambda value: self.on_scale_change('blue', value))
         self.blue_scale.grid(row=0, column=1, sticky='ew', padx=5)
+        self.create_gradient_track('blue', blue_frame, self.blue_scale, 2)
         ttk.Label(blue_frame, text="255").grid(row=0, column=2, padx=(5, 0))
         
         self.blue_value_label = ttk.Label(blue_frame, text="0x80", 
@@ -245,11 +381,53 @@ class RGBColorExplorer:
                   command=self.random_color).grid(row=0, column=1, padx=5)
         ttk.Button(button_frame, text="Copy RGB", 
                   command=self.copy_rgb).grid(row=0, column=2, padx=5)
-        
-        # Animation Controls
-        animation_frame = ttk.LabelFrame(main_frame, text="Color Animation", padding="8")
-        animation_frame.grid(row=8, column=0, columnspan=2, sticky='ew', pady=(15, 0))
-        
+        ttk.Button(button_frame, text="Browse Palette", 
+                  command=self.open_palette_browser).grid(row=0, column=3, padx=5)
+        ttk.Button(button_frame, text="Load Palette...", 
+                  command=self.load_palette).grid(row=0, column=4, padx=5)
+        ttk.Button(button_frame, text="Color Plane", 
+                  command=self.open_color_plane).grid(row=0, column=5, padx=5)
+        
+        # Buttons that open the secondary panels (built on first use)
+        self.main_frame = main_frame
+        panel_bar = ttk.Frame(main_frame)
+        panel_bar.grid(row=self.PANEL_ROW, column=0, columnspan=2, sticky='w', pady=(10, 0))
+        for column, (name, (title, _)) in enumerate(self.PANELS.items()):
+            button = ttk.Button(panel_bar, text=f"▸ {title}",
+                                command=lambda name=name: self.toggle_panel(name))
+            button.grid(row=0, column=column, padx=(0, 5))
+            self.panel_buttons[name] = button
+        
+    def toggle_panel(self, name):
+        """Show a secondary panel if it is hidden, otherwise hide it."""
+        if name in self.shown_panels:
+            self.close_panel(name)
+        else:
+            self.open_panel(name)
+        
+    def open_panel(self, name):
+        """Show a secondary panel below the panel bar, building it the first time; returns its frame."""
+        title, builder = self.PANELS[name]
+        panel = self.panels.get(name)
+        if panel is None:
+            panel = ttk.LabelFrame(self.main_frame, text=title, padding="8")
+            getattr(self, builder)(panel)
+            self.panels[name] = panel
+        row = self.PANEL_ROW + 1 + list(self.PANELS).index(name)
+        panel.grid(row=row, column=0, columnspan=2, sticky='ew', pady=(8, 0))
+        self.panel_buttons[name].config(text=f"▾ {title}")
+        self.shown_panels.add(name)
+        return panel
+        
+    def close_panel(self, name):
+        """Hide a secondary panel, keeping its widgets for next time."""
+        if name in self.shown_panels:
+            self.panels[name].grid_remove()
+            self.panel_buttons[name].config(text=f"▸ {self.PANELS[name][0]}")
+            self.shown_panels.discard(name)
+        
+    def create_animation_panel(self, animation_frame):
+        """Fill the animation panel: channel checkboxes, start/stop and speed."""
         # Animation mode selection
         ttk.Label(animation_frame, text="Auto-sweep channels:", 
                  font=('Arial', 10, 'bold')).grid(row=0, column=0, padx=(0, 15))
@@ -275,20 +453,68 @@ class RGBColorExplorer:
         ttk.Label(speed_frame, text="Speed:").grid(row=0, column=0, padx=(0, 5))
         self.speed_scale = ttk.Scale(speed_frame, from_=1, to=10, orient='horizontal', 
                                     length=150, command=self.on_speed_change)
-        self.speed_scale.set(3)  # Default speed
+        self.speed_scale.set(self.animation_speed)
         self.speed_scale.grid(row=0, column=1, padx=5)
         ttk.Label(speed_frame, text="Slow").grid(row=0, column=2, padx=(5, 0))
         ttk.Label(speed_frame, text="Fast").grid(row=0, column=3, padx=(15, 0))
         
-    def on_scale_change(self, event=None):
+    def create_history_panel(self, history_frame):
+        """Fill the history panel: recent colors, the current one outlined; click one to go back to it."""
+        cell = self.HISTORY_CELL_WIDTH
+        self.history_canvas = tk.Canvas(history_frame, width=cell * self.HISTORY_STRIP_SIZE,
+                                        height=18, highlightthickness=0, bg='#f0f0f0')
+        self.history_canvas.grid(row=0, column=0)
+        self.history_cells = [
+            self.history_canvas.create_rectangle(i * cell + 1, 2, (i + 1) * cell - 2, 16,
+                                                 outline='', fill='#f0f0f0')
+            for i in range(self.HISTORY_STRIP_SIZE)]
+        self.history_first = 0
+        self.history_canvas.bind('<Button-1>', self.on_history_click)
+        # Paint the strip on the next frame
+        self.widget_state.invalidate('history')
+        self.renderer.request()
+        
+    def create_vision_panel(self, vision_frame):
+        """Fill the color-vision panel: the current color as seen with each deficiency."""
+        width = self.VISION_SWATCH_WIDTH
+        swatch_frame = tk.Frame(vision_frame, width=width * len(DEFICIENCIES),
+                                height=self.VISION_SWATCH_HEIGHT)
+        swatch_frame.grid(row=0, column=0)
+        self.vision_swatches = {}
+        for position, deficiency in enumerate(DEFICIENCIES):
+            swatch = tk.Label(swatch_frame, text=DEFICIENCY_LABELS[deficiency],
+                              font=('Arial', 9), borderwidth=0)
+            swatch.place(x=position * width, y=0, width=width, relheight=1.0)
+            self.vision_swatches[deficiency] = swatch
+            self.widget_state.invalidate(f'vision_{deficiency}')
+        self.renderer.request()
+        
+    def create_gradient_track(self, name, frame, scale, channel):
+        """Show the color each position of a slider gives in a strip under it."""
+        image = tk.PhotoImage(master=self.root, width=TRACK_WIDTH, height=TRACK_HEIGHT)
+        track_label = tk.Label(frame, image=image, borderwidth=0, highlightthickness=0)
+        track_label.grid(row=1, column=1, sticky='ew', padx=5)
+        self.gradient_tracks[name] = GradientTrack(image, channel)
+        # The strip spans the slider, so it is redrawn at the slider's width
+        scale.bind('<Configure>', lambda e: self.on_track_resize(name, e.width))
+        
+    def on_track_resize(self, name, width):
+        """Redraw a gradient track when its slider changes width."""
+        if self.gradient_tracks[name].resize(width):
+            self.widget_state.invalidate(f'{name}_track')
+            self.renderer.request()
+        
+    def on_scale_change(self, channel, value):
         """Handle slider value changes."""
-        # Stop animation for manually adjusted channels
-        if self.animation_active and not getattr(self, '_programmatic_change', False):
-            # Determine which slider was moved and stop its animation
-            # For now, we'll keep all animations running unless explicitly stopped
-            pass
-        self.update_color()
-        self.update_combobox_selection()  # Set to "Custom Color" when manually adjusted
+        # The slider already shows this value, so the repaint leaves it alone
+        value = int(round(float(value)))
+        self.widget_state.mark(f'{channel}_scale', value)
+        if not self.color.set_channel(channel, value, source='slider'):
+            # Sub-step movement that rounds to the same channel value
+            return
+        self.update_combobox_selection()  # Match a named color or fall back to "Custom Color"
+        # A drag is one history entry, however many events it sends
+        self.record_history('drag')
     
     def on_animation_change(self):
         """Handle animation checkbox changes."""
@@ -299,6 +525,9 @@ class RGBColorExplorer:
             self.start_animation()
         elif not any_active and self.animation_active:
             self.stop_animation()
+        elif self.animation_active:
+            # Channels were toggled while running
+            self.sync_animated_channels()
     
     def start_all_animation(self):
         """Start all channel animations."""
@@ -317,149 +546,207 @@ class RGBColorExplorer:
     
     def on_speed_change(self, value):
         """Handle animation speed changes."""
-        # Speed is handled by the animation timer
-        pass
+        # Re-anchors the sweep so channels continue smoothly at the new pace
+        self.animation_speed = int(float(value))
+        self.sweep.set_rate(self.sweep_rate(self.animation_speed))
+    
+    def sweep_rate(self, speed):
+        """Return sweep steps per second for a 1-10 speed setting."""
+        return speed_to_rate(speed)
     
     def start_animation(self):
         """Start the color animation for enabled channels."""
         self.animation_active = True
+        self.frame_clock.reset()
+        self.sync_animated_channels()
         # Start the animation loop
         self.animate_color()
     
     def stop_animation(self):
         """Stop the color animation."""
         self.animation_active = False
-        if hasattr(self, 'animation_job'):
+        for channel in list(self.sweep.channels):
+            # Remember the direction so a restart continues the same way
+            self.animation_direction[channel] = self.sweep.stop(channel)
+        if self.animation_job is not None:
             self.root.after_cancel(self.animation_job)
+            self.animation_job = None
+    
+    def sync_animated_channels(self):
+        """Start or stop channel sweeps to match the animation checkboxes."""
+        enabled = {
+            "red": self.animate_red,
+            "green": self.animate_green,
+            "blue": self.animate_blue,
+        }
+        for channel, flag in enabled.items():
+            running = channel in self.sweep.channels
+            if flag.get() and not running:
+                # Continue from the channel's current value
+                self.sweep.start(channel, self.color.channel(channel), self.animation_direction[channel])
+                self.animated_values.pop(channel, None)
+            elif not flag.get() and running:
+                self.animation_direction[channel] = self.sweep.stop(channel)
+    
+    def seek_animation(self, seconds):
+        """Jump the running sweep forward (or back, if negative) by seconds."""
+        self.sweep.seek(seconds)
+        if self.animation_active:
+            self.animate_color()
     
     def animate_color(self):
-        """Main animation loop that updates color values for active channels."""
+        """Main animation loop that sets animated channels from the elapsed time."""
         if not self.animation_active:
             return
+        if self.animation_job is not None:
+            # Called directly (e.g. after a seek): replace the pending tick
+            self.root.after_cancel(self.animation_job)
         
-        speed = int(self.speed_scale.get())
-        step_size = 1  # Always 1 for smooth pixel-by-pixel animation
-        
-        # Animate Red channel if enabled
-        if self.animate_red.get():
-            current_val = int(self.red_var.get())
-            direction = self.animation_direction["red"]
-            next_val = current_val + (step_size * direction)
-            
-            # Check bounds and reverse direction if needed
-            if next_val >= 255:
-                next_val = 255
-                self.animation_direction["red"] = -1
-            elif next_val <= 0:
-                next_val = 0
-                self.animation_direction["red"] = 1
-            
-            # Update red channel
-            self._programmatic_change = True
-            self.red_var.set(next_val)
-            self._programmatic_change = False
-        
-        # Animate Green channel if enabled
-        if self.animate_green.get():
-            current_val = int(self.green_var.get())
-            direction = self.animation_direction["green"]
-            next_val = current_val + (step_size * direction)
-            
-            # Check bounds and reverse direction if needed
-            if next_val >= 255:
-                next_val = 255
-                self.animation_direction["green"] = -1
-            elif next_val <= 0:
-                next_val = 0
-                self.animation_direction["green"] = 1
-            
-            # Update green channel
-            self._programmatic_change = True
-            self.green_var.set(next_val)
-            self._programmatic_change = False
-        
-        # Animate Blue channel if enabled
-        if self.animate_blue.get():
-            current_val = int(self.blue_var.get())
-            direction = self.animation_direction["blue"]
-            next_val = current_val + (step_size * direction)
-            
-            # Check bounds and reverse direction if needed
-            if next_val >= 255:
-                next_val = 255
-                self.animation_direction["blue"] = -1
-            elif next_val <= 0:
-                next_val = 0
-                self.animation_direction["blue"] = 1
-            
-            # Update blue channel
-            self._programmatic_change = True
-            self.blue_var.set(next_val)
-            self._programmatic_change = False
-        
-        # Update the display
-        self.update_color()
-        
-        # Calculate delay based on speed (faster speed = shorter delay)
-        delay = max(20, 200 - (speed * 15))  # 20ms to 185ms delay
-        
-        # Schedule next animation frame
+        # Values depend only on the clock, so late or skipped ticks don't slow the sweep
+        now = self.sweep.clock()
+        moved = {}
+        for channel, value in self.sweep.values(now).items():
+            if self.animated_values.get(channel) != value:
+                self.animated_values[channel] = value
+                moved[channel] = value
+        
+        # All animated channels change together, and only if one actually moved
+        if moved and self.color.set_channels(moved, source='animation'):
+            # The whole sweep so far is a single history entry
+            self.record_history('animation')
+        
+        # Schedule the next tick on the next frame deadline
+        delay = self.frame_clock.next_delay(now)
         self.animation_job = self.root.after(delay, self.animate_color)
     
     def on_closing(self):
         """Handle application closing with proper cleanup."""
-        # Stop any running animations
+        # Stop any running animations and the control server
         self.stop_animation()
+        self.stop_control_server()
         
         # Destroy the window
         self.root.destroy()
         
+    def on_color_change(self, packed, old, source):
+        """Repaint after the color state changed."""
+        self.update_color()
+        
     def update_color(self):
-        """Update the color display and value labels."""
-        # Get current RGB values
-        r = int(self.red_var.get())
-        g = int(self.green_var.get())
-        b = int(self.blue_var.get())
+        """Request a repaint of the color display and value labels."""
+        # Bursts of slider/animation events collapse into one repaint per frame
+        self.renderer.request()
+        
+    def render(self):
+        """Push the current color to the widgets whose displayed value changed."""
+        # Current RGB values, straight from the packed state (no Tcl calls)
+        packed = self.color.packed
+        r, g, b = self.color.rgb
+        changed = self.widget_state.changed
+        
+        # Move the sliders for changes that didn't come from them
+        if changed('red_scale', r):
+            self.red_var.set(r)
+        if changed('green_scale', g):
+            self.green_var.set(g)
+        if changed('blue_scale', b):
+            self.blue_var.set(b)
         
         # Update value labels to show hex values with 0x prefix
-        self.red_value_label.config(text=f"0x{r:02X}")
-        self.green_value_label.config(text=f"0x{g:02X}")
-        self.blue_value_label.config(text=f"0x{b:02X}")
+        if changed('red_label', r):
+            self.red_value_label.config(text=CHANNEL_LABELS[r])
+        if changed('green_label', g):
+            self.green_value_label.config(text=CHANNEL_LABELS[g])
+        if changed('blue_label', b):
+            self.blue_value_label.config(text=CHANNEL_LABELS[b])
         
         # Create hex color string
-        hex_color = f"#{r:02x}{g:02x}{b:02x}"
+        color_hex = hex_color(packed)
         
         # Update color display
-        self.color_frame.config(bg=hex_color)
+        if changed('color_frame', color_hex):
+            self.color_frame.config(bg=color_hex)
+        
+        # Simulated colors are cached, so a drag mostly costs three lookups
+        # (none until the color-vision panel has been built)
+        for deficiency, swatch in self.vision_swatches.items():
+            simulated = simulate_packed(deficiency, packed)
+            if changed(f'vision_{deficiency}', simulated):
+                swatch.config(bg=hex_color(simulated),
+                              fg='#000000' if packed_luminance(simulated) > 0.18 else '#ffffff')
         
         # Update color value label
         rgb_text = f"RGB({r}, {g}, {b})"
-        hex_text = f"HEX: {hex_color.upper()}"
-        self.color_value_label.config(text=f"{rgb_text} | {hex_text}")
-        
-        # Update entry boxes to stay synchronized (only if not currently being edited)
-        if not hasattr(self, '_updating_from_entry'):
+        hex_text = f"HEX: {color_hex}"
+        value_text = f"{rgb_text} | {hex_text}"
+        if changed('value_label', value_text):
+            self.color_value_label.config(text=value_text)
+        
+        # Redraw a slider's gradient only when one of the other two channels moved
+        for name, track in self.gradient_tracks.items():
+            if changed(f'{name}_track', track.others(r, g, b)):
+                track.paint(r, g, b)
+        
+        # Move the plane picker's marker (the plane itself is only reloaded when
+        # its fixed channel or hue changed)
+        if self.plane_window is not None and self.plane_window.shown:
+            self.plane_window.show_color(r, g, b)
+        
+        # Keep the other color spaces' sliders in step
+        if self.space_window is not None and self.space_window.shown:
+            self.space_window.show_color(r, g, b)
+        
+        # Rate the new color against the palette
+        if self.contrast_window is not None and self.contrast_window.shown:
+            self.contrast_window.show_color(r, g, b)
+        
+        # Show the closest named color and how far away it is
+        self.update_nearest_color(r, g, b)
+        
+        # Update entry boxes to stay synchronized (skipped if they already show the value)
+        if changed('red_entry', r):
             self.red_entry.delete(0, tk.END)
             self.red_entry.insert(0, str(r))
+        if changed('green_entry', g):
             self.green_entry.delete(0, tk.END)
             self.green_entry.insert(0, str(g))
+        if changed('blue_entry', b):
             self.blue_entry.delete(0, tk.END)
             self.blue_entry.insert(0, str(b))
         
+        # Redraw the history strip after anything was recorded, undone or redone
+        if "history" in self.panels and changed('history', self.history.version):
+            self.draw_history_strip()
+        
+        # Match the dropdown to the new color after manual adjustments
+        if self.combobox_dirty:
+            self.combobox_dirty = False
+            self.sync_combobox(r, g, b)
+        
+    def update_nearest_color(self, r, g, b):
+        """Show the closest named color to the given RGB values."""
+        nearest = self.nearest_index.nearest((r, g, b))
+        if nearest is None:
+            if self.widget_state.changed('nearest_label', ""):
+                self.nearest_label.config(text="")
+            return
+        name, rgb_values, distance = nearest
+        if distance == 0:
+            text = f"Nearest: {name} (exact)"
+        else:
+            text = f"Nearest: {name} (ΔE {distance:.1f})"
+        if self.widget_state.changed('nearest_label', text):
+            self.nearest_label.config(text=text)
+        
     def on_entry_change(self, color_channel):
         """Handle text entry changes with validation for decimal and hex values."""
-        self._updating_from_entry = True  # Prevent circular updates
-        
         try:
             if color_channel == 'red':
                 entry_widget = self.red_entry
-                var = self.red_var
             elif color_channel == 'green':
                 entry_widget = self.green_entry
-                var = self.green_var
             elif color_channel == 'blue':
                 entry_widget = self.blue_entry
-                var = self.blue_var
             else:
                 return
             
@@ -469,10 +756,12 @@ class RGBColorExplorer:
             value = self.parse_color_value(value_str)
             
             if value is not None:
-                # Valid value - update the variable and slider
-                var.set(value)
-                self.update_color()
-                self.update_combobox_selection()  # Set to "Custom Color" when manually entered
+                # Valid value - update the color (and with it the slider)
+                # Leave the typed text (e.g. "0xFF") in the entry being edited
+                self.widget_state.mark(f'{color_channel}_entry', value)
+                if self.color.set_channel(color_channel, value, source='entry'):
+                    self.update_combobox_selection()  # Match a named color or fall back to "Custom Color"
+                    self.record_history()
                 # Reset any error styling
                 entry_widget.configure(style='TEntry')
             else:
@@ -482,42 +771,10 @@ class RGBColorExplorer:
         except Exception as e:
             print(f"Error processing entry change: {e}")
             self.show_entry_error(entry_widget)
-        finally:
-            self._updating_from_entry = False
             
     def parse_color_value(self, value_str):
         """Parse color value from string - supports decimal (0-255) and hex (00-FF, 0x00-0xFF)."""
-        if not value_str:
-            return None
-            
-        value_str = value_str.strip().lower()
-        
-        try:
-            # Try decimal format first
-            if value_str.isdigit():
-                value = int(value_str)
-                if 0 <= value <= 255:
-                    return value
-                return None
-            
-            # Try hexadecimal formats
-            if value_str.startswith('0x'):
-                # Format: 0x00 to 0xFF
-                value = int(value_str, 16)
-                if 0 <= value <= 255:
-                    return value
-                return None
-            elif len(value_str) <= 2 and all(c in '0123456789abcdef' for c in value_str):
-                # Format: 00 to FF (assume hex if all hex digits)
-                value = int(value_str, 16)
-                if 0 <= value <= 255:
-                    return value
-                return None
-                
-        except ValueError:
-            pass
-            
-        return None
+        return parse_color_value(value_str)
         
     def show_entry_error(self, entry_widget):
         """Show visual feedback for invalid entry."""
@@ -533,101 +790,432 @@ class RGBColorExplorer:
             
     def on_color_selected(self, event=None):
         """Handle color selection from dropdown."""
-        selected_text = self.color_combobox.get()
-        selected_color = self.extract_color_name(selected_text)
-        
-        if selected_color == "Custom Color" or selected_color not in self.COMMON_COLORS:
-            # Don't change anything for custom color selection
-            return
-            
-        rgb_values = self.COMMON_COLORS[selected_color]
-        if rgb_values is not None:
-            r, g, b = rgb_values
-            # Update the sliders and all displays
-            self.red_var.set(r)
-            self.green_var.set(g)
-            self.blue_var.set(b)
-            self.update_color()
+        # Custom Color (or anything not in the palette) leaves the sliders alone
+        self.apply_current_selection()
             
     def on_combobox_keypress(self, event):
-        """Handle any keypress in combobox."""
-        # Allow a small delay for the combobox to update its selection
-        self.root.after(10, self.apply_current_selection)
+        """Jump to the best match for the name or hex code typed so far."""
+        if event.keysym == 'BackSpace':
+            char = '\b'
+        elif event.char and event.char.isprintable():
+            char = event.char
+        else:
+            # Let Tab, Escape, Return etc. through
+            return None
+        index = self.type_ahead.key(char)
+        if index is not None:
+            self.select_palette_index(index)
+        return "break"
         
     def on_combobox_navigate(self, event):
         """Handle Up/Down arrow navigation in combobox."""
-        # Allow the default navigation to happen first
-        self.root.after(10, self.apply_current_selection)
+        if not len(self.palette):
+            return "break"
+        index = self.current_palette_index()
+        if index is None:
+            index = 0
+        else:
+            step = -1 if event.keysym == 'Up' else 1
+            index = max(0, min(len(self.palette) - 1, index + step))
+        self.type_ahead.reset()
+        self.select_palette_index(index)
+        return "break"
+        
+    def current_palette_index(self):
+        """Return the palette index shown in the dropdown, or None for Custom Color."""
+        position = self.color_combobox.current()
+        if position > 0:
+            # Values are Custom Color followed by the palette in order
+            return position - 1
+        # Large palettes only list Custom Color, so fall back to the shown name
+        return self.palette.index_of(self.extract_color_name(self.color_combobox.get()))
+        
+    def select_palette_index(self, index):
+        """Show palette entry index in the dropdown and apply its color."""
+        label = self.palette.label(index)
+        if self.color_combobox.get() != label:
+            self.color_combobox.set(label)
+        # All three channels change at once: one notification, one repaint
+        if self.color.set_rgb(*self.palette.rgb(index), source='palette'):
+            # Arrowing or typing through the dropdown merges into one entry
+            self.record_history('select')
         
     def apply_current_selection(self):
         """Apply the currently highlighted color in the combobox."""
-        try:
-            # Get the current value from the combobox
-            current_value = self.color_combobox.get()
-            if current_value:
-                # Extract color name and apply it
-                color_name = self.extract_color_name(current_value)
-                if color_name in self.COMMON_COLORS and self.COMMON_COLORS[color_name] is not None:
-                    rgb_values = self.COMMON_COLORS[color_name]
-                    r, g, b = rgb_values
-                    self.red_var.set(r)
-                    self.green_var.set(g)
-                    self.blue_var.set(b)
-                    self.update_color()
-        except Exception as e:
-            # Silently handle any errors during navigation
-            pass
+        index = self.current_palette_index()
+        if index is not None:
+            self.select_palette_index(index)
             
     def update_combobox_selection(self):
-        """Update combobox to show 'Custom Color' when user manually adjusts sliders."""
-        # Only change if not already set to Custom Color to avoid unnecessary updates
-        current_selection = self.extract_color_name(self.color_combobox.get())
-        if current_selection != "Custom Color":
-            self.color_combobox.set("Custom Color")
+        """Update combobox to the matching named color, or 'Custom Color' if there is none."""
+        # Done during the next repaint so slider drags only pay for it once per frame
+        self.combobox_dirty = True
+        self.renderer.request()
+        
+    def sync_combobox(self, r, g, b):
+        """Select the named color matching (r, g, b), or 'Custom Color'."""
+        # Pick the named color if the current one is perceptually identical to it
+        nearest = self.nearest_index.nearest((r, g, b))
+        if nearest is not None and nearest[2] < self.MATCH_THRESHOLD:
+            # Formatted from the match itself: looking the name up would build a
+            # name table, which memory-mapped palettes otherwise never need
+            target = format_dropdown_label(nearest[0], nearest[1])
+        else:
+            target = CUSTOM_COLOR
+        
+        # Only change if the selection differs to avoid unnecessary updates
+        if self.color_combobox.get() != target:
+            self.color_combobox.set(target)
+        
+    def set_palette(self, palette):
+        """Make palette the active palette for the dropdown, browser and nearest color."""
+        self.palette = palette
+        # Uses the tree stored in binary palettes instead of building one
+        self.nearest_index = index_for_palette(palette)
+        self.search = ColorSearch(palette)
+        self.type_ahead = TypeAhead(self.search, clock=self.clock)
+        self.color_combobox.configure(values=self.get_dropdown_values())
+        if self.palette_window is not None:
+            self.palette_window.set_palette(palette, self.search)
+        if self.swatch_window is not None:
+            self.swatch_window.set_palette(palette)
+        if self.contrast_window is not None:
+            self.contrast_window.set_palette(palette)
+        self.widget_state.invalidate('nearest_label')
+        self.update_combobox_selection()
+        
+    def load_palette(self, path=None):
+        """Load a palette file (JSON, CSV, .gpl or .rgbpal), asking for one if no path is given."""
+        if path is None:
+            from tkinter import filedialog
+            path = filedialog.askopenfilename(
+                parent=self.root, title="Load Palette",
+                filetypes=[("Palette files", "*.json *.csv *.gpl *.rgbpal"), ("All files", "*.*")])
+            if not path:
+                return
+        
+        try:
+            palette = open_palette(path)
+            palette.load()
+        except (OSError, ValueError) as e:
+            print(f"Could not load palette: {e}")
+            return
+        self.set_palette(palette)
+        
+    def open_palette_browser(self):
+        """Show the palette browser window, creating it on first use."""
+        if self.palette_window is None:
+            # Imported here so startup doesn't pay for widgets that may never open
+            from color_widgets import PaletteBrowserWindow
+            self.palette_window = PaletteBrowserWindow(self.root, self.palette, self.search,
+                                                       self.on_palette_index_selected)
+        self.palette_window.show()
+        
+    def open_swatch_board(self):
+        """Show every palette color as a zoomable grid of swatches, creating it on first use."""
+        if self.swatch_window is None:
+            from color_widgets import SwatchBoardWindow
+            self.swatch_window = SwatchBoardWindow(self.root, self.palette,
+                                                   self.on_palette_index_selected)
+        self.swatch_window.show()
+        
+    def open_color_plane(self):
+        """Show the 2D color-plane picker beside the main window, creating it on first use."""
+        if self.plane_window is None:
+            from color_widgets import ColorPlaneWindow
+            self.plane_window = ColorPlaneWindow(self.root, self.on_plane_pick)
+            self.plane_window.window.geometry(
+                f"+{self.root.winfo_x() + self.root.winfo_width() + 10}+{self.root.winfo_y()}")
+        self.plane_window.show()
+        self.plane_window.show_color(*self.color.rgb)
+        
+    def open_color_spaces(self):
+        """Show the HSV/HSL/OKLCh/CMYK sliders beside the main window, creating them on first use."""
+        if self.space_window is None:
+            from color_widgets import ColorSpaceWindow
+            self.space_window = ColorSpaceWindow(self.root, self.on_space_pick)
+            self.space_window.window.geometry(
+                f"+{self.root.winfo_x() + self.root.winfo_width() + 10}+{self.root.winfo_y()}")
+        self.space_window.show()
+        self.space_window.show_color(*self.color.rgb)
+        
+    def open_contrast(self):
+        """Show the contrast ratings against the palette, creating the window on first use."""
+        if self.contrast_window is None:
+            from color_widgets import ContrastWindow
+            self.contrast_window = ContrastWindow(self.root, self.palette, self.on_contrast_pick)
+            self.contrast_window.window.geometry(
+                f"+{self.root.winfo_x() + self.root.winfo_width() + 10}+{self.root.winfo_y()}")
+        self.contrast_window.show()
+        self.contrast_window.show_color(*self.color.rgb)
+        
+    def open_image_histogram(self, path=None):
+        """Show the image color histogram window and analyze path (or ask for an image)."""
+        if self.image_window is None:
+            from color_widgets import ImageHistogramWindow
+            self.image_window = ImageHistogramWindow(self.root, self.on_image_pick,
+                                                     self.set_palette)
+        self.image_window.show()
+        if path is None:
+            self.image_window.choose_image()
+        else:
+            self.image_window.analyze(path)
+        
+    def on_plane_pick(self, r, g, b):
+        """Apply a color picked on the color plane."""
+        if self.color.set_rgb(r, g, b, source='plane'):
+            self.update_combobox_selection()
+            self.record_history('plane')
+        
+    def on_contrast_pick(self, r, g, b):
+        """Apply a suggested color from the contrast window."""
+        if self.color.set_rgb(r, g, b, source='contrast'):
+            self.update_combobox_selection()
+            self.record_history()
+        
+    def on_image_pick(self, r, g, b):
+        """Apply a color clicked in the image histogram's swatches."""
+        # Each click is its own history entry, unlike a drag on the plane
+        if self.color.set_rgb(r, g, b, source='image'):
+            self.update_combobox_selection()
+            self.record_history()
+        
+    def on_space_pick(self, r, g, b):
+        """Apply a color set with the color-space sliders."""
+        if self.color.set_rgb(r, g, b, source='space'):
+            self.update_combobox_selection()
+            # A drag is one history entry, as with the RGB sliders
+            self.record_history('space')
+        
+    def on_palette_index_selected(self, index):
+        """Apply the color chosen in the palette browser."""
+        self.select_palette_index(index)
         
     def reset_to_gray(self):
         """Reset all sliders to middle gray (128, 128, 128)."""
-        self.red_var.set(128)
-        self.green_var.set(128)
-        self.blue_var.set(128)
-        self.update_color()
+        if self.color.set(DEFAULT_COLOR):
+            self.record_history()
         
     def random_color(self):
-        """Set sliders to a random color."""
-        import random
-        self.red_var.set(random.randint(0, 255))
-        self.green_var.set(random.randint(0, 255))
-        self.blue_var.set(random.randint(0, 255))
-        self.update_color()
+        """Set sliders to a random color; in distinct mode, one clearly unlike the recent colors."""
+        if self.distinct_random.get():
+            _, recent = self.history.recent(RECENT_COLORS)
+            changed = self.color.set_rgb(*distinct_from([unpack_rgb(packed) for packed in recent],
+                                                        rng=self.rng))
+        else:
+            changed = self.color.set(self.rng.randrange(0x1000000))
+        if changed:
+            self.record_history()
+        
+    def generate_distinct_palette(self, count=None):
+        """Make count mutually distinct colors the active palette, asking for count if not given."""
+        if count is None:
+            from tkinter import simpledialog
+            count = simpledialog.askinteger(
+                "Generate Distinct Colors", "Number of colors:", parent=self.root,
+                initialvalue=64, minvalue=1, maxvalue=100000)
+            if not count:
+                return
+        self.set_palette(distinct_palette(count, spacing_for(count)))
+        
+    def record_history(self, merge_key=None):
+        """Remember the current color for undo; changes with the same merge_key in a burst share one entry."""
+        self.history.record(self.color.packed, merge_key)
+        # Only the history strip shows the new entry
+        if "history" in self.panels:
+            self.renderer.request()
+        
+    def apply_history_color(self, packed):
+        """Show a color taken from the history without recording it again."""
+        if packed is not None and self.color.set(packed, source='history'):
+            self.update_combobox_selection()
+        
+    def undo(self, event=None):
+        """Go back to the previous color."""
+        self.apply_history_color(self.history.undo())
+        return "break"
+        
+    def redo(self, event=None):
+        """Go forward to the next color after an undo."""
+        self.apply_history_color(self.history.redo())
+        return "break"
+        
+    def on_history_click(self, event):
+        """Jump to the history entry under the pointer."""
+        if "history" not in self.panels:
+            return
+        index = self.history_first + event.x // self.HISTORY_CELL_WIDTH
+        if index < len(self.history):
+            self.apply_history_color(self.history.jump(index))
+        
+    def draw_history_strip(self):
+        """Paint the recent history entries and outline the current one."""
+        first, colors = self.history.recent(self.HISTORY_STRIP_SIZE)
+        self.history_first = first
+        current = self.history.position - first
+        changed = self.widget_state.changed
+        for cell, item in enumerate(self.history_cells):
+            if cell < len(colors):
+                look = (hex_color(colors[cell]), '#000000' if cell == current else '')
+            else:
+                look = ('#f0f0f0', '')
+            # A drag only changes the newest cell, so the rest are left alone
+            if changed(f'history_{cell}', look):
+                self.history_canvas.itemconfigure(item, fill=look[0], outline=look[1], width=2)
         
     def copy_rgb(self):
         """Copy the current RGB values to clipboard."""
-        r = int(self.red_var.get())
-        g = int(self.green_var.get())
-        b = int(self.blue_var.get())
+        r, g, b = self.color.rgb
         rgb_string = f"rgb({r}, {g}, {b})"
         
         try:
             self.root.clipboard_clear()
             self.root.clipboard_append(rgb_string)
             # Show temporary feedback
-            original_text = self.color_value_label.cget('text')
             self.color_value_label.config(text="RGB values copied to clipboard!")
-            self.root.after(2000, lambda: self.color_value_label.config(text=original_text))
+            self.root.after(2000, self.restore_value_label)
         except Exception as e:
             print(f"Could not copy to clipboard: {e}")
             
-    def center_window(self):
-        """Center the window on the screen."""
-        self.root.update_idletasks()  # Ensure window dimensions are calculated
+    def export_colors(self, what, path=None):
+        """Export the current color, the history or the palette ('color', 'history' or 'palette').
+
+        Asks for a file if no path is given; the format follows its extension.
+        The file is written on a background thread and progress is shown in
+        the value label. Returns the ExportJob, or None if nothing was started.
+        """
+        if self.export_job is not None and not self.export_job.done:
+            print("An export is already running")
+            return None
         
-        # Get screen dimensions
+        # Pairs are generated as the export thread consumes them; the palette
+        # is loaded here so the thread only reads it
+        if what == 'palette':
+            self.palette.load()
+            title, total, pairs = self.palette.title, len(self.palette), self.palette.items()
+        elif what == 'history':
+            colors = [self.history[index] for index in range(len(self.history))]
+            title, total = "History", len(colors)
+            pairs = ((f"History {index + 1}", unpack_rgb(packed))
+                     for index, packed in enumerate(colors))
+        else:
+            title, total = "Color", 1
+            pairs = [(hex_color(self.color.packed), self.color.rgb)]
+        
+        if path is None:
+            from tkinter import filedialog
+            from color_export import EXPORT_FILETYPES
+            path = filedialog.asksaveasfilename(
+                parent=self.root, title=f"Export {title}", defaultextension=".css",
+                filetypes=EXPORT_FILETYPES)
+            if not path:
+                return None
+        
+        from color_export import ExportJob
+        try:
+            self.export_job = ExportJob(path, pairs, title, total).start()
+        except ValueError as e:
+            print(f"Could not export: {e}")
+            return None
+        self.poll_export()
+        return self.export_job
+        
+    def poll_export(self):
+        """Show the running export's progress, checking again until it finishes."""
+        job = self.export_job
+        if not job.done:
+            self.color_value_label.config(text=f"Exporting... {job.progress() or 0:.0%}")
+            self.root.after(self.EXPORT_POLL_MS, self.poll_export)
+            return
+        
+        import os
+        if job.error is not None:
+            print(f"Could not export: {job.error}")
+            text = "Export failed"
+        else:
+            text = f"Exported {job.written:,} colors to {os.path.basename(job.path)}"
+        self.color_value_label.config(text=text)
+        self.root.after(2000, self.restore_value_label)
+        
+    def start_control_server(self, server):
+        """Take commands from a color_control.ControlServer, applying them once per frame."""
+        self.control_server = server
+        self.poll_control()
+        
+    def poll_control(self):
+        """Apply the control commands received since the last frame and publish the new state."""
+        server = self.control_server
+        # The mailbox holds only the latest value of each command, so a client
+        # sending thousands of updates a second costs one change per frame
+        for command, value in server.commands.drain():
+            self.apply_control(command, value)
+        server.publish(self.control_status())
+        self.control_job = self.root.after(self.CONTROL_POLL_MS, self.poll_control)
+        
+    def apply_control(self, command, value):
+        """Carry out one command from the control server (see color_control.parse_request)."""
+        if command == 'set':
+            if self.color.set(value, source='control'):
+                self.update_combobox_selection()
+                # A stream of updates is one history entry
+                self.record_history('control')
+        elif command == 'select':
+            index = value if isinstance(value, int) else self.palette.index_of(value)
+            if index is not None and index < len(self.palette):
+                self.select_palette_index(index)
+        elif command == 'animate':
+            self.animate_red.set("red" in value)
+            self.animate_green.set("green" in value)
+            self.animate_blue.set("blue" in value)
+            self.on_animation_change()
+        elif command == 'speed':
+            if "animation" in self.panels:
+                self.speed_scale.set(value)
+            self.on_speed_change(value)
+        
+    def control_status(self):
+        """Return the state reported to control clients that send get."""
+        return {
+            "color": rgb_to_hex(self.color.rgb),
+            "rgb": list(self.color.rgb),
+            "animating": sorted(self.sweep.channels) if self.animation_active else [],
+            "speed": self.animation_speed,
+            "palette": self.palette.title,
+            "palette_size": len(self.palette),
+        }
+        
+    def stop_control_server(self):
+        """Stop polling and close the control server, if there is one."""
+        if self.control_job is not None:
+            self.root.after_cancel(self.control_job)
+            self.control_job = None
+        if self.control_server is not None:
+            self.control_server.stop()
+            self.control_server = None
+        
+    def toggle_instrumentation_overlay(self, event=None):
+        """Show or hide the performance overlay (F12)."""
+        if self.instrumentation is None:
+            return
+        overlay = self.instrumentation_overlay
+        if overlay is not None and overlay.job is not None:
+            overlay.close()
+            self.instrumentation_overlay = None
+        else:
+            self.instrumentation_overlay = InstrumentationOverlay(self.root, self.instrumentation)
+            
+    def restore_value_label(self):
+        """Show the color values again after temporary feedback text."""
+        self.widget_state.invalidate('value_label')
+        self.update_color()
+            
+    def center_window(self):
+        """Size the window and center it on the screen with a single geometry call."""
+        # The size is the one we ask for, so there's no need to make Tk lay
+        # out the (still empty) window to measure it first
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
-        
-        # Get window dimensions
-        window_width = 800
-        window_height = 700
+        window_width, window_height = self.WINDOW_SIZE
         
         # Calculate center position
         x = (screen_width - window_width) // 2
@@ -637,14 +1225,328 @@ class RGBColorExplorer:
         self.root.geometry(f"{window_width}x{window_height}+{x}+{y}")
 
 
-def main():
+def parse_arguments(argv=None):
+    """Parse command-line options for the GUI and the batch converter."""
+    parser = argparse.ArgumentParser(
+        description="Explore RGB colors, or convert lists of colors with --batch.")
+    parser.add_argument('--batch', action='store_true',
+                        help="convert color strings from files or stdin instead of opening the GUI")
+    parser.add_argument('files', nargs='*', default=['-'],
+                        help="input files for --batch, one color per line ('-' for stdin)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv',
+                        help="batch output format (default: csv)")
+    parser.add_argument('--metric', choices=METRIC_NAMES, default=CIEDE2000,
+                        help="distance used for the nearest named color (default: ciede2000); "
+                             "in --batch, cie76 or oklab convert about 3-5x faster")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"lines processed per chunk (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="worker processes for --batch (default: convert in this process)")
+    parser.add_argument('--strict', action='store_true',
+                        help="exit with status 1 if any input color is invalid")
+    parser.add_argument('--quiet', action='store_true',
+                        help="don't print the throughput summary to stderr")
+    parser.add_argument('--palette', metavar='PATH',
+                        help="palette for nearest named colors (JSON, CSV, .gpl or .rgbpal)")
+    parser.add_argument('--convert-palette', nargs=2, metavar=('SOURCE', 'DEST'),
+                        help="convert a palette and exit; DEST may be .rgbpal (storing a "
+                             "nearest-color tree for --metric), .css, .json, .gpl or .ase")
+    parser.add_argument('--extract-palette', action='store_true',
+                        help="write the dominant colors of the PPM/PGM images in FILES as a "
+                             "JSON palette instead of opening the GUI")
+    parser.add_argument('--colors', type=int, default=16,
+                        help="colors per image for --extract-palette (default: 16)")
+    parser.add_argument('--distinct-colors', type=int, metavar='N',
+                        help="write N mutually distinct colors as a JSON palette instead of "
+                             "opening the GUI")
+    parser.add_argument('--min-delta-e', type=float,
+                        help="minimum OKLab ΔE between --distinct-colors (default: chosen so N fit)")
+    parser.add_argument('--lightness', type=float, nargs=2, default=(0.0, 1.0),
+                        metavar=('MIN', 'MAX'),
+                        help="OKLab lightness range for --distinct-colors (default: 0 1)")
+    parser.add_argument('--chroma', type=float, nargs=2, default=(0.0, None),
+                        metavar=('MIN', 'MAX'),
+                        help="OKLab chroma range for --distinct-colors (default: any)")
+    parser.add_argument('--seed', type=int,
+                        help="random seed, so --distinct-colors output can be reproduced")
+    parser.add_argument('--simulate-vision', choices=DEFICIENCIES, metavar='DEFICIENCY',
+                        help="write the palettes in FILES as seen with protanopia, deuteranopia "
+                             "or tritanopia, as a JSON palette, instead of opening the GUI")
+    parser.add_argument('--vision-audit', action='store_true',
+                        help="list the color pairs in the palette in FILES that only look alike "
+                             "with a color-vision deficiency, as JSON")
+    parser.add_argument('--vision-method', choices=METHODS, default=VIENOT,
+                        help="simulation model for --simulate-vision and --vision-audit "
+                             "(default: vienot)")
+    parser.add_argument('--vision-threshold', type=float, default=CONFUSION_DELTA_E,
+                        help=f"OKLab ΔE below which colors count as confusable "
+                             f"(default: {CONFUSION_DELTA_E:g})")
+    parser.add_argument('--contrast-audit', action='store_true',
+                        help="count the color pairs between the two palettes in FILES (or "
+                             "within one) that fail each WCAG contrast level, as JSON")
+    color_instrumentation.add_arguments(parser)
+    color_control.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def run_batch_mode(args):
+    """Run the streaming batch converter and return the process exit code."""
+    if args.chunk_size < 1:
+        print("--chunk-size must be at least 1", file=sys.stderr)
+        return 2
+    
+    try:
+        stats = run_batch(args.files, sys.stdout,
+                          output_format=args.format,
+                          chunk_size=args.chunk_size,
+                          workers=args.workers,
+                          metric=args.metric,
+                          report=None if args.quiet else sys.stderr,
+                          palette_path=args.palette)
+    except BrokenPipeError:
+        # Output was piped into something like `head` that stopped reading
+        return 0
+    except OSError as e:
+        print(f"Could not read input: {e}", file=sys.stderr)
+        return 2
+    except ValueError as e:
+        print(f"Could not load palette: {e}", file=sys.stderr)
+        return 2
+    
+    if args.strict and stats["invalid"]:
+        return 1
+    return 0
+
+
+def run_convert_mode(args):
+    """Convert a palette file to the binary or an export format and return the process exit code."""
+    from color_export import export_colors
+    from color_palette_file import PALETTE_FILE_EXTENSION, convert_palette
+    import os
+    
+    source, destination = args.convert_palette
+    start = time.perf_counter()
+    try:
+        if os.path.splitext(destination)[1].lower() == PALETTE_FILE_EXTENSION:
+            count = convert_palette(source, destination, metric=args.metric)
+        else:
+            # Streamed straight from the source; binary sources are memory-mapped
+            palette = open_palette(source)
+            count = export_colors(destination, palette.items(), palette.title)
+    except (OSError, ValueError) as e:
+        print(f"Could not convert palette: {e}", file=sys.stderr)
+        return 2
+    if not args.quiet:
+        print(f"Wrote {count} colors to {destination} in {time.perf_counter() - start:.2f}s",
+              file=sys.stderr)
+    return 0
+
+
+def run_extract_mode(args):
+    """Extract dominant-color palettes from images and return the process exit code."""
+    from color_quantize import extract_palettes, palette_pairs
+    import json
+    import os
+    
+    if args.colors < 1:
+        print("--colors must be at least 1", file=sys.stderr)
+        return 2
+    paths = [path for path in args.files if path != '-']
+    if not paths:
+        print("--extract-palette needs at least one image file", file=sys.stderr)
+        return 2
+    
+    start = time.perf_counter()
+    palette = {}
+    try:
+        for path, swatches in extract_palettes(paths, args.colors, args.workers):
+            title = os.path.splitext(os.path.basename(path))[0]
+            for name, rgb_values in palette_pairs(title, swatches):
+                palette[name] = rgb_to_hex(rgb_values)
+    except (OSError, ValueError) as e:
+        print(f"Could not extract palette: {e}", file=sys.stderr)
+        return 2
+    
+    json.dump(palette, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    if not args.quiet:
+        print(f"Extracted {len(palette)} colors from {len(paths)} images "
+              f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+def run_distinct_mode(args):
+    """Write a palette of distinct colors as JSON and return the process exit code."""
+    import json
+    
+    if args.distinct_colors < 1:
+        print("--distinct-colors must be at least 1", file=sys.stderr)
+        return 2
+    min_delta_e = args.min_delta_e or spacing_for(args.distinct_colors)
+    start = time.perf_counter()
+    try:
+        palette = distinct_palette(args.distinct_colors, min_delta_e, tuple(args.lightness),
+                                   tuple(args.chroma), args.seed)
+    except ValueError as e:
+        print(f"Could not generate colors: {e}", file=sys.stderr)
+        return 2
+    
+    json.dump({name: rgb_to_hex(rgb_values) for name, rgb_values in palette.items()},
+              sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    if not args.quiet:
+        print(f"Generated {len(palette)} colors at least ΔE {min_delta_e:g} apart "
+              f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if len(palette) < args.distinct_colors:
+        print(f"Only {len(palette)} colors fit; lower --min-delta-e or widen the ranges",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+def load_palettes(paths):
+    """Open palette files and return [(palette, [(r, g, b), ...])] for each."""
+    palettes = [open_palette(path) for path in paths]
+    return [(palette, [palette.rgb(index) for index in range(len(palette))])
+            for palette in palettes]
+
+
+def run_simulate_vision_mode(args):
+    """Write palettes as seen with a color-vision deficiency and return the process exit code."""
+    from color_vision import simulate_colors
+    import json
+    
+    paths = [path for path in args.files if path != '-']
+    if not paths:
+        print("--simulate-vision needs at least one palette file", file=sys.stderr)
+        return 2
+    try:
+        palettes = load_palettes(paths)
+    except (OSError, ValueError) as e:
+        print(f"Could not load palette: {e}", file=sys.stderr)
+        return 2
+    
+    start = time.perf_counter()
+    output = {}
+    for palette, colors in palettes:
+        simulated = simulate_colors(args.simulate_vision, colors, args.vision_method)
+        for index, rgb_values in enumerate(simulated):
+            output[palette.name(index)] = rgb_to_hex(rgb_values)
+    json.dump(output, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    if not args.quiet:
+        print(f"Simulated {args.simulate_vision} for {len(output)} colors "
+              f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+def run_vision_audit_mode(args):
+    """Report palette pairs confusable with each color-vision deficiency and return the exit code."""
+    from color_vision import audit_vision
+    import json
+    
+    paths = [path for path in args.files if path != '-']
+    if len(paths) != 1:
+        print("--vision-audit needs one palette file", file=sys.stderr)
+        return 2
+    try:
+        (palette, colors), = load_palettes(paths)
+    except (OSError, ValueError) as e:
+        print(f"Could not load palette: {e}", file=sys.stderr)
+        return 2
+    
+    start = time.perf_counter()
+    report = {"palette": paths[0], "colors": len(colors), "threshold": args.vision_threshold,
+              "method": args.vision_method, "confusable": {}}
+    for deficiency, (count, examples) in audit_vision(colors, args.vision_threshold,
+                                                      args.vision_method).items():
+        report["confusable"][deficiency] = {
+            "pairs": count,
+            "examples": [{"colors": [palette.name(i), palette.name(j)],
+                          "normal_delta_e": round(normal, 2),
+                          "simulated_delta_e": round(simulated, 2)}
+                         for i, j, normal, simulated in examples],
+        }
+    json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write('\n')
+    if not args.quiet:
+        print(f"Audited {len(colors)} colors in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+def run_contrast_mode(args):
+    """Audit WCAG contrast between palettes and return the process exit code."""
+    from color_contrast import WCAG_LEVELS, audit_contrast
+    import json
+    
+    paths = [path for path in args.files if path != '-']
+    if len(paths) not in (1, 2):
+        print("--contrast-audit needs one or two palette files", file=sys.stderr)
+        return 2
+    
+    start = time.perf_counter()
+    try:
+        colors = [colors for _, colors in load_palettes(paths)]
+    except (OSError, ValueError) as e:
+        print(f"Could not load palette: {e}", file=sys.stderr)
+        return 2
+    colors_a, colors_b = colors[0], colors[-1]
+    
+    report = {"palettes": paths, "failing": {}}
+    for rating, minimum in WCAG_LEVELS:
+        failing, pairs = audit_contrast(colors_a, colors_b, minimum)
+        report["failing"][rating] = failing
+    report["pairs"] = pairs
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    if not args.quiet:
+        print(f"Audited {pairs} pairs in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
     """Main function to run the RGB Color Explorer application."""
+    args = parse_arguments(argv)
+    if args.convert_palette:
+        sys.exit(run_convert_mode(args))
+    if args.extract_palette:
+        sys.exit(run_extract_mode(args))
+    if args.distinct_colors is not None:
+        sys.exit(run_distinct_mode(args))
+    if args.simulate_vision:
+        sys.exit(run_simulate_vision_mode(args))
+    if args.vision_audit:
+        sys.exit(run_vision_audit_mode(args))
+    if args.contrast_audit:
+        sys.exit(run_contrast_mode(args))
+    if args.batch:
+        sys.exit(run_batch_mode(args))
+    
     try:
         # Create the main window
+        profile = StartupProfile() if args.startup_profile else None
+        mark_startup(profile, "imports")
+        load_tkinter()
         root = tk.Tk()
+        mark_startup(profile, "tk")
         
         # Create and run the application
-        app = RGBColorExplorer(root)
+        instrumentation = color_instrumentation.from_arguments(args)
+        app = RGBColorExplorer(root, instrumentation, startup_profile=profile)
+        if args.palette:
+            app.load_palette(args.palette)
+        if args.instrument:
+            app.toggle_instrumentation_overlay()
+        if args.instrument_dump:
+            instrumentation.start_dumps(root, args.instrument_dump, args.instrument_interval)
+        control = color_control.start_from_arguments(args)
+        if control is not None:
+            app.start_control_server(control)
+        if profile is not None:
+            # Let Tk map and draw the window before reporting
+            root.update()
+            mark_startup(profile, "on screen")
+            print(profile.format_report(), file=sys.stderr)
         
         # Start the GUI event loop
         root.mainloop()
@@ -7,78 +7,110 @@ Features red, green, and blue sliders that control a color display in a small wi
 Optimized for 465x442 pixel window size.
 """
 
-import tkinter as tk
-from tkinter import ttk
+import argparse
+import random
 import sys
+import time
+
+from color_animation import ChannelSweep, FrameClock, speed_to_rate
+from color_core import (COMMON_COLORS, CUSTOM_COLOR, extract_color_name, parse_color_value,
+                        rgb_to_hex)
+from color_distinct import RECENT_COLORS, distinct_from
+from color_history import ColorHistory
+from color_index import NearestColorIndex
+import color_control
+import color_instrumentation
+from color_instrumentation import InstrumentationOverlay, StartupProfile, mark_startup
+from color_palette import Palette, unpack_rgb
+from color_search import ColorSearch, TypeAhead
+from color_state import CHANNEL_LABELS, DEFAULT_COLOR, ColorState, hex_color
+from color_render import FrameRenderer, WidgetState
+
+# tkinter is imported when the first window is created (see load_tkinter),
+# so importing this module works on machines without a display
+tk = None
+ttk = None
+
+
+def load_tkinter():
+    """Import tkinter on first use and return the (tk, ttk) modules."""
+    global tk, ttk
+    if tk is None:
+        import tkinter
+        from tkinter import ttk as tkinter_ttk
+        tk, ttk = tkinter, tkinter_ttk
+    return tk, ttk
 
 
 class RGBColorExplorerMini:
     """Main application class for the RGB Color Explorer Mini."""
     
-    # Common color names and their RGB values (full set restored)
-    COMMON_COLORS = {
-        "Custom Color": None,  # Default selection - no auto-change
-        "Azure": (240, 255, 255),
-        "Black": (0, 0, 0),
-        "Blue": (0, 0, 255),
-        "Brown": (165, 42, 42),
-        "Chartreuse": (127, 255, 0),
-        "Coral": (255, 127, 80),
-        "Crimson": (220, 20, 60),
-        "Cyan": (0, 255, 255),
-        "Gold": (255, 215, 0),
-        "Gray": (128, 128, 128),
-        "Green": (0, 128, 0),
-        "Indigo": (75, 0, 130),
-        "Ivory": (255, 255, 240),
-        "Khaki": (240, 230, 140),
-        "Lavender": (230, 230, 250),
-        "Lemon": (255, 250, 205),
-        "Lime": (0, 255, 0),
-        "Magenta": (255, 0, 255),
-        "Maroon": (128, 0, 0),
-        "Mint": (245, 255, 250),
-        "Navy": (0, 0, 128),
-        "Olive": (128, 128, 0),
-        "Orange": (255, 165, 0),
-        "Peach": (255, 218, 185),
-        "Pink": (255, 192, 203),
-        "Plum": (221, 160, 221),
-        "Purple": (128, 0, 128),
-        "Red": (255, 0, 0),
-        "Rose": (255, 102, 204),
-        "Salmon": (250, 128, 114),
-        "Silver": (192, 192, 192),
-        "Spring Green": (0, 255, 127),
-        "Tan": (210, 180, 140),
-        "Teal": (0, 128, 128),
-        "Turquoise": (64, 224, 208),
-        "Violet": (238, 130, 238),
-        "Wheat": (245, 222, 179),
-        "White": (255, 255, 255),
-        "Yellow": (255, 255, 0),
+    # Common color names and their RGB values (shared with color_core)
+    COMMON_COLORS = COMMON_COLORS
+    
+    # Largest CIEDE2000 difference still treated as the named color itself
+    # (1.0 is roughly one just-noticeable difference)
+    MATCH_THRESHOLD = 1.0
+    
+    # Target frame rate for color animation
+    ANIMATION_FPS = 60
+    
+    # How often commands from the control server are applied: once per frame
+    CONTROL_POLL_MS = 1000 // ANIMATION_FPS
+    
+    # Handlers timed when instrumentation is enabled
+    INSTRUMENTED_METHODS = ("update_color", "render", "on_scale_change",
+                            "on_entry_change", "animate_color")
+    
+    # Fixed window size
+    WINDOW_SIZE = (465, 442)
+    
+    # Secondary panels, built the first time they are opened rather than at
+    # startup: name -> (title, method that fills the panel's frame)
+    PANELS = {
+        "animation": ("Animation", "create_animation_panel"),
     }
     
-    def __init__(self, root):
-        """Initialize the RGB Color Explorer Mini application."""
+    # Grid row of the panel bar in the main frame; panels go in the rows after it
+    PANEL_ROW = 8
+    
+    def __init__(self, root, instrumentation=None, clock=time.monotonic, startup_profile=None):
+        """Initialize the RGB Color Explorer Mini application.
+        
+        startup_profile, a color_instrumentation.StartupProfile, gets a mark
+        at the end of each construction phase.
+        """
+        load_tkinter()
         self.root = root
+        self.startup_profile = startup_profile
+        
+        # Optional call counting, latency histograms and event-loop lag tracking;
+        # handlers are wrapped before any widget or timer holds a reference to them
+        self.instrumentation = instrumentation
+        self.instrumentation_overlay = None
+        if instrumentation is not None:
+            instrumentation.instrument(self, self.INSTRUMENTED_METHODS)
+            instrumentation.watch_event_loop(self.root)
+            self.root.bind('<F12>', self.toggle_instrumentation_overlay)
         self.root.title("RGB Color Explorer Mini")
         
         # Configure window close behavior for proper cleanup
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-        # Set compact window size
-        self.root.geometry("465x442")
-        self.root.minsize(465, 442)  # Fixed size for mini version
-        self.root.resizable(False, False)  # Fixed size window
-        
-        # Center the window on screen
+        # Size and center the window in one geometry call
         self.center_window()
+        self.root.minsize(*self.WINDOW_SIZE)  # Fixed size for mini version
+        self.root.resizable(False, False)  # Fixed size window
         
         # Configure the main window
         self.root.configure(bg='#f0f0f0')
+        mark_startup(startup_profile, "window")
         
-        # RGB values (0-255)
+        # The current color, packed into one integer; every change repaints once
+        self.color = ColorState(DEFAULT_COLOR)
+        self.color.subscribe(self.on_color_change)
+        
+        # Slider positions (0-255), written from the color state when repainting
         self.red_var = tk.IntVar(value=128)
         self.green_var = tk.IntVar(value=128)
         self.blue_var = tk.IntVar(value=128)
@@ -89,31 +121,62 @@ class RGBColorExplorerMini:
         self.animate_blue = tk.BooleanVar(value=False)
         self.animation_active = False
         self.animation_direction = {"red": 1, "green": 1, "blue": 1}  # 1 for increasing, -1 for decreasing
-        self.animation_speed = 2  # pixels per update (adjustable)
-        self.animation_timer = None
-        
-        # Set up the GUI
+        self.animation_job = None
+        self.animation_speed = 1  # 1-10, shown on the speed slider once the panel exists
+        
+        # Channel values are computed from elapsed time, ticks run on a frame clock
+        self.sweep = ChannelSweep(clock=clock, rate=self.sweep_rate(self.animation_speed))
+        self.frame_clock = FrameClock(self.ANIMATION_FPS, clock=clock)
+        self.animated_values = {}  # last value written to each animated channel
+        
+        # Palette and its nearest-named-color lookup, queried on every color change
+        self.palette = Palette.from_dict(self.COMMON_COLORS, "Common Colors")
+        self.nearest_index = NearestColorIndex(self.palette)
+        
+        # Name/hex search over the palette, driven by typing in the dropdown
+        self.search = ColorSearch(self.palette)
+        self.type_ahead = TypeAhead(self.search, clock=clock)
+        
+        # Repaints are coalesced to one per frame and only touch changed widgets
+        self.widget_state = WidgetState()
+        self.renderer = FrameRenderer(self.root, self.render, clock=clock)
+        self.combobox_dirty = False
+        
+        # Undo/redo history of packed colors (Ctrl+Z / Ctrl+Y)
+        self.history = ColorHistory(clock=clock)
+        self.root.bind('<Control-z>', self.undo)
+        self.root.bind('<Control-y>', self.redo)
+        self.root.bind('<Control-Z>', self.redo)  # Ctrl+Shift+Z
+        
+        # Random colors; in distinct mode they keep away from the recent history
+        self.rng = random.Random()
+        self.distinct_random = tk.BooleanVar(value=False)
+        
+        # Local control endpoint (--control), if one was started
+        self.control_server = None
+        self.control_job = None
+        
+        # Secondary panels that have been built, and those on screen
+        self.panels = {}
+        self.panel_buttons = {}
+        self.shown_panels = set()
+        mark_startup(startup_profile, "state")
+        
+        # Set up the GUI and paint the initial color right away
         self.create_widgets()
-        self.update_color()
+        mark_startup(startup_profile, "widgets")
+        self.record_history()
+        self.renderer.flush()
+        mark_startup(startup_profile, "first paint")
         
     def get_dropdown_values(self):
         """Generate dropdown values with color names and hex codes."""
-        dropdown_values = []
-        for color_name, rgb_values in self.COMMON_COLORS.items():
-            if rgb_values is None:
-                # Custom Color entry
-                dropdown_values.append(color_name)
-            else:
-                r, g, b = rgb_values
-                hex_code = f"#{r:02X}{g:02X}{b:02X}"
-                dropdown_values.append(f"{color_name} ({hex_code})")
-        return dropdown_values
+        return [CUSTOM_COLOR] + [self.palette.label(index)
+                                 for index in range(len(self.palette))]
         
     def extract_color_name(self, dropdown_text):
         """Extract the color name from dropdown text that includes hex code."""
-        if '(' in dropdown_text:
-            return dropdown_text.split(' (')[0]
-        return dropdown_text
+        return extract_color_name(dropdown_text)
         
     def create_widgets(self):
         """Create and arrange all GUI widgets in compact layout."""
@@ -142,7 +205,7 @@ class RGBColorExplorerMini:
                                           values=self.get_dropdown_values(),
                                           state="readonly", width=28, font=('Arial', 8))
         self.color_combobox.grid(row=0, column=1)
-        self.color_combobox.set("Custom Color")  # Default selection
+        self.color_combobox.set(CUSTOM_COLOR)  # Default selection
         self.color_combobox.bind('<<ComboboxSelected>>', self.on_color_selected)
         
         # Add keyboard navigation for real-time color changes
@@ -171,7 +234,8 @@ class RGBColorExplorerMini:
         ttk.Label(red_frame, text="0", font=('Arial', 8)).grid(row=0, column=0, padx=(0, 3))
         self.red_scale = ttk.Scale(red_frame, from_=0, to=255, 
                                   variable=self.red_var, orient='horizontal',
-                                  command=self.on_scale_change, length=150)
+                                  command=lambda value: self.on_scale_change('red', value),
+                                  length=150)
         self.red_scale.grid(row=0, column=1, sticky='ew', padx=3)
         ttk.Label(red_frame, text="255", font=('Arial', 8)).grid(row=0, column=2, padx=(3, 0))
         
@@ -194,7 +258,8 @@ class RGBColorExplorerMini:
         ttk.Label(green_frame, text="0", font=('Arial', 8)).grid(row=0, column=0, padx=(0, 3))
         self.green_scale = ttk.Scale(green_frame, from_=0, to=255, 
                                     variable=self.green_var, orient='horizontal',
-                                    command=self.on_scale_change, length=150)
+                                    command=lambda value: self.on_scale_change('green', value),
+                                    length=150)
         self.green_scale.grid(row=0, column=1, sticky='ew', padx=3)
         ttk.Label(green_frame, text="255", font=('Arial', 8)).grid(row=0, column=2, padx=(3, 0))
         
@@ -217,7 +282,8 @@ class RGBColorExplorerMini:
         ttk.Label(blue_frame, text="0", font=('Arial', 8)).grid(row=0, column=0, padx=(0, 3))
         self.blue_scale = ttk.Scale(blue_frame, from_=0, to=255, 
                                    variable=self.blue_var, orient='horizontal',
-                                   command=self.on_scale_change, length=150)
+                                   command=lambda value: self.on_scale_change('blue', value),
+                                   length=150)
         self.blue_scale.grid(row=0, column=1, sticky='ew', padx=3)
         ttk.Label(blue_frame, text="255", font=('Arial', 8)).grid(row=0, column=2, padx=(3, 0))
         
@@ -242,11 +308,49 @@ class RGBColorExplorerMini:
                   command=self.random_color).grid(row=0, column=1, padx=2)
         ttk.Button(button_frame, text="Copy", 
                   command=self.copy_rgb).grid(row=0, column=2, padx=2)
-        
-        # Animation Controls (compact)
-        animation_frame = ttk.LabelFrame(main_frame, text="Animation", padding="4")
-        animation_frame.grid(row=8, column=0, columnspan=2, sticky='ew', pady=(8, 0))
-        
+        ttk.Checkbutton(button_frame, text="Distinct",
+                        variable=self.distinct_random).grid(row=0, column=3, padx=2)
+        
+        # Buttons that open the secondary panels (built on first use)
+        self.main_frame = main_frame
+        panel_bar = ttk.Frame(main_frame)
+        panel_bar.grid(row=self.PANEL_ROW, column=0, columnspan=2, sticky='w')
+        for column, (name, (title, _)) in enumerate(self.PANELS.items()):
+            button = ttk.Button(panel_bar, text=f"▸ {title}",
+                                command=lambda name=name: self.toggle_panel(name))
+            button.grid(row=0, column=column, padx=(0, 2))
+            self.panel_buttons[name] = button
+        
+    def toggle_panel(self, name):
+        """Show a secondary panel if it is hidden, otherwise hide it."""
+        if name in self.shown_panels:
+            self.close_panel(name)
+        else:
+            self.open_panel(name)
+        
+    def open_panel(self, name):
+        """Show a secondary panel below the panel bar, building it the first time; returns its frame."""
+        title, builder = self.PANELS[name]
+        panel = self.panels.get(name)
+        if panel is None:
+            panel = ttk.LabelFrame(self.main_frame, text=title, padding="4")
+            getattr(self, builder)(panel)
+            self.panels[name] = panel
+        row = self.PANEL_ROW + 1 + list(self.PANELS).index(name)
+        panel.grid(row=row, column=0, columnspan=2, sticky='ew', pady=(4, 0))
+        self.panel_buttons[name].config(text=f"▾ {title}")
+        self.shown_panels.add(name)
+        return panel
+        
+    def close_panel(self, name):
+        """Hide a secondary panel, keeping its widgets for next time."""
+        if name in self.shown_panels:
+            self.panels[name].grid_remove()
+            self.panel_buttons[name].config(text=f"▸ {self.PANELS[name][0]}")
+            self.shown_panels.discard(name)
+        
+    def create_animation_panel(self, animation_frame):
+        """Fill the animation panel: channel checkboxes, start/stop and speed (compact)."""
         # Checkboxes for independent channel animation (smaller)
         checkbox_frame = ttk.Frame(animation_frame)
         checkbox_frame.grid(row=0, column=0, columnspan=2, sticky='ew')
@@ -271,30 +375,32 @@ class RGBColorExplorerMini:
         ttk.Label(speed_frame, text="Speed:", font=('Arial', 8)).grid(row=0, column=0, padx=(0, 3))
         self.speed_scale = ttk.Scale(speed_frame, from_=1, to=10, orient='horizontal', 
                                     length=100, command=self.on_speed_change)
-        self.speed_scale.set(1)  # Default to slowest speed
+        self.speed_scale.set(self.animation_speed)
         self.speed_scale.grid(row=0, column=1, padx=3)
         ttk.Label(speed_frame, text="Slow", font=('Arial', 7)).grid(row=0, column=2, padx=(3, 0))
         ttk.Label(speed_frame, text="Fast", font=('Arial', 7)).grid(row=0, column=3, padx=(8, 0))
         
-    def on_scale_change(self, event=None):
+    def on_scale_change(self, channel, value):
         """Handle slider value changes."""
-        self.update_color()
-        self.update_combobox_selection()  # Set to "Custom Color" when manually adjusted
+        # The slider already shows this value, so the repaint leaves it alone
+        value = int(round(float(value)))
+        self.widget_state.mark(f'{channel}_scale', value)
+        if not self.color.set_channel(channel, value, source='slider'):
+            # Sub-step movement that rounds to the same channel value
+            return
+        self.update_combobox_selection()  # Match a named color or fall back to "Custom Color"
+        # A drag is one history entry, however many events it sends
+        self.record_history('drag')
     
     def on_entry_change(self, color_channel):
         """Handle text entry changes with validation for decimal and hex values."""
-        self._updating_from_entry = True  # Prevent circular updates
-        
         try:
             if color_channel == 'red':
                 entry_widget = self.red_entry
-                var = self.red_var
             elif color_channel == 'green':
                 entry_widget = self.green_entry
-                var = self.green_var
             elif color_channel == 'blue':
                 entry_widget = self.blue_entry
-                var = self.blue_var
             else:
                 return
             
@@ -304,10 +410,12 @@ class RGBColorExplorerMini:
             value = self.parse_color_value(value_str)
             
             if value is not None:
-                # Valid value - update the variable and slider
-                var.set(value)
-                self.update_color()
-                self.update_combobox_selection()  # Set to "Custom Color" when manually entered
+                # Valid value - update the color (and with it the slider)
+                # Leave the typed text (e.g. "0xFF") in the entry being edited
+                self.widget_state.mark(f'{color_channel}_entry', value)
+                if self.color.set_channel(color_channel, value, source='entry'):
+                    self.update_combobox_selection()  # Match a named color or fall back to "Custom Color"
+                    self.record_history()
                 # Reset any error styling
                 entry_widget.configure(style='TEntry')
             else:
@@ -317,42 +425,10 @@ class RGBColorExplorerMini:
         except Exception as e:
             print(f"Error processing entry change: {e}")
             self.show_entry_error(entry_widget)
-        finally:
-            self._updating_from_entry = False
             
     def parse_color_value(self, value_str):
         """Parse color value from string - supports decimal (0-255) and hex (00-FF, 0x00-0xFF)."""
-        if not value_str:
-            return None
-            
-        value_str = value_str.strip().lower()
-        
-        try:
-            # Try decimal format first
-            if value_str.isdigit():
-                value = int(value_str)
-                if 0 <= value <= 255:
-                    return value
-                return None
-            
-            # Try hexadecimal formats
-            if value_str.startswith('0x'):
-                # Format: 0x00 to 0xFF
-                value = int(value_str, 16)
-                if 0 <= value <= 255:
-                    return value
-                return None
-            elif len(value_str) <= 2 and all(c in '0123456789abcdef' for c in value_str):
-                # Format: 00 to FF (assume hex if all hex digits)
-                value = int(value_str, 16)
-                if 0 <= value <= 255:
-                    return value
-                return None
-                
-        except ValueError:
-            pass
-            
-        return None
+        return parse_color_value(value_str)
         
     def show_entry_error(self, entry_widget):
         """Show visual feedback for invalid entry."""
@@ -366,33 +442,56 @@ class RGBColorExplorerMini:
             pass
     
     def on_combobox_keypress(self, event):
-        """Handle any keypress in combobox."""
-        # Allow a small delay for the combobox to update its selection
-        self.root.after(10, self.apply_current_selection)
+        """Jump to the best match for the name or hex code typed so far."""
+        if event.keysym == 'BackSpace':
+            char = '\b'
+        elif event.char and event.char.isprintable():
+            char = event.char
+        else:
+            # Let Tab, Escape, Return etc. through
+            return None
+        index = self.type_ahead.key(char)
+        if index is not None:
+            self.select_palette_index(index)
+        return "break"
         
     def on_combobox_navigate(self, event):
         """Handle Up/Down arrow navigation in combobox."""
-        # Allow the default navigation to happen first
-        self.root.after(10, self.apply_current_selection)
+        if not len(self.palette):
+            return "break"
+        index = self.current_palette_index()
+        if index is None:
+            index = 0
+        else:
+            step = -1 if event.keysym == 'Up' else 1
+            index = max(0, min(len(self.palette) - 1, index + step))
+        self.type_ahead.reset()
+        self.select_palette_index(index)
+        return "break"
+        
+    def current_palette_index(self):
+        """Return the palette index shown in the dropdown, or None for Custom Color."""
+        position = self.color_combobox.current()
+        if position > 0:
+            # Values are Custom Color followed by the palette in order
+            return position - 1
+        return self.palette.index_of(self.extract_color_name(self.color_combobox.get()))
+        
+    def select_palette_index(self, index):
+        """Show palette entry index in the dropdown and apply its color."""
+        label = self.palette.label(index)
+        if self.color_combobox.get() != label:
+            self.color_combobox.set(label)
+        # All three channels change at once: one notification, one repaint
+        if self.color.set_rgb(*self.palette.rgb(index), source='palette'):
+            # Arrowing or typing through the dropdown merges into one entry
+            self.record_history('select')
         
     def apply_current_selection(self):
         """Apply the currently highlighted color in the combobox."""
-        try:
-            # Get the current value from the combobox
-            current_value = self.color_combobox.get()
-            if current_value:
-                # Extract color name and apply it
-                color_name = self.extract_color_name(current_value)
-                if color_name in self.COMMON_COLORS and self.COMMON_COLORS[color_name] is not None:
-                    rgb_values = self.COMMON_COLORS[color_name]
-                    r, g, b = rgb_values
-                    self.red_var.set(r)
-                    self.green_var.set(g)
-                    self.blue_var.set(b)
-                    self.update_color()
-        except Exception as e:
-            # Silently handle any errors during navigation
-            pass
+        index = self.current_palette_index()
+        if index is not None:
+            self.select_palette_index(index)
     
     def on_animation_change(self):
         """Handle animation checkbox changes."""
@@ -403,6 +502,9 @@ class RGBColorExplorerMini:
             self.start_animation()
         elif not any_active and self.animation_active:
             self.stop_animation()
+        elif self.animation_active:
+            # Channels were toggled while running
+            self.sync_animated_channels()
     
     def start_all_animation(self):
         """Start all channel animations."""
@@ -421,182 +523,303 @@ class RGBColorExplorerMini:
     
     def on_speed_change(self, value):
         """Handle animation speed changes."""
-        pass  # Speed is handled by the animation timer
+        # Re-anchors the sweep so channels continue smoothly at the new pace
+        self.animation_speed = int(float(value))
+        self.sweep.set_rate(self.sweep_rate(self.animation_speed))
+    
+    def sweep_rate(self, speed):
+        """Return sweep steps per second for a 1-10 speed setting (half speed)."""
+        return speed_to_rate(speed) / 2
     
     def start_animation(self):
         """Start the color animation for enabled channels."""
         self.animation_active = True
+        self.frame_clock.reset()
+        self.sync_animated_channels()
+        # Start the animation loop
         self.animate_color()
     
     def stop_animation(self):
         """Stop the color animation."""
         self.animation_active = False
-        if hasattr(self, 'animation_job'):
+        for channel in list(self.sweep.channels):
+            # Remember the direction so a restart continues the same way
+            self.animation_direction[channel] = self.sweep.stop(channel)
+        if self.animation_job is not None:
             self.root.after_cancel(self.animation_job)
+            self.animation_job = None
+    
+    def sync_animated_channels(self):
+        """Start or stop channel sweeps to match the animation checkboxes."""
+        enabled = {
+            "red": self.animate_red,
+            "green": self.animate_green,
+            "blue": self.animate_blue,
+        }
+        for channel, flag in enabled.items():
+            running = channel in self.sweep.channels
+            if flag.get() and not running:
+                # Continue from the channel's current value
+                self.sweep.start(channel, self.color.channel(channel), self.animation_direction[channel])
+                self.animated_values.pop(channel, None)
+            elif not flag.get() and running:
+                self.animation_direction[channel] = self.sweep.stop(channel)
+    
+    def seek_animation(self, seconds):
+        """Jump the running sweep forward (or back, if negative) by seconds."""
+        self.sweep.seek(seconds)
+        if self.animation_active:
+            self.animate_color()
     
     def animate_color(self):
-        """Main animation loop that updates color values for active channels."""
+        """Main animation loop that sets animated channels from the elapsed time."""
         if not self.animation_active:
             return
+        if self.animation_job is not None:
+            # Called directly (e.g. after a seek): replace the pending tick
+            self.root.after_cancel(self.animation_job)
         
-        speed = int(self.speed_scale.get())
-        step_size = 1  # Always 1 for smooth animation in mini version
-        
-        # Animate Red channel if enabled
-        if self.animate_red.get():
-            current_val = int(self.red_var.get())
-            direction = self.animation_direction["red"]
-            next_val = current_val + (step_size * direction)
-            
-            if next_val >= 255:
-                next_val = 255
-                self.animation_direction["red"] = -1
-            elif next_val <= 0:
-                next_val = 0
-                self.animation_direction["red"] = 1
-            
-            self.red_var.set(next_val)
-        
-        # Animate Green channel if enabled
-        if self.animate_green.get():
-            current_val = int(self.green_var.get())
-            direction = self.animation_direction["green"]
-            next_val = current_val + (step_size * direction)
-            
-            if next_val >= 255:
-                next_val = 255
-                self.animation_direction["green"] = -1
-            elif next_val <= 0:
-                next_val = 0
-                self.animation_direction["green"] = 1
-            
-            self.green_var.set(next_val)
-        
-        # Animate Blue channel if enabled
-        if self.animate_blue.get():
-            current_val = int(self.blue_var.get())
-            direction = self.animation_direction["blue"]
-            next_val = current_val + (step_size * direction)
-            
-            if next_val >= 255:
-                next_val = 255
-                self.animation_direction["blue"] = -1
-            elif next_val <= 0:
-                next_val = 0
-                self.animation_direction["blue"] = 1
-            
-            self.blue_var.set(next_val)
-        
-        # Update the display
-        self.update_color()
-        
-        # Calculate delay for half speed compared to original
-        base_delay = max(20, 200 - (speed * 15))  # Original timing
-        delay = base_delay * 2  # Double the delay for half speed
-        
-        # Schedule next animation frame
+        # Values depend only on the clock, so late or skipped ticks don't slow the sweep
+        now = self.sweep.clock()
+        moved = {}
+        for channel, value in self.sweep.values(now).items():
+            if self.animated_values.get(channel) != value:
+                self.animated_values[channel] = value
+                moved[channel] = value
+        
+        # All animated channels change together, and only if one actually moved
+        if moved and self.color.set_channels(moved, source='animation'):
+            # The whole sweep so far is a single history entry
+            self.record_history('animation')
+        
+        # Schedule the next tick on the next frame deadline
+        delay = self.frame_clock.next_delay(now)
         self.animation_job = self.root.after(delay, self.animate_color)
     
     def on_closing(self):
         """Handle application closing with proper cleanup."""
         self.stop_animation()
+        self.stop_control_server()
         self.root.destroy()
         
+    def on_color_change(self, packed, old, source):
+        """Repaint after the color state changed."""
+        self.update_color()
+        
     def update_color(self):
-        """Update the color display and value labels."""
-        # Get current RGB values
-        r = int(self.red_var.get())
-        g = int(self.green_var.get())
-        b = int(self.blue_var.get())
+        """Request a repaint of the color display and value labels."""
+        # Bursts of slider/animation events collapse into one repaint per frame
+        self.renderer.request()
+        
+    def render(self):
+        """Push the current color to the widgets whose displayed value changed."""
+        # Current RGB values, straight from the packed state (no Tcl calls)
+        packed = self.color.packed
+        r, g, b = self.color.rgb
+        changed = self.widget_state.changed
+        
+        # Move the sliders for changes that didn't come from them
+        if changed('red_scale', r):
+            self.red_var.set(r)
+        if changed('green_scale', g):
+            self.green_var.set(g)
+        if changed('blue_scale', b):
+            self.blue_var.set(b)
         
         # Update value labels to show hex values with 0x prefix
-        self.red_value_label.config(text=f"0x{r:02X}")
-        self.green_value_label.config(text=f"0x{g:02X}")
-        self.blue_value_label.config(text=f"0x{b:02X}")
+        if changed('red_label', r):
+            self.red_value_label.config(text=CHANNEL_LABELS[r])
+        if changed('green_label', g):
+            self.green_value_label.config(text=CHANNEL_LABELS[g])
+        if changed('blue_label', b):
+            self.blue_value_label.config(text=CHANNEL_LABELS[b])
         
         # Create hex color string
-        hex_color = f"#{r:02x}{g:02x}{b:02x}"
+        color_hex = hex_color(packed)
         
         # Update color display
-        self.color_frame.config(bg=hex_color)
+        if changed('color_frame', color_hex):
+            self.color_frame.config(bg=color_hex)
         
         # Update color value label (shorter format for compact display)
-        self.color_value_label.config(text=f"RGB({r},{g},{b}) | {hex_color.upper()}")
-        
-        # Update entry boxes to stay synchronized (only if not currently being edited)
-        if not hasattr(self, '_updating_from_entry'):
+        value_text = f"RGB({r},{g},{b}) | {color_hex}"
+        
+        # Append the closest named color (no room for a separate label)
+        nearest = self.nearest_index.nearest((r, g, b))
+        if nearest is not None:
+            name, rgb_values, distance = nearest
+            value_text += f" | {name}" if distance == 0 else f" | ~{name}"
+        if changed('value_label', value_text):
+            self.color_value_label.config(text=value_text)
+        
+        # Update entry boxes to stay synchronized (skipped if they already show the value)
+        if changed('red_entry', r):
             self.red_entry.delete(0, tk.END)
             self.red_entry.insert(0, str(r))
+        if changed('green_entry', g):
             self.green_entry.delete(0, tk.END)
             self.green_entry.insert(0, str(g))
+        if changed('blue_entry', b):
             self.blue_entry.delete(0, tk.END)
             self.blue_entry.insert(0, str(b))
         
+        # Match the dropdown to the new color after manual adjustments
+        if self.combobox_dirty:
+            self.combobox_dirty = False
+            self.sync_combobox(r, g, b)
+        
     def on_color_selected(self, event=None):
         """Handle color selection from dropdown."""
-        selected_text = self.color_combobox.get()
-        selected_color = self.extract_color_name(selected_text)
-        
-        if selected_color == "Custom Color" or selected_color not in self.COMMON_COLORS:
-            return
-            
-        rgb_values = self.COMMON_COLORS[selected_color]
-        if rgb_values is not None:
-            r, g, b = rgb_values
-            self.red_var.set(r)
-            self.green_var.set(g)
-            self.blue_var.set(b)
-            self.update_color()
+        # Custom Color leaves the sliders alone
+        self.apply_current_selection()
             
     def update_combobox_selection(self):
-        """Update combobox to show 'Custom Color' when user manually adjusts sliders."""
-        current_selection = self.extract_color_name(self.color_combobox.get())
-        if current_selection != "Custom Color":
-            self.color_combobox.set("Custom Color")
+        """Update combobox to the matching named color, or 'Custom Color' if there is none."""
+        # Done during the next repaint so slider drags only pay for it once per frame
+        self.combobox_dirty = True
+        self.renderer.request()
+        
+    def sync_combobox(self, r, g, b):
+        """Select the named color matching (r, g, b), or 'Custom Color'."""
+        # Pick the named color if the current one is perceptually identical to it
+        nearest = self.nearest_index.nearest((r, g, b))
+        if nearest is not None and nearest[2] < self.MATCH_THRESHOLD:
+            target = self.palette.label(self.palette.index_of(nearest[0]))
+        else:
+            target = CUSTOM_COLOR
+        
+        # Only change if the selection differs to avoid unnecessary updates
+        if self.color_combobox.get() != target:
+            self.color_combobox.set(target)
         
     def reset_to_gray(self):
         """Reset all sliders to middle gray (128, 128, 128)."""
-        self.red_var.set(128)
-        self.green_var.set(128)
-        self.blue_var.set(128)
-        self.update_color()
+        if self.color.set(DEFAULT_COLOR):
+            self.record_history()
         
     def random_color(self):
-        """Set sliders to a random color."""
-        import random
-        self.red_var.set(random.randint(0, 255))
-        self.green_var.set(random.randint(0, 255))
-        self.blue_var.set(random.randint(0, 255))
-        self.update_color()
+        """Set sliders to a random color; in distinct mode, one clearly unlike the recent colors."""
+        if self.distinct_random.get():
+            _, recent = self.history.recent(RECENT_COLORS)
+            changed = self.color.set_rgb(*distinct_from([unpack_rgb(packed) for packed in recent],
+                                                        rng=self.rng))
+        else:
+            changed = self.color.set(self.rng.randrange(0x1000000))
+        if changed:
+            self.record_history()
+        
+    def record_history(self, merge_key=None):
+        """Remember the current color for undo; changes with the same merge_key in a burst share one entry."""
+        self.history.record(self.color.packed, merge_key)
+        
+    def apply_history_color(self, packed):
+        """Show a color taken from the history without recording it again."""
+        if packed is not None and self.color.set(packed, source='history'):
+            self.update_combobox_selection()
+        
+    def undo(self, event=None):
+        """Go back to the previous color."""
+        self.apply_history_color(self.history.undo())
+        return "break"
+        
+    def redo(self, event=None):
+        """Go forward to the next color after an undo."""
+        self.apply_history_color(self.history.redo())
+        return "break"
         
     def copy_rgb(self):
         """Copy the current RGB values to clipboard."""
-        r = int(self.red_var.get())
-        g = int(self.green_var.get())
-        b = int(self.blue_var.get())
+        r, g, b = self.color.rgb
         rgb_string = f"rgb({r}, {g}, {b})"
         
         try:
             self.root.clipboard_clear()
             self.root.clipboard_append(rgb_string)
             # Show temporary feedback
-            original_text = self.color_value_label.cget('text')
             self.color_value_label.config(text="Copied!")
-            self.root.after(1500, lambda: self.color_value_label.config(text=original_text))
+            self.root.after(1500, self.restore_value_label)
         except Exception as e:
             print(f"Could not copy to clipboard: {e}")
             
+    def start_control_server(self, server):
+        """Take commands from a color_control.ControlServer, applying them once per frame."""
+        self.control_server = server
+        self.poll_control()
+        
+    def poll_control(self):
+        """Apply the control commands received since the last frame and publish the new state."""
+        server = self.control_server
+        # The mailbox holds only the latest value of each command, so a client
+        # sending thousands of updates a second costs one change per frame
+        for command, value in server.commands.drain():
+            self.apply_control(command, value)
+        server.publish(self.control_status())
+        self.control_job = self.root.after(self.CONTROL_POLL_MS, self.poll_control)
+        
+    def apply_control(self, command, value):
+        """Carry out one command from the control server (see color_control.parse_request)."""
+        if command == 'set':
+            if self.color.set(value, source='control'):
+                self.update_combobox_selection()
+                # A stream of updates is one history entry
+                self.record_history('control')
+        elif command == 'select':
+            index = value if isinstance(value, int) else self.palette.index_of(value)
+            if index is not None and index < len(self.palette):
+                self.select_palette_index(index)
+        elif command == 'animate':
+            self.animate_red.set("red" in value)
+            self.animate_green.set("green" in value)
+            self.animate_blue.set("blue" in value)
+            self.on_animation_change()
+        elif command == 'speed':
+            if "animation" in self.panels:
+                self.speed_scale.set(value)
+            self.on_speed_change(value)
+        
+    def control_status(self):
+        """Return the state reported to control clients that send get."""
+        return {
+            "color": rgb_to_hex(self.color.rgb),
+            "rgb": list(self.color.rgb),
+            "animating": sorted(self.sweep.channels) if self.animation_active else [],
+            "speed": self.animation_speed,
+            "palette": self.palette.title,
+            "palette_size": len(self.palette),
+        }
+        
+    def stop_control_server(self):
+        """Stop polling and close the control server, if there is one."""
+        if self.control_job is not None:
+            self.root.after_cancel(self.control_job)
+            self.control_job = None
+        if self.control_server is not None:
+            self.control_server.stop()
+            self.control_server = None
+        
+    def toggle_instrumentation_overlay(self, event=None):
+        """Show or hide the performance overlay (F12)."""
+        if self.instrumentation is None:
+            return
+        overlay = self.instrumentation_overlay
+        if overlay is not None and overlay.job is not None:
+            overlay.close()
+            self.instrumentation_overlay = None
+        else:
+            self.instrumentation_overlay = InstrumentationOverlay(self.root, self.instrumentation)
+            
+    def restore_value_label(self):
+        """Show the color values again after temporary feedback text."""
+        self.widget_state.invalidate('value_label')
+        self.update_color()
+            
     def center_window(self):
-        """Center the window on the screen."""
-        self.root.update_idletasks()
-        
-        # Get screen dimensions
+        """Size the window and center it on the screen with a single geometry call."""
+        # The size is fixed, so there's no need to make Tk lay out the (still
+        # empty) window to measure it first
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
-        
-        # Get window dimensions
-        window_width = 465
-        window_height = 442
+        window_width, window_height = self.WINDOW_SIZE
         
         # Calculate center position
         x = (screen_width - window_width) // 2
@@ -606,14 +829,41 @@ class RGBColorExplorerMini:
         self.root.geometry(f"{window_width}x{window_height}+{x}+{y}")
 
 
-def main():
+def parse_arguments(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Compact RGB color explorer.")
+    color_instrumentation.add_arguments(parser)
+    color_control.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to run the RGB Color Explorer Mini application."""
+    args = parse_arguments(argv)
+    
     try:
         # Create the main window
+        profile = StartupProfile() if args.startup_profile else None
+        mark_startup(profile, "imports")
+        load_tkinter()
         root = tk.Tk()
+        mark_startup(profile, "tk")
         
         # Create and run the application
-        app = RGBColorExplorerMini(root)
+        instrumentation = color_instrumentation.from_arguments(args)
+        app = RGBColorExplorerMini(root, instrumentation, startup_profile=profile)
+        if args.instrument:
+            app.toggle_instrumentation_overlay()
+        if args.instrument_dump:
+            instrumentation.start_dumps(root, args.instrument_dump, args.instrument_interval)
+        control = color_control.start_from_arguments(args)
+        if control is not None:
+            app.start_control_server(control)
+        if profile is not None:
+            # Let Tk map and draw the window before reporting
+            root.update()
+            mark_startup(profile, "on screen")
+            print(profile.format_report(), file=sys.stderr)
         
         # Start the GUI event loop
         root.mainloop()
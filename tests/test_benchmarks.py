@@ -0,0 +1,46 @@
+"""Tests for benchmarks/bench_explorer: a short run against both explorers on the fake Tk backend."""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "benchmarks", "bench_explorer.py")
+
+# Benchmarks every explorer has; the others depend on the full explorer's panels
+COMMON = {"startup", "update_color", "slider_drag_frame", "animation_frame", "parse_color_value",
+          "apply_current_selection", "type_ahead_keystroke"}
+
+
+class BenchmarkRunTests(unittest.TestCase):
+
+    def run_script(self, *args):
+        # A separate process, so the fake tkinter never replaces the real one here
+        result = subprocess.run([sys.executable, SCRIPT, *args], capture_output=True, text=True,
+                                timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+
+    def test_json_report(self):
+        report = json.loads(self.run_script("--iterations", "5", "--json"))
+        results = report["results"]
+        self.assertEqual(set(results), {"RGBColorExplorer", "RGBColorExplorerMini"})
+        self.assertTrue(COMMON <= set(results["RGBColorExplorerMini"]))
+        self.assertTrue(COMMON | {"color_plane_frame", "hue_drag_frame", "palette_browser_scroll",
+                                  "swatch_board_scroll"} <= set(results["RGBColorExplorer"]))
+        for explorer_results in results.values():
+            for summary in explorer_results.values():
+                self.assertGreaterEqual(summary["calls"], 5)
+                self.assertLessEqual(summary["p50_us"], summary["max_us"])
+
+    def test_table(self):
+        table = self.run_script("--iterations", "5", "--only", "update_color")
+        lines = table.splitlines()
+        self.assertTrue(lines[0].startswith("explorer"))
+        self.assertEqual(len(lines), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests for color_animation: the triangle wave, time-based sweeps and frame deadlines."""
+
+import unittest
+
+from color_animation import SWEEP_PERIOD, ChannelSweep, FrameClock, speed_to_rate, triangle_wave
+
+
+class ManualClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TriangleWaveTests(unittest.TestCase):
+
+    def test_values(self):
+        self.assertEqual([triangle_wave(p) for p in (0, 1, 255, 256, 509, 510, 765)],
+                         [0, 1, 255, 254, 1, 0, 255])
+        self.assertEqual(triangle_wave(-1), 1)
+        self.assertTrue(all(0 <= triangle_wave(p / 3) <= 255 for p in range(3 * SWEEP_PERIOD)))
+
+    def test_speed_to_rate(self):
+        # The original animation stepped every max(20, 200 - speed * 15) ms
+        self.assertAlmostEqual(speed_to_rate(1), 1000 / 185)
+        self.assertAlmostEqual(speed_to_rate(10), 1000 / 50)
+        self.assertAlmostEqual(speed_to_rate(20), 1000 / 20)
+
+
+class ChannelSweepTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = ManualClock()
+        self.sweep = ChannelSweep(rate=10.0, clock=self.clock)
+
+    def test_value_depends_only_on_elapsed_time(self):
+        self.sweep.start('red', 100)
+        self.sweep.start('blue', 100, direction=-1)
+        self.clock.now += 2.0
+        self.assertEqual(self.sweep.values(), {'red': 120, 'blue': 80})
+        self.assertEqual(self.sweep.direction('red'), 1)
+        self.assertEqual(self.sweep.direction('blue'), -1)
+        # Past the top the channel turns around
+        self.clock.now += 16.0
+        self.assertEqual(self.sweep.values()['red'], 230)
+        self.assertEqual(self.sweep.direction('red'), -1)
+
+    def test_set_rate_is_continuous(self):
+        self.sweep.start('green', 0)
+        self.clock.now += 5.0
+        self.sweep.set_rate(20.0)
+        self.assertEqual(self.sweep.values(), {'green': 50})
+        self.clock.now += 1.0
+        self.assertEqual(self.sweep.values(), {'green': 70})
+
+    def test_seek_and_stop(self):
+        self.sweep.start('red', 10)
+        self.sweep.seek(3.0)
+        self.assertEqual(self.sweep.values(), {'red': 40})
+        self.assertEqual(self.sweep.channels, {'red'})
+        self.assertEqual(self.sweep.stop('red'), 1)
+        self.assertEqual(self.sweep.values(), {})
+        self.assertEqual(self.sweep.direction('red'), 1)
+
+    def test_start_clamps(self):
+        self.sweep.start('red', 300)
+        self.assertEqual(self.sweep.values(), {'red': 255})
+
+
+class FrameClockTests(unittest.TestCase):
+
+    def test_deadlines_do_not_drift(self):
+        clock = ManualClock()
+        frames = FrameClock(fps=50, clock=clock)
+        self.assertEqual(frames.next_delay(), 20)
+        clock.now += 0.023     # a late tick: the next one is sooner
+        self.assertEqual(frames.next_delay(), 17)
+        self.assertEqual(frames.skipped, 0)
+
+    def test_missed_frames_are_skipped(self):
+        clock = ManualClock()
+        frames = FrameClock(fps=50, clock=clock)
+        frames.next_delay()
+        clock.now += 0.095
+        self.assertEqual(frames.next_delay(), 5)
+        self.assertEqual((frames.frames, frames.skipped), (2, 3))
+        frames.reset()
+        self.assertEqual(frames.next_delay(), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Tests for color_batch: chunking, conversion and the output formats."""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from color_batch import (CSV_HEADER, convert_chunk, convert_stream, format_results, iter_chunks,
+                         iter_lines, run_batch)
+
+LINES = ["#FF0000\n", "0, 0, 255\n", "not a color\n", "rgb(255, 255, 255)\n", "#fe0101\n"]
+
+
+class ConversionTests(unittest.TestCase):
+
+    def test_convert_chunk(self):
+        results = convert_chunk(LINES)
+        self.assertEqual(results[0], ("#FF0000", (255, 0, 0), "#FF0000", "Red", 0.0))
+        self.assertEqual(results[1][3], "Blue")
+        self.assertEqual(results[2], ("not a color", None, None, None, None))
+        self.assertEqual(results[3][2:4], ("#FFFFFF", "White"))
+        name, distance = results[4][3:]
+        self.assertEqual(name, "Red")
+        self.assertGreater(distance, 0)
+
+    def test_chunks_keep_order(self):
+        chunks = list(iter_chunks(iter(range(7)), 3))
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+        results = [result for chunk in convert_stream(LINES * 3, chunk_size=2) for result in chunk]
+        self.assertEqual(results, convert_chunk(LINES * 3))
+
+    def test_process_pool_matches_serial(self):
+        lines = LINES * 20
+        pooled = [result for chunk in convert_stream(lines, chunk_size=7, workers=2)
+                  for result in chunk]
+        self.assertEqual(pooled, convert_chunk(lines))
+
+
+class FormatTests(unittest.TestCase):
+
+    def setUp(self):
+        self.results = convert_chunk(LINES[:3])
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(format_results(self.results, "csv"))))
+        self.assertEqual(rows[0], ["#FF0000", "255", "0", "0", "#FF0000", "Red", "0.00"])
+        self.assertEqual(rows[2], ["not a color", "", "", "", "", "", ""])
+
+    def test_jsonl(self):
+        records = [json.loads(line) for line in format_results(self.results, "jsonl").splitlines()]
+        self.assertEqual(records[1], {"input": "0, 0, 255", "rgb": [0, 0, 255], "hex": "#0000FF",
+                                      "nearest": "Blue", "delta_e": 0.0})
+        self.assertEqual(records[2], {"input": "not a color", "error": "invalid color"})
+
+    def test_hex(self):
+        self.assertEqual(format_results(self.results, "hex"), "#FF0000\n#0000FF\ninvalid\n")
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            format_results(self.results, "xml")
+
+
+class RunBatchTests(unittest.TestCase):
+
+    def test_files_and_stats(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "colors.txt")
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.write("".join(LINES) + "\n   \n")
+            self.assertEqual(list(iter_lines([path])), LINES)
+            output = io.StringIO()
+            report = io.StringIO()
+            stats = run_batch([path], output, chunk_size=2, report=report)
+        self.assertEqual((stats["lines"], stats["invalid"]), (5, 1))
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], ",".join(CSV_HEADER))
+        self.assertEqual(len(lines), 6)
+        self.assertIn("Converted 5 colors (1 invalid)", report.getvalue())
+
+    def test_unknown_format_writes_nothing(self):
+        output = io.StringIO()
+        with self.assertRaises(ValueError):
+            run_batch([], output, output_format="xml")
+        self.assertEqual(output.getvalue(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""Tests for color_contrast: WCAG and APCA known values and the indexed queries against brute force."""
+
+import random
+import unittest
+
+from color_contrast import (AA, AAA, ContrastIndex, apca_contrast, audit_contrast,
+                            contrast_against, contrast_matrix, contrast_ratio, nearest_passing,
+                            wcag_rating)
+from color_palette import pack_rgb
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+def random_colors(rng, count):
+    return [tuple(rng.randrange(256) for _ in range(3)) for _ in range(count)]
+
+
+class KnownValueTests(unittest.TestCase):
+
+    def test_wcag_ratios(self):
+        self.assertEqual(contrast_ratio(BLACK, WHITE), 21.0)
+        self.assertEqual(contrast_ratio(WHITE, WHITE), 1.0)
+        # #777777 is the classic just-fails-AA gray on white; #767676 passes
+        self.assertAlmostEqual(contrast_ratio((0x77,) * 3, WHITE), 4.478, places=3)
+        self.assertAlmostEqual(contrast_ratio((0x76,) * 3, WHITE), 4.542, places=3)
+        self.assertEqual(contrast_ratio((10, 200, 30), (90, 20, 140)),
+                         contrast_ratio((90, 20, 140), (10, 200, 30)))
+
+    def test_wcag_rating(self):
+        self.assertEqual(wcag_rating(21.0), "AAA")
+        self.assertEqual(wcag_rating(AAA), "AAA")
+        self.assertEqual(wcag_rating(4.499), "AA Large")
+        self.assertEqual(wcag_rating(AA), "AA")
+        self.assertEqual(wcag_rating(2.9), "Fail")
+
+    def test_apca(self):
+        # Values from the APCA reference implementation (0.0.98G-4g)
+        self.assertAlmostEqual(apca_contrast(BLACK, WHITE), 106.04, places=2)
+        self.assertAlmostEqual(apca_contrast(WHITE, BLACK), -107.88, places=2)
+        self.assertAlmostEqual(apca_contrast((0x88,) * 3, WHITE), 63.06, places=2)
+        self.assertAlmostEqual(apca_contrast(WHITE, (0x88,) * 3), -68.54, places=2)
+        self.assertEqual(apca_contrast((100, 100, 100), (100, 100, 100)), 0.0)
+
+
+class PaletteContrastTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(19)
+        self.colors = random_colors(rng, 300)
+        self.queries = random_colors(rng, 40)
+
+    def test_against_and_matrix(self):
+        query = self.queries[0]
+        self.assertEqual(contrast_against(query, self.colors),
+                         [contrast_ratio(query, other) for other in self.colors])
+        matrix = contrast_matrix(self.queries, self.colors, block_size=64)
+        self.assertEqual(matrix, [[contrast_ratio(a, b) for b in self.colors] for a in self.queries])
+
+    def test_index_counts(self):
+        index = ContrastIndex([pack_rgb(rgb_values) for rgb_values in self.colors])
+        self.assertEqual(len(index), len(self.colors))
+        for query in self.queries:
+            ratios = [contrast_ratio(query, other) for other in self.colors]
+            self.assertEqual(index.count_below(query, AA), sum(ratio < AA for ratio in ratios))
+            counts = index.rating_counts(query)
+            self.assertEqual(sum(counts.values()), len(self.colors))
+            self.assertEqual(counts["Fail"], sum(wcag_rating(ratio) == "Fail" for ratio in ratios))
+
+    def test_index_lowest(self):
+        index = ContrastIndex([pack_rgb(rgb_values) for rgb_values in self.colors])
+        query = self.queries[1]
+        expected = sorted(contrast_ratio(query, other) for other in self.colors)[:10]
+        lowest = index.lowest(query, 10)
+        for (position, ratio), want in zip(lowest, expected):
+            self.assertAlmostEqual(ratio, want)
+            self.assertAlmostEqual(ratio, contrast_ratio(query, self.colors[position]))
+
+    def test_audit(self):
+        failing, total = audit_contrast(self.queries, self.colors)
+        self.assertEqual(total, len(self.queries) * len(self.colors))
+        self.assertEqual(failing, sum(contrast_ratio(a, b) < AA
+                                      for a in self.queries for b in self.colors))
+
+
+class NearestPassingTests(unittest.TestCase):
+
+    def test_passing_color_is_unchanged(self):
+        self.assertEqual(nearest_passing(BLACK, WHITE), (BLACK, 21.0))
+
+    def test_adjusts_lightness_to_pass(self):
+        for color, background in (((120, 160, 220), WHITE), ((60, 40, 90), BLACK),
+                                  ((200, 60, 60), (128, 128, 128))):
+            with self.subTest(color=color, background=background):
+                rgb_values, ratio = nearest_passing(color, background)
+                self.assertGreaterEqual(ratio, AA)
+                self.assertAlmostEqual(ratio, contrast_ratio(rgb_values, background))
+
+    def test_impossible(self):
+        # Nothing reaches 21:1 against mid gray
+        self.assertIsNone(nearest_passing((128, 128, 128), (128, 128, 128), minimum=21))
+
+
+if __name__ == '__main__':
+    unittest.main()
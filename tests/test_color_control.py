@@ -0,0 +1,124 @@
+"""Tests for color_control: request parsing, the mailbox and a live server."""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from color_control import (CommandMailbox, ControlError, ControlServer, parse_address,
+                           parse_request)
+
+
+class ParseRequestTests(unittest.TestCase):
+
+    def test_set(self):
+        self.assertEqual(parse_request({"cmd": "set", "color": "#FF8000"}), ("set", 0xFF8000))
+        self.assertEqual(parse_request({"cmd": "set", "rgb": [1, 2, 3]}), ("set", 0x010203))
+
+    def test_select_animate_speed_stop(self):
+        self.assertEqual(parse_request({"cmd": "select", "index": 4}), ("select", 4))
+        self.assertEqual(parse_request({"cmd": "select", "name": "Coral"}), ("select", "Coral"))
+        self.assertEqual(parse_request({"cmd": "animate", "channels": ["red", "blue"]}),
+                         ("animate", frozenset({"red", "blue"})))
+        self.assertEqual(parse_request({"cmd": "stop"}), ("animate", frozenset()))
+        self.assertEqual(parse_request({"cmd": "speed", "value": 10}), ("speed", 10))
+
+    def test_invalid_requests(self):
+        for request in (
+                [], "set", {}, {"cmd": "nope"},
+                {"cmd": "set"}, {"cmd": "set", "color": "not a color"},
+                {"cmd": "set", "rgb": [1, 2]}, {"cmd": "set", "rgb": [1, 2, 256]},
+                {"cmd": "set", "rgb": [True, 0, 0]}, {"cmd": "set", "rgb": [1.0, 2, 3]},
+                {"cmd": "select"}, {"cmd": "select", "index": -1},
+                {"cmd": "select", "index": True},
+                {"cmd": "animate"}, {"cmd": "animate", "channels": "red"},
+                {"cmd": "animate", "channels": ["purple"]},
+                {"cmd": "animate", "channels": [["red"]]},
+                {"cmd": "animate", "channels": [{"red": 1}]},
+                {"cmd": "speed", "value": 0}, {"cmd": "speed", "value": True}):
+            with self.subTest(request=request):
+                with self.assertRaises(ControlError):
+                    parse_request(request)
+
+    def test_addresses(self):
+        self.assertEqual(parse_address("8765"), ("tcp", ("127.0.0.1", 8765)))
+        self.assertEqual(parse_address("localhost:0"), ("tcp", ("localhost", 0)))
+        self.assertEqual(parse_address("[::1]:9"), ("tcp", ("::1", 9)))
+        self.assertEqual(parse_address("/tmp/x.sock"), ("unix", "/tmp/x.sock"))
+        self.assertEqual(parse_address("unix:x.sock"), ("unix", "x.sock"))
+        for address in ("10.0.0.1:80", "0.0.0.0:80", "port", "70000"):
+            with self.assertRaises(ValueError):
+                parse_address(address)
+
+
+class CommandMailboxTests(unittest.TestCase):
+
+    def test_keeps_latest_value_in_order_of_last_put(self):
+        mailbox = CommandMailbox()
+        mailbox.put("set", 1)
+        mailbox.put("select", 5)
+        mailbox.put("set", 2)
+        self.assertEqual(list(mailbox.drain()), [("select", 5), ("set", 2)])
+        self.assertEqual((mailbox.received, mailbox.replaced), (3, 1))
+        self.assertEqual(list(mailbox.drain()), [])
+
+    def test_concurrent_puts(self):
+        mailbox = CommandMailbox()
+
+        def send(offset):
+            for value in range(1000):
+                mailbox.put(f"cmd{offset}", value)
+
+        threads = [threading.Thread(target=send, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(dict(mailbox.drain()), {f"cmd{offset}": 999 for offset in range(4)})
+        self.assertEqual(mailbox.received, 4000)
+
+
+class ControlServerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "control.sock")
+        self.server = ControlServer(self.path).start()
+        self.client = socket.socket(socket.AF_UNIX)
+        self.client.connect(self.path)
+        self.stream = self.client.makefile('rwb')
+
+    def tearDown(self):
+        self.stream.close()
+        self.client.close()
+        self.server.stop()
+        self.directory.cleanup()
+
+    def request(self, line):
+        self.stream.write(line + b'\n')
+        self.stream.flush()
+        return json.loads(self.stream.readline())
+
+    def test_replies_and_queue(self):
+        self.assertEqual(self.request(b'{"cmd": "set", "rgb": [1, 2, 3]}'), {"ok": True})
+        self.assertEqual(self.request(b'{"cmd": "set", "rgb": [4, 5, 6]}'), {"ok": True})
+        self.assertEqual(list(self.server.commands.drain()), [("set", 0x040506)])
+        self.server.publish({"color": "#040506"})
+        self.assertEqual(self.request(b'{"cmd": "get"}'), {"ok": True, "color": "#040506"})
+
+    def test_errors_keep_the_connection(self):
+        for line in (b'{oops', b'{"cmd": "animate", "channels": [["red"]]}',
+                     b'{"cmd": "set", "rgb": [true, 0, 0]}', b'[1, 2]'):
+            with self.subTest(line=line):
+                self.assertFalse(self.request(line)["ok"])
+        self.assertEqual(self.request(b'{"cmd": "stop"}'), {"ok": True})
+
+    def test_stop_removes_socket(self):
+        self.server.stop()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
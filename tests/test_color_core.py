@@ -0,0 +1,72 @@
+"""Tests for color_core: channel and color parsing, hex formatting and dropdown labels."""
+
+import os
+import subprocess
+import sys
+import unittest
+
+from color_core import (COMMON_COLORS, CUSTOM_COLOR, channel_to_hex, extract_color_name,
+                        format_dropdown_label, get_dropdown_values, parse_color_string,
+                        parse_color_value, rgb_to_hex)
+
+
+class ParseColorValueTests(unittest.TestCase):
+
+    def test_valid(self):
+        for text, value in (("0", 0), ("128", 128), ("255", 255), ("  42 ", 42), ("0x00", 0),
+                            ("0x7f", 127), ("0XFF", 255), ("7f", 127), ("ff", 255), ("F", 15)):
+            with self.subTest(text=text):
+                self.assertEqual(parse_color_value(text), value)
+
+    def test_invalid(self):
+        for text in ("", None, "256", "0x100", "fff", "abc", "-1", "12.5", "0x", "g"):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_color_value(text))
+
+    def test_every_value_round_trips(self):
+        for value in range(256):
+            self.assertEqual(parse_color_value(str(value)), value)
+            self.assertEqual(parse_color_value(channel_to_hex(value)), value)
+
+
+class ParseColorStringTests(unittest.TestCase):
+
+    def test_forms(self):
+        for text in ("#FF8000", "#ff8000", "0xFF8000", "ff8000", "255, 128, 0", "255 128 0",
+                     "rgb(255, 128, 0)", "0xff 0x80 0", " #FF8000 "):
+            with self.subTest(text=text):
+                self.assertEqual(parse_color_string(text), (255, 128, 0))
+        self.assertEqual(parse_color_string("#F80"), (255, 136, 0))
+
+    def test_invalid(self):
+        for text in ("", "#FF80", "#GG8000", "1, 2", "1, 2, 3, 4", "256, 0, 0", "red", "#FF80001"):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_color_string(text))
+
+    def test_hex_round_trip(self):
+        for rgb_values in ((0, 0, 0), (255, 255, 255), (1, 35, 69), (171, 205, 239)):
+            self.assertEqual(parse_color_string(rgb_to_hex(rgb_values)), rgb_values)
+
+
+class FormattingTests(unittest.TestCase):
+
+    def test_hex(self):
+        self.assertEqual(rgb_to_hex((255, 128, 0)), "#FF8000")
+        self.assertEqual(channel_to_hex(10), "0x0A")
+
+    def test_dropdown_labels(self):
+        self.assertEqual(format_dropdown_label("Red", (255, 0, 0)), "Red (#FF0000)")
+        self.assertEqual(format_dropdown_label(CUSTOM_COLOR, None), CUSTOM_COLOR)
+        values = get_dropdown_values()
+        self.assertEqual(len(values), len(COMMON_COLORS))
+        self.assertEqual(values[0], CUSTOM_COLOR)
+        self.assertEqual([extract_color_name(value) for value in values], list(COMMON_COLORS))
+
+    def test_does_not_import_tkinter(self):
+        code = "import sys, color_core; sys.exit('tkinter' in sys.modules)"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(subprocess.run([sys.executable, "-c", code], cwd=root).returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
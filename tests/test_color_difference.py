@@ -0,0 +1,104 @@
+"""Tests for color_difference."""
+
+import unittest
+
+from color_difference import (CIE76, CIEDE2000, OKLAB, color_difference, delta_e_2000,
+                              delta_e_76, delta_e_94, distance_matrix, nearest_color,
+                              rgb_to_lab, rgb_to_oklab)
+
+
+# Test data from Sharma, Wu & Dalal, "The CIEDE2000 Color-Difference Formula:
+# Implementation Notes, Supplementary Test Data, and Mathematical Observations" (2005)
+SHARMA_PAIRS = (
+    ((50.0000, 2.6772, -79.7751), (50.0000, 0.0000, -82.7485), 2.0425),
+    ((50.0000, 3.1571, -77.2803), (50.0000, 0.0000, -82.7485), 2.8615),
+    ((50.0000, 2.8361, -74.0200), (50.0000, 0.0000, -82.7485), 3.4412),
+    ((50.0000, -1.3802, -84.2814), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, -1.1848, -84.8006), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, -0.9009, -85.5211), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, 0.0000, 0.0000), (50.0000, -1.0000, 2.0000), 2.3669),
+    ((50.0000, -1.0000, 2.0000), (50.0000, 0.0000, 0.0000), 2.3669),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0009), 7.1792),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0010), 7.1792),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0011), 7.2195),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0012), 7.2195),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0009, -2.4900), 4.8045),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0010, -2.4900), 4.8045),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0011, -2.4900), 4.7461),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 0.0000, -2.5000), 4.3065),
+    ((50.0000, 2.5000, 0.0000), (73.0000, 25.0000, -18.0000), 27.1492),
+    ((50.0000, 2.5000, 0.0000), (61.0000, -5.0000, 29.0000), 22.8977),
+    ((50.0000, 2.5000, 0.0000), (56.0000, -27.0000, -3.0000), 31.9030),
+    ((50.0000, 2.5000, 0.0000), (58.0000, 24.0000, 15.0000), 19.4535),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.1736, 0.5854), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.2972, 0.0000), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 1.8634, 0.5757), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.2592, 0.3350), 1.0000),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((63.0109, -31.0961, -5.8663), (62.8187, -29.7946, -4.0864), 1.2630),
+    ((61.2901, 3.7196, -5.3901), (61.4292, 2.2480, -4.9620), 1.8731),
+    ((35.0831, -44.1164, 3.7933), (35.0232, -40.0716, 1.5901), 1.8645),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+    ((36.4612, 47.8580, 18.3852), (36.2715, 50.5065, 21.2231), 1.4146),
+    ((90.8027, -2.0831, 1.4410), (91.1528, -1.6435, 0.0447), 1.4441),
+    ((90.9257, -0.5406, -0.9208), (88.6381, -0.8985, -0.7239), 1.5381),
+    ((6.7747, -0.2908, -2.4247), (5.8714, -0.0985, -2.2286), 0.6377),
+    ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082),
+)
+
+
+class ConversionTests(unittest.TestCase):
+
+    def test_lab_of_white_black_and_gray(self):
+        for rgb_values, expected in (((255, 255, 255), (100.0, 0.0, 0.0)),
+                                     ((0, 0, 0), (0.0, 0.0, 0.0))):
+            for actual, wanted in zip(rgb_to_lab(rgb_values), expected):
+                self.assertAlmostEqual(actual, wanted, places=2)
+        lightness, a, b = rgb_to_lab((128, 128, 128))
+        self.assertAlmostEqual(lightness, 53.585, places=2)
+        self.assertAlmostEqual(a, 0.0, places=2)
+        self.assertAlmostEqual(b, 0.0, places=2)
+
+    def test_lab_of_red(self):
+        for actual, wanted in zip(rgb_to_lab((255, 0, 0)), (53.24, 80.09, 67.20)):
+            self.assertAlmostEqual(actual, wanted, places=1)
+
+    def test_oklab_of_white_and_red(self):
+        for actual, wanted in zip(rgb_to_oklab((255, 255, 255)), (1.0, 0.0, 0.0)):
+            self.assertAlmostEqual(actual, wanted, places=3)
+        for actual, wanted in zip(rgb_to_oklab((255, 0, 0)), (0.6279, 0.2249, 0.1258)):
+            self.assertAlmostEqual(actual, wanted, places=3)
+
+
+class DifferenceTests(unittest.TestCase):
+
+    def test_ciede2000_sharma_pairs(self):
+        for lab1, lab2, expected in SHARMA_PAIRS:
+            with self.subTest(lab1=lab1, lab2=lab2):
+                self.assertAlmostEqual(delta_e_2000(lab1, lab2), expected, places=4)
+                # CIEDE2000 is symmetric
+                self.assertAlmostEqual(delta_e_2000(lab2, lab1), expected, places=4)
+
+    def test_cie76_is_euclidean(self):
+        self.assertEqual(delta_e_76((50, 0, 0), (53, 4, 0)), 5.0)
+
+    def test_cie94_known_value(self):
+        # Reference chroma 0: SC = SH = 1, so CIE94 equals CIE76
+        self.assertAlmostEqual(delta_e_94((50, 0, 0), (53, 4, 0)), 5.0)
+        # Pure chroma difference from a chroma-100 reference: 10 / SC
+        self.assertAlmostEqual(delta_e_94((50, 100, 0), (50, 110, 0)), 10 / 5.5)
+
+    def test_identical_colors(self):
+        for metric in (CIE76, CIEDE2000, OKLAB):
+            self.assertEqual(color_difference((12, 34, 56), (12, 34, 56), metric), 0.0)
+
+    def test_nearest_color_and_matrix(self):
+        colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+        self.assertEqual(nearest_color((250, 10, 10), colors)[0], 0)
+        matrix = distance_matrix(colors, colors)
+        self.assertEqual([matrix[i][i] for i in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(matrix[0][1], matrix[1][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Tests for color_distinct: minimum spacing, reproducibility and the recent-color mode."""
+
+import itertools
+import random
+import unittest
+
+from color_difference import OKLAB, get_metric
+from color_distinct import (DistinctSampler, distinct_colors, distinct_from, distinct_palette,
+                            spacing_for)
+
+
+def delta_e(first, second):
+    """Return the OKLab ΔE (distance × 100) between two (r, g, b) colors."""
+    convert, difference = get_metric(OKLAB)
+    return difference(convert(first), convert(second))
+
+
+class DistinctColorsTests(unittest.TestCase):
+
+    def test_every_pair_is_far_enough_apart(self):
+        colors = distinct_colors(60, min_delta_e=8, seed=3)
+        self.assertEqual(len(colors), 60)
+        for first, second in itertools.combinations(colors, 2):
+            self.assertGreaterEqual(delta_e(first, second), 8 - 1e-9)
+
+    def test_same_seed_same_colors(self):
+        self.assertEqual(distinct_colors(40, seed=7), distinct_colors(40, seed=7))
+        self.assertNotEqual(distinct_colors(40, seed=7), distinct_colors(40, seed=8))
+
+    def test_full_space_returns_fewer(self):
+        # Only a handful of colors fit when they must be 60 apart
+        colors = distinct_colors(100, min_delta_e=60, seed=1)
+        self.assertLess(len(colors), 100)
+        self.assertGreater(len(colors), 0)
+
+    def test_lightness_and_chroma_limits(self):
+        sampler = DistinctSampler(5, lightness=(0.6, 0.8), chroma=(0.0, 0.05), seed=2)
+        convert, _ = get_metric(OKLAB)
+        for rgb_values in sampler.fill(30):
+            lightness, a, b = convert(rgb_values)
+            self.assertTrue(0.6 <= lightness <= 0.8)
+            self.assertLessEqual((a * a + b * b) ** 0.5, 0.05)
+
+    def test_spacing_for(self):
+        self.assertEqual(spacing_for(1), 10.0)
+        self.assertLess(spacing_for(10000), spacing_for(100))
+        self.assertEqual(len(distinct_colors(1000, spacing_for(1000), seed=4)), 1000)
+
+    def test_palette_names(self):
+        palette = distinct_palette(3, seed=5)
+        self.assertEqual([name for name, _ in palette.items()],
+                         ["Distinct 1", "Distinct 2", "Distinct 3"])
+
+    def test_min_delta_e_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            DistinctSampler(0)
+
+
+class DistinctFromTests(unittest.TestCase):
+
+    def test_keeps_away_from_recent(self):
+        rng = random.Random(11)
+        recent = [(128, 128, 128), (255, 0, 0), (0, 0, 255), (255, 255, 255)]
+        for _ in range(50):
+            rgb_values = distinct_from(recent, rng=rng)
+            for other in recent:
+                self.assertGreaterEqual(delta_e(rgb_values, other), 10 - 1e-9)
+
+    def test_falls_back_when_nothing_fits(self):
+        rgb_values = distinct_from([(128, 128, 128)], min_delta_e=500, rng=random.Random(1))
+        self.assertEqual(len(rgb_values), 3)
+        self.assertTrue(all(0 <= value <= 255 for value in rgb_values))
+
+
+if __name__ == '__main__':
+    unittest.main()
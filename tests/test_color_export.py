@@ -0,0 +1,145 @@
+"""Tests for color_export: each format's output and round trips through the palette readers."""
+
+import io
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from color_export import (ExportCancelled, ExportJob, export_colors, export_format, write_ase,
+                          write_css, write_gpl, write_json_tokens)
+from color_palette import read_gpl_palette, read_json_palette
+from color_palette_file import open_palette_file
+
+PAIRS = [("Coral Red", (255, 64, 32)), ("Coral Red", (250, 60, 30)), ("Sky.Blue", (0, 128, 255)),
+         ("Ünïcode", (1, 2, 3))]
+
+
+class WriterTests(unittest.TestCase):
+
+    def test_css(self):
+        stream = io.StringIO()
+        self.assertEqual(write_css(stream, PAIRS, "Test */ title"), 4)
+        text = stream.getvalue()
+        self.assertTrue(text.startswith("/* Test * / title */\n:root {\n"))
+        self.assertIn("  --coral-red: #ff4020;\n", text)
+        self.assertIn("  --coral-red-2: #fa3c1e;\n", text)
+        self.assertIn("  --sky-blue: #0080ff;\n", text)
+
+    def test_json_tokens(self):
+        stream = io.StringIO()
+        write_json_tokens(stream, PAIRS, "Test")
+        group = json.loads(stream.getvalue())["Test"]
+        self.assertEqual(group["$type"], "color")
+        self.assertEqual(group["Coral Red"], {"$value": "#FF4020"})
+        self.assertEqual(group["Coral Red 2"], {"$value": "#FA3C1E"})
+        self.assertEqual(group["Sky-Blue"], {"$value": "#0080FF"})
+
+    def test_gpl(self):
+        stream = io.StringIO()
+        write_gpl(stream, [("Two\nlines", (1, 2, 3))], "My  Palette")
+        self.assertEqual(stream.getvalue(),
+                         "GIMP Palette\nName: My Palette\nColumns: 0\n#\n  1   2   3\tTwo lines\n")
+
+    def test_ase_header_count_and_blocks(self):
+        stream = io.BytesIO()
+        self.assertEqual(write_ase(stream, iter(PAIRS)), 4)
+        data = stream.getvalue()
+        self.assertEqual(struct.unpack_from('>4sHHI', data), (b"ASEF", 1, 0, 4))
+        offset = 12
+        names = []
+        while offset < len(data):
+            block_type, length = struct.unpack_from('>HI', data, offset)
+            self.assertEqual(block_type, 1)
+            body = data[offset + 6:offset + 6 + length]
+            units, = struct.unpack_from('>H', body)
+            names.append(body[2:2 + 2 * units].decode('utf-16-be').rstrip('\0'))
+            self.assertEqual(body[2 + 2 * units:6 + 2 * units], b"RGB ")
+            offset += 6 + length
+        self.assertEqual(offset, len(data))
+        self.assertEqual(names, [name for name, _ in PAIRS])
+
+    def test_unknown_format(self):
+        self.assertEqual(export_format("a/b.GPL"), ".gpl")
+        with self.assertRaises(ValueError):
+            export_format("palette.txt")
+
+
+class RoundTripTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_json_round_trip(self):
+        path = self.path("out.json")
+        self.assertEqual(export_colors(path, PAIRS), 4)
+        self.assertEqual([rgb for _, rgb in read_json_palette(path)], [rgb for _, rgb in PAIRS])
+
+    def test_gpl_round_trip(self):
+        path = self.path("out.gpl")
+        export_colors(path, iter(PAIRS))
+        self.assertEqual(list(read_gpl_palette(path)), PAIRS)
+
+    def test_rgbpal_round_trip(self):
+        path = self.path("out.rgbpal")
+        self.assertEqual(export_colors(path, iter(PAIRS)), 4)
+        self.assertEqual(list(open_palette_file(path).items()), PAIRS)
+
+    def test_failed_export_leaves_no_file(self):
+        path = self.path("out.css")
+
+        def broken():
+            yield PAIRS[0]
+            raise RuntimeError("source failed")
+
+        with self.assertRaises(RuntimeError):
+            export_colors(path, broken())
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_job(self):
+        path = self.path("out.ase")
+        job = ExportJob(path, iter(PAIRS), total=4).start()
+        job.join(5)
+        self.assertTrue(job.done)
+        self.assertIsNone(job.error)
+        self.assertEqual((job.written, job.progress()), (4, 1.0))
+
+    def test_cancelled_job(self):
+        path = self.path("out.gpl")
+        job = ExportJob(path, iter(PAIRS))
+        job.cancel()
+        job.start().join(5)
+        self.assertIsInstance(job.error, ExportCancelled)
+        self.assertFalse(os.path.exists(path))
+
+
+class ReadJsonPaletteTests(unittest.TestCase):
+
+    def read(self, data):
+        with tempfile.NamedTemporaryFile('w', suffix=".json", delete=False) as stream:
+            json.dump(data, stream)
+        self.addCleanup(os.remove, stream.name)
+        return list(read_json_palette(stream.name))
+
+    def test_forms(self):
+        self.assertEqual(self.read({"Red": "#FF0000"}), [("Red", (255, 0, 0))])
+        self.assertEqual(self.read([{"name": "Red", "hex": "#FF0000"},
+                                    {"name": "Lime", "rgb": [0, 255, 0]}]),
+                         [("Red", (255, 0, 0)), ("Lime", (0, 255, 0))])
+        self.assertEqual(self.read({"Group": {"$type": "color", "Red": {"$value": "#FF0000"}}}),
+                         [("Red", (255, 0, 0))])
+
+    def test_invalid_structure_raises_value_error(self):
+        for data in (["#FF0000"], [{"name": "Red", "hex": "#FF0000"}, 3], 42, "#FF0000", None):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    self.read(data)
+
+
+if __name__ == '__main__':
+    unittest.main()
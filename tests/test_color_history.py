@@ -0,0 +1,96 @@
+"""Tests for color_history: undo/redo, merging and the ring buffer at capacity."""
+
+import unittest
+
+from color_history import ColorHistory
+
+
+class ManualClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ColorHistoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = ManualClock()
+        self.history = ColorHistory(capacity=5, clock=self.clock, merge_timeout=0.5)
+
+    def entries(self):
+        return [self.history[index] for index in range(len(self.history))]
+
+    def test_undo_redo(self):
+        self.assertIsNone(self.history.current())
+        self.assertIsNone(self.history.undo())
+        for packed in (1, 2, 3):
+            self.history.record(packed)
+        self.assertEqual(self.history.undo(), 2)
+        self.assertEqual(self.history.undo(), 1)
+        self.assertIsNone(self.history.undo())
+        self.assertEqual(self.history.redo(), 2)
+        self.assertTrue(self.history.can_redo)
+        # A new color drops the redo entries
+        self.history.record(9)
+        self.assertEqual(self.entries(), [1, 2, 9])
+        self.assertFalse(self.history.can_redo)
+
+    def test_repeated_color_is_one_entry(self):
+        self.history.record(4)
+        self.history.record(4)
+        self.assertEqual(len(self.history), 1)
+
+    def test_merge_within_timeout(self):
+        self.history.record(1)
+        for packed in (10, 11, 12):
+            self.clock.now += 0.1
+            self.history.record(packed, 'drag')
+        # The burst is one entry holding its latest color
+        self.assertEqual(self.entries(), [1, 12])
+        # Another source, or a pause, starts a new entry
+        self.history.record(20, 'plane')
+        self.clock.now += 1.0
+        self.history.record(21, 'plane')
+        self.assertEqual(self.entries(), [1, 12, 20, 21])
+
+    def test_undo_ends_a_merge(self):
+        self.history.record(1)
+        self.history.record(2, 'drag')
+        self.history.record(3, 'drag')
+        self.history.undo()
+        self.history.record(4, 'drag')
+        self.assertEqual(self.entries(), [1, 4])
+
+    def test_capacity(self):
+        for packed in range(1, 9):
+            self.history.record(packed)
+        self.assertEqual(self.entries(), [4, 5, 6, 7, 8])
+        for _ in range(4):
+            self.history.undo()
+        self.assertEqual(self.history.current(), 4)
+        self.assertFalse(self.history.can_undo)
+        with self.assertRaises(IndexError):
+            self.history[5]
+
+    def test_recent(self):
+        for packed in range(1, 6):
+            self.history.record(packed)
+        self.assertEqual(self.history.recent(3), (2, [3, 4, 5]))
+        self.history.jump(0)
+        self.assertEqual(self.history.position, 0)
+        self.assertEqual(self.history.recent(3), (0, [1, 2, 3]))
+
+    def test_version_changes(self):
+        version = self.history.version
+        self.history.record(1)
+        self.assertGreater(self.history.version, version)
+        version = self.history.version
+        self.history.record(1)
+        self.assertEqual(self.history.version, version)
+
+
+if __name__ == '__main__':
+    unittest.main()
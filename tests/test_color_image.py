@@ -0,0 +1,106 @@
+"""Tests for color_image: PPM/PGM readers in every variant and the color histogram."""
+
+import io
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+from color_image import ColorHistogram, analyze_image, iter_pnm_strips, pack_pixels, read_pnm_header
+
+
+def make_pixels(width, height, seed=14):
+    """Return width x height random RGB pixels drawn from a few colors."""
+    rng = random.Random(seed)
+    colors = [(255, 0, 0), (0, 128, 255), (10, 20, 30), (255, 255, 255)]
+    return [colors[min(3, int(rng.expovariate(1.0)))] for _ in range(width * height)]
+
+
+class ImageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.width, self.height = 7, 5
+        self.pixels = make_pixels(self.width, self.height)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as stream:
+            stream.write(data)
+        return path
+
+    def read_all(self, path, strip_pixels):
+        width, height, strips = iter_pnm_strips(path, strip_pixels)
+        data = b"".join(strips)
+        return width, height, [tuple(data[i:i + 3]) for i in range(0, len(data), 3)]
+
+    def test_binary_and_plain_ppm(self):
+        raw = bytes(channel for pixel in self.pixels for channel in pixel)
+        plain = " ".join(str(channel) for channel in raw)
+        paths = (self.write("binary.ppm", b"P6\n# comment\n7 5\n255\n" + raw),
+                 self.write("plain.ppm", b"P3 7 5 255\n" + plain.encode() + b"\n"))
+        for path in paths:
+            for strip_pixels in (1, 7, 10, 1000):
+                with self.subTest(path=os.path.basename(path), strip_pixels=strip_pixels):
+                    self.assertEqual(self.read_all(path, strip_pixels),
+                                     (self.width, self.height, self.pixels))
+
+    def test_gray_maxval_and_16_bit(self):
+        path = self.write("gray.pgm", b"P2 2 1 15\n0 15\n")
+        self.assertEqual(self.read_all(path, 10)[2], [(0, 0, 0), (255, 255, 255)])
+        path = self.write("gray16.pgm", b"P5 2 1 65535\n" + bytes([0x80, 0x00, 0xFF, 0xFF]))
+        self.assertEqual(self.read_all(path, 10)[2], [(128, 128, 128), (255, 255, 255)])
+
+    def test_plain_scales_like_binary(self):
+        for maxval in (100, 1000):
+            samples = [0, 1, maxval // 3, maxval // 2, maxval - 1, maxval]
+            size = 1 if maxval < 256 else 2
+            raw = b"".join(sample.to_bytes(size, 'big') for sample in samples)
+            plain = " ".join(str(sample) for sample in samples)
+            binary = self.write("binary.ppm", b"P6 2 1 %d\n" % maxval + raw)
+            text = self.write("plain.ppm", b"P3 2 1 %d\n" % maxval + plain.encode())
+            with self.subTest(maxval=maxval):
+                self.assertEqual(self.read_all(text, 10), self.read_all(binary, 10))
+
+    def test_malformed(self):
+        for data in (b"P7 1 1 255\n", b"P6 x 1 255\n", b"P6 0 1 255\n", b"P6 1 1 70000\n"):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    read_pnm_header(io.BytesIO(data))
+        path = self.write("short.ppm", b"P6 2 2 255\n" + bytes(6))
+        with self.assertRaises(ValueError):
+            self.read_all(path, 10)
+        path = self.write("short_plain.ppm", b"P3 2 2 255\n1 2 3\n")
+        with self.assertRaises(ValueError):
+            self.read_all(path, 10)
+
+    def test_histogram_matches_counter(self):
+        raw = bytes(channel for pixel in self.pixels for channel in pixel)
+        path = self.write("image.ppm", b"P6 7 5 255\n" + raw)
+        width, height, histogram = analyze_image(path, strip_pixels=8)
+        expected = Counter(self.pixels)
+        self.assertEqual((width, height, histogram.pixels), (7, 5, 35))
+        self.assertEqual(histogram.unique, len(expected))
+        top = [((packed >> 16, (packed >> 8) & 0xFF, packed & 0xFF), count)
+               for packed, count in histogram.top(2)]
+        self.assertEqual(top, expected.most_common(2))
+
+    def test_unsupported_without_tk(self):
+        with self.assertRaises(ValueError):
+            analyze_image(self.write("image.png", b"\x89PNG"))
+
+
+class PackPixelsTests(unittest.TestCase):
+
+    def test_pack(self):
+        self.assertEqual(list(pack_pixels(bytes([1, 2, 3, 255, 0, 128]))), [0x010203, 0xFF0080])
+        histogram = ColorHistogram()
+        histogram.add(bytes([1, 2, 3]) * 4 + bytes([9, 9, 9]))
+        histogram.add(bytes([9, 9, 9]))
+        self.assertEqual(histogram.top(), [(0x010203, 4), (0x090909, 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Tests for color_index: tree searches against brute force."""
+
+import random
+import unittest
+
+from color_core import COMMON_COLORS
+from color_difference import CIE76, CIE94, CIEDE2000, OKLAB, get_metric
+from color_index import NearestColorIndex
+
+
+def brute_force(palette, rgb_values, metric, k=1):
+    """Return the k smallest metric distances from rgb_values to the palette."""
+    convert, difference = get_metric(metric)
+    query = convert(rgb_values)
+    return sorted(difference(query, convert(color)) for _, color in palette)[:k]
+
+
+class NearestColorIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.common = [(name, rgb_values) for name, rgb_values in COMMON_COLORS.items()
+                       if rgb_values is not None]
+        self.random = [(f"Color {index}", (rng.randrange(256), rng.randrange(256),
+                                           rng.randrange(256)))
+                       for index in range(500)]
+        self.queries = [(r, g, b) for r in range(0, 256, 17) for g in range(0, 256, 17)
+                        for b in range(0, 256, 17)]
+
+    def check_exact(self, palette, metric, queries, k=1):
+        index = NearestColorIndex(palette, metric)
+        for rgb_values in queries:
+            expected = brute_force(palette, rgb_values, metric, k)
+            actual = [distance for _, _, distance in index.nearest_k(rgb_values, k)]
+            self.assertEqual(len(actual), len(expected))
+            for got, wanted in zip(actual, expected):
+                self.assertAlmostEqual(got, wanted, places=9, msg=(metric, rgb_values))
+
+    def test_ciede2000_matches_brute_force(self):
+        self.check_exact(self.common, CIEDE2000, self.queries)
+        self.check_exact(self.random, CIEDE2000, self.queries[::7])
+
+    def test_cie94_matches_brute_force(self):
+        self.check_exact(self.common, CIE94, self.queries)
+        self.check_exact(self.random, CIE94, self.queries[::7])
+
+    def test_euclidean_metrics_match_brute_force(self):
+        for metric in (CIE76, OKLAB):
+            self.check_exact(self.random, metric, self.queries[::11])
+
+    def test_nearest_k(self):
+        self.check_exact(self.random, CIEDE2000, self.queries[::37], k=5)
+
+    def test_exact_match_and_names(self):
+        index = NearestColorIndex(COMMON_COLORS)
+        name, rgb_values, distance = index.nearest((255, 0, 0))
+        self.assertEqual((name, rgb_values, distance), ("Red", (255, 0, 0), 0.0))
+        # "Custom Color" has no value and is not indexed
+        self.assertEqual(len(index), len(self.common))
+
+    def test_tree_round_trip(self):
+        index = NearestColorIndex(self.random)
+        names = [name for name, _ in self.random]
+        colors = [color for _, color in self.random]
+        copy = NearestColorIndex.from_tree(names, colors, CIEDE2000, *index.tree_arrays())
+        for rgb_values in self.queries[::13]:
+            self.assertEqual(copy.nearest(rgb_values), index.nearest(rgb_values))
+
+    def test_empty_palette(self):
+        index = NearestColorIndex({})
+        self.assertIsNone(index.nearest((1, 2, 3)))
+        self.assertEqual(index.nearest_k((1, 2, 3), 3), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Tests for color_instrumentation: histogram percentiles, timing wrappers and dumps."""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from color_instrumentation import (CSV_FIELDS, EVENT_LOOP_LAG, Instrumentation, LatencyHistogram,
+                                   StartupProfile)
+
+
+class FakeClock:
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRoot:
+    """Just enough of a Tk root for watch_event_loop and start_dumps."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, func=None, *args):
+        self.callbacks.append((func, args))
+
+    def after_idle(self, func, *args):
+        self.callbacks.append((func, args))
+
+
+class LatencyHistogramTests(unittest.TestCase):
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(99), 0.0)
+        self.assertEqual(histogram.summary()["mean_ms"], 0.0)
+
+    def test_percentiles_bound_the_samples(self):
+        histogram = LatencyHistogram()
+        samples = [i / 10000 for i in range(1, 1001)]
+        for seconds in samples:
+            histogram.record(seconds)
+        for percent in (50, 90, 99):
+            exact = samples[int(len(samples) * percent / 100) - 1]
+            bound = histogram.percentile(percent)
+            # Within one bucket (a quarter octave) above the exact percentile
+            self.assertGreaterEqual(bound, exact)
+            self.assertLessEqual(bound, exact * 2 ** 0.25 * 1.0001)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 1000)
+        self.assertAlmostEqual(summary["mean_ms"], 50.05)
+        self.assertEqual(summary["max_ms"], 100.0)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+
+class InstrumentationTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.instrumentation = Instrumentation(clock=self.clock)
+
+    def test_instrument_times_calls(self):
+        clock = self.clock
+
+        class Handler:
+            def work(self, seconds):
+                """Pretend to work."""
+                clock.now += seconds
+                return seconds
+
+        handler = Handler()
+        self.instrumentation.instrument(handler, ["work"])
+        self.assertEqual(handler.work(0.002), 0.002)
+        handler.work(0.004)
+        self.assertEqual(handler.work.__doc__, "Pretend to work.")
+        summary = self.instrumentation.snapshot()["work"]
+        self.assertEqual(summary["count"], 2)
+        self.assertAlmostEqual(summary["mean_ms"], 3.0)
+
+    def test_event_loop_lag(self):
+        root = FakeRoot()
+        self.instrumentation.watch_event_loop(root)
+        root.after(10, lambda: None)
+        self.clock.now = 0.025
+        func, args = root.callbacks.pop()
+        func(*args)
+        summary = self.instrumentation.snapshot()[EVENT_LOOP_LAG]
+        self.assertAlmostEqual(summary["max_ms"], 15.0)
+
+    def test_dumps(self):
+        self.instrumentation.histogram("render").record(0.001)
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "dump.csv")
+            self.instrumentation.dump(csv_path)
+            self.instrumentation.dump(csv_path)
+            with open(csv_path, encoding='utf-8') as stream:
+                lines = stream.read().splitlines()
+            self.assertEqual(lines[0], ",".join(CSV_FIELDS))
+            self.assertEqual(len(lines), 3)
+
+            json_path = os.path.join(directory, "dump.jsonl")
+            self.instrumentation.dump(json_path)
+            with open(json_path, encoding='utf-8') as stream:
+                record = json.loads(stream.readline())
+            self.assertEqual(record["metrics"]["render"]["count"], 1)
+
+    def test_failed_dump_goes_to_stderr(self):
+        root = FakeRoot()
+        self.instrumentation.start_dumps(root, os.path.join(tempfile.gettempdir(), "missing", "x"))
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            func, args = root.callbacks.pop()
+            func(*args)
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertIn("Could not write instrumentation dump", stderr.getvalue())
+        # The dumps stop after a failure
+        self.assertEqual(root.callbacks, [])
+
+
+class StartupProfileTests(unittest.TestCase):
+
+    def test_phases(self):
+        clock = FakeClock()
+        profile = StartupProfile(start=0.0, clock=clock)
+        clock.now = 0.1
+        profile.mark("imports")
+        clock.now = 0.25
+        profile.mark("widgets")
+        self.assertEqual([name for name, _ in profile.phases], ["imports", "widgets"])
+        self.assertAlmostEqual(profile.phases[1][1], 0.15)
+        self.assertAlmostEqual(profile.total(), 0.25)
+        self.assertIn("widgets", profile.format_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
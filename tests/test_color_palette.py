@@ -0,0 +1,96 @@
+"""Tests for color_palette: lazy loading, lookups, labels and the text palette readers."""
+
+import os
+import tempfile
+import unittest
+
+from color_core import COMMON_COLORS, CUSTOM_COLOR
+from color_palette import (Palette, open_palette, pack_rgb, read_csv_palette, read_gpl_palette,
+                           read_palette_file, unpack_rgb)
+
+
+class PackingTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        for rgb_values in ((0, 0, 0), (255, 255, 255), (1, 2, 3), (255, 128, 0)):
+            self.assertEqual(unpack_rgb(pack_rgb(rgb_values)), rgb_values)
+        self.assertEqual(pack_rgb((0x12, 0x34, 0x56)), 0x123456)
+
+
+class PaletteTests(unittest.TestCase):
+
+    def test_loads_on_first_use(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return [("Red", (255, 0, 0)), ("Teal", (0, 128, 128)), ("Red", (200, 0, 0))]
+
+        palette = Palette(loader, "Test")
+        self.assertFalse(palette.loaded)
+        self.assertEqual(calls, [])
+        self.assertEqual(len(palette), 3)
+        self.assertTrue(palette.loaded)
+        self.assertEqual(palette.rgb(1), (0, 128, 128))
+        self.assertEqual(palette.packed(1), 0x008080)
+        self.assertEqual(palette.name(2), "Red")
+        self.assertEqual(calls, [1])
+
+    def test_lookups(self):
+        palette = Palette.from_pairs([("Red", (255, 0, 0)), ("Red", (200, 0, 0)),
+                                      ("Blue", (0, 0, 255))])
+        self.assertEqual(palette.index_of("Red"), 0)
+        self.assertEqual(palette.get("Blue"), (0, 0, 255))
+        self.assertIsNone(palette.index_of("Green"))
+        self.assertIsNone(palette.get("Green"))
+        self.assertEqual(palette.label(2), "Blue (#0000FF)")
+        self.assertEqual(palette.label.cache_info().currsize, 1)
+
+    def test_from_dict_skips_custom_color(self):
+        palette = Palette.from_dict(COMMON_COLORS)
+        self.assertEqual(len(palette), len(COMMON_COLORS) - 1)
+        self.assertIsNone(palette.index_of(CUSTOM_COLOR))
+        self.assertEqual(dict(palette.items()),
+                         {name: rgb for name, rgb in COMMON_COLORS.items() if rgb is not None})
+
+    def test_from_tables(self):
+        palette = Palette.from_tables(["A", "B"], [0x010203, 0xFFFFFF], "Tables")
+        self.assertTrue(palette.loaded)
+        self.assertEqual(list(palette.items()), [("A", (1, 2, 3)), ("B", (255, 255, 255))])
+
+
+class ReaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(text)
+        return path
+
+    def test_csv(self):
+        path = self.write("colors.csv", "name,color\nRed,#FF0000\nLime,0,255,0\nbad,nope\n")
+        self.assertEqual(list(read_csv_palette(path)), [("Red", (255, 0, 0)), ("Lime", (0, 255, 0))])
+
+    def test_gpl(self):
+        path = self.write("colors.gpl", "GIMP Palette\nName: Test\nColumns: 4\n# comment\n"
+                                        "255   0   0\tRed\n  0 128   0\n300 0 0 Too bright\n")
+        self.assertEqual(list(read_gpl_palette(path)), [("Red", (255, 0, 0)), ("#008000", (0, 128, 0))])
+
+    def test_open_palette(self):
+        path = self.write("My Colors.json", '{"Red": "#FF0000", "Navy": "rgb(0, 0, 128)"}')
+        palette = open_palette(path)
+        self.assertEqual(palette.title, "My Colors")
+        self.assertFalse(palette.loaded)
+        self.assertEqual(list(palette.items()), [("Red", (255, 0, 0)), ("Navy", (0, 0, 128))])
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            read_palette_file(self.write("colors.txt", "Red #FF0000\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
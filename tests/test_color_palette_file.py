@@ -0,0 +1,120 @@
+"""Tests for color_palette_file: .rgbpal round trips, stored trees and malformed files."""
+
+import os
+import random
+import tempfile
+import unittest
+
+from color_difference import CIE76, CIEDE2000
+from color_index import NearestColorIndex, index_for_palette
+from color_palette_file import (HEADER, convert_palette, open_palette_file, stream_palette_file,
+                                write_palette_file)
+
+PAIRS = [("Red", (255, 0, 0)), ("", (0, 0, 0)), ("Grün", (0, 128, 0)), ("日本の赤", (188, 0, 45)),
+         ("Red", (254, 1, 1))]
+
+
+class RoundTripTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_write_and_open(self):
+        path = self.path("test.rgbpal")
+        self.assertEqual(write_palette_file(path, PAIRS), 5)
+        palette = open_palette_file(path)
+        self.assertEqual(palette.title, "test")
+        self.assertEqual(list(palette.items()), PAIRS)
+        self.assertEqual(palette.index_of("Red"), 0)
+        self.assertEqual(palette.tree.metric, CIEDE2000)
+        with self.assertRaises(IndexError):
+            palette.name(5)
+
+    def test_stream_matches_write(self):
+        written, streamed = self.path("written.rgbpal"), self.path("streamed.rgbpal")
+        write_palette_file(written, PAIRS, metric=None)
+        self.assertEqual(stream_palette_file(streamed, iter(PAIRS)), 5)
+        with open(written, 'rb') as first, open(streamed, 'rb') as second:
+            self.assertEqual(first.read(), second.read())
+        self.assertIsNone(open_palette_file(streamed).tree)
+
+    def test_failed_write_leaves_no_temporary(self):
+        # A directory in the way makes the final rename fail after the .tmp is written
+        path = self.path("blocked.rgbpal")
+        os.mkdir(path)
+        for write in (write_palette_file, stream_palette_file):
+            with self.subTest(write=write.__name__):
+                with self.assertRaises(OSError):
+                    write(path, iter(PAIRS))
+                self.assertEqual(os.listdir(self.directory.name), ["blocked.rgbpal"])
+
+    def test_empty(self):
+        path = self.path("empty.rgbpal")
+        self.assertEqual(write_palette_file(path, []), 0)
+        self.assertEqual(len(open_palette_file(path)), 0)
+
+    def test_stored_tree_matches_a_fresh_index(self):
+        rng = random.Random(11)
+        pairs = [(f"Color {i}", tuple(rng.randrange(256) for _ in range(3))) for i in range(500)]
+        path = self.path("tree.rgbpal")
+        write_palette_file(path, pairs, metric=CIEDE2000)
+        palette = open_palette_file(path)
+        stored = index_for_palette(palette, CIEDE2000)
+        fresh = NearestColorIndex(pairs, CIEDE2000)
+        for _ in range(200):
+            query = tuple(rng.randrange(256) for _ in range(3))
+            self.assertEqual(stored.nearest(query)[2], fresh.nearest(query)[2])
+        # Another metric builds its own index
+        self.assertEqual(index_for_palette(palette, CIE76).nearest(pairs[7][1])[1], pairs[7][1])
+
+    def test_convert(self):
+        source = self.path("source.gpl")
+        with open(source, 'w', encoding='utf-8') as stream:
+            stream.write("GIMP Palette\n255 0 0\tRed\n0 0 255\tBlue\n")
+        destination = self.path("source.rgbpal")
+        self.assertEqual(convert_palette(source, destination), 2)
+        self.assertEqual(list(open_palette_file(destination).items()),
+                         [("Red", (255, 0, 0)), ("Blue", (0, 0, 255))])
+
+
+class MalformedFileTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "bad.rgbpal")
+
+    def write(self, data):
+        with open(self.path, 'wb') as stream:
+            stream.write(data)
+
+    def test_not_a_palette(self):
+        for data in (b"", b"short", b"GIMP Palette\n" * 10):
+            with self.subTest(data=data[:12]):
+                self.write(data)
+                with self.assertRaises(ValueError):
+                    open_palette_file(self.path)
+
+    def test_truncated(self):
+        write_palette_file(self.path, PAIRS)
+        with open(self.path, 'rb') as stream:
+            data = stream.read()
+        self.write(data[:HEADER.size + 16])
+        with self.assertRaises(ValueError):
+            open_palette_file(self.path)
+
+    def test_text_mode_damage(self):
+        write_palette_file(self.path, PAIRS)
+        with open(self.path, 'rb') as stream:
+            data = stream.read()
+        self.write(data.replace(b"\r\n", b"\n", 1))
+        with self.assertRaises(ValueError):
+            open_palette_file(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
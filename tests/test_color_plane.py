@@ -0,0 +1,81 @@
+"""Tests for color_plane: generated pixels against plane_color, and position round trips."""
+
+import random
+import unittest
+
+from color_plane import (HUE_PLANE, PLANE_MODES, PLANE_SIZE, RGB_PLANES, fixed_value, plane_color,
+                         plane_position, plane_ppm)
+
+HEADER = f"P6 {PLANE_SIZE} {PLANE_SIZE} 255\n".encode('ascii')
+
+
+def pixel(data, x, y):
+    """Return the (r, g, b) of pixel (x, y) in binary PPM plane data."""
+    start = len(HEADER) + 3 * (y * PLANE_SIZE + x)
+    return tuple(data[start:start + 3])
+
+
+class PlanePixelTests(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(13)
+
+    def test_rgb_planes_match_plane_color(self):
+        for mode in RGB_PLANES:
+            data = plane_ppm(mode, 77)
+            self.assertTrue(data.startswith(HEADER))
+            self.assertEqual(len(data), len(HEADER) + 3 * PLANE_SIZE * PLANE_SIZE)
+            for _ in range(200):
+                x, y = self.rng.randrange(PLANE_SIZE), self.rng.randrange(PLANE_SIZE)
+                self.assertEqual(pixel(data, x, y), plane_color(mode, 77, x, y))
+
+    def test_hue_plane_matches_plane_color(self):
+        for hue in (0, 45, 200, 359):
+            data = plane_ppm(HUE_PLANE, hue)
+            for _ in range(200):
+                x, y = self.rng.randrange(PLANE_SIZE), self.rng.randrange(PLANE_SIZE)
+                for got, want in zip(pixel(data, x, y), plane_color(HUE_PLANE, hue, x, y)):
+                    # Integer tables against float HSV: at most one step apart
+                    self.assertLessEqual(abs(got - want), 1)
+
+    def test_corners(self):
+        data = plane_ppm("Red × Green", 0)
+        self.assertEqual(pixel(data, 0, PLANE_SIZE - 1), (0, 0, 0))
+        self.assertEqual(pixel(data, PLANE_SIZE - 1, 0), (255, 255, 0))
+        data = plane_ppm(HUE_PLANE, 120)
+        self.assertEqual(pixel(data, PLANE_SIZE - 1, 0), (0, 255, 0))
+        self.assertEqual(pixel(data, 0, 0), (255, 255, 255))
+
+    def test_cached(self):
+        self.assertIs(plane_ppm("Green × Blue", 5), plane_ppm("Green × Blue", 5))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            plane_ppm("Hue × Value", 0)
+
+
+class PositionTests(unittest.TestCase):
+
+    def test_rgb_round_trip(self):
+        rng = random.Random(31)
+        for mode in RGB_PLANES:
+            for _ in range(100):
+                rgb_values = tuple(rng.randrange(256) for _ in range(3))
+                x, y = plane_position(mode, rgb_values)
+                self.assertEqual(plane_color(mode, fixed_value(mode, rgb_values), x, y), rgb_values)
+
+    def test_hue_round_trip(self):
+        rgb_values = (200, 40, 40)
+        hue = fixed_value(HUE_PLANE, rgb_values)
+        self.assertEqual(hue, 0)
+        x, y = plane_position(HUE_PLANE, rgb_values)
+        self.assertEqual(plane_color(HUE_PLANE, hue, x, y), rgb_values)
+        self.assertIsNone(fixed_value(HUE_PLANE, (90, 90, 90)))
+
+    def test_clamped(self):
+        for mode in PLANE_MODES:
+            self.assertEqual(plane_color(mode, 0, -20, 999), plane_color(mode, 0, 0, PLANE_SIZE - 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
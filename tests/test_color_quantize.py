@@ -0,0 +1,90 @@
+"""Tests for color_quantize: quantized counting, tiling and median cut."""
+
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+from color_image import ColorHistogram
+from color_quantize import (count_pnm_tile, extract_palettes, median_cut, palette_pairs,
+                            pnm_tiles, quantize_histogram, quantized_counts)
+
+
+def write_ppm(path, pixels, width):
+    """Write RGB pixel tuples as a binary PPM."""
+    with open(path, 'wb') as stream:
+        stream.write(f"P6 {width} {len(pixels) // width} 255\n".encode())
+        stream.write(bytes(channel for pixel in pixels for channel in pixel))
+
+
+class MedianCutTests(unittest.TestCase):
+
+    def test_separated_clusters(self):
+        rng = random.Random(15)
+        pixels = bytearray()
+        for center, count in (((240, 20, 20), 600), ((20, 40, 230), 300), ((30, 220, 40), 100)):
+            for _ in range(count):
+                pixels += bytes(min(255, max(0, value + rng.randint(-6, 6))) for value in center)
+        swatches = median_cut(quantized_counts(bytes(pixels)), 3)
+        self.assertEqual([population for _, population in swatches], [600, 300, 100])
+        for (rgb_values, _), center in zip(swatches, ((240, 20, 20), (20, 40, 230), (30, 220, 40))):
+            self.assertTrue(all(abs(a - b) <= 6 for a, b in zip(rgb_values, center)), rgb_values)
+
+    def test_fewer_colors_than_asked(self):
+        counts = quantized_counts(bytes([255, 0, 0]) * 5 + bytes([0, 0, 255]) * 2)
+        # Each swatch is the middle of its 5-bit bucket
+        self.assertEqual(median_cut(counts, 16), [((252, 4, 4), 5), ((4, 4, 252), 2)])
+        self.assertEqual(median_cut({}, 4), [])
+
+    def test_population_is_kept(self):
+        rng = random.Random(3)
+        rgb = bytes(rng.randrange(256) for _ in range(3 * 5000))
+        swatches = median_cut(quantized_counts(rgb), 8)
+        self.assertEqual(len(swatches), 8)
+        self.assertEqual(sum(population for _, population in swatches), 5000)
+
+    def test_histogram_matches_direct_counts(self):
+        rng = random.Random(8)
+        rgb = bytes(rng.randrange(256) for _ in range(3 * 2000))
+        histogram = ColorHistogram()
+        histogram.add(rgb)
+        self.assertEqual(quantize_histogram(histogram), quantized_counts(rgb))
+
+    def test_palette_pairs(self):
+        self.assertEqual(palette_pairs("Photo", [((1, 2, 3), 9), ((4, 5, 6), 1)]),
+                         [("Photo 1", (1, 2, 3)), ("Photo 2", (4, 5, 6))])
+
+
+class ExtractTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        rng = random.Random(21)
+        self.pixels = [tuple(rng.choice((0, 100, 200)) for _ in range(3)) for _ in range(40 * 30)]
+        self.path = os.path.join(self.directory.name, "image.ppm")
+        write_ppm(self.path, self.pixels, 40)
+
+    def test_tiles_cover_the_image(self):
+        tiles = pnm_tiles(self.path, tile_pixels=100)
+        self.assertEqual(sum(tile[4] for tile in tiles), 30)
+        counts = Counter()
+        for tile in tiles:
+            counts.update(count_pnm_tile(*tile))
+        rgb = bytes(channel for pixel in self.pixels for channel in pixel)
+        self.assertEqual(counts, quantized_counts(rgb))
+
+    def test_pool_matches_serial(self):
+        serial = list(extract_palettes([self.path, self.path], colors=6))
+        pooled = list(extract_palettes([self.path, self.path], colors=6, workers=2))
+        self.assertEqual(serial, pooled)
+        self.assertEqual(sum(population for _, population in serial[0][1]), 1200)
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            list(extract_palettes([os.path.join(self.directory.name, "image.png")]))
+
+
+if __name__ == '__main__':
+    unittest.main()
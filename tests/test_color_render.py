@@ -0,0 +1,133 @@
+"""Tests for color_render: frame coalescing, widget change tracking and gradient pixel data."""
+
+import unittest
+
+from color_render import FrameRenderer, GradientTrack, WidgetState
+
+
+class FakeRoot:
+    """after/after_idle/after_cancel on a manual clock, run by run_until()."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.jobs = {}
+        self.next_id = 0
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, func):
+        self.next_id += 1
+        self.jobs[self.next_id] = (self.now + ms / 1000, func)
+        return self.next_id
+
+    def after_idle(self, func):
+        return self.after(0, func)
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+    def run_until(self, time):
+        while True:
+            due = [(when, job) for job, (when, _) in self.jobs.items() if when <= time]
+            if not due:
+                break
+            when, job = min(due)
+            self.now = max(self.now, when)
+            self.jobs.pop(job)[1]()
+        self.now = time
+
+
+class FakeImage:
+
+    def __init__(self):
+        self.size = None
+        self.puts = []
+
+    def configure(self, width, height):
+        self.size = (width, height)
+
+    def put(self, data, to):
+        self.puts.append(data)
+
+
+class FrameRendererTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.renders = []
+        self.renderer = FrameRenderer(self.root, lambda: self.renders.append(self.root.now),
+                                      frame_interval_ms=16, clock=self.root.clock)
+
+    def test_requests_merge(self):
+        for _ in range(10):
+            self.renderer.request()
+        self.assertTrue(self.renderer.pending)
+        self.root.run_until(0.001)
+        self.assertEqual(self.renders, [0.0])
+        self.assertFalse(self.renderer.pending)
+
+    def test_at_most_one_render_per_frame(self):
+        self.renderer.flush()
+        self.root.run_until(0.004)
+        self.renderer.request()
+        self.root.run_until(0.010)
+        self.assertEqual(len(self.renders), 1)
+        self.root.run_until(0.020)
+        self.assertEqual(len(self.renders), 2)
+        self.assertGreaterEqual(self.renders[1], 0.016)
+
+    def test_cancel(self):
+        self.renderer.request()
+        self.renderer.cancel()
+        self.root.run_until(1.0)
+        self.assertEqual(self.renders, [])
+
+
+class WidgetStateTests(unittest.TestCase):
+
+    def test_changed_mark_invalidate(self):
+        state = WidgetState()
+        self.assertTrue(state.changed('label', 1))
+        self.assertFalse(state.changed('label', 1))
+        self.assertTrue(state.changed('label', 2))
+        state.mark('entry', "12")
+        self.assertFalse(state.changed('entry', "12"))
+        state.invalidate('entry')
+        self.assertTrue(state.changed('entry', "12"))
+        state.invalidate()
+        self.assertTrue(state.changed('label', 2))
+        self.assertTrue(state.changed('none', None))
+
+
+class GradientTrackTests(unittest.TestCase):
+
+    def test_pixel_data(self):
+        image = FakeImage()
+        track = GradientTrack(image, 1, width=3, height=2)
+        self.assertEqual(image.size, (3, 2))
+        track.paint(16, 200, 32)
+        self.assertEqual(image.puts[-1], "{#100020 #107f20 #10ff20} {#100020 #107f20 #10ff20}")
+        # The varying channel's own value doesn't change the track
+        track.paint(16, 0, 32)
+        self.assertEqual(track.pixel_data.cache_info().hits, 1)
+
+    def test_each_channel(self):
+        for channel, expected in ((0, "{#000203 #ff0203}"), (1, "{#010003 #01ff03}"),
+                                  (2, "{#010200 #0102ff}")):
+            image = FakeImage()
+            GradientTrack(image, channel, width=2, height=1).paint(1, 2, 3)
+            self.assertEqual(image.puts[-1], expected)
+
+    def test_resize(self):
+        image = FakeImage()
+        track = GradientTrack(image, 0, width=4)
+        self.assertFalse(track.resize(4))
+        self.assertTrue(track.resize(300))
+        self.assertEqual(image.size[0], 300)
+        track.paint(0, 0, 0)
+        self.assertEqual(image.puts[-1].split("}")[0].count("#"), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for color_search: ranking, tiers and narrowing."""
+
+import unittest
+
+from color_core import COMMON_COLORS
+from color_palette import Palette
+from color_search import DEFAULT_LIMIT, ColorSearch, TypeAhead
+
+
+# Entries in the large palette searched by LargePaletteTests
+LARGE_SIZE = 300000
+
+
+def names(palette, indices):
+    """Return the palette names at indices."""
+    return [palette.name(index) for index in indices]
+
+
+class ColorSearchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.palette = Palette.from_dict(COMMON_COLORS, "Common Colors")
+        self.search = ColorSearch(self.palette)
+
+    def test_prefix_matches_shortest_first(self):
+        pairs = [("Sea Green", (1, 1, 1)), ("Seashell", (2, 2, 2)), ("Sea", (3, 3, 3)),
+                 ("Deep Sea", (4, 4, 4))]
+        palette = Palette.from_pairs(pairs)
+        search = ColorSearch(palette)
+        # Prefix matches by length, then the word match
+        self.assertEqual(names(palette, search.search("sea")),
+                         ["Sea", "Seashell", "Sea Green", "Deep Sea"])
+
+    def test_tiers(self):
+        self.assertEqual(names(self.palette, self.search.search("spr", limit=1)), ["Spring Green"])
+        # Word start ("green" in "Spring Green") and substring ("urquo" in "Turquoise")
+        self.assertIn("Spring Green", names(self.palette, self.search.search("green")))
+        self.assertEqual(names(self.palette, self.search.search("urquo")), ["Turquoise"])
+        # Hex codes, explicit and as six digits
+        self.assertEqual(names(self.palette, self.search.search("#ff0000")), ["Red"])
+        self.assertEqual(names(self.palette, self.search.search("0xff0000")), ["Red"])
+        self.assertEqual(names(self.palette, self.search.search("FF0000")), ["Red"])
+        self.assertEqual(self.search.search("   "), [])
+
+    def test_fuzzy_matches_typos(self):
+        self.assertEqual(names(self.palette, self.search.search("turqoise", limit=1)),
+                         ["Turquoise"])
+        self.assertEqual(names(self.palette, self.search.search("lavendre", limit=1)),
+                         ["Lavender"])
+
+    def test_extended_queries_match_fresh_searches(self):
+        pairs = [(f"{word} {number}", (number % 256, 0, 0))
+                 for number in range(0, 3000, 7)
+                 for word in ("Dark Red", "Light Blue", "Sea Green")]
+        palette = Palette.from_pairs(pairs)
+        typed = ColorSearch(palette)
+        for query in ("sea gree", "light blue 1", "dark rde 12", "grn 70", "ue 21"):
+            for end in range(1, len(query) + 1):
+                for limit in (1, 50, None):
+                    with self.subTest(query=query[:end], limit=limit):
+                        self.assertEqual(list(typed.search(query[:end], limit)),
+                                         list(ColorSearch(palette).search(query[:end], limit)))
+
+    def test_type_ahead(self):
+        now = [0.0]
+        type_ahead = TypeAhead(self.search, clock=lambda: now[0])
+        type_ahead.key('c')
+        index = type_ahead.key('r')
+        self.assertEqual(self.palette.name(index), "Crimson")
+        # After a pause the next key starts a new query
+        now[0] += 5
+        self.assertEqual(self.palette.name(type_ahead.key('n')), "Navy")
+
+
+class LargePaletteTests(unittest.TestCase):
+    """Ranking and narrowing with LARGE_SIZE names (keystroke timing is in benchmarks/)."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.palette = Palette.from_pairs((f"Color {index}", (index % 256, (index >> 8) % 256, 0))
+                                         for index in range(LARGE_SIZE))
+        cls.search = ColorSearch(cls.palette)
+
+    def test_typed_queries(self):
+        # Typed one key at a time, so every tier narrows from the previous result
+        for query in ("color 4242", "#3f", "colr 12", "lor 29999", "xyz 12"):
+            for end in range(1, len(query) + 1):
+                results = self.search.search(query[:end])
+        self.assertEqual(names(self.palette, self.search.search("color 4242")[:1]), ["Color 4242"])
+        self.assertEqual(names(self.palette, self.search.search("lor 29999")[:1]), ["Color 29999"])
+        self.assertEqual(names(self.palette, self.search.search("colr 12", limit=1)), ["Color 12"])
+        self.assertEqual(list(results), [])
+
+    def test_prefix_ranking(self):
+        # Shortest names first, then palette order
+        self.assertEqual(names(self.palette, self.search.search("color 9", limit=4)),
+                         ["Color 9", "Color 90", "Color 91", "Color 92"])
+
+    def test_hex(self):
+        results = self.search.search("#3f")
+        self.assertEqual(len(results), DEFAULT_LIMIT)
+        for index in results:
+            self.assertEqual(self.palette.rgb(index)[0], 0x3F)
+
+
+if __name__ == '__main__':
+    unittest.main()
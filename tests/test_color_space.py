@@ -0,0 +1,107 @@
+"""Tests for color_space: known values, round trips and the slider position helpers."""
+
+import random
+import unittest
+
+from color_difference import delta_e_ok, linearize, rgb_to_oklab
+from color_palette import pack_rgb, unpack_rgb
+from color_space import (CMYK, HSL, HSV, OKLCH, SPACE_NAMES, channel_color, channel_table,
+                         colors_from_space, colors_to_space, encode_linear, from_positions,
+                         position_labels, rgb_to_space, space_to_rgb, sync_positions,
+                         to_positions)
+
+
+class KnownValueTests(unittest.TestCase):
+
+    def assertComponents(self, got, expected, places=3):
+        for value, want in zip(got, expected):
+            self.assertAlmostEqual(value, want, places=places)
+
+    def test_hsv_hsl_cmyk(self):
+        self.assertComponents(rgb_to_space(HSV, (255, 0, 0)), (0, 1, 1))
+        self.assertComponents(rgb_to_space(HSV, (0, 128, 255)), (209.882, 1, 1))
+        self.assertComponents(rgb_to_space(HSL, (0, 0, 255)), (240, 1, 0.5))
+        self.assertComponents(rgb_to_space(CMYK, (0, 0, 0)), (0, 0, 0, 1))
+        self.assertComponents(rgb_to_space(CMYK, (255, 128, 0)), (0, 0.498, 1, 0))
+
+    def test_oklch(self):
+        # Reference values from Björn Ottosson's OKLab definition
+        self.assertComponents(rgb_to_space(OKLCH, (255, 255, 255)), (1.0, 0.0), places=4)
+        self.assertComponents(rgb_to_space(OKLCH, (255, 0, 0)), (0.62796, 0.25768, 29.234),
+                              places=3)
+        self.assertComponents(rgb_to_space(OKLCH, (0, 0, 255)), (0.45201, 0.31321, 264.052),
+                              places=3)
+
+    def test_unknown_space(self):
+        with self.assertRaises(ValueError):
+            rgb_to_space("LAB", (0, 0, 0))
+
+
+class RoundTripTests(unittest.TestCase):
+
+    def test_encode_linear_inverts_linearize(self):
+        for value in range(256):
+            self.assertEqual(encode_linear(linearize(value)), value)
+        self.assertEqual(encode_linear(-0.5), 0)
+        self.assertEqual(encode_linear(1.5), 255)
+
+    def test_components_round_trip(self):
+        rng = random.Random(18)
+        colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(500)]
+        for space in SPACE_NAMES:
+            with self.subTest(space=space):
+                self.assertEqual(colors_from_space(space, colors_to_space(space, colors)), colors)
+
+    def test_out_of_gamut_oklch_is_mapped_into_srgb(self):
+        rgb_values = space_to_rgb(OKLCH, (0.7, 0.4, 150.0))
+        self.assertTrue(all(0 <= value <= 255 for value in rgb_values))
+        lightness, _, hue = rgb_to_space(OKLCH, rgb_values)
+        # Chroma is reduced; lightness and hue are kept
+        self.assertAlmostEqual(lightness, 0.7, delta=0.01)
+        self.assertAlmostEqual(hue, 150.0, delta=2.0)
+
+
+class PositionTests(unittest.TestCase):
+
+    def test_positions_round_trip_closely(self):
+        # Slider positions are quantized (percent steps), so close, not exact
+        rng = random.Random(5)
+        for space in (HSV, HSL, CMYK):
+            for _ in range(200):
+                packed = rng.randrange(0x1000000)
+                back = from_positions(space, to_positions(space, packed))
+                for shift in (16, 8, 0):
+                    self.assertLessEqual(abs((back >> shift & 0xFF) - (packed >> shift & 0xFF)), 4)
+        # A 1% OKLCh lightness step can move a dark sRGB channel a long way, so
+        # OKLCh is held to a perceptual bound instead (ΔE under 1)
+        for _ in range(200):
+            rgb_values = tuple(rng.randrange(256) for _ in range(3))
+            back = unpack_rgb(from_positions(OKLCH, to_positions(OKLCH, pack_rgb(rgb_values))))
+            self.assertLess(delta_e_ok(rgb_to_oklab(rgb_values), rgb_to_oklab(back)), 1.0)
+
+    def test_channel_table(self):
+        positions = to_positions(HSV, pack_rgb((200, 40, 40)))
+        table = channel_table(HSV, 0, positions)
+        self.assertEqual(len(table), 360)
+        for hue in (0, 90, 359):
+            expected = from_positions(HSV, (hue,) + positions[1:])
+            self.assertEqual(table[hue], expected)
+            self.assertEqual(channel_color(HSV, 0, positions, hue), expected)
+
+    def test_sync_keeps_meaningless_sliders(self):
+        gray = pack_rgb((128, 128, 128))
+        self.assertEqual(sync_positions(HSV, gray, (200, 0, 80))[0], 200)
+        black = pack_rgb((0, 0, 0))
+        self.assertEqual(sync_positions(CMYK, black, (10, 20, 30, 100)), (10, 20, 30, 100))
+        # A slider that does matter follows the color
+        red = pack_rgb((255, 0, 0))
+        self.assertEqual(sync_positions(HSV, red, (200, 100, 100)), (0, 100, 100))
+
+    def test_labels(self):
+        self.assertEqual(position_labels(HSV, 0)[90], "90°")
+        self.assertEqual(position_labels(HSL, 1)[50], "50%")
+        self.assertEqual(position_labels(OKLCH, 1)[123], "0.123")
+
+
+if __name__ == '__main__':
+    unittest.main()
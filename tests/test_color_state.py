@@ -0,0 +1,57 @@
+"""Tests for color_state: packed updates, change-only notifications and hex labels."""
+
+import unittest
+
+from color_core import rgb_to_hex
+from color_palette import unpack_rgb
+from color_state import DEFAULT_COLOR, ColorState, changed_channels, hex_color
+
+
+class ColorStateTests(unittest.TestCase):
+
+    def setUp(self):
+        self.state = ColorState()
+        self.changes = []
+        self.state.subscribe(lambda packed, old, source: self.changes.append((packed, old, source)))
+
+    def test_default(self):
+        self.assertEqual(self.state.packed, DEFAULT_COLOR)
+        self.assertEqual(self.state.rgb, (128, 128, 128))
+
+    def test_notifies_only_on_change(self):
+        self.assertTrue(self.state.set_rgb(1, 2, 3, source='palette'))
+        self.assertFalse(self.state.set_rgb(1, 2, 3, source='palette'))
+        self.assertEqual(self.changes, [(0x010203, DEFAULT_COLOR, 'palette')])
+
+    def test_channels(self):
+        self.state.set_channel('green', 300.0, source='slider')
+        self.assertEqual(self.state.rgb, (128, 255, 128))
+        self.state.set_channel('red', "-4")
+        self.state.set_channel('blue', 12.6)
+        self.assertEqual(self.state.rgb, (0, 255, 13))
+        self.assertEqual(self.state.channel('blue'), 13)
+        self.state.set_channels({'red': 9, 'blue': 8}, source='animation')
+        self.assertEqual(self.state.rgb, (9, 255, 8))
+        self.assertEqual(self.changes[-1][2], 'animation')
+        self.assertEqual(len(self.changes), 4)
+
+    def test_unsubscribe(self):
+        callback = self.state.subscribe(lambda *args: self.fail("unsubscribed callback ran"))
+        self.state.unsubscribe(callback)
+        self.state.set(0)
+
+
+class HelperTests(unittest.TestCase):
+
+    def test_hex_color_matches_rgb_to_hex(self):
+        for packed in (0, 0xFFFFFF, 0x0A0B0C, 0x123456, DEFAULT_COLOR):
+            self.assertEqual(hex_color(packed), rgb_to_hex(unpack_rgb(packed)))
+
+    def test_changed_channels(self):
+        self.assertEqual(changed_channels(0x102030, 0x102030), ())
+        self.assertEqual(changed_channels(0x102030, 0x112031), ('red', 'blue'))
+        self.assertEqual(changed_channels(0x000000, 0x00FF00), ('green',))
+
+
+if __name__ == '__main__':
+    unittest.main()
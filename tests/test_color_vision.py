@@ -0,0 +1,104 @@
+"""Tests for color_vision: simulation against a direct matrix product, and confusable pairs."""
+
+import itertools
+import math
+import random
+import unittest
+
+from color_difference import rgb_to_oklab
+from color_vision import (_MODELS, DEFICIENCIES, DEUTERANOPIA, MACHADO, METHODS, PROTANOPIA,
+                          TRITANOPIA, VIENOT, audit_vision, close_pairs, confusable_pairs,
+                          simulate, simulate_colors, simulate_packed)
+
+
+def to_linear(value):
+    c = value / 255
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def to_srgb(linear):
+    linear = min(1.0, max(0.0, linear))
+    c = 12.92 * linear if linear <= 0.0031308 else 1.055 * linear ** (1 / 2.4) - 0.055
+    return round(c * 255)
+
+
+def reference(method, deficiency, rgb_values):
+    """Simulate with floating-point math straight from the model's matrices."""
+    matrix, second, normal = _MODELS[method, deficiency]
+    linear = [to_linear(value) for value in rgb_values]
+    if normal is not None and sum(n * c for n, c in zip(normal, linear)) < 0:
+        matrix = second
+    return tuple(to_srgb(sum(m * c for m, c in zip(row, linear))) for row in matrix)
+
+
+class SimulationTests(unittest.TestCase):
+
+    def test_matches_reference(self):
+        rng = random.Random(22)
+        colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(300)]
+        for method, deficiency in itertools.product(METHODS, DEFICIENCIES):
+            simulated = simulate_colors(deficiency, colors, method)
+            # Table lookups against float math: at most one step apart
+            mismatches = [(rgb_values, got) for rgb_values, got in zip(colors, simulated)
+                          if any(abs(a - b) > 1 for a, b in
+                                 zip(got, reference(method, deficiency, rgb_values)))]
+            self.assertEqual(mismatches, [], (method, deficiency))
+
+    def test_grays_are_unchanged(self):
+        for deficiency in (PROTANOPIA, DEUTERANOPIA):
+            for value in (0, 64, 128, 255):
+                self.assertEqual(simulate(deficiency, (value,) * 3), (value,) * 3)
+
+    def test_red_and_green_merge_for_protans(self):
+        red, green = simulate(PROTANOPIA, (255, 0, 0)), simulate(PROTANOPIA, (0, 255, 0))
+        # Both become shades of a dull yellow, with about equal red and green
+        self.assertLess(abs(red[0] - red[1]), 10)
+        self.assertLess(abs(green[0] - green[1]), 10)
+
+    def test_packed(self):
+        packed = simulate_packed(TRITANOPIA, 0x3366CC, MACHADO)
+        self.assertEqual(((packed >> 16), (packed >> 8) & 0xFF, packed & 0xFF),
+                         simulate(TRITANOPIA, (0x33, 0x66, 0xCC), MACHADO))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            simulate("achromatopsia", (1, 2, 3))
+        with self.assertRaises(ValueError):
+            simulate(PROTANOPIA, (1, 2, 3), method="brettel")
+
+
+class ConfusionTests(unittest.TestCase):
+
+    def test_close_pairs_against_brute_force(self):
+        rng = random.Random(9)
+        points = [(rng.random(), rng.random(), rng.random()) for _ in range(400)]
+        found = {(i, j) for i, j, _ in close_pairs(points, 0.08)}
+        expected = {(i, j) for i, j in itertools.combinations(range(len(points)), 2)
+                    if math.dist(points[i], points[j]) < 0.08}
+        self.assertEqual(found, expected)
+
+    def test_confusable_pairs(self):
+        # Red and green are far apart normally but close for a deuteranope; the
+        # two grays look alike to everyone and are left out
+        colors = [(200, 60, 0), (110, 110, 0), (128, 128, 128), (129, 129, 129), (0, 0, 255)]
+        threshold = 8.0
+        pairs = list(confusable_pairs(colors, DEUTERANOPIA, threshold))
+        self.assertIn((0, 1), [(i, j) for i, j, _, _ in pairs])
+        self.assertNotIn((2, 3), [(i, j) for i, j, _, _ in pairs])
+        for i, j, normal, simulated in pairs:
+            self.assertGreaterEqual(normal, threshold)
+            self.assertLess(simulated, threshold)
+            self.assertAlmostEqual(normal, math.dist(rgb_to_oklab(colors[i]),
+                                                     rgb_to_oklab(colors[j])) * 100)
+
+    def test_audit(self):
+        colors = [(200, 60, 0), (110, 110, 0), (0, 0, 255)]
+        report = audit_vision(colors, threshold=8.0, method=VIENOT, examples=1)
+        self.assertEqual(set(report), set(DEFICIENCIES))
+        count, examples = report[DEUTERANOPIA]
+        self.assertGreaterEqual(count, 1)
+        self.assertLessEqual(len(examples), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()